@@ -12,9 +12,12 @@ import sys
 import os.path as osp
 from os.path import join as opj
 import tarfile
+import tempfile
 import timeit
 
 from subprocess import call
+from subprocess import check_output
+from subprocess import STDOUT
 
 from datalad.api import add
 from datalad.api import create
@@ -25,6 +28,8 @@ from datalad.api import ls
 from datalad.api import remove
 from datalad.api import uninstall
 
+from datalad.interface.results import ResultPathTracker
+from datalad.interface.results import results_from_annex_noinfo
 from datalad.utils import rmtree
 from datalad.utils import getpwd
 
@@ -59,6 +64,39 @@ class startup(SuprocBenchmarks):
     def time_import_api(self):
         call([sys.executable, "-c", "import datalad.api"])
 
+    # import of datalad.api must not load any interface or spawn processes
+    import_api_budget = 0.1
+
+    def track_import_api(self):
+        # import time as reported by the interpreter itself, so it does not
+        # include the startup of the interpreter
+        out = check_output(
+            [sys.executable, "-X", "importtime", "-c", "import datalad.api"],
+            stderr=STDOUT).decode()
+        duration = float(out.rstrip().split('\n')[-1].split('|')[1]) / 1e6
+        assert duration < self.import_api_budget, \
+            "import datalad.api took %.3f sec" % duration
+        return duration
+    track_import_api.unit = "seconds"
+
+    def track_import_api_subprocesses(self):
+        out = check_output([sys.executable, "-c", """\
+import subprocess
+calls = []
+_init = subprocess.Popen.__init__
+def _popen(self, args, *a, **kw):
+    calls.append(args)
+    _init(self, args, *a, **kw)
+subprocess.Popen.__init__ = _popen
+import datalad.api
+# version gets deduced by 'git describe' only within a git checkout
+print(len([c for c in calls if 'describe' not in c]))
+"""])
+        n = int(out)
+        assert not n, "import datalad.api spawned %d processes" % n
+        return n
+    track_import_api_subprocesses.unit = "processes"
+
 
 class runner(SuprocBenchmarks):
     """Some rudimentary tests to see if there is no major slowdowns from Runner
@@ -81,3 +119,32 @@ class runner(SuprocBenchmarks):
         self.git_runner.run("echo")
 
 
+class results(object):
+    """Bookkeeping of results on many paths, as done by get, drop and add"""
+
+    params = [10 ** 5, 10 ** 6]
+    param_names = ['npaths']
+    timeout = 600
+
+    def setup(self, npaths):
+        self.path = tempfile.mkdtemp(prefix='datalad_bm_results')
+        # 100 files per directory
+        self.dirs = [opj(self.path, 'd%d' % i) for i in range(npaths // 100)]
+        for d in self.dirs:
+            os.mkdir(d)
+        self.files = [opj(d, 'f%d' % i) for d in self.dirs for i in range(100)]
+
+    def teardown(self, npaths):
+        rmtree(self.path)
+
+    def time_results_from_annex_noinfo(self, npaths):
+        tracker = ResultPathTracker()
+        # a report on all the files but the last one in every directory
+        for f in self.files:
+            if not f.endswith('f99'):
+                tracker.add({'path': f, 'status': 'ok'})
+        for r in results_from_annex_noinfo(
+                Dataset(self.path), self.dirs + self.files, tracker,
+                dir_fail_msg='%s %s', noinfo_dir_msg='%s',
+                noinfo_file_msg='', action='get'):
+            pass
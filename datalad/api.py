@@ -9,14 +9,13 @@
 """Python DataLad API exposing user-oriented commands (also available via CLI)"""
 
 # Should have no spurious imports/definitions at the module level
-from .distribution.dataset import Dataset
+import sys as _sys
 
 
 def _generate_func_api():
     """Auto detect all available interfaces and generate a function-based
        API from them
     """
-    from importlib import import_module
     from inspect import isgenerator
     from collections import namedtuple
     from functools import wraps
@@ -24,6 +23,7 @@ def _generate_func_api():
     from .interface.base import get_interface_groups
     from .interface.base import get_api_name
     from .interface.base import get_allargs_as_kwargs
+    from .interface.base import load_interface
 
     def _kwargs_to_namespace(call, args, kwargs):
         """
@@ -66,14 +66,48 @@ def _generate_func_api():
     for grp_name, grp_descr, interfaces in get_interface_groups():
         for intfspec in interfaces:
             # turn the interface spec into an instance
-            mod = import_module(intfspec[0], package='datalad')
-            intf = getattr(mod, intfspec[1])
+            intf = load_interface(intfspec)
             api_name = get_api_name(intfspec)
             globals()[api_name] = intf.__call__
 
 
-# Invoke above helper
-_generate_func_api()
+def _get_api_specs():
+    """Return {API name: interface spec} of all available interfaces"""
+    from .interface.base import get_interface_groups
+    from .interface.base import get_api_name
+    return dict(
+        (get_api_name(intfspec), intfspec)
+        for grp_name, grp_descr, interfaces in get_interface_groups()
+        for intfspec in interfaces)
+
+
+if _sys.version_info >= (3, 7):
+    # Importing all the interfaces (and thereby GitPython, requests, ...)
+    # takes a considerable time, so they get imported upon first access
+    def __getattr__(name):
+        if name == '__all__':
+            value = ['Dataset'] + sorted(_get_api_specs())
+        elif name == 'Dataset':
+            from .distribution.dataset import Dataset as value
+        else:
+            intfspec = _get_api_specs().get(name, None)
+            if intfspec is None:
+                raise AttributeError(
+                    "module %r has no attribute %r" % (__name__, name))
+            from .interface.base import load_interface
+            value = load_interface(intfspec).__call__
+        globals()[name] = value
+        return value
+
+    def __dir__():
+        return sorted(
+            [k for k in globals() if k.startswith('__')] +
+            __getattr__('__all__'))
+else:
+    from .distribution.dataset import Dataset
+    # Invoke above helper
+    _generate_func_api()
 
 # Be nice and clean up the namespace properly
 del _generate_func_api
+del _sys
@@ -12,14 +12,17 @@ Wrapper for command and function calls, allowing for dry runs and output handlin
 """
 
 
+import errno
 import subprocess
 import sys
 import logging
+import time
 import os
 import shutil
 import shlex
 import atexit
 import functools
+import tempfile
 
 from collections import OrderedDict
 from six import PY3, PY2
@@ -29,6 +32,7 @@ from os.path import abspath, isabs, pathsep
 from .consts import GIT_SSH_COMMAND
 from .dochelpers import exc_str
 from .support.exceptions import CommandError
+from .support.cmdstats import cmd_stats
 from .support.protocol import NullProtocol, DryRunProtocol, \
     ExecutionTimeProtocol, ExecutionTimeExternalsProtocol
 from .utils import on_windows
@@ -38,6 +42,17 @@ lgr = logging.getLogger('datalad.cmd')
 
 _TEMP_std = sys.stdout, sys.stderr
 
+# Maximal length of a command line (in characters) we would compose, so
+# commands are invoked for long lists of files in chunks.  Only half of the
+# system limit, since environment counts towards it as well
+if on_windows:
+    CMD_MAX_ARG = 8191
+else:
+    try:
+        CMD_MAX_ARG = os.sysconf('SC_ARG_MAX') // 2
+    except (ValueError, OSError, AttributeError):
+        CMD_MAX_ARG = 2 ** 16
+
 if PY2:
     # TODO apparently there is a recommended substitution for Python2
     # which is a backported implementation of python3 subprocess
@@ -45,6 +60,56 @@ if PY2:
     pass
 
 
+class _RusagePopen(subprocess.Popen):
+    """Popen which collects resource usage of the process upon its reaping
+
+    The process is reaped via `os.wait4` by both `wait()` and `poll()`, and
+    its resource usage is stored in `rusage`.  Where `os.wait4` is not
+    available (Windows), it behaves as a regular Popen.
+    """
+    rusage = None
+
+    def _wait4(self, flags):
+        if self.returncode is not None:
+            return self.returncode
+        while True:
+            try:
+                pid, sts, rusage = os.wait4(self.pid, flags)
+                break
+            except OSError as e:
+                if e.errno == errno.EINTR:
+                    continue
+                if e.errno != errno.ECHILD:
+                    raise
+                # e.g. SIGCLD is ignored -- we can know neither the status
+                # nor the usage.  Popen assumes success as well
+                self.returncode = 0
+                return self.returncode
+        if pid != self.pid:
+            # still running
+            return None
+        self.rusage = rusage
+        self.returncode = -os.WTERMSIG(sts) if os.WIFSIGNALED(sts) \
+            else os.WEXITSTATUS(sts)
+        return self.returncode
+
+    def poll(self):
+        if not hasattr(os, 'wait4'):
+            return super(_RusagePopen, self).poll()
+        return self._wait4(os.WNOHANG)
+
+    def wait(self, timeout=None, **kwargs):
+        if not hasattr(os, 'wait4') or timeout is not None or kwargs:
+            # PY3 only arguments
+            return super(_RusagePopen, self).wait(timeout=timeout, **kwargs)
+        return self._wait4(0)
+
+
+def _get_cpu_time(proc):
+    rusage = getattr(proc, 'rusage', None)
+    return rusage.ru_utime + rusage.ru_stime if rusage else None
+
+
 class Runner(object):
     """Provides a wrapper for calling functions and commands.
 
@@ -402,14 +467,16 @@ class Runner(object):
                     shlex.split(cmd, posix=not on_windows)
                     if isinstance(cmd, string_types)
                     else cmd)
+            t_start = time.time()
             try:
-                proc = subprocess.Popen(cmd,
-                                        stdout=outputstream,
-                                        stderr=errstream,
-                                        shell=shell,
-                                        cwd=cwd or self.cwd,
-                                        env=popen_env,
-                                        stdin=stdin)
+                popen = _RusagePopen if cmd_stats.enabled else subprocess.Popen
+                proc = popen(cmd,
+                             stdout=outputstream,
+                             stderr=errstream,
+                             shell=shell,
+                             cwd=cwd or self.cwd,
+                             env=popen_env,
+                             stdin=stdin)
 
             except Exception as e:
                 prot_exc = e
@@ -437,6 +504,12 @@ class Runner(object):
                     out = tuple(map(decode_if_not_None, out))
 
                 status = proc.poll()
+                if cmd_stats.enabled:
+                    cmd_stats.record(
+                        cmd, time.time() - t_start, _get_cpu_time(proc),
+                        stdout_bytes=len(out[0] or ''),
+                        stderr_bytes=len(out[1] or ''),
+                        failed=status not in [0, None])
 
                 # needs to be done after we know status
                 if not log_online:
@@ -472,6 +545,110 @@ class Runner(object):
 
         return out
 
+    def run_gen(self, cmd, expect_stderr=False, expect_fail=False,
+                cwd=None, env=None, shell=None, stdin=None):
+        """Runs the command `cmd` yielding lines of its stdout as they come
+
+        In contrast to `run`, the output is not collected in memory, so it is
+        suitable for commands producing a lot of output which could be
+        processed line by line (e.g. `git annex ... --json`).  stderr is
+        collected in a temporary file to avoid dead locks, and logged (and
+        possibly reported via `CommandError`) only after the command exits.
+
+        Parameters
+        ----------
+        cmd : str, list
+          String (or list) defining the command call.  No shell is used if cmd
+          is specified as a list
+        expect_stderr, expect_fail, cwd, env, shell, stdin
+          Same as for `run`
+
+        Yields
+        ------
+        str
+          Lines of stdout, including trailing newline
+
+        Raises
+        ------
+        CommandError
+           if command's exitcode wasn't 0 or None, after all of its stdout was
+           yielded.  Only stderr is provided in the exception.
+        """
+        popen_env = env or self.env
+        self.log("Running (streaming stdout): %s", cmd)
+
+        if not self.protocol.do_execute_ext_commands:
+            if self.protocol.records_ext_commands:
+                self.protocol.add_section(shlex.split(cmd,
+                                                      posix=not on_windows)
+                                          if isinstance(cmd, string_types)
+                                          else cmd, None)
+            return
+
+        if shell is None:
+            shell = isinstance(cmd, string_types)
+
+        if self.protocol.records_ext_commands:
+            prot_exc = None
+            prot_id = self.protocol.start_section(
+                shlex.split(cmd, posix=not on_windows)
+                if isinstance(cmd, string_types)
+                else cmd)
+        errstream = tempfile.TemporaryFile()
+        t_start = time.time()
+        stdout_bytes = 0
+        try:
+            popen = _RusagePopen if cmd_stats.enabled else subprocess.Popen
+            proc = popen(cmd,
+                         stdout=subprocess.PIPE,
+                         stderr=errstream,
+                         shell=shell,
+                         cwd=cwd or self.cwd,
+                         env=popen_env,
+                         stdin=stdin)
+        except Exception as e:
+            prot_exc = e
+            errstream.close()
+            lgr.error("Failed to start %r%r: %s" %
+                      (cmd, " under %r" % cwd if cwd else '', exc_str(e)))
+            raise
+        finally:
+            if self.protocol.records_ext_commands:
+                self.protocol.end_section(prot_id, prot_exc)
+
+        try:
+            for line in iter(proc.stdout.readline, binary_type()):
+                stdout_bytes += len(line)
+                line = line.decode() if PY3 else line
+                self._log_out(line)
+                yield line
+            status = proc.wait()
+            errstream.seek(0)
+            err = errstream.read()
+            err = err.decode() if PY3 else err
+            if cmd_stats.enabled:
+                cmd_stats.record(
+                    cmd, time.time() - t_start, _get_cpu_time(proc),
+                    stdout_bytes=stdout_bytes, stderr_bytes=len(err),
+                    failed=status not in [0, None])
+            if status not in [0, None]:
+                self._log_err(err, expected=expect_fail)
+                msg = "Failed to run %r%s. Exit code=%d. err=%s" \
+                    % (cmd, " under %r" % (cwd or self.cwd), status, err)
+                (lgr.debug if expect_fail else lgr.error)(msg)
+                raise CommandError(str(cmd), msg, status, '', err)
+            else:
+                self._log_err(err, expected=expect_stderr)
+                self.log("Finished running %r with status %s" % (cmd, status),
+                         level=8)
+        finally:
+            if proc.poll() is None:
+                # we were interrupted before the command finished
+                proc.kill()
+                proc.wait()
+            proc.stdout.close()
+            errstream.close()
+
     def call(self, f, *args, **kwargs):
         """Helper to unify collection of logging all "dry" actions.
 
@@ -543,7 +720,11 @@ class GitRunner(Runner):
         if found.  If it is empty (but not None), we do nothing
         """
         if GitRunner._GIT_PATH is None:
-            from distutils.spawn import find_executable
+            try:
+                from shutil import which as find_executable
+            except ImportError:
+                # PY2
+                from distutils.spawn import find_executable
             annex_fpath = find_executable("git-annex")
             if not annex_fpath:
                 # not sure how to live further anyways! ;)
@@ -590,6 +771,10 @@ class GitRunner(Runner):
         return super(GitRunner, self).run(
             cmd, env=self.get_git_environ_adjusted(env), *args, **kwargs)
 
+    def run_gen(self, cmd, env=None, *args, **kwargs):
+        return super(GitRunner, self).run_gen(
+            cmd, env=self.get_git_environ_adjusted(env), *args, **kwargs)
+
 
 # ####
 # Preserve from previous version
@@ -620,6 +805,93 @@ def link_file_load(src, dst, dry_run=False):
         lgr.log(2, "Hardlinking finished")
 
 
+def generate_file_chunks(files, cmd=None):
+    """Split files into chunks which could be passed to a command at once
+
+    Parameters
+    ----------
+    files : list of str
+    cmd : list of str, optional
+      Command the files are to be appended to
+
+    Yields
+    ------
+    list of str
+      Consecutive chunks of files, so the command with any of them does not
+      exceed CMD_MAX_ARG characters
+    """
+    cmd_length = sum(len(a) + 1 for a in cmd or [])
+    chunk, length = [], cmd_length
+    for f in files:
+        if chunk and length + len(f) + 1 > CMD_MAX_ARG:
+            yield chunk
+            chunk, length = [], cmd_length
+        chunk.append(f)
+        length += len(f) + 1
+    if chunk:
+        yield chunk
+
+
+def run_chunked(run, cmd, files, jobs=None):
+    """Run a command for all files, in as many invocations as necessary
+
+    Parameters
+    ----------
+    run : callable
+      To be called with a command line, returning (stdout, stderr)
+    cmd : list of str
+    files : list of str
+      To be appended to `cmd`, in chunks so no command line exceeds
+      CMD_MAX_ARG characters
+    jobs : int, optional
+      How many invocations to run in parallel.  Only for commands which do
+      not modify anything
+
+    Returns
+    -------
+    stdout, stderr
+      Concatenated across all invocations, in the order of the chunks
+
+    Raises
+    ------
+    CommandError
+      If any invocation failed.  Raised only after all invocations finished,
+      with stdout and stderr of all of them
+    """
+    chunks = list(generate_file_chunks(files, cmd))
+    if len(chunks) <= 1:
+        return run(cmd + (chunks[0] if chunks else []))
+
+    lgr.debug("Running %s for %d files in %d invocations",
+              cmd, len(files), len(chunks))
+    cmds = [cmd + chunk for chunk in chunks]
+
+    def _run(cmd_):
+        try:
+            return run(cmd_), None
+        except CommandError as e:
+            return (e.stdout or '', e.stderr or ''), e
+
+    if jobs and jobs > 1:
+        from multiprocessing.pool import ThreadPool
+        pool = ThreadPool(min(jobs, len(cmds)))
+        try:
+            results = pool.map(_run, cmds)
+        finally:
+            pool.terminate()
+    else:
+        results = [_run(cmd_) for cmd_ in cmds]
+
+    out = ''.join(r[0][0] for r in results)
+    err = ''.join(r[0][1] for r in results)
+    failed = [e for _, e in results if e is not None]
+    if failed:
+        e = failed[-1]
+        raise CommandError(cmd=e.cmd, msg=e.msg, code=e.code,
+                           stdout=out, stderr=err)
+    return out, err
+
+
 def get_runner(*args, **kwargs):
     # needs local import, because the ConfigManager itself needs the runner
     from . import cfg
@@ -19,7 +19,6 @@ import argparse
 import sys
 import textwrap
 import shutil
-from importlib import import_module
 import os
 
 from six import text_type
@@ -59,19 +58,69 @@ THE SOFTWARE.
 """
 
 
-# TODO:  OPT look into making setup_parser smarter to become faster
-# Now it seems to take up to 200ms to do all the parser setup
-# even though it might not be necessary to know about all the commands etc.
-# I wondered if it could somehow decide on what commands to worry about etc
-# by going through sys.args first
+def _get_command(parser, args, commands):
+    """Return the name of the command invoked by the cmdline arguments
+
+    Global options (and their values) preceding the command are skipped
+    according to their definitions in the main `parser`, so the command can
+    be determined without setting up the parsers of all the commands.
+
+    Returns
+    -------
+    str or None
+      None if no known command is invoked, or if global options are not
+      known or request help, i.e. when the full parser is needed
+    """
+    nargs = {}
+    for action in parser._actions:
+        for opt in action.option_strings:
+            nargs[opt] = action.nargs
+    # number of values still to be consumed by the preceding option,
+    # -1 for any number
+    nvalues = 0
+    for arg in args:
+        if arg.startswith('-'):
+            opt = arg.split('=', 1)[0]
+            if opt not in nargs or opt in ('-h', '--help', '--help-np'):
+                return None
+            if '=' in arg:
+                nvalues = 0
+            elif nargs[opt] in ('+', '*'):
+                nvalues = -1
+            elif nargs[opt] is None:
+                nvalues = 1
+            else:
+                nvalues = nargs[opt] if isinstance(nargs[opt], int) else 0
+        elif nvalues:
+            if nvalues > 0:
+                nvalues -= 1
+        else:
+            return arg if arg in commands else None
+    return None
+
+
 def setup_parser(
         formatter_class=argparse.RawDescriptionHelpFormatter,
-        return_subparsers=False):
+        return_subparsers=False,
+        cmdlineargs=None):
+    """Setup the parser for the datalad cmdline
+
+    Parameters
+    ----------
+    formatter_class
+    return_subparsers : bool, optional
+      If True, a dict with the main parser and the parsers of the commands
+      is returned
+    cmdlineargs : list of str, optional
+      Arguments the parser is going to be used for.  If they invoke a known
+      command (and do not ask for help on global options), only the
+      interface of that command gets imported and its parser set up
+    """
 
     lgr.log(5, "Starting to setup_parser")
     # delay since it can be a heavy import
     from ..interface.base import dedent_docstring, get_interface_groups, \
-        get_cmdline_command_name, alter_interface_docs_for_cmdline
+        get_cmdline_command_name
     # setup cmdline args parser
     parts = {}
     # main parser
@@ -189,57 +238,30 @@ def setup_parser(
 
     # auto detect all available interfaces and generate a function-based
     # API from them
-    grp_short_descriptions = []
     interface_groups = get_interface_groups()
+    if cmdlineargs is not None:
+        intfspecs = dict(
+            (get_cmdline_command_name(intfspec), intfspec)
+            for _, _, intfspecs in interface_groups
+            for intfspec in intfspecs)
+        cmd_name = _get_command(parser, cmdlineargs, intfspecs)
+        if cmd_name:
+            lgr.log(5, "Setting up the parser only for %s", cmd_name)
+            parts[cmd_name] = _add_interface_parser(
+                subparsers, intfspecs[cmd_name], formatter_class)[1]
+            parts['datalad'] = parser
+            return parts if return_subparsers else parser
+
+    grp_short_descriptions = []
     for grp_name, grp_descr, _interfaces \
                 in sorted(interface_groups, key=lambda x: x[1]):
         # for all subcommand modules it can find
         cmd_short_descriptions = []
 
         for _intfspec in _interfaces:
-            # turn the interface spec into an instance
-            lgr.log(5, "Importing module %s " % _intfspec[0])
-            _mod = import_module(_intfspec[0], package='datalad')
-            _intf = getattr(_mod, _intfspec[1])
-            cmd_name = get_cmdline_command_name(_intfspec)
-            # deal with optional parser args
-            if hasattr(_intf, 'parser_args'):
-                parser_args = _intf.parser_args
-            else:
-                parser_args = dict(formatter_class=formatter_class)
-            # use class description, if no explicit description is available
-                intf_doc = _intf.__doc__.strip()
-                if hasattr(_intf, '_docs_'):
-                    # expand docs
-                    intf_doc = intf_doc.format(**_intf._docs_)
-                parser_args['description'] = alter_interface_docs_for_cmdline(
-                    intf_doc)
-            # create subparser, use module suffix as cmd name
-            subparser = subparsers.add_parser(cmd_name, add_help=False, **parser_args)
-            # all subparser can report the version
-            helpers.parser_add_common_opt(
-                subparser, 'version',
-                version='datalad %s %s\n\n%s' % (cmd_name, datalad.__version__,
-                                                 _license_info()))
-            # our own custom help for all commands
-            helpers.parser_add_common_opt(subparser, 'help')
-            helpers.parser_add_common_opt(subparser, 'log_level')
-            helpers.parser_add_common_opt(subparser, 'pbs_runner')
-            # let module configure the parser
-            _intf.setup_parser(subparser)
-            # logger for command
-
-            # configure 'run' function for this command
-            plumbing_args = dict(
-                func=_intf.call_from_parser,
-                logger=logging.getLogger(_intf.__module__),
-                subparser=subparser)
-            if hasattr(_intf, 'result_renderer_cmdline'):
-                plumbing_args['result_renderer'] = _intf.result_renderer_cmdline
-            subparser.set_defaults(**plumbing_args)
+            cmd_name, subparser, sdescr = _add_interface_parser(
+                subparsers, _intfspec, formatter_class)
             # store short description for later
-            sdescr = getattr(_intf, 'short_description',
-                             parser_args['description'].split('\n')[0])
             cmd_short_descriptions.append((cmd_name, sdescr))
             parts[cmd_name] = subparser
         grp_short_descriptions.append(cmd_short_descriptions)
@@ -282,6 +304,58 @@ def setup_parser(
         return parser
 
 
+def _add_interface_parser(subparsers, intfspec, formatter_class):
+    """Import an interface and add a parser for its command
+
+    Returns
+    -------
+    cmd_name, subparser, short_description
+    """
+    from ..interface.base import get_cmdline_command_name, \
+        alter_interface_docs_for_cmdline, load_interface
+    # turn the interface spec into an instance
+    _intf = load_interface(intfspec)
+    cmd_name = get_cmdline_command_name(intfspec)
+    # deal with optional parser args
+    if hasattr(_intf, 'parser_args'):
+        parser_args = _intf.parser_args
+    else:
+        parser_args = dict(formatter_class=formatter_class)
+        # use class description, if no explicit description is available
+        intf_doc = _intf.__doc__.strip()
+        if hasattr(_intf, '_docs_'):
+            # expand docs
+            intf_doc = intf_doc.format(**_intf._docs_)
+        parser_args['description'] = alter_interface_docs_for_cmdline(
+            intf_doc)
+    # create subparser, use module suffix as cmd name
+    subparser = subparsers.add_parser(cmd_name, add_help=False, **parser_args)
+    # all subparser can report the version
+    helpers.parser_add_common_opt(
+        subparser, 'version',
+        version='datalad %s %s\n\n%s' % (cmd_name, datalad.__version__,
+                                         _license_info()))
+    # our own custom help for all commands
+    helpers.parser_add_common_opt(subparser, 'help')
+    helpers.parser_add_common_opt(subparser, 'log_level')
+    helpers.parser_add_common_opt(subparser, 'pbs_runner')
+    # let module configure the parser
+    _intf.setup_parser(subparser)
+    # logger for command
+
+    # configure 'run' function for this command
+    plumbing_args = dict(
+        func=_intf.call_from_parser,
+        logger=logging.getLogger(_intf.__module__),
+        subparser=subparser)
+    if hasattr(_intf, 'result_renderer_cmdline'):
+        plumbing_args['result_renderer'] = _intf.result_renderer_cmdline
+    subparser.set_defaults(**plumbing_args)
+    sdescr = getattr(_intf, 'short_description',
+                     parser_args['description'].split('\n')[0])
+    return cmd_name, subparser, sdescr
+
+
 # yoh: arn't used
 # def generate_api_call(cmdlineargs=None):
 #     parser = setup_parser()
@@ -295,7 +369,10 @@ def setup_parser(
 def main(args=None):
     lgr.log(5, "Starting main(%r)", args)
     # PYTHON_ARGCOMPLETE_OK
-    parser = setup_parser()
+    # completion needs to know about all the commands
+    parser = setup_parser(
+        cmdlineargs=None if '_ARGCOMPLETE' in os.environ
+        else sys.argv[1:] if args is None else args)
     try:
         import argcomplete
         argcomplete.autocomplete(parser)
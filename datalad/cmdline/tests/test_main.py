@@ -15,6 +15,7 @@ from mock import patch
 
 import datalad
 from ..main import main
+from ..main import setup_parser
 from datalad import __version__
 from datalad.cmd import Runner
 from datalad.tests.utils import assert_equal, assert_raises, in_, ok_startswith
@@ -118,6 +119,21 @@ def test_subcmd_usage_on_unknown_args():
     in_('get', stdout)
 
 
+def test_setup_parser_for_command():
+    # only the invoked command gets set up
+    for args in (['get', 'file'],
+                 ['-l', 'debug', '--run-before', 'plug', 'a=1', '--cmd',
+                  'get', '--help'],
+                 ['-c', 'some.var=1', '--output-format=json', 'get']):
+        parts = setup_parser(cmdlineargs=args, return_subparsers=True)
+        assert_equal(sorted(parts), ['datalad', 'get'])
+    # help on global options, unknown or no commands need them all
+    for args in (['--help', 'get'], ['bogus'], ['--bogus', 'get'], [],
+                 ['--run-before', 'get']):
+        parts = setup_parser(cmdlineargs=args, return_subparsers=True)
+        assert_in('install', parts)
+
+
 def check_incorrect_option(opts, err_str):
     # The first line used to be:
     # stdout, stderr = run_main((sys.argv[0],) + opts, expect_stderr=True, exit_code=2)
@@ -11,18 +11,32 @@
 
 from datalad.cmd import GitRunner
 from datalad.dochelpers import exc_str
-from distutils.version import LooseVersion
+from datalad.support.exceptions import CommandError
+from six import PY3
 
 import re
 import os
+import threading
 from os.path import join as opj, exists
 from os.path import getmtime
 from os.path import abspath
+from os.path import expanduser
+from os.path import isfile
+from os.path import normpath
 from time import time
 
 cfg_kv_regex = re.compile(r'(^.*)\n(.*)$', flags=re.MULTILINE)
 cfg_section_regex = re.compile(r'(.*)\.[^.]+')
 cfg_sectionoption_regex = re.compile(r'(.*)\.([^.]+)')
+cfg_section_header_regex = re.compile(
+    r'^\[\s*([-.a-zA-Z0-9]+)\s*(?:"((?:[^"\\]|\\.)*)")?\s*\](.*)$')
+cfg_var_regex = re.compile(r'^([a-zA-Z][-a-zA-Z0-9]*)\s*(=?)(.*)$')
+cfg_unreadable_regex = re.compile(r"unable to read config file '(.*)'")
+
+# environment variables which make git config read something else than
+# the standard set of files
+_GIT_CONFIG_ENV_VARS = (
+    'GIT_CONFIG', 'GIT_CONFIG_PARAMETERS', 'GIT_CONFIG_COUNT', 'GIT_DIR')
 
 
 _where_reload_doc = """
@@ -45,6 +59,17 @@ def get_git_version(runner):
     return runner.run('git version'.split())[0].split()[2]
 
 
+_git_version = None
+
+
+def _get_git_version_cached(runner):
+    """Same as get_git_version but asking git only once per process"""
+    global _git_version
+    if _git_version is None:
+        _git_version = get_git_version(runner)
+    return _git_version
+
+
 def _where_reload(obj):
     """Helper decorator to simplify providing repetitive docstring"""
     obj.__doc__ = obj.__doc__ % _where_reload_doc
@@ -87,6 +112,211 @@ def _parse_gitconfig_dump(dump, store, fileset, replace):
     return store, fileset
 
 
+def _parse_gitconfig_value(value, lines):
+    """Parse (possibly quoted and continued) value as git does
+
+    Parameters
+    ----------
+    value : str
+      Value part (after '=') of a line
+    lines : iterator
+      Remaining lines of the file, consumed if value continues on them
+
+    Returns
+    -------
+    str
+    """
+    out = []
+    space = 0
+    quote = False
+    chars = iter(value)
+    while True:
+        c = next(chars, '\n')
+        if c == '\n':
+            if quote:
+                raise ValueError("unterminated quote")
+            return ''.join(out)
+        if c.isspace() and not quote:
+            if out:
+                space += 1
+            continue
+        if not quote and c in ';#':
+            # comment till the end of the line
+            return ''.join(out)
+        out.append(' ' * space)
+        space = 0
+        if c == '\\':
+            c = next(chars, '\n')
+            if c == '\n':
+                # line continuation
+                chars = iter(next(lines))
+                continue
+            try:
+                out.append({'t': '\t', 'b': '\b', 'n': '\n',
+                            '\\': '\\', '"': '"'}[c])
+            except KeyError:
+                raise ValueError("bad escape sequence \\%s" % c)
+            continue
+        if c == '"':
+            quote = not quote
+            continue
+        out.append(c)
+
+
+def _parse_gitconfig_file(fname):
+    """Parse a git config file without calling git
+
+    Only the common subset of the syntax is supported.  Whenever anything
+    else is encountered (e.g. includes, or variables without a value)
+    ValueError is raised, so the caller could fall back to `git config`.
+
+    Returns
+    -------
+    str
+      Content in the format of `git config -z -l --show-origin`, so it could
+      be parsed with `_parse_gitconfig_dump`
+    """
+    with open(fname, 'rb') as f:
+        content = f.read()
+    if PY3:
+        # UnicodeDecodeError is a ValueError as well
+        content = content.decode('utf-8')
+    lines = iter(content.splitlines())
+    section = None
+    dump = []
+    origin = 'file:%s' % fname
+    for line in lines:
+        line = line.strip()
+        if not line or line[0] in ';#':
+            continue
+        if line[0] == '[':
+            m = cfg_section_header_regex.match(line)
+            if not m or m.group(3).strip()[:1] not in ('', '#', ';'):
+                raise ValueError("unsupported section header: %s" % line)
+            name, subsection = m.group(1).lower(), m.group(2)
+            if name in ('include', 'includeif') or name.startswith('include'):
+                raise ValueError("includes are not supported")
+            if subsection is not None:
+                if '.' in name:
+                    raise ValueError("unsupported section header: %s" % line)
+                name += '.' + re.sub(r'\\(.)', r'\1', subsection)
+            section = name
+            continue
+        m = cfg_var_regex.match(line)
+        if not m or section is None:
+            raise ValueError("unsupported line: %s" % line)
+        var, eq, value = m.groups()
+        if not eq:
+            # valueless (boolean) variable, or garbage
+            raise ValueError("unsupported line: %s" % line)
+        dump.append(origin)
+        dump.append('%s.%s\n%s' % (
+            section, var.lower(), _parse_gitconfig_value(value, lines)))
+    return '\0'.join(dump)
+
+
+def _get_file_stamp(fname):
+    """Return (path, mtime, size) or (path, None, None) if it does not exist"""
+    try:
+        st = os.stat(fname)
+    except OSError:
+        return fname, None, None
+    return fname, st.st_mtime, st.st_size
+
+
+# Process-wide cache of the global and system configuration shared by all
+# ConfigManager instances, to not ask git for it over and over again.
+_global_cfg_cache = {}
+_global_cfg_cache_lock = threading.Lock()
+
+
+def _get_global_cfg_candidates():
+    """Files git might read global configuration from"""
+    xdg = os.environ.get('XDG_CONFIG_HOME') or expanduser(opj('~', '.config'))
+    return [expanduser(opj('~', '.gitconfig')), opj(xdg, 'git', 'config')]
+
+
+def _get_global_cfg_dump(runner):
+    """Return `git config -z -l --show-origin` dump of global+system config
+
+    The dump is obtained via `git config` and cached until any of the files it
+    came from (or the standard locations of the global configuration) change
+    their mtime or size.
+
+    If the configuration uses any `include.*` or `includeIf.*` directive, the
+    result of which might depend on the repository git is invoked in, no dump
+    is provided and the caller should ask `git config` for the complete
+    configuration from within the repository.
+
+    Returns
+    -------
+    str or None, set
+      Dump (None if includes are used) and the files to monitor for changes
+    """
+    env_key = tuple(os.environ.get(v) for v in
+                    ('HOME', 'XDG_CONFIG_HOME', 'GIT_CONFIG_NOSYSTEM'))
+    with _global_cfg_cache_lock:
+        cached = _global_cfg_cache.get(env_key)
+        current_time = time()
+        if cached is not None and all(
+                _get_file_stamp(s[0]) == s and
+                # protect against low-res mtimes as ConfigManager.reload does
+                (s[1] is None or (current_time - s[1]) > 2.0)
+                for s in cached['stamps']):
+            return cached['dump'], cached['files']
+
+        dumps = []
+        files = set(_get_global_cfg_candidates())
+        for where in ('--system', '--global'):
+            try:
+                stdout, stderr = runner.run(
+                    ['git', 'config', where, '-z', '-l', '--show-origin',
+                     '--includes'],
+                    log_stderr=True, expect_fail=True)
+            except CommandError as e:
+                # no such file (yet), but we need to know to monitor it
+                stdout = ''
+                m = cfg_unreadable_regex.search(e.stderr)
+                if m:
+                    files.add(abspath(m.group(1)))
+            dumps.append(stdout)
+        dump = '\0'.join(d.strip('\0') for d in dumps if d.strip('\0'))
+        store, files = _parse_gitconfig_dump(dump, {}, files, replace=False)
+        if any(k.startswith(('include.', 'includeif.')) for k in store):
+            # conditional includes are evaluated relative to the repository,
+            # so such a dump must not be shared across repositories
+            dump = None
+        _global_cfg_cache[env_key] = {
+            'dump': dump,
+            'files': files,
+            'stamps': [_get_file_stamp(f) for f in files],
+        }
+        return dump, files
+
+
+def _get_repo_cfgfname(path):
+    """Return path to the .git/config of a repository, following .git file
+
+    For a linked worktree the configuration of the repository it belongs to,
+    as pointed to by `commondir`, is returned.
+    """
+    dotgit = opj(path, '.git')
+    if isfile(dotgit):
+        with open(dotgit) as f:
+            line = f.readline().strip()
+        if line.startswith('gitdir:'):
+            dotgit = line[7:].strip()
+            if not os.path.isabs(dotgit):
+                dotgit = opj(path, dotgit)
+    commondir = opj(dotgit, 'commondir')
+    if isfile(commondir):
+        with open(commondir) as f:
+            common = f.readline().strip()
+        if common:
+            dotgit = common if os.path.isabs(common) else opj(dotgit, common)
+    return normpath(opj(dotgit, 'config'))
+
+
 def _parse_env(store):
     dct = {}
     for k in os.environ:
@@ -139,6 +369,10 @@ class ConfigManager(object):
     are persistent across reloads, and are not modified by any of the
     manipulation methods, such as `set` or `unset`.
 
+    Configuration is read only when it is accessed for the first time, so
+    creating an instance (e.g. `datalad.cfg` upon `import datalad`) does not
+    cost any call to `git`.
+
     Any DATALAD_* environment variable is also presented as a configuration
     item. Settings read from environment variables are not stored in any of the
     configuration file, but are read dynamically from the environment at each
@@ -161,8 +395,14 @@ class ConfigManager(object):
     def __init__(self, dataset=None, dataset_only=False, overrides=None):
         # store in a simple dict
         # no subclassing, because we want to be largely read-only, and implement
-        # config writing separately
-        self._store = {}
+        # config writing separately.  None until loaded (see _store)
+        self._store_dict = None
+        # guards (re)loading, as instances get shared across threads
+        self._lock = threading.RLock()
+        self._loading = False
+        self._gitconfig_has_showorgin_ = None
+        # callables to be called once configuration was loaded
+        self._on_load = []
         self._cfgfiles = set()
         self._cfgmtimes = None
         # public dict to store variables that always override any setting
@@ -176,7 +416,7 @@ class ConfigManager(object):
             self._dataset_path = dataset.path
             self._dataset_cfgfname = opj(self._dataset_path, '.datalad', 'config')
             if not dataset_only:
-                self._repo_cfgfname = opj(self._dataset_path, '.git', 'config')
+                self._repo_cfgfname = _get_repo_cfgfname(self._dataset_path)
         self._dataset_only = dataset_only
         # Since configs could contain sensitive information, to prevent
         # any "facilitated" leakage -- just disable logging of outputs for
@@ -187,15 +427,47 @@ class ConfigManager(object):
             # to pick up the right config files
             run_kwargs['cwd'] = dataset.path
         self._runner = GitRunner(**run_kwargs)
-        try:
-            self._gitconfig_has_showorgin = \
-                LooseVersion(get_git_version(self._runner)) >= '2.8.0'
-        except:
-            # no git something else broken, assume git is present anyway
-            # to not delay this, but assume it is old
-            self._gitconfig_has_showorgin = False
 
-        self.reload(force=True)
+    @property
+    def loaded(self):
+        """Whether configuration was read already"""
+        return self._store_dict is not None
+
+    @property
+    def _store(self):
+        if self._store_dict is None:
+            with self._lock:
+                if self._store_dict is None:
+                    if self._loading:
+                        # asked for while loading, e.g. by the runner
+                        # calling git config
+                        return {}
+                    self._loading = True
+                    try:
+                        self.reload(force=True)
+                    finally:
+                        self._loading = False
+                    on_load, self._on_load = self._on_load, []
+                    for f in on_load:
+                        f()
+        return self._store_dict
+
+    @_store.setter
+    def _store(self, store):
+        self._store_dict = store
+
+    @property
+    def _gitconfig_has_showorgin(self):
+        if self._gitconfig_has_showorgin_ is None:
+            from distutils.version import LooseVersion
+            try:
+                self._gitconfig_has_showorgin_ = LooseVersion(
+                    _get_git_version_cached(self._runner)) >= '2.8.0'
+            except:
+                # no git something else broken, assume git is present anyway
+                # to not delay this, but assume it is old
+                self._gitconfig_has_showorgin_ = False
+        return self._gitconfig_has_showorgin_
 
     def reload(self, force=False):
         """Reload all configuration items from the configured sources
@@ -205,6 +477,10 @@ class ConfigManager(object):
         is found for any file no reload is performed. This mechanism will not
         detect newly created global configuration files, use `force` in this case.
         """
+        with self._lock:
+            self._reload(force)
+
+    def _reload(self, force):
         if not force and self._cfgmtimes:
             # we aren't forcing and we have read files before
             # check if any file we read from has changed
@@ -217,12 +493,16 @@ class ConfigManager(object):
                    for c in curmtimes):
                 # all the same, nothing to do, except for
                 # superimpose overrides, could have changed in the meantime
-                self._store.update(self.overrides)
+                store = dict(self._store_dict)
+                store.update(self.overrides)
                 # reread env, is quick
-                self._store = _parse_env(self._store)
+                self._store = _parse_env(store)
                 return
 
-        self._store = {}
+        # collect into local containers, and only expose them once complete,
+        # so other threads never see a partially loaded configuration
+        store = {}
+        cfgfiles = set(self._cfgfiles)
         # 2-step strategy:
         #   - load datalad dataset config from dataset
         #   - load git config from all supported by git sources
@@ -233,37 +513,75 @@ class ConfigManager(object):
         if self._gitconfig_has_showorgin:
             run_args.append('--show-origin')
 
+        # we can read the files ourselves, and use cached global
+        # configuration, only if we know exactly which files git would read
+        read_files = self._gitconfig_has_showorgin \
+            and not any(v in os.environ for v in _GIT_CONFIG_ENV_VARS)
+
         if self._dataset_cfgfname:
             if exists(self._dataset_cfgfname):
-                stdout, stderr = self._run(
-                    run_args + ['--file', self._dataset_cfgfname],
-                    log_stderr=True
-                )
+                stdout = self._read_file(
+                    self._dataset_cfgfname, run_args, read_files)
                 # overwrite existing value, do not amend to get multi-line
                 # values
-                self._store, self._cfgfiles = _parse_gitconfig_dump(
-                    stdout, self._store, self._cfgfiles, replace=False)
+                store, cfgfiles = _parse_gitconfig_dump(
+                    stdout, store, cfgfiles, replace=False)
 
         if self._dataset_only:
             # superimpose overrides
-            self._store.update(self.overrides)
+            store.update(self.overrides)
+            self._cfgfiles = cfgfiles
+            self._store = store
             return
 
-        stdout, stderr = self._run(run_args, log_stderr=True)
-        self._store, self._cfgfiles = _parse_gitconfig_dump(
-            stdout, self._store, self._cfgfiles, replace=True)
+        if read_files and self._dataset_path:
+            global_dump, global_files = _get_global_cfg_dump(self._runner)
+        else:
+            global_dump, global_files = None, set()
+        if global_dump is not None:
+            stdout = global_dump + '\0' + (
+                self._read_file(
+                    self._repo_cfgfname, run_args + ['--local', '--includes'],
+                    True)
+                if exists(self._repo_cfgfname) else '')
+        else:
+            stdout, stderr = self._run(run_args, log_stderr=True)
+        store, cfgfiles = _parse_gitconfig_dump(
+            stdout, store, cfgfiles, replace=True)
+        # also monitor (possibly not yet existing) global config files
+        cfgfiles.update(global_files)
 
         # always monitor the dataset cfg location, we know where it is in all cases
         if self._dataset_cfgfname:
-            self._cfgfiles.add(self._dataset_cfgfname)
-            self._cfgfiles.add(self._repo_cfgfname)
-        self._cfgmtimes = {c: getmtime(c) for c in self._cfgfiles if exists(c)}
+            cfgfiles.add(self._dataset_cfgfname)
+            cfgfiles.add(self._repo_cfgfname)
+        self._cfgmtimes = {c: getmtime(c) for c in cfgfiles if exists(c)}
+        self._cfgfiles = cfgfiles
 
         # superimpose overrides
-        self._store.update(self.overrides)
+        store.update(self.overrides)
 
         # override with environment variables
-        self._store = _parse_env(self._store)
+        self._store = _parse_env(store)
+
+    def _read_file(self, fname, run_args, read_file):
+        """Read a config file in Python or, if unsupported, using git config
+
+        Returns
+        -------
+        str
+          Dump as produced by `git config -z -l --show-origin`
+        """
+        if read_file:
+            try:
+                return _parse_gitconfig_file(fname)
+            except (ValueError, IOError, StopIteration):
+                # unsupported syntax or something else git knows better
+                pass
+        if '--local' not in run_args:
+            run_args = run_args + ['--file', fname]
+        stdout, stderr = self._run(run_args, log_stderr=True)
+        return stdout
 
     @_where_reload
     def obtain(self, var, default=None, dialog_type=None, valtype=None,
@@ -12,6 +12,8 @@
 
 import os
 import json
+import hashlib
+from itertools import chain
 from abc import ABCMeta, abstractmethod, abstractproperty
 from six import add_metaclass
 
@@ -118,6 +120,200 @@ class JsonBaseDB(object):
         pass
 
 
+@auto_repr
+@add_metaclass(ABCMeta)
+class SQLiteBaseDB(object):
+    """
+    Base class for DBs which would store to SQLite files
+
+    The SQLite file itself is not committed (it is listed in a `.gitignore`
+    next to it).  Upon `save()` the DB is exported into a text file with one
+    JSON record per line, sorted, so its diffs across crawls remain
+    meaningful.  If that export is found to differ from what the SQLite file
+    was last synchronized with (e.g. in a fresh clone, or after the branch
+    was switched), the SQLite file gets rebuilt from it.
+
+    Changes are committed to the SQLite file every `checkpoint_interval`
+    modifications, so long crawls do not accumulate a single huge
+    transaction.
+    """
+
+    def __init__(self, repo, name=None, checkpoint_interval=10000):
+        self.repo = repo
+        self.name = name
+        self.checkpoint_interval = checkpoint_interval
+        self._filepath = None
+        self._export_filepath = None
+        self._nchanges = 0  # since last checkpoint
+        self._modified = False  # since last export
+        self._gitignore = None  # if created by us, so needs to be committed
+        self.__conn = None
+
+    def _assure_connected(self):
+        """Make it lazy loading/creation so we get actual active branch where it is used
+        """
+        if self.__conn is not None:
+            return
+        import sqlite3
+        d = opj(realpath(self.repo.path), self.__class__.__crawler_subdir__)
+        name = self.name or self.repo.get_active_branch()
+        self._filepath = opj(d, name + '.sqlite')
+        self._export_filepath = opj(d, name + '.jsonl')
+        if not exists(d):
+            os.makedirs(d)
+        gitignore = opj(d, '.gitignore')
+        if not lexists(gitignore):
+            with open(gitignore, 'w') as f:
+                f.write('*.sqlite\n*.sqlite-journal\n')
+            self._gitignore = gitignore
+
+        self.__conn = sqlite3.connect(self._filepath)
+        self.__conn.execute(
+            "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        for statement in self._get_schema():
+            self.__conn.execute(statement)
+        self.__conn.commit()
+
+        export_digest = self._get_export_digest()
+        if export_digest != self._get_meta('export_digest'):
+            if export_digest is None:
+                lgr.debug("Export of %s is gone, starting anew", self)
+                self._clear()
+            else:
+                self.load()
+        elif self._get_meta('db_version') is None:
+            self._set_meta('db_version', self.__class__.__version__)
+            self.__conn.commit()
+        # might have been checkpointed but not exported by a previous crawl
+        self._modified = bool(self._get_meta('modified'))
+
+    @property
+    def _conn(self):
+        self._assure_connected()
+        return self.__conn
+
+    def _get_meta(self, key):
+        row = self.__conn.execute(
+            "SELECT value FROM meta WHERE key=?", (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _set_meta(self, key, value):
+        self.__conn.execute(
+            "INSERT OR REPLACE INTO meta VALUES (?, ?)",
+            (key, json.dumps(value, sort_keys=True)))
+
+    def _clear(self):
+        self.__conn.execute("DELETE FROM meta")
+        for table in self._get_tables():
+            self.__conn.execute("DELETE FROM %s" % table)
+        self._set_meta('db_version', self.__class__.__version__)
+        self.__conn.commit()
+
+    def _get_export_digest(self):
+        if not lexists(self._export_filepath):
+            return None
+        digest = hashlib.sha1()
+        with open(self._export_filepath, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def _changed(self):
+        """To be called upon every modification of the DB"""
+        self._modified = True
+        self._nchanges += 1
+        if self.checkpoint_interval and \
+                self._nchanges >= self.checkpoint_interval:
+            self.checkpoint()
+
+    def checkpoint(self):
+        """Commit all changes so far to the SQLite file"""
+        if self.__conn is None:
+            return
+        self._set_meta('modified', self._modified)
+        self.__conn.commit()
+        self._nchanges = 0
+
+    def load(self):
+        """(Re)build the DB from its export"""
+        self._assure_connected()
+        lgr.debug("Loading %s from %s", self.__class__.__name__,
+                  self._export_filepath)
+        self._clear()
+        with open(self._export_filepath) as f:
+            header = json.loads(next(f))
+            # no compatibility layers for now
+            assert (header.pop('db_version') == self.__class__.__version__)
+            self._load_records(header, (json.loads(line) for line in f))
+        self._set_meta('export_digest', self._get_export_digest())
+        self._modified = False
+        self.checkpoint()
+
+    def save(self):
+        if self.__conn is None:
+            # nothing to do
+            return
+        tosave = [self._gitignore] if self._gitignore else []
+        if self._modified:
+            tosave.append(self._export())
+        self.checkpoint()
+        if tosave:
+            # stage to be committed:
+            self.repo.add(tosave, git=True)
+            self._gitignore = None
+
+    def _export(self):
+        lgr.debug("Writing %s to %s" % (self.__class__.__name__,
+                                         self._export_filepath))
+        header = dict(self._get_export_header(),
+                      db_version=self.__class__.__version__)
+        digest = hashlib.sha1()
+        with open(self._export_filepath, 'wb') as f:
+            for record in chain([header], self._get_export_records()):
+                line = (json.dumps(record, sort_keys=True) + '\n').encode()
+                digest.update(line)
+                f.write(line)
+        self._set_meta('export_digest', digest.hexdigest())
+        self._modified = False
+        return self._export_filepath
+
+    def close(self):
+        if self.__conn is not None:
+            self.checkpoint()
+            self.__conn.close()
+            self.__conn = None
+
+    @property
+    def db_version(self):
+        self._assure_connected()
+        return self._get_meta('db_version')
+
+    @abstractmethod
+    def _get_schema(self):
+        """Return statements creating the tables (if not exist yet)"""
+        pass
+
+    @abstractmethod
+    def _get_tables(self):
+        """Return names of all the tables"""
+        pass
+
+    @abstractmethod
+    def _get_export_header(self):
+        """Return dict with meta information to be exported"""
+        pass
+
+    @abstractmethod
+    def _get_export_records(self):
+        """Generate records to be exported, in a deterministic order"""
+        pass
+
+    @abstractmethod
+    def _load_records(self, header, records):
+        """Populate the (empty) DB from an export"""
+        pass
+
+
 @auto_repr
 class FileStatusesBaseDB(object):
     """Base class for DBs to monitor status of the files
@@ -20,7 +20,7 @@ from ...utils import auto_repr
 from ...utils import swallow_logs
 from ...consts import CRAWLER_META_STATUSES_DIR
 
-from .base import JsonBaseDB, FileStatusesBaseDB
+from .base import JsonBaseDB, SQLiteBaseDB, FileStatusesBaseDB
 import logging
 lgr = logging.getLogger('datalad.crawler.dbs')
 
@@ -85,6 +85,15 @@ class PhysicalFileStatusesDB(FileStatusesBaseDB):
     def _remove(self, filepath):
         pass
 
+    def _get_fpath(self, filepath):
+        assert (filepath.startswith(self.annex.path))
+        fpath = filepath[len(self.annex.path.rstrip(sep)) + 1:]
+        return fpath
+
+    def _get_fileattributes_status(self, fpath):
+        filepath = self._get_filepath(fpath)
+        return PhysicalFileStatusesDB._get(self, filepath)
+
 
 @auto_repr
 class JsonFileStatusesDB(JsonBaseDB, PhysicalFileStatusesDB):
@@ -115,15 +124,6 @@ class JsonFileStatusesDB(JsonBaseDB, PhysicalFileStatusesDB):
         """
         return self._db
 
-    def _get_fpath(self, filepath):
-        assert (filepath.startswith(self.annex.path))
-        fpath = filepath[len(self.annex.path.rstrip(sep)) + 1:]
-        return fpath
-
-    def _get_fileattributes_status(self, fpath):
-        filepath = self._get_filepath(fpath)
-        return PhysicalFileStatusesDB._get(self, filepath)
-
     def _get(self, filepath):
         # TODO: may be avoid this all fpath -> filepath -> fpath?
         fpath = self._get_fpath(filepath)
@@ -151,3 +151,75 @@ class JsonFileStatusesDB(JsonBaseDB, PhysicalFileStatusesDB):
         fpath = self._get_fpath(filepath)
         if fpath in self._db['files']:
             self._db['files'].pop(fpath)
+
+
+@auto_repr
+class SQLiteFileStatusesDB(SQLiteBaseDB, PhysicalFileStatusesDB):
+    """Persistent DB to store information about files' size/mtime/filename in a SQLite file
+
+    Unlike `JsonFileStatusesDB`, it does not need to load all the records
+    into memory, so it is suitable for crawling millions of files
+    """
+
+    __version__ = 1
+    __crawler_subdir__ = CRAWLER_META_STATUSES_DIR
+
+    _FIELDS = ('size', 'mtime', 'filename')
+
+    def __init__(self, annex, track_queried=True, name=None,
+                 checkpoint_interval=10000):
+        PhysicalFileStatusesDB.__init__(self, annex, track_queried=track_queried)
+        SQLiteBaseDB.__init__(self, annex, name=name,
+                              checkpoint_interval=checkpoint_interval)
+
+    #
+    # Defining abstract methods implementations
+    #
+    def _get_schema(self):
+        return [
+            "CREATE TABLE IF NOT EXISTS files "
+            "(fpath TEXT PRIMARY KEY, size INTEGER, mtime REAL, filename TEXT)"
+        ]
+
+    def _get_tables(self):
+        return ['files']
+
+    def _get_export_header(self):
+        return {}
+
+    def _get_export_records(self):
+        for row in self._conn.execute(
+                "SELECT fpath, size, mtime, filename FROM files ORDER BY fpath"):
+            yield [row[0], {f: v for f, v in zip(self._FIELDS, row[1:])
+                            if v is not None}]
+
+    def _load_records(self, header, records):
+        self._conn.executemany(
+            "INSERT INTO files VALUES (?, ?, ?, ?)",
+            ((fpath,) + tuple(status.get(f) for f in self._FIELDS)
+             for fpath, status in records))
+
+    def _get(self, filepath):
+        row = self._conn.execute(
+            "SELECT size, mtime, filename FROM files WHERE fpath=?",
+            (self._get_fpath(filepath),)).fetchone()
+        if row is None:
+            return None
+        return FileStatus(*row)
+
+    def _set(self, filepath, status):
+        if status is None:
+            # see JsonFileStatusesDB._set on why not to get it from the file
+            values = (None, None, None)
+        else:
+            values = tuple(getattr(status, f) for f in self._FIELDS)
+        self._conn.execute(
+            "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?)",
+            (self._get_fpath(filepath),) + values)
+        self._changed()
+
+    def _remove(self, filepath):
+        if self._conn.execute(
+                "DELETE FROM files WHERE fpath=?",
+                (self._get_fpath(filepath),)).rowcount:
+            self._changed()
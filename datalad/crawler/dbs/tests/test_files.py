@@ -11,13 +11,18 @@ import os
 from os.path import join as opj, curdir, sep
 from os.path import realpath
 from ..files import PhysicalFileStatusesDB, JsonFileStatusesDB
+from ..files import SQLiteFileStatusesDB
+from ....consts import CRAWLER_META_STATUSES_DIR
+from ....support.status import FileStatus
 
 from ....tests.utils import with_tree
 from ....tests.utils import assert_equal
 from ....tests.utils import assert_false
 from ....tests.utils import assert_true
 from ....tests.utils import chpwd
+from ....tests.utils import ok_file_has_content
 from ....support.annexrepo import AnnexRepo
+from ....support.gitrepo import GitRepo
 
 @with_tree(
     tree={'file1.txt': 'load1',
@@ -39,7 +44,7 @@ def _test_AnnexDB(cls, path):
 
     def set_db_status_from_file(fpath):
         """To test JsonFileStatusesDB, we need to keep updating the status stored"""
-        if cls is JsonFileStatusesDB:
+        if cls in (JsonFileStatusesDB, SQLiteFileStatusesDB):
             # we need first to set the status
             db.set(fpath, db._get_fileattributes_status(fpath))
 
@@ -130,5 +135,53 @@ def _test_AnnexDB(cls, path):
 
 def test_AnnexDBs():
     for cls in (PhysicalFileStatusesDB,
-                JsonFileStatusesDB,):
-        yield _test_AnnexDB, cls
\ No newline at end of file
+                JsonFileStatusesDB,
+                SQLiteFileStatusesDB):
+        yield _test_AnnexDB, cls
+
+
+@with_tree(tree={'file1.txt': 'load1'})
+def test_SQLiteFileStatusesDB(path):
+    repo = GitRepo(path, create=True)
+    db = SQLiteFileStatusesDB(annex=repo, checkpoint_interval=2)
+    status1 = FileStatus(size=5, mtime=10.5, filename='file1.txt')
+    status2 = FileStatus(size=6)
+    db.set('file1.txt', status1)
+    db.set(opj('d', 'file2.txt'), status2)
+    assert_equal(db.get('file1.txt'), status1)
+    assert_equal(db.get(opj('d', 'file2.txt')).mtime, None)
+    # checkpointed, so visible to another instance before saving
+    assert_equal(SQLiteFileStatusesDB(annex=repo).get('file1.txt'), status1)
+
+    db.save()
+    dbdir = opj(realpath(path), CRAWLER_META_STATUSES_DIR)
+    export = opj(dbdir, 'master.jsonl')
+    ok_file_has_content(
+        export,
+        '{"db_version": 1}\n'
+        '["d/file2.txt", {"size": 6}]\n'
+        '["file1.txt", {"filename": "file1.txt", "mtime": 10.5, "size": 5}]\n')
+    # only the export gets committed
+    assert_equal(
+        set(repo.get_indexed_files()),
+        {opj(CRAWLER_META_STATUSES_DIR, f) for f in ('.gitignore', 'master.jsonl')})
+    assert_equal(repo.untracked_files, ['file1.txt'])
+    db.close()
+
+    # DB gets rebuilt from the export, e.g. in a fresh clone
+    os.unlink(opj(dbdir, 'master.sqlite'))
+    db = SQLiteFileStatusesDB(annex=repo)
+    assert_equal(db.get(opj('d', 'file2.txt')), status2)
+    assert_equal(db.get_obsolete(), [opj(realpath(path), 'file1.txt')])
+    db.remove(opj('d', 'file2.txt'))
+    assert_equal(db.get(opj('d', 'file2.txt')), None)
+    db.save()
+    with open(export) as f:
+        assert_equal(len(f.readlines()), 2)
+
+    # or whenever the export changed (e.g. the branch was switched)
+    with open(export, 'w') as f:
+        f.write('{"db_version": 1}\n["file3.txt", {"size": 1}]\n')
+    db = SQLiteFileStatusesDB(annex=repo)
+    assert_equal(db.get('file1.txt'), None)
+    assert_equal(db.get('file3.txt').size, 1)
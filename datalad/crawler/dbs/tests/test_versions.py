@@ -0,0 +1,53 @@
+# emacs: -*- mode: python; py-indent-offset: 4; tab-width: 4; indent-tabs-mode: nil -*-
+# ex: set sts=4 ts=4 sw=4 noet:
+# ## ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ##
+#
+#   See COPYING file distributed along with the datalad package for the
+#   copyright and license terms.
+#
+# ## ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ##
+
+import os
+from collections import OrderedDict
+from os.path import join as opj
+from os.path import realpath
+
+from ..versions import SingleVersionDB, SQLiteSingleVersionDB
+
+from ....consts import CRAWLER_META_VERSIONS_DIR
+from ....tests.utils import with_tempfile
+from ....tests.utils import assert_equal
+from ....support.gitrepo import GitRepo
+
+
+@with_tempfile(mkdir=True)
+def _test_SingleVersionDB(cls, path):
+    repo = GitRepo(path, create=True)
+    db = cls(repo)
+    assert_equal(db.version, None)
+    assert_equal(db.versions, OrderedDict())
+    db.update_versions(OrderedDict([
+        ('1.0', {'f': 'f-1.0'}),
+        ('0.9', {'f': 'f-0.9', 'g': 'g-0.9'})]))
+    db.update_versions({'1.1': {'f': 'f-1.1'}, '1.0': {'g': 'g-1.0'}})
+    db.version = '1.1'
+    versions = OrderedDict([
+        ('1.0', {'f': 'f-1.0', 'g': 'g-1.0'}),
+        ('0.9', {'f': 'f-0.9', 'g': 'g-0.9'}),
+        ('1.1', {'f': 'f-1.1'})])
+    assert_equal(db.versions, versions)
+    assert_equal(list(db.versions), list(versions))
+
+    if cls is SQLiteSingleVersionDB:
+        db.close()
+        os.unlink(opj(realpath(path), CRAWLER_META_VERSIONS_DIR,
+                      'master.sqlite'))
+    # state is restored from what was saved
+    db = cls(repo)
+    assert_equal(db.version, '1.1')
+    assert_equal(list(db.versions.items()), list(versions.items()))
+
+
+def test_SingleVersionDBs():
+    for cls in (SingleVersionDB, SQLiteSingleVersionDB):
+        yield _test_SingleVersionDB, cls
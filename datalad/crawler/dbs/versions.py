@@ -10,6 +10,7 @@
 
 """
 
+import json
 from collections import OrderedDict
 from six import iteritems
 
@@ -17,6 +18,7 @@ from ...utils import auto_repr
 from ...consts import CRAWLER_META_VERSIONS_DIR
 
 from .base import JsonBaseDB
+from .base import SQLiteBaseDB
 
 import logging
 lgr = logging.getLogger('datalad.crawler.dbs')
@@ -99,3 +101,95 @@ class SingleVersionDB(JsonBaseDB):
                 else:
                     fpaths[new_fpath] = entry
         self.save()
+
+
+@auto_repr
+class SQLiteSingleVersionDB(SQLiteBaseDB):
+    """
+    SQLite version of `SingleVersionDB`
+
+    New versions are added to the DB without rewriting already known ones,
+    and it saves its state upon any change as well
+    """
+    __version__ = 1
+    __crawler_subdir__ = CRAWLER_META_VERSIONS_DIR
+
+    #
+    # Defining abstract methods implementations
+    #
+    def _get_schema(self):
+        return [
+            # order of versions is the order of their addition
+            "CREATE TABLE IF NOT EXISTS versions "
+            "(idx INTEGER PRIMARY KEY, version TEXT UNIQUE)",
+            "CREATE TABLE IF NOT EXISTS fpaths "
+            "(version TEXT, fpath TEXT, entry TEXT, "
+            "PRIMARY KEY (version, fpath))",
+        ]
+
+    def _get_tables(self):
+        return ['versions', 'fpaths']
+
+    def _get_export_header(self):
+        return {'version': self.version}
+
+    def _get_export_records(self):
+        for version, fpath, entry in self._conn.execute(
+                "SELECT v.version, f.fpath, f.entry "
+                "FROM versions v LEFT JOIN fpaths f ON v.version = f.version "
+                "ORDER BY v.idx, f.fpath"):
+            yield [version, fpath, None if entry is None else json.loads(entry)]
+
+    def _load_records(self, header, records):
+        self._set_meta('version', header['version'])
+        for version, fpath, entry in records:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO versions (version) VALUES (?)",
+                (version,))
+            if fpath is not None:
+                self._conn.execute(
+                    "INSERT INTO fpaths VALUES (?, ?, ?)",
+                    (version, fpath, json.dumps(entry, sort_keys=True)))
+
+    #
+    # Custom properties and methods
+    #
+    @property
+    def version(self):
+        self._assure_connected()
+        return self._get_meta('version')
+
+    @version.setter
+    def version(self, v):
+        self._assure_connected()
+        self._set_meta('version', v)
+        self._changed()
+        self.save()
+
+    @property
+    def versions(self):
+        """OrderedDict of all known versions with their files"""
+        versions = OrderedDict(
+            (version, {})
+            for version, in self._conn.execute(
+                "SELECT version FROM versions ORDER BY idx"))
+        for version, fpath, entry in self._conn.execute(
+                "SELECT version, fpath, entry FROM fpaths"):
+            versions[version][fpath] = json.loads(entry)
+        return versions
+
+    def update_versions(self, new_versions):
+        """Update known versions with new information
+        """
+        conn = self._conn
+        for new_version, new_fpaths in iteritems(new_versions):
+            # TODO: check that it is newer!?
+            conn.execute(
+                "INSERT OR IGNORE INTO versions (version) VALUES (?)",
+                (new_version,))
+            conn.executemany(
+                "INSERT OR REPLACE INTO fpaths VALUES (?, ?, ?)",
+                ((new_version, new_fpath, json.dumps(entry, sort_keys=True))
+                 for new_fpath, entry in iteritems(new_fpaths)))
+            self._changed()
+        self.save()
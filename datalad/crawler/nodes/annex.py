@@ -60,7 +60,9 @@ from ...cmd import get_runner
 from ..pipeline import CRAWLER_PIPELINE_SECTION
 from ..pipeline import initiate_pipeline_config
 from ..dbs.files import PhysicalFileStatusesDB, JsonFileStatusesDB
+from ..dbs.files import SQLiteFileStatusesDB
 from ..dbs.versions import SingleVersionDB
+from ..dbs.versions import SQLiteSingleVersionDB
 from datalad.customremotes.base import init_datalad_remote
 from datalad.dochelpers import exc_str
 
@@ -247,6 +249,7 @@ class Annexificator(object):
                  allow_dirty=False, yield_non_updated=False,
                  auto_finalize=True,
                  statusdb=None,
+                 versiondb='json',
                  skip_problematic=False,
                  **kwargs):
         """
@@ -270,16 +273,22 @@ class Annexificator(object):
           In some cases, if e.g. adding a file in place of an existing directory or placing
           a file under a directory for which there is a file atm, we would 'finalize' before
           carrying out the operation
-        statusdb : {'json', 'fileattr'}, optional
+        statusdb : {'json', 'sqlite', 'fileattr'}, optional
           DB of file statuses which will be used to figure out if remote load has changed.
           If None, no statusdb will be used so Annexificator will process every given URL
           as if it leads to new content.  'json' -- JsonFileStatusesDB will
           be used which will store information about each provided file/url into a JSON file.
+          'sqlite' -- SQLiteFileStatusesDB will store it into a SQLite file, committing only
+          its text export, which scales to millions of files.
           'fileattr' -- PhysicalFileStatusesDB will be used to decide based on information in
           annex and file(s) mtime on the disk.
           Note that statusdb "lives" within the branch, so switch_branch would drop existing DB (which
           should get committed within the branch) and would create a new one if DB is requested
           again.
+        versiondb : {'json', 'sqlite'}, optional
+          DB to store information about versions of the files in, for
+          `commit_versions` and `remove_other_versions`.  'json' --
+          SingleVersionDB, 'sqlite' -- SQLiteSingleVersionDB
         skip_problematic: bool, optional
           If True, it would not raise an exception if e.g. url is 404 or forbidden -- then just
           nothing is yielded, and effectively that entry is skipped
@@ -334,6 +343,7 @@ class Annexificator(object):
 
         self.statusdb = statusdb
         self._statusdb = None  # actual DB to be instantiated later
+        self.versiondb = versiondb
         self.skip_problematic = skip_problematic
 
     # def add(self, filename, url=None):
@@ -422,6 +432,7 @@ class Annexificator(object):
                 # initiate the DB
                 self._statusdb = {
                     'json': JsonFileStatusesDB,
+                    'sqlite': SQLiteFileStatusesDB,
                     'fileattr': PhysicalFileStatusesDB}[self.statusdb](annex=self.repo)
             else:
                 # use provided persistent instance
@@ -842,6 +853,11 @@ class Annexificator(object):
 
         return merge_branch
 
+    def _get_versions_db(self, name=None):
+        return {
+            'json': SingleVersionDB,
+            'sqlite': SQLiteSingleVersionDB}[self.versiondb](self.repo, name=name)
+
     def _precommit(self):
         self.repo.precommit()  # so that all batched annexes stop
         if self._statusdb:
@@ -989,7 +1005,7 @@ class Annexificator(object):
                 versions.pop(None)
 
             # take only new versions to deal with
-            versions_db = SingleVersionDB(self.repo)
+            versions_db = self._get_versions_db()
             prev_version = versions_db.version
 
             if prev_version is None:
@@ -1141,7 +1157,7 @@ class Annexificator(object):
 
         def _remove_other_versions(data):
             stats = data.get('datalad_stats', None)
-            versions_db = SingleVersionDB(self.repo, name=name) \
+            versions_db = self._get_versions_db(name=name) \
                 if db is None \
                 else db
 
@@ -20,7 +20,6 @@ lgr = logging.getLogger('datalad.customremotes.archive')
 lgr.log(5, "Importing datalad.customremotes.archive")
 
 from ..dochelpers import exc_str
-from ..cmd import link_file_load
 from ..support.archives import ArchivesCache
 from ..support.network import URL
 from ..utils import getpwd
@@ -57,6 +56,7 @@ class ArchiveAnnexCustomRemote(AnnexCustomRemote):
 
     def stop(self, *args):
         """Stop communication with annex"""
+        lgr.debug("Archives cache stats: %s", dict(self._cache.stats))
         self._cache.clean()
         super(ArchiveAnnexCustomRemote, self).stop(*args)
 
@@ -344,14 +344,13 @@ class ArchiveAnnexCustomRemote(AnnexCustomRemote):
                 assert exists(akey_path), "Key file %s is not present" % akey_path
 
                 # Extract that bloody file from the bloody archive
-                # TODO: implement/use caching, for now a simple one
-                #  actually patool doesn't support extraction of a single file
+                # patool doesn't support extraction of a single file
                 #  https://github.com/wummel/patool/issues/20
-                # so
+                # so tar and zip archives are read natively, and the entire
+                # archive gets extracted into the cache only for other formats
                 pwd = getpwd()
                 lgr.debug("Getting file {afile} from {akey_path} while PWD={pwd}".format(**locals()))
-                apath = self.cache[akey_path].get_extracted_file(afile)
-                link_file_load(apath, path)
+                self.cache[akey_path].extract_file(afile, path)
                 self.send('TRANSFER-SUCCESS', cmd, key)
                 return
             except Exception as exc:
@@ -15,9 +15,11 @@ __docformat__ = 'restructuredtext'
 import errno
 import os
 import sys
+import threading
 
 from os.path import exists, join as opj, realpath, dirname, lexists
 
+from six.moves import queue
 from six.moves import range
 from six.moves.urllib.parse import urlparse
 
@@ -25,6 +27,7 @@ import logging
 lgr = logging.getLogger('datalad.customremotes')
 lgr.log(5, "Importing datalad.customremotes.main")
 
+from .. import cfg
 from ..ui import ui
 from ..support.protocol import ProtocolInterface
 from ..support.cache import DictCache
@@ -181,6 +184,9 @@ class AnnexCustomRemote(object):
     COST = DEFAULT_COST
     AVAILABILITY = DEFAULT_AVAILABILITY
 
+    # protocol extensions we support
+    EXTENSIONS = ('ASYNC',)
+
     def __init__(self, path=None, cost=None):  # , availability=DEFAULT_AVAILABILITY):
         """
         Parameters
@@ -223,6 +229,20 @@ class AnnexCustomRemote(object):
 
         self._contentlocations = DictCache(size_limit=100)  # TODO: config ?
 
+        # With ASYNC protocol extension, requests of concurrent jobs of annex
+        # are prefixed with "J <job>" and processed in parallel in a pool of
+        # threads, while replies from annex are routed to the requesting job
+        self._async = False
+        self._jobs = cfg.obtain('datalad.customremotes.jobs')
+        self._pool = None
+        self._job = threading.local()
+        self._job_replies = {}
+        # jobs with a request being processed, i.e. awaiting replies
+        self._busy_jobs = set()
+        self._send_lock = threading.Lock()
+        # to guard the state shared across jobs
+        self._lock = threading.RLock()
+
         # instruct annex backend UI to use this remote
         if ui.backend == 'annex':
             ui.set_specialremote(self)
@@ -247,6 +267,12 @@ class AnnexCustomRemote(object):
         This is a wrapper around AnnexRepo.get_contentlocation which provides caching
         of the result (we are asking the location for the same archive key often)
         """
+        # batched annex process and the cache are shared across jobs
+        with self._lock:
+            return self._get_contentlocation(key, absolute=absolute,
+                                             verify_exists=verify_exists)
+
+    def _get_contentlocation(self, key, absolute=False, verify_exists=True):
         if key not in self._contentlocations:
             fpath = self.repo.get_contentlocation(key, batch=True)
             if fpath:  # shouldn't store empty ones
@@ -280,12 +306,17 @@ class AnnexCustomRemote(object):
             lgr.debug("We are not yet in the loop, thus should not send to annex"
                       " anything.  Got: %s" % msg.encode())
             return
+        job = self._get_job()
+        if job is not None:
+            msg = "J %s %s" % (job, msg)
         try:
             self.heavydebug("Sending %r" % msg)
-            self.fout.write(msg + "\n")  # .encode())
-            self.fout.flush()
-            if self._protocol is not None:
-                self._protocol += "send %s" % msg
+            # messages of concurrent jobs must not interleave
+            with self._send_lock:
+                self.fout.write(msg + "\n")  # .encode())
+                self.fout.flush()
+                if self._protocol is not None:
+                    self._protocol += "send %s" % msg
         except IOError as exc:
             lgr.debug("Failed to send due to %s" % str(exc))
             if exc.errno == errno.EPIPE:
@@ -307,12 +338,12 @@ class AnnexCustomRemote(object):
         n : int
            Number of response elements after first msg
         """
-        # TODO: should we strip or should we not? verify how annex would deal
-        # with filenames starting/ending with spaces - encoded?
-        # Split right away
-        l = self.fin.readline().rstrip(os.linesep)
-        if self._protocol is not None:
-            self._protocol += "recv %s" % l
+        job = self._get_job()
+        if job is not None:
+            # routed to us by the main loop
+            l = self._get_job_replies(job).get()
+        else:
+            l = self._readline()
         msg = l.split(None, n)
         if req and (req != msg[0]):
             # verify correct response was given
@@ -321,6 +352,25 @@ class AnnexCustomRemote(object):
         self.heavydebug("Received %r" % (msg,))
         return msg
 
+    def _readline(self):
+        # TODO: should we strip or should we not? verify how annex would deal
+        # with filenames starting/ending with spaces - encoded?
+        # Split right away
+        l = self.fin.readline().rstrip(os.linesep)
+        if self._protocol is not None:
+            with self._send_lock:
+                self._protocol += "recv %s" % l
+        return l
+
+    def _get_job(self):
+        """Return ID of the job (of annex) processed by current thread, if any"""
+        return getattr(self._job, 'id', None) if self._async else None
+
+    def _get_job_replies(self, job):
+        """Return queue of messages from annex for the job"""
+        with self._lock:
+            return self._job_replies.setdefault(job, queue.Queue())
+
     # TODO: see if we could adjust the "originating" file:line, because
     # otherwise they are all reported from main.py:117 etc
     def heavydebug(self, msg, *args, **kwargs):
@@ -354,6 +404,10 @@ class AnnexCustomRemote(object):
             self.stop(str(e))
         finally:
             self._in_the_loop = False
+            if self._pool is not None:
+                # annex is gone, so there is nobody to report to
+                self._pool.terminate()
+                self._pool = None
 
     def stop(self, msg=None):
         lgr.debug("Stopping communications of %s%s" %
@@ -367,6 +421,14 @@ class AnnexCustomRemote(object):
         self.send("VERSION", SUPPORTED_PROTOCOL)
 
         while True:
+            if self._async:
+                l = self._readline()
+                if not l:
+                    self.stop()
+                    return
+                self._dispatch(l)
+                continue
+
             l = self.read(n=-1)
 
             if l is not None and not l:
@@ -374,22 +436,76 @@ class AnnexCustomRemote(object):
                 self.stop()
                 return
 
-            req, req_load = l[0], l[1:]
+            self._process(l)
 
-            method = getattr(self, "req_%s" % req, None)
-            if not method:
-                self.error("We have no support for %s request, part of %s response"
-                           % (req, l))
-                self.send("UNSUPPORTED-REQUEST")
-                continue
+    def _dispatch(self, l):
+        """Pass a message with a job prefix to the job or to a new worker"""
+        msg = l.split(None, 2)
+        if len(msg) < 3 or msg[0] != 'J':
+            self.error("Expected a message prefixed with a job, got %r" % l)
+            return
+        job, msg = msg[1], msg[2]
+        with self._lock:
+            if job in self._busy_jobs:
+                # reply to a request of the job
+                self._get_job_replies(job).put(msg)
+                return
+            # annex sends a new request only when done with the previous one
+            # of the same job
+            self._busy_jobs.add(job)
+        self._pool.apply_async(self._process_job, (job, msg))
+
+    def _process_job(self, job, msg):
+        self._job.id = job
+        try:
+            while msg is not None:
+                self._process(msg.split())
+                with self._lock:
+                    replies = self._get_job_replies(job)
+                    if replies.empty():
+                        self._busy_jobs.discard(job)
+                        msg = None
+                    else:
+                        # annex got our last reply and sent the next request
+                        # before we were done
+                        msg = replies.get()
+        except AnnexRemoteQuit:
+            # failed to talk to annex -- main loop will find out as well
+            pass
+        finally:
+            self._job.id = None
+
+    def _process(self, l):
+        """Process a request of annex"""
+        req, req_load = l[0], l[1:]
+
+        method = getattr(self, "req_%s" % req, None)
+        if not method:
+            lgr.debug("We have no support for %s request, part of %s response",
+                      req, l)
+            self.send_unsupported()
+            return
 
-            try:
-                method(*req_load)
-            except Exception as e:
-                self.error("Problem processing %r with parameters %r: %r"
-                           % (req, req_load, e))
-                from traceback import format_exc
-                lgr.error("Caught exception detail: %s" % format_exc())
+        try:
+            method(*req_load)
+        except Exception as e:
+            self.error("Problem processing %r with parameters %r: %r"
+                       % (req, req_load, e))
+            from traceback import format_exc
+            lgr.error("Caught exception detail: %s" % format_exc())
+
+    def req_EXTENSIONS(self, *extensions):
+        """Negotiate protocol extensions supported by annex and us"""
+        supported = [e for e in extensions
+                     if e in self.EXTENSIONS
+                     and (e != 'ASYNC' or self._jobs > 1)]
+        self.send("EXTENSIONS", *supported)
+        if 'ASYNC' in supported:
+            from multiprocessing.pool import ThreadPool
+            lgr.debug("Processing requests of up to %d jobs in parallel",
+                      self._jobs)
+            self._pool = ThreadPool(self._jobs)
+            self._async = True
 
     def req_INITREMOTE(self, *args):
         """Initialize this remote. Provides high level abstraction.
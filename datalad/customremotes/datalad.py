@@ -43,6 +43,11 @@ class DataladAnnexCustomRemote(AnnexCustomRemote):
 
     #
     # Helper methods
+    def _get_downloader(self, url):
+        # providers are shared across (concurrent) jobs and not thread-safe,
+        # while downloaders are
+        with self._lock:
+            return self._providers.get_provider(url).get_downloader(url)
 
     # Protocol implementation
     def req_CHECKURL(self, url):
@@ -68,7 +73,7 @@ class DataladAnnexCustomRemote(AnnexCustomRemote):
 
         try:
             with swallow_logs():
-                status = self._providers.get_status(url)
+                status = self._get_downloader(url).get_status(url)
             size = str(status.size) if status.size is not None else 'UNKNOWN'
             resp = ["CHECKURL-CONTENTS", size] \
                 + ([status.filename] if status.filename else [])
@@ -98,7 +103,7 @@ class DataladAnnexCustomRemote(AnnexCustomRemote):
             # somewhat duplicate of CHECKURL
             try:
                 with swallow_logs():
-                    status = self._providers.get_status(url)
+                    status = self._get_downloader(url).get_status(url)
                 if status:  # TODO:  anything specific to check???
                     resp = "CHECKPRESENT-SUCCESS"
                     break
@@ -156,7 +161,7 @@ class DataladAnnexCustomRemote(AnnexCustomRemote):
 
         for url in urls:
             try:
-                downloaded_path = self._providers.download(
+                downloaded_path = self._get_downloader(url).download(
                     url, path=path, overwrite=True
                 )
                 lgr.info("Successfully downloaded %s into %s" % (url, downloaded_path))
@@ -8,8 +8,13 @@
 # ## ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ##
 """Tests for the base of our custom remotes"""
 
+import os
+import threading
+import time
 from os.path import isabs
 
+from datalad.tests.utils import assert_equal
+from datalad.tests.utils import ok_
 from datalad.tests.utils import with_tree
 from datalad.support.annexrepo import AnnexRepo
 
@@ -31,3 +36,72 @@ def test_get_contentlocation(tdir):
     assert cr._contentlocations == {key: key_path}
     repo.drop('file.dat', options=['--force'])
     assert not cr.get_contentlocation(key, absolute=True)
+
+
+class _Output(object):
+    def __init__(self):
+        self.lines = []
+
+    def write(self, s):
+        self.lines.extend(s.splitlines())
+
+    def flush(self):
+        pass
+
+
+class _AsyncRemote(AnnexCustomRemote):
+    def __init__(self, *args, **kwargs):
+        super(_AsyncRemote, self).__init__(*args, **kwargs)
+        self.started = {}
+
+    def req_CHECKPRESENT(self, key):
+        self.send("GETSTATE", key)
+        state = self.read("VALUE", 1)[1]
+        self.started[key].set()
+        # would never finish if jobs were not processed concurrently
+        for event in self.started.values():
+            ok_(event.wait(10))
+        self.send("CHECKPRESENT-SUCCESS", key, state)
+
+
+@with_tree(tree={'file.dat': ''})
+def test_async_jobs(tdir):
+    AnnexRepo(tdir, create=True, init=True)
+    cr = _AsyncRemote(tdir)
+    cr.started = {'key1': threading.Event(), 'key2': threading.Event()}
+    rfd, wfd = os.pipe()
+    cr.fin = os.fdopen(rfd, 'r')
+    cr.fout = _Output()
+    thread = threading.Thread(target=cr.main)
+    thread.start()
+
+    def send(msg):
+        os.write(wfd, (msg + '\n').encode())
+
+    def wait_for(line):
+        for i in range(100):
+            if line in cr.fout.lines:
+                return
+            time.sleep(0.1)
+        raise AssertionError("%r was never sent, got %s"
+                             % (line, cr.fout.lines))
+
+    send("EXTENSIONS INFO ASYNC")
+    wait_for("EXTENSIONS ASYNC")
+    send("J 1 CHECKPRESENT key1")
+    send("J 2 CHECKPRESENT key2")
+    wait_for("J 1 GETSTATE key1")
+    wait_for("J 2 GETSTATE key2")
+    # replies get routed to the jobs which requested them
+    send("J 2 VALUE state 2")
+    send("J 1 VALUE state 1")
+    wait_for("J 1 CHECKPRESENT-SUCCESS key1 state 1")
+    wait_for("J 2 CHECKPRESENT-SUCCESS key2 state 2")
+    # requests we know nothing about do not get mistaken for replies
+    send("J 1 LISTCONFIGS")
+    wait_for("J 1 UNSUPPORTED-REQUEST")
+    send("J 1 GETCOST")
+    wait_for("J 1 COST %d" % cr.cost)
+    os.close(wfd)
+    thread.join()
+    assert_equal(cr.fout.lines[0], "VERSION 1")
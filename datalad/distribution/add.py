@@ -35,6 +35,7 @@ from datalad.interface.common_opts import jobs_opt
 from datalad.interface.results import get_status_dict
 from datalad.interface.results import annexjson2result
 from datalad.interface.results import success_status_map
+from datalad.interface.results import ResultPathTracker
 from datalad.interface.results import results_from_annex_noinfo
 from datalad.interface.utils import discover_dataset_trace_to_targets
 from datalad.interface.utils import eval_results
@@ -305,7 +306,7 @@ class Add(Interface):
         for ds_path in sorted(content_by_ds, reverse=True):
             ds = Dataset(ds_path)
             torepoadd = {}
-            respath_by_status = {}
+            respath_by_status = ResultPathTracker()
             for ap in content_by_ds[ds_path]:
                 # we have a new story
                 ap.pop('status', None)
@@ -319,8 +320,7 @@ class Add(Interface):
                 if ap.get('registered_subds', False):
                     # subdataset that might be in this list because of the
                     # need to save all the way up to a super dataset
-                    respath_by_status['success'] = \
-                        respath_by_status.get('success', []) + [ap['path']]
+                    respath_by_status.add_path(ap['path'])
                     yield get_status_dict(
                         status='notneeded',
                         message="already known subdataset",
@@ -389,8 +389,7 @@ class Add(Interface):
             for a in added:
                 res = annexjson2result(a, ds, type='file', **common_report)
                 success = success_status_map[res['status']]
-                respath_by_status[success] = \
-                    respath_by_status.get(success, []) + [res['path']]
+                respath_by_status.add(res)
                 # produce best possible path/result annotation
                 if res['path'] in torepoadd:
                     # pull out correct ap for any path that comes out here
@@ -442,7 +441,7 @@ class Add(Interface):
                     r['process_content'] = True
                     to_save.append({k: v for k, v in r.items() if k != 'status'})
                 yield r
-            if refds_path and ds_path != refds_path and len(respath_by_status.get('success', [])):
+            if refds_path and ds_path != refds_path and respath_by_status.counts['success']:
                 # TODO XXX we have an issue here when with `add('.')` and annex ignores any
                 # dotfiles. In this case we end up not saving a dataset completely, because
                 # we rely on accurate reporting. there is an issue about this already
@@ -18,6 +18,7 @@ import logging
 from os.path import join as opj, relpath, normpath, dirname, curdir
 
 import datalad
+from datalad import cfg
 from datalad import ssh_manager
 from datalad.cmd import CommandError
 from datalad.consts import WEB_HTML_DIR, WEB_META_LOG
@@ -59,29 +60,20 @@ from datalad.utils import assure_list
 lgr = logging.getLogger('datalad.distribution.create_sibling')
 
 
-def _create_dataset_sibling(
-        name,
+def _get_remote_target(
         ds,
         hierarchy_basepath,
-        ssh,
         replicate_local_structure,
         ssh_url,
         target_dir,
         target_url,
-        target_pushurl,
-        existing,
-        shared,
-        publish_depends,
-        publish_by_default,
-        as_common_datasrc,
-        annex_wanted,
-        annex_group,
-        annex_groupwanted,
-        inherit
-):
-    """Everyone is very smart here and could figure out the combinatorial
-    affluence among provided tiny (just slightly over a dozen) number of options
-    and only a few pages of code
+        target_pushurl):
+    """Determine remote path and access URLs of the sibling of a dataset
+
+    Returns
+    -------
+    tuple
+      remote path, URL, and push URL (None if no separate push URL is needed)
     """
     localds_path = ds.path
     ds_name = relpath(localds_path, start=hierarchy_basepath)
@@ -111,6 +103,88 @@ def _create_dataset_sibling(
         # not guaranteed that we can push via the primary URL
         ds_target_pushurl = target_pushurl.replace('%RELNAME', ds_name) \
             if target_pushurl else ds_sshurl
+    return remoteds_path, ds_target_url, ds_target_pushurl
+
+
+def _forget_replaced_remote(ds, name):
+    """Announce a remote dead and remove it, since its target was replaced"""
+    remotes = ds.repo.get_remotes()
+    if name in remotes:
+        # so we had this remote already, we should announce it dead
+        # XXX what if there was some kind of mismatch and this name
+        # isn't matching the actual remote UUID?  should have we
+        # checked more carefully?
+        lgr.info(
+            "Announcing existing remote %s dead to annex and removing",
+            name
+        )
+        if isinstance(ds.repo, AnnexRepo):
+            ds.repo.set_remote_dead(name)
+        ds.repo.remove_remote(name)
+
+
+def _configure_sibling(
+        name,
+        ds,
+        url,
+        pushurl,
+        publish_depends,
+        publish_by_default,
+        as_common_datasrc,
+        annex_wanted,
+        annex_group,
+        annex_groupwanted,
+        inherit):
+    # at this point we have a remote sibling in some shape or form
+    # -> add as remote
+    lgr.debug("Adding the siblings")
+    # TODO generator, yield the now swallowed results
+    Siblings.__call__(
+        'configure',
+        dataset=ds,
+        name=name,
+        url=url,
+        pushurl=pushurl,
+        recursive=False,
+        fetch=True,
+        as_common_datasrc=as_common_datasrc,
+        publish_by_default=publish_by_default,
+        publish_depends=publish_depends,
+        annex_wanted=annex_wanted,
+        annex_group=annex_group,
+        annex_groupwanted=annex_groupwanted,
+        inherit=inherit
+    )
+
+
+def _create_dataset_sibling(
+        name,
+        ds,
+        hierarchy_basepath,
+        ssh,
+        replicate_local_structure,
+        ssh_url,
+        target_dir,
+        target_url,
+        target_pushurl,
+        existing,
+        shared,
+        publish_depends,
+        publish_by_default,
+        as_common_datasrc,
+        annex_wanted,
+        annex_group,
+        annex_groupwanted,
+        inherit
+):
+    """Everyone is very smart here and could figure out the combinatorial
+    affluence among provided tiny (just slightly over a dozen) number of options
+    and only a few pages of code
+    """
+    localds_path = ds.path
+    remoteds_path, ds_target_url, ds_target_pushurl = _get_remote_target(
+        ds, hierarchy_basepath, replicate_local_structure, ssh_url,
+        target_dir, target_url, target_pushurl)
 
     lgr.info("Considering to create a target dataset {0} at {1} of {2}".format(
         localds_path, remoteds_path, ssh_url.hostname))
@@ -172,19 +246,7 @@ def _create_dataset_sibling(
                 # if we succeeded in removing it
                 path_exists = False
                 # Since it is gone now, git-annex also should forget about it
-                remotes = ds.repo.get_remotes()
-                if name in remotes:
-                    # so we had this remote already, we should announce it dead
-                    # XXX what if there was some kind of mismatch and this name
-                    # isn't matching the actual remote UUID?  should have we
-                    # checked more carefully?
-                    lgr.info(
-                        "Announcing existing remote %s dead to annex and removing",
-                        name
-                    )
-                    if isinstance(ds.repo, AnnexRepo):
-                        ds.repo.set_remote_dead(name)
-                    ds.repo.remove_remote(name)
+                _forget_replaced_remote(ds, name)
             elif existing == 'reconfigure':
                 lgr.info(_msg + " Will only reconfigure")
                 only_reconfigure = True
@@ -219,26 +281,10 @@ def _create_dataset_sibling(
         # TODO -- we might still want to reconfigure 'shared' setting!
         pass
 
-    # at this point we have a remote sibling in some shape or form
-    # -> add as remote
-    lgr.debug("Adding the siblings")
-    # TODO generator, yield the now swallowed results
-    Siblings.__call__(
-        'configure',
-        dataset=ds,
-        name=name,
-        url=ds_target_url,
-        pushurl=ds_target_pushurl,
-        recursive=False,
-        fetch=True,
-        as_common_datasrc=as_common_datasrc,
-        publish_by_default=publish_by_default,
-        publish_depends=publish_depends,
-        annex_wanted=annex_wanted,
-        annex_group=annex_group,
-        annex_groupwanted=annex_groupwanted,
-        inherit=inherit
-    )
+    _configure_sibling(
+        name, ds, ds_target_url, ds_target_pushurl,
+        publish_depends, publish_by_default, as_common_datasrc,
+        annex_wanted, annex_group, annex_groupwanted, inherit)
 
     # check git version on remote end
     lgr.info("Adjusting remote git configuration")
@@ -271,6 +317,352 @@ def _create_dataset_sibling(
     return remoteds_path
 
 
+# prefix of the lines a batched remote script reports back with
+_BATCH_MARKER = 'DATALAD-BATCH'
+
+
+def _run_batch(ssh, steps, preamble=None):
+    """Run shell code for a number of items in a single remote call
+
+    Each step runs in its own subshell with `set -e`, and can report back
+    tags via `_dl_report TAG`.  The exit code and stderr output of every
+    step are reported back as well.
+
+    Parameters
+    ----------
+    ssh : SSHConnection
+    steps : list of str
+      Shell code per item
+    preamble : str, optional
+      Shell code to run first, e.g. to define functions for the steps
+
+    Returns
+    -------
+    list of dict
+      Per step: 'tags' (list), 'exit' (int, or None if the step was never
+      completed), and 'stderr' (list of lines)
+    """
+    script = [
+        preamble or '',
+        '_dl_report() { echo "%s $_dl_i $*"; }' % _BATCH_MARKER,
+        '_dl_err=$(mktemp)',
+    ]
+    for i, step in enumerate(steps):
+        script.extend([
+            '_dl_i=%d' % i,
+            # steps must not consume the remainder of the script on stdin
+            '( set -e\n%s\n) 2>"$_dl_err" </dev/null' % step,
+            '_dl_report exit $?',
+            'sed "s/^/%s %d stderr /" "$_dl_err"' % (_BATCH_MARKER, i),
+        ])
+    script.append('rm -f "$_dl_err"')
+    # the script is fed via stdin, since it could exceed the limit on the
+    # length of a single command line argument for a large number of steps
+    with make_tempfile(content='\n'.join(script) + '\n') as tempf, \
+            open(tempf) as stdin:
+        out, err = ssh('sh -s', stdin=stdin)
+
+    reports = [dict(tags=[], exit=None, stderr=[]) for _ in steps]
+    for line in out.splitlines():
+        fields = line.split(' ', 3)
+        if len(fields) < 3 or fields[0] != _BATCH_MARKER:
+            # regular output of the commands
+            continue
+        report = reports[int(fields[1])]
+        value = fields[3] if len(fields) > 3 else ''
+        if fields[2] == 'exit':
+            report['exit'] = int(value)
+        elif fields[2] == 'stderr':
+            report['stderr'].append(value)
+        else:
+            report['tags'].append(fields[2])
+    return reports
+
+
+def _get_batch_error(report):
+    """Return an error message for a failed step of a batch, or None"""
+    if report['exit'] == 0:
+        return None
+    if report['exit'] is None:
+        return 'no status was reported'
+    return '\n'.join(report['stderr']) or \
+        'exited with code {}'.format(report['exit'])
+
+
+def _get_hook_installer():
+    """Return shell code defining `_dl_install_hook HOOKSDIR` for `_run_batch`
+    """
+    return "_dl_install_hook() {{\nmkdir -p \"$1\" && " \
+        "cat > \"$1/post-update\" <<'DATALAD_HOOK_EOF' && " \
+        "chmod +x \"$1/post-update\"\n{}DATALAD_HOOK_EOF\n}}".format(
+            _get_postupdate_hook())
+
+
+def _get_setup_step(
+        remoteds_path,
+        existing,
+        shared,
+        inherit_from,
+        annex,
+        description,
+        update_server_info,
+        config_push):
+    """Compose shell code setting up a remote dataset for `_run_batch`
+
+    Tags reported are 'skipped', 'replaced' and 'reconfigured' for an
+    already existing target path, and 'no-push-config' and 'no-hook' for
+    failures of non-critical steps.
+    """
+    path = sh_quote(remoteds_path)
+    lines = []
+    if remoteds_path != '.':
+        # empty directory is fine to reuse
+        lines.append(
+            'if [ -e {0} ] && ! rmdir {0} 2>/dev/null; then'.format(path))
+        if existing == 'error':
+            lines.append(
+                '  echo Target path {} already exists. >&2; exit 1'.format(
+                    path))
+        elif existing == 'skip':
+            lines.append('  _dl_report skipped; exit 0')
+        elif existing == 'replace':
+            # enable write permissions to allow removing dir
+            lines.append(
+                '  chmod +r+w -R {0}; rm -rf {0}; _dl_report replaced'.format(
+                    path))
+        elif existing == 'reconfigure':
+            lines.append('  _dl_reconfigure=1; _dl_report reconfigured')
+        else:
+            raise ValueError(
+                "Do not know how to handle existing={}".format(
+                    repr(existing)))
+        lines.extend(['fi', 'mkdir -p {}'.format(path)])
+
+    # don't (re-)initialize dataset if existing == reconfigure
+    lines.append('if [ -z "${_dl_reconfigure:-}" ]; then')
+    if shared:
+        lines.append(
+            '  git -C {} init --shared={}'.format(
+                path, sh_quote(text_type(shared))))
+    elif inherit_from:
+        # inherit from the setting on remote end
+        lines.extend([
+            '  _dl_shared=$(git -C {} config --get core.sharedrepository '
+            '|| :)'.format(sh_quote(inherit_from)),
+            '  git -C {} init ${{_dl_shared:+--shared="$_dl_shared"}}'.format(
+                path),
+        ])
+    else:
+        lines.append('  git -C {} init'.format(path))
+    if annex:
+        # init remote git annex repo (part fix of #463)
+        lines.append('  git -C {} annex init {}'.format(
+            path, sh_quote(description) if description else ''))
+    if update_server_info:
+        lines.append('  git -C {} update-server-info'.format(path))
+    lines.append('fi')
+
+    if config_push:
+        # allow for pushing to checked out branch
+        lines.append(
+            'git -C {} config receive.denyCurrentBranch updateInstead '
+            '|| _dl_report no-push-config'.format(path))
+    # enable metadata refresh on dataset updates to publication server
+    lines.append(
+        '_dl_install_hook {} || _dl_report no-hook'.format(
+            sh_quote(opj(remoteds_path, '.git', 'hooks'))))
+    return '\n'.join(lines)
+
+
+def _create_dataset_siblings_batched(
+        name,
+        aps,
+        hierarchy_basepath,
+        ssh,
+        batch_size,
+        replicate_local_structure,
+        ssh_url,
+        target_dir,
+        target_url,
+        target_pushurl,
+        existing,
+        shared,
+        publish_depends,
+        publish_by_default,
+        as_common_datasrc,
+        annex_wanted,
+        annex_group,
+        annex_groupwanted,
+        inherit
+):
+    """Set up siblings like `_create_dataset_sibling`, many per SSH call
+
+    All remote steps for up to `batch_size` datasets are compiled into a
+    single script.  Datasets need to be ordered from top to bottom.
+
+    Yields
+    ------
+    dict, str or None
+      Annotated path of a dataset, and the remote path of its sibling or None
+      if none was created.  If that is due to a failure, the annotated path
+      carries an 'error' status.
+    """
+    config_push = ssh.get_git_version() and \
+        ssh.get_git_version() >= LooseVersion("2.4")
+    if not config_push:
+        lgr.error("Git version >= 2.4 needed to configure remote."
+                  " Version detected on server: %s\nSkipping configuration"
+                  " of receive.denyCurrentBranch - you will not be able to"
+                  " publish updates to this repository. Upgrade your git"
+                  " and run with --existing=reconfigure",
+                  ssh.get_git_version())
+    hook_preamble = _get_hook_installer()
+
+    remote_paths = {}
+    for i in range(0, len(aps), batch_size):
+        batch = []
+        for ap in aps[i:i + batch_size]:
+            ds = Dataset(ap['path'])
+            target = _get_remote_target(
+                ds, hierarchy_basepath, replicate_local_structure, ssh_url,
+                target_dir, target_url, target_pushurl)
+            remoteds_path = target[0]
+            lgr.info(
+                "Considering to create a target dataset %s at %s of %s",
+                ds.path, remoteds_path, ssh_url.hostname)
+            inherit_from = None
+            if inherit and shared is None:
+                super_ds = ds.get_superdataset()
+                if super_ds and super_ds.path in remote_paths:
+                    # set up earlier on
+                    inherit_from = remote_paths[super_ds.path]
+                elif super_ds:
+                    try:
+                        inherit_from = RI(CreateSibling._get_remote_url(
+                            super_ds, name)).path
+                    except ValueError as e:
+                        lgr.debug(
+                            "Could not figure out remote shared setting of "
+                            "%s for %s due to %s", super_ds, name, exc_str(e))
+            remote_paths[ds.path] = remoteds_path
+            step = _get_setup_step(
+                remoteds_path,
+                existing,
+                shared,
+                inherit_from,
+                isinstance(ds.repo, AnnexRepo),
+                target_url,
+                target_url and not is_ssh(target_url),
+                config_push)
+            batch.append((ap, ds, target, step))
+
+        lgr.info("Setting up %d target datasets", len(batch))
+        reports = _run_batch(
+            ssh, [b[-1] for b in batch], preamble=hook_preamble)
+
+        for (ap, ds, target, _), report in zip(batch, reports):
+            remoteds_path, ds_target_url, ds_target_pushurl = target
+            error = _get_batch_error(report)
+            if error:
+                ap['status'] = 'error'
+                ap['message'] = (
+                    "failed to set up target dataset at %s (%s)",
+                    remoteds_path, error)
+                yield ap, None
+                continue
+            tags = report['tags']
+            if 'skipped' in tags:
+                lgr.info("Target path %s already exists. Skipping",
+                         remoteds_path)
+                yield ap, None
+                continue
+            if 'replaced' in tags:
+                lgr.info("Target path %s already existed and was replaced",
+                         remoteds_path)
+                # Since it is gone now, git-annex also should forget about it
+                _forget_replaced_remote(ds, name)
+            if 'no-push-config' in tags:
+                lgr.error("git config failed at remote location %s.\n"
+                          "You will not be able to push to checked out "
+                          "branch.", remoteds_path)
+            if 'no-hook' in tags:
+                lgr.error("Failed to add json creation command to post update "
+                          "hook at remote location %s", remoteds_path)
+
+            _configure_sibling(
+                name, ds, ds_target_url, ds_target_pushurl,
+                publish_depends, publish_by_default, as_common_datasrc,
+                annex_wanted, annex_group, annex_groupwanted, inherit)
+            yield ap, remoteds_path
+
+
+def _run_postupdate_hooks(ssh, paths, batch_size=None):
+    """Run post-update hooks of remote datasets
+
+    Parameters
+    ----------
+    ssh : SSHConnection
+    paths : list of str
+    batch_size : int, optional
+      If given, hooks of up to this many datasets are run per SSH call
+
+    Yields
+    ------
+    str, str or None
+      Path, and an error message if its hook failed
+    """
+    cmds = ["cd {} && hooks/post-update".format(sh_quote(_path_(path, ".git")))
+            for path in paths]
+    if not batch_size:
+        for path, cmd in zip(paths, cmds):
+            # Trigger the hook
+            lgr.debug("Running hook for %s", path)
+            try:
+                ssh(cmd)
+            except CommandError as e:
+                yield path, exc_str(e)
+                continue
+            yield path, None
+        return
+    for i in range(0, len(paths), batch_size):
+        lgr.debug("Running hooks for %d datasets", len(cmds[i:i + batch_size]))
+        reports = _run_batch(ssh, cmds[i:i + batch_size])
+        for path, report in zip(paths[i:i + batch_size], reports):
+            yield path, _get_batch_error(report)
+
+
+def _get_postupdate_hook():
+    """Return the content of the post-update hook for a remote repository"""
+    # create json command for current dataset
+    log_filename = 'datalad-publish-hook-$(date +%s).log' % TIMESTAMP_FMT
+    return r'''#!/bin/bash
+
+git update-server-info
+
+#
+# DataLad
+#
+# (Re)generate meta-data for DataLad Web UI and possibly init new submodules
+dsdir="$(dirname $0)/../.."
+logfile="$dsdir/{WEB_META_LOG}/{log_filename}"
+
+if [ ! -e "$dsdir/.git" ]; then
+  echo Assumption of being under .git has failed >&2
+  exit 1
+fi
+
+mkdir -p "$dsdir/{WEB_META_LOG}"  # assure logs directory exists
+
+( which datalad > /dev/null \
+  && ( cd "$dsdir"; GIT_DIR="$PWD/.git" datalad ls -a --json file .; ) \
+  || echo "E: no datalad found - skipping generation of indexes for web frontend"; \
+) &> "$logfile"
+
+# Some submodules might have been added and thus we better init them
+( cd "$dsdir"; git submodule update --init || : ; ) >> "$logfile" 2>&1
+'''.format(WEB_META_LOG=WEB_META_LOG, **locals())
+
+
 @build_doc
 class CreateSibling(Interface):
     """Create a dataset sibling on a UNIX-like SSH-accessible machine
@@ -292,6 +684,11 @@ class CreateSibling(Interface):
     organization on the local file system. However, a simple templating
     mechanism is provided to produce a flat list of datasets (see
     --target-dir).
+
+    By default, every step of setting up a remote dataset is a separate SSH
+    call.  With the configuration variable 'datalad.create-sibling.batch-size'
+    set, all steps for up to that many datasets are run as a single script
+    on the server instead, which is much faster over high-latency links.
     """
     # XXX prevent common args from being added to the docstring
     _no_eval_results = True
@@ -577,15 +974,15 @@ class CreateSibling(Interface):
         # would only collect first and then run (see gh #790)
         yielded = set()
         remote_repos_to_run_hook_for = []
-        for currentds_ap in \
-                sorted(to_process, key=lambda x: x['path'].count('/')):
-            current_ds = Dataset(currentds_ap['path'])
-
-            path = _create_dataset_sibling(
+        to_process = sorted(to_process, key=lambda x: x['path'].count('/'))
+        batch_size = cfg.obtain('datalad.create-sibling.batch-size')
+        if batch_size:
+            created = _create_dataset_siblings_batched(
                 name,
-                current_ds,
+                to_process,
                 ds.path,
                 ssh,
+                batch_size,
                 replicate_local_structure,
                 sshri,
                 target_dir,
@@ -601,10 +998,36 @@ class CreateSibling(Interface):
                 annex_groupwanted,
                 inherit
             )
+        else:
+            created = (
+                (currentds_ap, _create_dataset_sibling(
+                    name,
+                    Dataset(currentds_ap['path']),
+                    ds.path,
+                    ssh,
+                    replicate_local_structure,
+                    sshri,
+                    target_dir,
+                    target_url,
+                    target_pushurl,
+                    existing,
+                    shared,
+                    publish_depends,
+                    publish_by_default,
+                    as_common_datasrc,
+                    annex_wanted,
+                    annex_group,
+                    annex_groupwanted,
+                    inherit
+                ))
+                for currentds_ap in to_process)
+        for currentds_ap, path in created:
+            current_ds = Dataset(currentds_ap['path'])
             if not path:
                 # nothing new was created
                 # TODO is 'notneeded' appropriate in this case?
-                currentds_ap['status'] = 'notneeded'
+                if not currentds_ap.get('status', None):
+                    currentds_ap['status'] = 'notneeded'
                 # TODO explain status in 'message'
                 yield currentds_ap
                 yielded.add(currentds_ap['path'])
@@ -628,17 +1051,17 @@ class CreateSibling(Interface):
         # in reverse order would be depth first
         lgr.info("Running post-update hooks in all created siblings")
         # TODO: add progressbar
-        for path, currentds_ap in remote_repos_to_run_hook_for[::-1]:
-            # Trigger the hook
-            lgr.debug("Running hook for %s", path)
-            try:
-                ssh("cd {} && hooks/post-update".format(
-                    sh_quote(_path_(path, ".git"))))
-            except CommandError as e:
+        remote_repos_to_run_hook_for = remote_repos_to_run_hook_for[::-1]
+        hook_errors = _run_postupdate_hooks(
+            ssh, [path for path, _ in remote_repos_to_run_hook_for],
+            batch_size)
+        for (path, currentds_ap), (_, error) in zip(
+                remote_repos_to_run_hook_for, hook_errors):
+            if error:
                 currentds_ap['status'] = 'error'
                 currentds_ap['message'] = (
                     "failed to run post-update hook under remote path %s (%s)",
-                    path, exc_str(e))
+                    path, error)
                 yield currentds_ap
                 yielded.add(currentds_ap['path'])
                 continue
@@ -720,34 +1143,7 @@ class CreateSibling(Interface):
         ssh('mkdir -p {}'.format(sh_quote(hooks_remote_dir)))
         hook_remote_target = opj(hooks_remote_dir, 'post-update')
 
-        # create json command for current dataset
-        log_filename = 'datalad-publish-hook-$(date +%s).log' % TIMESTAMP_FMT
-        hook_content = r'''#!/bin/bash
-
-git update-server-info
-
-#
-# DataLad
-#
-# (Re)generate meta-data for DataLad Web UI and possibly init new submodules
-dsdir="$(dirname $0)/../.."
-logfile="$dsdir/{WEB_META_LOG}/{log_filename}"
-
-if [ ! -e "$dsdir/.git" ]; then
-  echo Assumption of being under .git has failed >&2
-  exit 1
-fi
-
-mkdir -p "$dsdir/{WEB_META_LOG}"  # assure logs directory exists
-
-( which datalad > /dev/null \
-  && ( cd "$dsdir"; GIT_DIR="$PWD/.git" datalad ls -a --json file .; ) \
-  || echo "E: no datalad found - skipping generation of indexes for web frontend"; \
-) &> "$logfile"
-
-# Some submodules might have been added and thus we better init them
-( cd "$dsdir"; git submodule update --init || : ; ) >> "$logfile" 2>&1
-'''.format(WEB_META_LOG=WEB_META_LOG, **locals())
+        hook_content = _get_postupdate_hook()
 
         with make_tempfile(content=hook_content) as tempf:
             # create post_update hook script
@@ -78,7 +78,41 @@ def resolve_path(path, ds=None):
     return normpath(opj(top_path, path))
 
 
-@add_metaclass(Flyweight)
+def _bind_interface(name):
+    """Import an interface with the API `name`, binding it to Dataset
+
+    Interfaces bind themselves as methods of Dataset upon import, which
+    datalad.api delays until their first use.
+
+    Returns
+    -------
+    bool
+      Whether there was such an interface
+    """
+    if name.startswith('_'):
+        return False
+    from datalad.interface.base import get_interface_groups
+    from datalad.interface.base import get_api_name
+    from datalad.interface.base import load_interface
+    for grp_name, grp_descr, interfaces in get_interface_groups():
+        for intfspec in interfaces:
+            if get_api_name(intfspec) == name:
+                load_interface(intfspec)
+                return True
+    return False
+
+
+class _DatasetType(Flyweight):
+    """Flyweight which binds interfaces upon access via the class"""
+
+    def __getattr__(cls, attr):
+        if _bind_interface(attr):
+            return type.__getattribute__(cls, attr)
+        raise AttributeError(
+            "type object %r has no attribute %r" % (cls.__name__, attr))
+
+
+@add_metaclass(_DatasetType)
 class Dataset(object):
 
     # Begin Flyweight
@@ -145,6 +179,12 @@ class Dataset(object):
             return False
         return realpath(self.path) == realpath(other.path)
 
+    def __getattr__(self, attr):
+        if _bind_interface(attr):
+            return super(Dataset, self).__getattribute__(attr)
+        raise AttributeError(
+            "%r object has no attribute %r" % (self.__class__.__name__, attr))
+
     def close(self):
         """Perform operations which would close any possible process using this Dataset
         """
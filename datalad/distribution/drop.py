@@ -33,7 +33,7 @@ from datalad.interface.common_opts import recursion_flag
 from datalad.interface.common_opts import recursion_limit
 from datalad.interface.results import get_status_dict
 from datalad.interface.results import annexjson2result
-from datalad.interface.results import success_status_map
+from datalad.interface.results import ResultPathTracker
 from datalad.interface.results import results_from_annex_noinfo
 from datalad.interface.utils import handle_dirty_dataset
 from datalad.interface.utils import eval_results
@@ -93,14 +93,12 @@ def _drop_files(ds, paths, check, noannex_iserror=False, **kwargs):
         return
 
     opts = ['--force'] if not check else []
-    respath_by_status = {}
-    for res in ds.repo.drop(paths, options=opts):
+    respath_by_status = ResultPathTracker()
+    for res in ds.repo.drop(paths, options=opts, stream=True):
         res = annexjson2result(
             # annex reports are always about files
             res, ds, type='file', **kwargs)
-        success = success_status_map[res['status']]
-        respath_by_status[success] = \
-            respath_by_status.get(success, []) + [res['path']]
+        respath_by_status.add(res)
         yield res
     # report on things requested that annex was silent about
     for r in results_from_annex_noinfo(
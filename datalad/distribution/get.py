@@ -11,7 +11,9 @@
 """
 
 import logging
+import threading
 
+from multiprocessing.pool import ThreadPool
 from os.path import join as opj
 from os.path import relpath
 
@@ -26,7 +28,7 @@ from datalad.interface.results import get_status_dict
 from datalad.interface.results import results_from_paths
 from datalad.interface.results import annexjson2result
 from datalad.interface.results import count_results
-from datalad.interface.results import success_status_map
+from datalad.interface.results import ResultPathTracker
 from datalad.interface.results import results_from_annex_noinfo
 from datalad.interface.common_opts import recursion_flag
 # from datalad.interface.common_opts import git_opts
@@ -48,11 +50,14 @@ from datalad.support.exceptions import InstallFailedError
 from datalad.support.exceptions import IncompleteResultsError
 from datalad.support.network import URL
 from datalad.support.network import RI
+from datalad.support.parallel import run_balanced
+from datalad.support.parallel import walk_tree
 from datalad.dochelpers import exc_str
 from datalad.dochelpers import single_or_plural
 from datalad.utils import get_dataset_root
 from datalad.utils import with_pathsep as _with_sep
 from datalad.utils import unique
+from datalad.utils import nothing_cm
 
 from .dataset import Dataset
 from .dataset import EnsureDataset
@@ -106,15 +111,21 @@ def _get_flexible_source_candidates_for_submodule(ds, sm_path, sm_url=None):
 
 
 def _install_subds_from_flexible_source(
-        ds, sm_path, sm_url, reckless, description=None):
-    """Tries to obtain a given subdataset from several meaningful locations"""
-    # TODO remove this assertion eventually, for now it assures intented
-    # usage of this helper function
-    assert(sm_path in ds.subdatasets(recursive=False, result_xfm='relpaths'))
+        ds, sm_path, sm_url, reckless, description=None, lock=None):
+    """Tries to obtain a given subdataset from several meaningful locations
 
-    # compose a list of candidate clone URLs
-    clone_urls = _get_flexible_source_candidates_for_submodule(
-        ds, sm_path, sm_url)
+    If a `lock` is given, it is held whenever the parent dataset is accessed,
+    so only the cloning itself runs unguarded and multiple subdatasets could
+    be installed concurrently.
+    """
+    with lock if lock is not None else nothing_cm():
+        # TODO remove this assertion eventually, for now it assures intented
+        # usage of this helper function
+        assert(sm_path in ds.subdatasets(recursive=False, result_xfm='relpaths'))
+
+        # compose a list of candidate clone URLs
+        clone_urls = _get_flexible_source_candidates_for_submodule(
+            ds, sm_path, sm_url)
 
     # prevent inevitable exception from `clone`
     dest_path = opj(ds.path, sm_path)
@@ -150,47 +161,50 @@ def _install_subds_from_flexible_source(
                 clone_urls))
 
     assert(subds.is_installed())
-    _fixup_submodule_dotgit_setup(ds, sm_path)
-
-    # do fancy update
-    lgr.debug("Update cloned subdataset {0} in parent".format(subds))
-    # TODO: move all of that into update_submodule ??
-    # TODO: direct mode ramifications?
-    # track branch originally cloned
-    subrepo = subds.repo
-    branch = subrepo.get_active_branch()
-    branch_hexsha = subrepo.get_hexsha(branch)
-    ds.repo.update_submodule(sm_path, init=True)
-    updated_branch = subrepo.get_active_branch()
-    if branch and not updated_branch:
-        # got into 'detached' mode
-        # trace if current state is a predecessor of the branch_hexsha
-        lgr.debug(
-            "Detected detached HEAD after updating submodule %s which was "
-            "in %s branch before", subds.path, branch)
-        detached_hexsha = subrepo.get_hexsha()
-        if subrepo.get_merge_base(
-                [branch_hexsha, detached_hexsha]) == detached_hexsha:
-            # TODO: config option?
-            # in all likely event it is of the same branch since
-            # it is an ancestor -- so we could update that original branch
-            # to point to the state desired by the submodule, and update
-            # HEAD to point to that location
-            lgr.info(
-                "Submodule HEAD got detached. Resetting branch %s to point "
-                "to %s. Original location was %s",
-                branch, detached_hexsha[:8], branch_hexsha[:8]
-            )
-            branch_ref = 'refs/heads/%s' % branch
-            subrepo.update_ref(branch_ref, detached_hexsha)
-            assert(subrepo.get_hexsha(branch) == detached_hexsha)
-            subrepo.update_ref('HEAD', branch_ref, symbolic=True)
-            assert(subrepo.get_active_branch() == branch)
-        else:
-            lgr.warning(
-                "%s has a detached HEAD since cloned branch %s has another common ancestor with %s",
-                subrepo.path, branch, detached_hexsha[:8]
-            )
+    # the parent repository gets modified from here on, which must not
+    # happen for multiple subdatasets at once
+    with lock if lock is not None else nothing_cm():
+        _fixup_submodule_dotgit_setup(ds, sm_path)
+
+        # do fancy update
+        lgr.debug("Update cloned subdataset {0} in parent".format(subds))
+        # TODO: move all of that into update_submodule ??
+        # TODO: direct mode ramifications?
+        # track branch originally cloned
+        subrepo = subds.repo
+        branch = subrepo.get_active_branch()
+        branch_hexsha = subrepo.get_hexsha(branch)
+        ds.repo.update_submodule(sm_path, init=True)
+        updated_branch = subrepo.get_active_branch()
+        if branch and not updated_branch:
+            # got into 'detached' mode
+            # trace if current state is a predecessor of the branch_hexsha
+            lgr.debug(
+                "Detected detached HEAD after updating submodule %s which was "
+                "in %s branch before", subds.path, branch)
+            detached_hexsha = subrepo.get_hexsha()
+            if subrepo.get_merge_base(
+                    [branch_hexsha, detached_hexsha]) == detached_hexsha:
+                # TODO: config option?
+                # in all likely event it is of the same branch since
+                # it is an ancestor -- so we could update that original branch
+                # to point to the state desired by the submodule, and update
+                # HEAD to point to that location
+                lgr.info(
+                    "Submodule HEAD got detached. Resetting branch %s to point "
+                    "to %s. Original location was %s",
+                    branch, detached_hexsha[:8], branch_hexsha[:8]
+                )
+                branch_ref = 'refs/heads/%s' % branch
+                subrepo.update_ref(branch_ref, detached_hexsha)
+                assert(subrepo.get_hexsha(branch) == detached_hexsha)
+                subrepo.update_ref('HEAD', branch_ref, symbolic=True)
+                assert(subrepo.get_active_branch() == branch)
+            else:
+                lgr.warning(
+                    "%s has a detached HEAD since cloned branch %s has another common ancestor with %s",
+                    subrepo.path, branch, detached_hexsha[:8]
+                )
     return subds
 
 
@@ -259,48 +273,115 @@ def _recursive_install_subds_underneath(ds, recursion_limit, reckless, start=Non
                                         refds_path=None, description=None):
     if isinstance(recursion_limit, int) and recursion_limit <= 0:
         return
-    # install using helper that give some flexibility regarding where to
-    # get the module from
-    for sub in ds.subdatasets(
-            return_type='generator', result_renderer='disabled'):
-        subds = Dataset(sub['path'])
-        if start is not None and not subds.path.startswith(_with_sep(start)):
-            # this one we can ignore, not underneath the start path
-            continue
-        if sub['state'] != 'absent':
+
+    # Dataset, repository and config instances are shared (flyweights), and
+    # not safe to be used by multiple threads at once, so any access to them
+    # is serialized, while the clones themselves run concurrently
+    lock = threading.Lock()
+
+    def expand(node):
+        sub, parentds, limit = node
+        if sub is None:
+            # the dataset we start from
+            subds = ds
+            res = None
+        elif sub['state'] != 'absent':
+            subds = Dataset(sub['path'])
             # dataset was already found to exist
-            yield get_status_dict(
+            res = get_status_dict(
                 'install', ds=subds, status='notneeded', logger=lgr,
                 refds=refds_path)
-            # do not continue, even if an intermediate dataset exists it
+            # do not stop, even if an intermediate dataset exists it
             # does not imply that everything below it does too
         else:
             # try to get this dataset
             try:
                 subds = _install_subds_from_flexible_source(
-                    ds,
-                    relpath(sub['path'], start=ds.path),
+                    parentds,
+                    relpath(sub['path'], start=parentds.path),
                     sub['gitmodule_url'],
                     reckless,
-                    description=description)
-                yield get_status_dict(
-                    'install', ds=subds, status='ok', logger=lgr, refds=refds_path,
-                    message=("Installed subdataset %s", subds), parentds=ds.path)
+                    description=description,
+                    lock=lock)
+                res = get_status_dict(
+                    'install', ds=subds, status='ok', logger=lgr,
+                    refds=refds_path,
+                    message=("Installed subdataset %s", subds),
+                    parentds=parentds.path)
             except Exception as e:
-                # skip all of downstairs, if we didn't manage to install subdataset
-                yield get_status_dict(
-                    'install', ds=subds, status='error', logger=lgr, refds=refds_path,
+                # skip all of downstairs, if we didn't manage to install
+                # subdataset
+                return get_status_dict(
+                    'install', ds=Dataset(sub['path']), status='error',
+                    logger=lgr, refds=refds_path,
                     message=("Installation of subdatasets %s failed with exception: %s",
-                             subds, exc_str(e)))
-                continue
+                             sub['path'], exc_str(e))), []
+        if isinstance(limit, int) and limit <= 0:
+            return res, []
         # otherwise recurse
-        # we can skip the start expression, we know we are within
-        for res in _recursive_install_subds_underneath(
-                subds,
-                recursion_limit=recursion_limit - 1 if isinstance(recursion_limit, int) else recursion_limit,
-                reckless=reckless,
-                refds_path=refds_path):
-            yield res
+        # install using helper that give some flexibility regarding where to
+        # get the module from
+        with lock:
+            subs = subds.subdatasets(
+                return_type='list', result_renderer='disabled')
+        if sub is None and start is not None:
+            # ignore those not underneath the start path
+            subs = [s for s in subs if s['path'].startswith(_with_sep(start))]
+        return res, [
+            (s, subds, limit - 1 if isinstance(limit, int) else limit)
+            for s in subs]
+
+    # sibling subdatasets get installed by a number of threads, but reported
+    # in the same order as if done serially
+    for res in walk_tree(
+            (None, None, recursion_limit),
+            expand,
+            jobs=ds.config.obtain('datalad.install.jobs')):
+        yield res
+
+
+def _get_content_concurrently(annex_content, options, jobs):
+    """Get content in multiple datasets at once within a budget of `jobs`
+
+    Datasets get a share of the jobs proportional to the size of the content
+    they need to fetch, and the heaviest ones are started first.
+
+    Parameters
+    ----------
+    annex_content : list of (Dataset, list of str)
+      Datasets with annexes, and paths to get content for in them
+    options : list of str
+      Options for git annex get
+    jobs : int
+
+    Yields
+    ------
+    list of dict
+      git-annex records for the fetched content of a dataset, in the order of
+      `annex_content`
+    """
+    # figuring out what to fetch is cheap compared to fetching, but still
+    # requires a git-annex call per dataset
+    pool = ThreadPool(min(jobs, len(annex_content)))
+    try:
+        expected = pool.map(
+            lambda x: x[0].repo.get_expected_downloads(x[1]), annex_content)
+    finally:
+        pool.terminate()
+
+    def get_ds_content(i, share):
+        ds = annex_content[i][0]
+        expected_downloads, fetch_files = expected[i]
+        if not fetch_files:
+            return []
+        return ds.repo.get(
+            fetch_files, options=options, jobs=share,
+            expected_downloads=expected_downloads)
+
+    weights = [sum(size or 0 for size in e[0].values()) for e in expected]
+    for i, results in run_balanced(
+            get_ds_content, range(len(annex_content)), weights, jobs=jobs):
+        yield results
 
 
 @build_doc
@@ -561,6 +642,7 @@ class Get(Interface):
 
         # hand over to git-annex, get files content,
         # report files in git as 'notneeded' to get
+        ds_content = []
         for ds_path in sorted(content_by_ds.keys()):
             ds = Dataset(ds_path)
             # grab content, ignore subdataset entries
@@ -569,6 +651,22 @@ class Get(Interface):
             if not content:
                 # cut this short should there be nothing
                 continue
+            ds_content.append((ds, content))
+
+        options = ['--from=%s' % source] if source else []
+        annex_content = [(ds, content) for ds, content in ds_content
+                         if isinstance(ds.repo, AnnexRepo)]
+        if jobs and jobs > 1 and len(annex_content) > 1:
+            # many annex calls would take longer to start up than to fetch
+            # a few files each, so run them for multiple datasets at once
+            annex_results = _get_content_concurrently(
+                annex_content, options, jobs)
+        else:
+            annex_results = (
+                ds.repo.get(content, options=options, jobs=jobs, stream=True)
+                for ds, content in annex_content)
+
+        for ds, content in ds_content:
             # needs to be an annex to get content
             if not isinstance(ds.repo, AnnexRepo):
                 for r in results_from_paths(
@@ -578,16 +676,11 @@ class Get(Interface):
                         refds=refds_path):
                     yield r
                 continue
-            respath_by_status = {}
-            for res in ds.repo.get(
-                    content,
-                    options=['--from=%s' % source] if source else [],
-                    jobs=jobs):
+            respath_by_status = ResultPathTracker()
+            for res in next(annex_results):
                 res = annexjson2result(res, ds, type='file', logger=lgr,
                                        refds=refds_path)
-                success = success_status_map[res['status']]
-                respath_by_status[success] = \
-                    respath_by_status.get(success, []) + [res['path']]
+                respath_by_status.add(res)
                 yield res
 
             for r in results_from_annex_noinfo(
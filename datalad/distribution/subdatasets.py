@@ -12,12 +12,13 @@ __docformat__ = 'restructuredtext'
 
 
 import logging
-import re
 import os
 from os.path import join as opj
 from os.path import normpath
 from os.path import relpath
 from os.path import exists
+from os.path import isdir
+from os.path import isfile
 
 from git import GitConfigParser
 
@@ -31,6 +32,7 @@ from datalad.support.constraints import EnsureNone
 from datalad.support.param import Parameter
 from datalad.support.gitrepo import InvalidGitRepositoryError
 from datalad.support.exceptions import CommandError
+from datalad.support.parallel import walk_tree
 from datalad.interface.common_opts import recursion_flag
 from datalad.interface.common_opts import recursion_limit
 from datalad.distribution.dataset import require_dataset
@@ -47,17 +49,6 @@ from .dataset import resolve_path
 lgr = logging.getLogger('datalad.distribution.subdatasets')
 
 
-submodule_full_props = re.compile(r'([0-9a-f]+) (.*) \((.*)\)$')
-submodule_nodescribe_props = re.compile(r'([0-9a-f]+) (.*)$')
-
-status_map = {
-    ' ': 'clean',
-    '+': 'modified',
-    '-': 'absent',
-    'U': 'conflict',
-}
-
-
 def _parse_gitmodules(dspath):
     gitmodule_path = opj(dspath, ".gitmodules")
     parser = GitConfigParser(gitmodule_path)
@@ -75,27 +66,86 @@ def _parse_gitmodules(dspath):
     return mods
 
 
-def _parse_git_submodules(dspath, recursive):
-    """All known ones with some properties"""
+def _get_gitdir(path):
+    """Return path to the git directory of a repository at `path`, or None"""
+    dotgit = opj(path, '.git')
+    if isdir(dotgit):
+        return dotgit
+    if isfile(dotgit):
+        with open(dotgit) as f:
+            line = f.readline().strip()
+        if line.startswith('gitdir:'):
+            gitdir = normpath(opj(path, line[7:].strip()))
+            if isdir(gitdir):
+                return gitdir
+    return None
+
+
+def _read_ref(gitdir, ref):
+    """Return hexsha a reference points to, or None if it cannot be found"""
+    # a linked worktree shares refs with the main repository
+    commondir = gitdir
+    if exists(opj(gitdir, 'commondir')):
+        with open(opj(gitdir, 'commondir')) as f:
+            commondir = normpath(opj(gitdir, f.read().strip()))
+    for refdir in ((gitdir, commondir) if ref == 'HEAD' else (commondir,)):
+        try:
+            with open(opj(refdir, *ref.split('/'))) as f:
+                content = f.read().strip()
+        except (IOError, OSError):
+            continue
+        if content.startswith('ref:'):
+            return _read_ref(gitdir, content[4:].strip())
+        return content or None
+    # could be a packed one
+    try:
+        with open(opj(commondir, 'packed-refs')) as f:
+            for line in f:
+                if line.endswith(' %s\n' % ref):
+                    return line.split(' ', 1)[0]
+    except (IOError, OSError):
+        pass
+    return None
+
+
+def _describe_submodule(path):
+    """Return `git describe` alike description of the HEAD of a submodule"""
+    # same sequence of attempts as `git submodule status` does
+    for opts in ([], ['--tags'], ['--contains'], ['--all', '--always']):
+        try:
+            stdout, stderr = GitRunner(cwd=path).run(
+                ['git', 'describe'] + opts + ['HEAD'],
+                log_stderr=True,
+                log_stdout=True,
+                expect_stderr=True,
+                expect_fail=True)
+        except CommandError:
+            continue
+        return stdout.strip()
+
+
+def _parse_git_submodules(dspath, recursive, describe=False):
+    """All known ones with some properties
+
+    Gitlinks are taken from the index, and the state of a submodule is
+    determined by reading its HEAD directly, hence at most a single call to
+    Git per dataset is needed, unless `describe` is True, in which case
+    `git describe` is run for every present submodule to report
+    'revision_descr' as well.
+    """
     if not exists(opj(dspath, ".gitmodules")):
         # easy way out. if there is no .gitmodules file
         # we cannot have (functional) subdatasets
         return
 
-    # this will not work in direct mode, need better way #1422
-    cmd = ['git', '--work-tree=.', 'submodule', 'status']
-    if recursive:
-        cmd.append('--recursive')
-
     # need to go rogue  and cannot use proper helper in GitRepo
     # as they also pull in all of GitPython's magic
+    # --work-tree=. is needed to deal with direct mode
     try:
         stdout, stderr = GitRunner(cwd=dspath).run(
-            cmd,
+            ['git', '--work-tree=.', 'ls-files', '--stage', '-z'],
             log_stderr=True,
             log_stdout=True,
-            # not sure why exactly, but log_online has to be false!
-            log_online=False,
             expect_stderr=False,
             shell=False,
             # we don't want it to scream on stdout
@@ -103,21 +153,44 @@ def _parse_git_submodules(dspath, recursive):
     except CommandError as e:
         raise InvalidGitRepositoryError(exc_str(e))
 
-    for line in stdout.split('\n'):
-        if not line:
+    # <mode> SP <sha> SP <stage> TAB <path>
+    gitlinks = []
+    for line in stdout.split('\0'):
+        if not line.startswith('160000 '):
             continue
-        sm = {}
-        sm['state'] = status_map[line[0]]
-        props = submodule_full_props.match(line[1:])
-        if props:
-            sm['revision'] = props.group(1)
-            sm['path'] = opj(dspath, props.group(2))
-            sm['revision_descr'] = props.group(3)
+        props, path = line.split('\t', 1)
+        mode, sha, stage = props.split(' ')
+        if gitlinks and gitlinks[-1][0] == path:
+            # multiple stages for a path in conflict
+            gitlinks[-1] = (path, sha, 'conflict')
+            continue
+        gitlinks.append((path, sha, 'conflict' if stage != '0' else None))
+
+    for path, revision, state in gitlinks:
+        sm = {'path': opj(dspath, path)}
+        gitdir = _get_gitdir(sm['path'])
+        head = _read_ref(gitdir, 'HEAD') if gitdir else None
+        if state == 'conflict':
+            # `git submodule status` reports no SHA in this case
+            revision = '0' * 40
+        elif gitdir is None:
+            state = 'absent'
         else:
-            props = submodule_nodescribe_props.match(line[1:])
-            sm['revision'] = props.group(1)
-            sm['path'] = opj(dspath, props.group(2))
+            state = 'clean' if head == revision else 'modified'
+        if state == 'modified' and head:
+            # as `git submodule status`, report what is checked out
+            revision = head
+        sm['state'] = state
+        sm['revision'] = revision
+        if describe and gitdir is not None and head:
+            descr = _describe_submodule(sm['path'])
+            if descr:
+                sm['revision_descr'] = descr
         yield sm
+        if recursive and gitdir is not None:
+            for sub_sm in _parse_git_submodules(
+                    sm['path'], recursive, describe=describe):
+                yield sub_sm
 
 
 def _get_gitmodule_parser(dspath):
@@ -153,7 +226,8 @@ class Subdatasets(Interface):
         as reported by `git submodule`
 
     "revision_descr"
-        Output of `git describe` for the subdataset
+        Output of `git describe` for the subdataset (only reported if
+        `describe` is enabled)
 
     "gitmodule_url"
         URL of the subdataset recorded in the parent
@@ -164,8 +238,9 @@ class Subdatasets(Interface):
     Performance note: Requesting `bottomup` reporting order, or a particular
     numerical `recursion_limit` implies an internal switch to an alternative
     query implementation for recursive query that is more flexible, but also
-    notably slower (performs one call to Git per dataset versus a single call
-    for all combined).
+    slower (reads the .gitmodules file of every dataset with a more complex
+    parser).  Requesting `describe` implies one additional call to Git per
+    subdataset.
 
     """
     _params_ = dict(
@@ -219,7 +294,12 @@ class Subdatasets(Interface):
             doc="""Name of one or more subdataset properties to be removed
             from the parent dataset's .gitmodules file.[CMD:  This
             option can be given multiple times. CMD]""",
-            constraints=EnsureStr() | EnsureNone()))
+            constraints=EnsureStr() | EnsureNone()),
+        describe=Parameter(
+            args=("--describe",),
+            action="store_true",
+            doc="""whether to also report the output of `git describe` for
+            each present subdataset as 'revision_descr'."""))
 
     @staticmethod
     @datasetmethod(name='subdatasets')
@@ -232,7 +312,8 @@ class Subdatasets(Interface):
             contains=None,
             bottomup=False,
             set_property=None,
-            delete_property=None):
+            delete_property=None,
+            describe=False):
         dataset = require_dataset(
             dataset, check_installed=False, purpose='subdataset reporting/modification')
         refds_path = dataset.path
@@ -254,7 +335,8 @@ class Subdatasets(Interface):
                 # need to track current parent
                 stack = [refds_path]
                 modinfo_cache = {}
-                for sm in _parse_git_submodules(refds_path, recursive=recursive):
+                for sm in _parse_git_submodules(
+                        refds_path, recursive=recursive, describe=describe):
                     # unwind the parent stack until we find the right one
                     # this assumes that submodules come sorted
                     while not sm['path'].startswith(_with_sep(stack[-1])):
@@ -292,7 +374,8 @@ class Subdatasets(Interface):
         for r in _get_submodules(
                 dataset.path, fulfilled, recursive, recursion_limit,
                 contains, bottomup, set_property, delete_property,
-                refds_path):
+                refds_path, describe=describe,
+                jobs=dataset.config.obtain('datalad.recursion.jobs')):
             # without the refds_path cannot be rendered/converted relative
             # in the eval_results decorator
             r['refds'] = refds_path
@@ -303,16 +386,46 @@ class Subdatasets(Interface):
 # the main command interface with all its decorators again
 def _get_submodules(dspath, fulfilled, recursive, recursion_limit,
                     contains, bottomup, set_property, delete_property,
-                    refds_path):
-    if not GitRepo.is_valid_repo(dspath):
-        return
+                    refds_path, describe=False, jobs=1):
+    def expand(node):
+        path, res, limit, descend = node
+        if res is not None and fulfilled is not None and \
+                GitRepo.is_valid_repo(path) != fulfilled:
+            # do not report, but possibly still go underneath
+            res = None
+        if not descend or not GitRepo.is_valid_repo(path):
+            return res, []
+        # expand list with child submodules, if we are to recurse further
+        descend = recursive and \
+            (limit in (None, 'existing') or
+             (isinstance(limit, int) and limit > 1))
+        limit = limit - 1 if isinstance(limit, int) else limit
+        return res, [
+            (sm['path'], sm, limit, descend)
+            for sm in _get_submodules_of(
+                path, contains, set_property, delete_property, refds_path,
+                describe)]
+
+    # subdatasets get discovered by `jobs` threads, but reported in the
+    # same order as if done serially
+    return walk_tree(
+        (dspath, None, recursion_limit, True),
+        expand,
+        jobs=jobs,
+        bottomup=bottomup)
+
+
+def _get_submodules_of(dspath, contains, set_property, delete_property,
+                       refds_path, describe=False):
+    """Return records on the immediate subdatasets of a dataset"""
     modinfo = _parse_gitmodules(dspath)
     # write access parser
     parser = None
     if set_property or delete_property:
         parser = _get_gitmodule_parser(dspath)
-    # put in giant for-loop to be able to yield results before completion
-    for sm in _parse_git_submodules(dspath, recursive=False):
+    results = []
+    for sm in _parse_git_submodules(
+            dspath, recursive=False, describe=describe):
         if contains and \
                 not (contains == sm['path'] or
                      contains.startswith(_with_sep(sm['path']))):
@@ -356,33 +469,8 @@ def _get_submodules(dspath, fulfilled, recursive, recursion_limit,
             logger=lgr)
         subdsres.update(sm)
         subdsres['parentds'] = dspath
-        if not bottomup and \
-                (fulfilled is None or
-                 GitRepo.is_valid_repo(sm['path']) == fulfilled):
-            yield subdsres
-
-        # expand list with child submodules. keep all paths relative to parent
-        # and convert jointly at the end
-        if recursive and \
-                (recursion_limit in (None, 'existing') or
-                 (isinstance(recursion_limit, int) and
-                  recursion_limit > 1)):
-            for r in _get_submodules(
-                    sm['path'],
-                    fulfilled, recursive,
-                    (recursion_limit - 1)
-                    if isinstance(recursion_limit, int)
-                    else recursion_limit,
-                    contains,
-                    bottomup,
-                    set_property,
-                    delete_property,
-                    refds_path):
-                yield r
-        if bottomup and \
-                (fulfilled is None or
-                 GitRepo.is_valid_repo(sm['path']) == fulfilled):
-            yield subdsres
+        results.append(subdsres)
     if parser is not None:
         # release parser lock manually, auto-cleanup is not reliable in PY3
         parser.release()
+    return results
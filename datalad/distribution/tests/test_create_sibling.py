@@ -16,6 +16,12 @@ import re
 from os.path import join as opj, exists
 
 from ..dataset import Dataset
+from ..create_sibling import _get_batch_error
+from ..create_sibling import _get_hook_installer
+from ..create_sibling import _get_postupdate_hook
+from ..create_sibling import _get_setup_step
+from ..create_sibling import _run_batch
+from ..create_sibling import _run_postupdate_hooks
 from datalad.api import publish, install, create_sibling
 from datalad.cmd import Runner
 from datalad.utils import chpwd
@@ -49,6 +55,7 @@ from datalad.support.exceptions import InsufficientArgumentsError
 
 from datalad.utils import on_windows
 from datalad.utils import _path_
+from datalad.consts import WEB_META_LOG
 
 import logging
 
@@ -522,3 +529,70 @@ def test_target_ssh_inherit():
     #yield _test_target_ssh_inherit, None      # no wanted etc
     #yield _test_target_ssh_inherit, 'manual'  # manual -- no load should be annex copied
     yield _test_target_ssh_inherit, 'backup'  # backup -- all data files
+
+
+class _LocalShell(object):
+    """Runs commands of a would-be SSH connection locally, counting calls"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, cmd, stdin=None):
+        self.calls += 1
+        return Runner().run(['sh', '-c', cmd], stdin=stdin)
+
+
+@with_tempfile(mkdir=True)
+def test_batched_setup(path):
+    ssh = _LocalShell()
+    new, empty, existing, sub = [
+        opj(path, d) for d in ('new', 'empty', 'existing', opj('new', 'sub'))]
+    os.makedirs(empty)
+    create_tree(existing, {'file': 'content'})
+
+    reports = _run_batch(
+        ssh,
+        [_get_setup_step(p, 'skip', 'group', None, False, None, True, True)
+         for p in (new, empty, existing)] +
+        [_get_setup_step(sub, 'error', None, new, False, None, False, True)],
+        preamble=_get_hook_installer())
+    eq_(ssh.calls, 1)
+    eq_([r['exit'] for r in reports], [0, 0, 0, 0])
+    eq_([r['tags'] for r in reports], [[], [], ['skipped'], []])
+    ok_file_has_content(opj(existing, 'file'), 'content')
+    for p in (new, empty, sub):
+        repo = GitRepo(p, create=False)
+        # inherited from the superdataset
+        eq_(repo.config.get('core.sharedrepository'), '1')
+        eq_(repo.config.get('receive.denycurrentbranch'), 'updateInstead')
+        hook = opj(p, '.git', 'hooks', 'post-update')
+        ok_(os.stat(hook).st_mode & stat.S_IXUSR)
+        ok_file_has_content(hook, _get_postupdate_hook())
+
+    # existing targets
+    reports = _run_batch(
+        ssh,
+        [_get_setup_step(existing, mode, None, None, False, None, False, False)
+         for mode in ('error', 'reconfigure', 'replace')],
+        preamble=_get_hook_installer())
+    eq_(reports[0]['exit'], 1)
+    assert_in('already exists', _get_batch_error(reports[0]))
+    eq_([r['tags'] for r in reports], [[], ['reconfigured'], ['replaced']])
+    eq_(os.listdir(existing), ['.git'])
+
+    # hooks run depth first
+    ssh.calls = 0
+    res = list(_run_postupdate_hooks(ssh, [sub, new, existing, empty], 3))
+    eq_(ssh.calls, 2)
+    eq_(res, [(p, None) for p in (sub, new, existing, empty)])
+    ok_exists(opj(sub, WEB_META_LOG))
+
+
+def test_run_batch_large():
+    ssh = _LocalShell()
+    # the script exceeds the limit on the length of a single argument
+    steps = ['read -r line || _dl_report eof; : %s' % ('x' * 1000)] * 200
+    reports = _run_batch(ssh, steps)
+    eq_(ssh.calls, 1)
+    eq_([r['exit'] for r in reports], [0] * 200)
+    eq_([r['tags'] for r in reports], [['eof']] * 200)
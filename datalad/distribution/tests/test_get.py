@@ -13,6 +13,7 @@
 from os import curdir
 from os.path import join as opj, basename
 from glob import glob
+from mock import patch
 
 from datalad.api import create
 from datalad.api import get
@@ -335,6 +336,52 @@ def test_get_greedy_recurse_subdatasets(src, path):
     ok_(subds2.repo.file_has_content('test-annex.dat') is True)
 
 
+@with_testrepos('submodule_annex', flavors='local')
+@with_tempfile(mkdir=True)
+def test_get_subdatasets_concurrently(src, path):
+
+    ds = install(
+        path, source=src,
+        result_xfm='datasets', return_type='item-or-list')
+    ds.get(['subm 1', 'subm 2'], get_data=False)
+    subds1, subds2 = ds.subdatasets(result_xfm='datasets')
+
+    # content of both subdatasets is fetched at once
+    result = ds.get(['subm 1', 'subm 2'], jobs=2)
+    ok_(subds1.repo.file_has_content('test-annex.dat') is True)
+    ok_(subds2.repo.file_has_content('test-annex.dat') is True)
+    # but reported in the order of datasets
+    files = [r['path'] for r in result if r.get('type') == 'file']
+    eq_(files, sorted(files))
+    assert_result_count(
+        result, 1, path=opj(subds1.path, 'test-annex.dat'), status='ok')
+    assert_result_count(
+        result, 1, path=opj(subds2.path, 'test-annex.dat'), status='ok')
+
+    # nothing to fetch anymore
+    assert_status('notneeded', ds.get(['subm 1', 'subm 2'], jobs=2))
+
+
+@with_testrepos('submodule_annex', flavors='local')
+@with_tempfile(mkdir=True)
+def test_install_subdatasets_concurrently(src, path):
+    ds = install(
+        path, source=src,
+        result_xfm='datasets', return_type='item-or-list')
+    # clone concurrency has its own setting, --jobs is for git-annex
+    with patch.dict('os.environ', {'DATALAD_INSTALL_JOBS': '2'}):
+        ds.config.reload()
+        result = ds.get(curdir, recursive=True, get_data=False)
+    subds1, subds2 = ds.subdatasets(result_xfm='datasets')
+    ok_(subds1.is_installed())
+    ok_(subds2.is_installed())
+    # reported in the order of datasets
+    installed = [r['path'] for r in result
+                 if r['action'] == 'install' and r['status'] == 'ok']
+    eq_(installed, [subds1.path, subds2.path])
+    ok_clean_git(ds.path)
+
+
 @with_testrepos('submodule_annex', flavors='local')
 @with_tempfile(mkdir=True)
 def test_get_install_missing_subdataset(src, path):
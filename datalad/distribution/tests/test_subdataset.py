@@ -166,3 +166,23 @@ def test_get_subdatasets(path):
                        result_xfm='paths'),
         [])
 
+
+@with_testrepos('.*nested_submodule.*', flavors=['clone'])
+def test_get_subdatasets_state(path):
+    ds = Dataset(path)
+    res = ds.subdatasets()
+    eq_([r['state'] for r in res], ['absent'])
+    # the revision recorded in the parent
+    eq_(res[0]['revision'],
+        ds.repo.repo.git.rev_parse('HEAD:sub dataset1'))
+    assert_not_in('revision_descr', res[0])
+    ds.get('sub dataset1', get_data=False)
+    res = ds.subdatasets(describe=True)
+    eq_([r['state'] for r in res], ['clean'])
+    assert_in('revision_descr', res[0])
+    subds = Dataset(opj(path, 'sub dataset1'))
+    subds.repo.commit('empty', options=['--allow-empty'])
+    res = ds.subdatasets()
+    eq_([r['state'] for r in res], ['modified'])
+    # as `git submodule status` reports what is checked out
+    eq_(res[0]['revision'], subds.repo.get_hexsha())
@@ -43,15 +43,22 @@ class DownloaderSession(object):
     .download method
     """
 
-    def __init__(self, size=None, filename=None, url=None, headers=None):
+    def __init__(self, size=None, filename=None, url=None, headers=None,
+                 offset=0):
         self.size = size
         self.filename = filename
         self.headers = headers
         self.url = url
+        # position (in bytes) within the content at which .download starts
+        self.offset = offset
 
     def download(self, f=None, pbar=None, size=None):
         raise NotImplementedError("must be implemented in subclases")
 
+    def close(self):
+        """Release the session, e.g. if its content is not to be downloaded"""
+        pass
+
         # TODO: get_status ?
 
 
@@ -62,6 +69,9 @@ class BaseDownloader(object):
 
     _DEFAULT_AUTHENTICATOR = None
     _DOWNLOAD_SIZE_TO_VERIFY_AUTH = 10000
+    # either get_downloader_session supports byte_range, so interrupted
+    # downloads could be resumed and content fetched in parallel chunks
+    _RANGES_SUPPORTED = False
 
     def __init__(self, credential=None, authenticator=None):
         """
@@ -196,6 +206,59 @@ class BaseDownloader(object):
         # TODO: might better reside somewhere under .datalad/tmp or .git/datalad/tmp
         return filepath + ".datalad-download-temp"
 
+    @staticmethod
+    def _get_validator_filename(filepath):
+        """Given a partial download, return the file to store its validator in
+        """
+        return filepath + "-validator"
+
+    @classmethod
+    def get_validator_from_headers(cls, headers):
+        """Given headers, return a validator of the content, or None
+
+        A partial download could be continued only as long as the content
+        did not change, which server checks by the validator (strong ETag or
+        Last-Modified) provided along with the request for the remainder.
+        """
+        if not headers:
+            return None
+        etag = headers.get('ETag')
+        if etag and not etag.startswith('W/'):
+            # weak entity tags are not good enough for ranges
+            return etag
+        return headers.get('Last-Modified')
+
+    def _save_validator(self, filepath, headers):
+        """Store validator of the content along with its partial download
+
+        Returns
+        -------
+        str or None
+          The validator, if any
+        """
+        validator = self.get_validator_from_headers(headers)
+        validator_filepath = self._get_validator_filename(filepath)
+        if validator:
+            with open(validator_filepath, 'w') as f:
+                f.write(validator)
+        elif exists(validator_filepath):
+            os.unlink(validator_filepath)
+        return validator
+
+    def _load_validator(self, filepath):
+        """Return validator stored along with a partial download, or None"""
+        validator_filepath = self._get_validator_filename(filepath)
+        if not exists(validator_filepath):
+            return None
+        with open(validator_filepath) as f:
+            return f.read() or None
+
+    def _remove_partial(self, filepath):
+        """Remove a partial download along with its validator"""
+        for f in (filepath, self._get_validator_filename(filepath)):
+            if exists(f):
+                os.unlink(f)
+
     @abstractmethod
     def get_downloader_session(self, url):
         """
@@ -241,9 +304,58 @@ class BaseDownloader(object):
             raise (IncompleteDownloadError if target_size > downloaded_size else UnaccountedDownloadError)(
                 "Downloaded size %d differs from originally announced %d" % (downloaded_size, target_size))
 
-    def _download(self, url, path=None, overwrite=False, size=None, stats=None):
+    def _get_resume_offset(self, temp_filepath, size=None):
+        """Return size of a partial download which could be continued
+
+        Returns
+        -------
+        int, str or None
+          Offset (0 if there is nothing to continue) and the validator of
+          the content the partial download is of
+        """
+        if not exists(temp_filepath):
+            return 0, None
+        offset = os.stat(temp_filepath).st_size
+        validator = self._load_validator(temp_filepath)
+        if offset and validator and self._RANGES_SUPPORTED and size is None:
+            return offset, validator
+        lgr.warning(
+            "Temporary file %s from the previous download was found. "
+            "It will be overriden" % temp_filepath)
+        return 0, None
+
+    def _get_ranged_session(self, url, offset, validator=None):
+        """Get downloader session starting at offset, if possible
+
+        If content could not be provided starting at offset (e.g. server
+        does not support ranges, or content does not match the `validator`
+        anymore), session would start at 0
+        """
+        if not offset:
+            return self.get_downloader_session(url)
+        downloader_session = self.get_downloader_session(
+            url, byte_range=(offset, None), validator=validator)
+        if downloader_session.offset not in (0, offset):
+            downloader_session.close()
+            raise DownloadError(
+                "Requested content of %s starting at %d but got it starting "
+                "at %d" % (url, offset, downloader_session.offset))
+        if downloader_session.offset and validator != \
+                self.get_validator_from_headers(downloader_session.headers):
+            # server ignored the condition, but the content has changed
+            lgr.debug("Content of %s has changed since the partial download, "
+                      "will request whole content", url)
+            downloader_session.close()
+            return self.get_downloader_session(url)
+        return downloader_session
+
+    def _download(self, url, path=None, overwrite=False, size=None, stats=None,
+                  progress=True):
         """Download content into a file
 
+        If a temporary file from a previous interrupted download is found, and
+        the downloader supports ranges, download continues where it stopped.
+
         Parameters
         ----------
         url: str
@@ -253,6 +365,8 @@ class BaseDownloader(object):
           filename deduced from the url and saved in curdir
         size: int, optional
           Limit in size to be downloaded
+        progress: bool, optional
+          Either to show a progress bar
 
         Returns
         -------
@@ -260,14 +374,15 @@ class BaseDownloader(object):
           Returns downloaded filename
 
         """
-
-        downloader_session = self.get_downloader_session(url)
+        offset, validator = 0, None
+        known_filepath = path and not isdir(path)
+        if known_filepath:
+            # we know the target already, so could ask only for the remainder
+            offset, validator = self._get_resume_offset(
+                self._get_temp_download_filename(path), size)
+        downloader_session = self._get_ranged_session(url, offset, validator)
         status = self.get_status_from_headers(downloader_session.headers)
 
-        target_size = downloader_session.size
-        if size is not None:
-            target_size = min(target_size, size)
-
         #### Specific to download
         if path:
             if isdir(path):
@@ -281,27 +396,55 @@ class BaseDownloader(object):
 
         existed = exists(filepath)
         if existed and not overwrite:
+            downloader_session.close()
             raise DownloadError("File %s already exists" % filepath)
 
+        temp_filepath = self._get_temp_download_filename(filepath)
+        if downloader_session.offset != offset:
+            # server did not provide the requested range, e.g. since the
+            # content has changed
+            offset = 0
+        elif not known_filepath:
+            offset, validator = self._get_resume_offset(temp_filepath, size)
+            if offset:
+                # only now we know the filename, so need to ask again
+                downloader_session.close()
+                downloader_session = self._get_ranged_session(
+                    url, offset, validator)
+                offset = downloader_session.offset
+        if offset:
+            lgr.info("Continuing download of %s from byte %d", url, offset)
+
+        target_size = downloader_session.size
+        if size is not None:
+            target_size = min(target_size, size)
+
         # FETCH CONTENT
-        # TODO: pbar = ui.get_progressbar(size=response.headers['size'])
+        # Partial content is kept only if we got disconnected while
+        # transferring, so the download could be continued
+        keep_temp = False
+        transferring = False
         try:
-            temp_filepath = self._get_temp_download_filename(filepath)
-            if exists(temp_filepath):
-                # eventually we might want to continue the download
-                lgr.warning(
-                    "Temporary file %s from the previous download was found. "
-                    "It will be overriden" % temp_filepath)
-                # TODO.  also logic below would clean it up atm
-
-            with open(temp_filepath, 'wb') as fp:
+            if not offset:
+                # (re)starting from scratch, so a continuation later on would
+                # need to know which content it is of
+                self._remove_partial(temp_filepath)
+                validator = self._save_validator(
+                    temp_filepath, downloader_session.headers)
+            with open(temp_filepath, 'ab' if offset else 'wb') as fp:
                 # TODO: url might be a bit too long for the beast.
                 # Consider to improve to make it animated as well, or shorten here
-                pbar = ui.get_progressbar(label=url, fill_text=filepath, total=target_size)
+                pbar = ui.get_progressbar(
+                    label=url, fill_text=filepath,
+                    total=target_size - offset if target_size else None) \
+                    if progress else None
                 t0 = time.time()
+                transferring = True
                 downloader_session.download(fp, pbar, size=size)
+                transferring = False
                 downloaded_time = time.time() - t0
-                pbar.finish()
+                if pbar:
+                    pbar.finish()
             downloaded_size = os.stat(temp_filepath).st_size
 
             # (headers.get('Content-type', "") and headers.get('Content-Type')).startswith('text/html')
@@ -315,28 +458,117 @@ class BaseDownloader(object):
 
             # place successfully downloaded over the filepath
             os.rename(temp_filepath, filepath)
+            self._remove_partial(temp_filepath)
 
             if stats:
                 stats.downloaded += 1
                 stats.overwritten += int(existed)
-                stats.downloaded_size += downloaded_size
+                stats.downloaded_size += downloaded_size - offset
                 stats.downloaded_time += downloaded_time
         except (AccessDeniedError, IncompleteDownloadError) as e:
+            keep_temp = self._RANGES_SUPPORTED and size is None and validator \
+                and isinstance(e, IncompleteDownloadError) \
+                and not isinstance(e, UnaccountedDownloadError)
             raise
         except Exception as e:
             e_str = exc_str(e, limit=5)
+            # e.g. connection was lost -- next download could continue
+            # where this one stopped
+            keep_temp = transferring and self._RANGES_SUPPORTED \
+                and size is None and validator and exists(temp_filepath) \
+                and os.stat(temp_filepath).st_size > 0
             lgr.error("Failed to download {url} into {filepath}: {e_str}".format(
                 **locals()
             ))
             raise DownloadError(exc_str(e))  # for now
         finally:
-            if exists(temp_filepath):
+            if not keep_temp:
                 # clean up
                 lgr.debug("Removing a temporary download %s", temp_filepath)
-                os.unlink(temp_filepath)
+                self._remove_partial(temp_filepath)
 
         return filepath
 
+    def _download_range(self, url, filepath, start, end, validator=None):
+        """Download a range of content into a (possibly partial) file
+
+        Parameters
+        ----------
+        url: str
+        filepath: str
+          File to store the range in.  If it exists already and is of the
+          content with the same `validator`, it is assumed to contain the
+          beginning of the range, and only the remainder gets downloaded
+        start, end: int
+          First and last byte of the range
+        validator: str, optional
+          Validator of the content (see `get_validator_from_headers`) the
+          range must be of.  Without it, the range is never continued
+        """
+        assert self._RANGES_SUPPORTED
+        range_size = end - start + 1
+        offset = os.stat(filepath).st_size if exists(filepath) else 0
+        if offset > range_size or (
+                offset and (not validator
+                            or self._load_validator(filepath) != validator)):
+            self._remove_partial(filepath)
+            offset = 0
+        if offset == range_size:
+            return filepath
+        downloader_session = self.get_downloader_session(
+            url, byte_range=(start + offset, end), validator=validator)
+        if downloader_session.offset != start + offset or (
+                validator and validator !=
+                self.get_validator_from_headers(downloader_session.headers)):
+            # e.g. the content has changed, so the part is of no use
+            downloader_session.close()
+            self._remove_partial(filepath)
+            raise DownloadError(
+                "Requested content of %s (%s) starting at %d but got %s "
+                "starting at %d"
+                % (url, validator, start + offset,
+                   self.get_validator_from_headers(downloader_session.headers),
+                   downloader_session.offset))
+        if not offset and validator:
+            with open(self._get_validator_filename(filepath), 'w') as f:
+                f.write(validator)
+        try:
+            with open(filepath, 'ab') as fp:
+                downloader_session.download(fp, size=range_size - offset)
+        except Exception as e:
+            raise IncompleteDownloadError(
+                "Download of bytes %d-%d of %s was interrupted: %s"
+                % (start, end, url, exc_str(e)))
+        self._verify_download(
+            url, os.stat(filepath).st_size, range_size, filepath)
+        return filepath
+
+    def download_range(self, url, filepath, start, end, validator=None):
+        """Fetch a range of bytes of the content pointed by the URL into a file
+
+        Should be used only if downloader supports ranges.  Interrupted
+        download of the range gets continued (also across the calls), as long
+        as the content still matches the `validator`.
+
+        Parameters
+        ----------
+        url : string
+          URL to access
+        filepath : string
+          File to store the range in
+        start, end : int
+          First and last byte of the range
+        validator : string, optional
+          Validator of the content, as returned by `get_validator_from_headers`
+
+        Returns
+        -------
+        string
+          file path
+        """
+        return self.access(self._download_range, url, filepath=filepath,
+                           start=start, end=end, validator=validator)
+
     def download(self, url, path=None, **kwargs):
         """Fetch content as pointed by the URL optionally into a file
 
@@ -421,6 +653,7 @@ class BaseDownloader(object):
         if size is not None:
             if size == 0:
                 # no download of the content was requested -- just return headers and be done
+                downloader_session.close()
                 return None, downloader_session.headers
             target_size = min(size, target_size)
 
@@ -17,9 +17,11 @@ import requests.auth
 # from urllib3.exceptions import MaxRetryError, NewConnectionError
 
 import io
+import threading
 from six import BytesIO
 from time import sleep
 
+from .. import cfg
 from ..utils import assure_list_from_str, assure_dict_from_str
 from ..dochelpers import borrowkwargs
 
@@ -68,7 +70,8 @@ __docformat__ = 'restructuredtext'
 def check_response_status(response, err_prefix="", session=None):
     """Check if response's status_code signals problem with authentication etc
 
-    ATM succeeds only if response code was 200
+    ATM succeeds only if response code was 200, or 206 (partial content, as
+    requested with a Range header)
     """
     if not err_prefix:
         err_prefix = "Access to %s has failed: " % response.url
@@ -82,7 +85,7 @@ def check_response_status(response, err_prefix="", session=None):
         raise DownloadError(err_prefix + "not found")
     elif 400 <= response.status_code < 500:
         raise AccessDeniedError(err_msg)
-    elif response.status_code in {200}:
+    elif response.status_code in {200, 206}:
         pass
     elif response.status_code in {301, 302, 307}:
         # TODO: apparently tests do not excercise this one yet
@@ -98,6 +101,23 @@ def check_response_status(response, err_prefix="", session=None):
         raise AccessFailedError(err_msg)
 
 
+def parse_content_range(value):
+    """Parse Content-Range header of a partial response
+
+    Returns
+    -------
+    int, int or None
+      offset of the provided content, and the size of the whole content if
+      known
+    """
+    match = re.match(r'bytes\s+(\d+)-(\d+)/(\d+|\*)$', value.strip())
+    if not match:
+        raise AccessFailedError(
+            "Could not parse Content-Range header: %r" % value)
+    start, _, total = match.groups()
+    return int(start), None if total == '*' else int(total)
+
+
 @auto_repr
 class HTTPBaseAuthenticator(Authenticator):
     """Base class for html_form and http_auth authenticators
@@ -296,13 +316,18 @@ class HTTPDigestAuthAuthenticator(HTTPRequestsAuthenticator):
 @auto_repr
 class HTTPDownloaderSession(DownloaderSession):
     def __init__(self, size=None, filename=None,  url=None, headers=None,
+                 offset=0,
                  response=None, chunk_size=1024 ** 2):
         super(HTTPDownloaderSession, self).__init__(
             size=size, filename=filename, url=url, headers=headers,
+            offset=offset,
         )
         self.chunk_size = chunk_size
         self.response = response
 
+    def close(self):
+        self.response.close()
+
     def download(self, f=None, pbar=None, size=None):
         response = self.response
         # content_gzipped = 'gzip' in response.headers.get('content-encoding', '').split(',')
@@ -372,16 +397,37 @@ class HTTPDownloaderSession(DownloaderSession):
 @auto_repr
 class HTTPDownloader(BaseDownloader):
     """A stateful downloader to maintain a session to the website
+
+    The session (and its pool of keep-alive connections) is shared by all
+    the threads downloading via this downloader.
     """
 
+    _RANGES_SUPPORTED = True
+
     @borrowkwargs(BaseDownloader)
     def __init__(self, **kwargs):
         super(HTTPDownloader, self).__init__(**kwargs)
         self._session = None
+        self._session_lock = threading.Lock()
+
+    @staticmethod
+    def _get_new_session():
+        session = requests.Session()
+        # keep as many connections alive as there could be concurrent
+        # downloads
+        pool_maxsize = max(10, cfg.obtain('datalad.download.jobs'))
+        for prefix in ('http://', 'https://'):
+            session.mount(
+                prefix,
+                requests.adapters.HTTPAdapter(pool_maxsize=pool_maxsize))
+        return session
 
     def _establish_session(self, url, allow_old=True):
         """
 
+        Sessions might be established by multiple threads at once, so
+        (re)establishing a session is serialized.
+
         Parameters
         ----------
         allow_old: bool, optional
@@ -393,6 +439,10 @@ class HTTPDownloader(BaseDownloader):
         bool
           To state if old instance of a session/authentication was used
         """
+        with self._session_lock:
+            return self._establish_session_(url, allow_old=allow_old)
+
+    def _establish_session_(self, url, allow_old):
         if allow_old:
             if self._session:
                 lgr.debug("http session: Reusing previous")
@@ -400,7 +450,7 @@ class HTTPDownloader(BaseDownloader):
             elif url in cookies_db:
                 cookie_dict = cookies_db[url]
                 lgr.debug("http session: Creating new with old cookies %s", list(cookie_dict.keys()))
-                self._session = requests.Session()
+                self._session = self._get_new_session()
                 # not sure what happens if cookie is expired (need check to that or exception will prolly get thrown)
 
                 # TODO dict_to_cookiejar doesn't preserve all fields when reversed
@@ -411,7 +461,7 @@ class HTTPDownloader(BaseDownloader):
                 return True
 
         lgr.debug("http session: Creating brand new session")
-        self._session = requests.Session()
+        self._session = self._get_new_session()
         if self.authenticator:
             self.authenticator.authenticate(url, self.credential, self._session)
 
@@ -419,12 +469,33 @@ class HTTPDownloader(BaseDownloader):
 
     def get_downloader_session(self, url,
                                allow_redirects=True,
-                               use_redirected_url=True):
+                               use_redirected_url=True,
+                               byte_range=None, validator=None):
+        """
+
+        Parameters
+        ----------
+        byte_range: tuple, optional
+          (first, last) bytes of the content to request.  last could be None
+          to request everything starting from first.  If server ignores the
+          request, whole content is provided, i.e. .offset of the session
+          would be 0.
+        validator: str, optional
+          Validator (ETag or Last-Modified) of the content the range is
+          requested of.  If content does not match it anymore, whole content
+          is provided.
+        """
         # TODO: possibly make chunk size adaptive
         # TODO: make it not this ugly -- but at the moment we are testing end-file size
         # while can't know for sure if content was gunziped and either it all went ok.
         # So safer option -- just request to not have it gzipped
         headers = {'Accept-Encoding': ''}
+        if byte_range:
+            headers['Range'] = 'bytes=%d-%s' % (
+                byte_range[0],
+                '' if byte_range[1] is None else '%d' % byte_range[1])
+            if validator:
+                headers['If-Range'] = validator
         # TODO: our tests ATM aren't ready for retries, thus altogether disabled for now
         nretries = 1
         for retry in range(1, nretries+1):
@@ -440,10 +511,24 @@ class HTTPDownloader(BaseDownloader):
                 lgr.warning("Caught exception %s. Will retry %d out of %d times", exc_str(exc), retry+1, nretries)
                 sleep(2**retry)
 
+        if byte_range and response.status_code == 416:
+            # range not satisfiable, e.g. content changed, so start over
+            lgr.debug("Requested range of %s is not satisfiable, will request "
+                      "whole content", url)
+            response.close()
+            return self.get_downloader_session(
+                url, allow_redirects=allow_redirects,
+                use_redirected_url=use_redirected_url)
+
         check_response_status(response, session=self._session)
         headers = response.headers
         lgr.debug("Establishing session for url %s, response headers: %s", url, headers)
         target_size = int(headers.get('Content-Length', '0').strip()) or None
+        offset = 0
+        if response.status_code == 206:
+            # partial content, size is of the whole content
+            offset, target_size = parse_content_range(
+                headers.get('Content-Range', ''))
         if use_redirected_url and response.url and response.url != url:
             lgr.debug("URL %s was redirected to %s and thus the later will be used"
                       % (url, response.url))
@@ -458,6 +543,7 @@ class HTTPDownloader(BaseDownloader):
             url=response.url,
             filename=url_filename,
             headers=headers,
+            offset=offset,
             response=response
         )
 
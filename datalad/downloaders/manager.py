@@ -0,0 +1,265 @@
+# emacs: -*- mode: python; py-indent-offset: 4; tab-width: 4; indent-tabs-mode: nil -*-
+# ex: set sts=4 ts=4 sw=4 noet:
+# ## ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ##
+#
+#   See COPYING file distributed along with the datalad package for the
+#   copyright and license terms.
+#
+# ## ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ##
+"""Download many URLs concurrently
+
+"""
+
+__docformat__ = 'restructuredtext'
+
+import os
+import shutil
+import threading
+import time
+
+from multiprocessing.pool import ThreadPool
+from os.path import exists, isdir, join as opj
+
+from six import string_types
+from six.moves import queue
+
+from .. import cfg
+from ..dochelpers import exc_str
+from ..support.stats import ActivityStats
+from ..utils import auto_repr
+from .base import DownloadError
+from .base import IncompleteDownloadError
+
+from logging import getLogger
+lgr = getLogger('datalad.downloaders.manager')
+
+
+class _ChunkedDownload(object):
+    """State of a download of a single file in parallel parts"""
+
+    def __init__(self, url, downloader, filepath, status, validator, ranges,
+                 existed):
+        self.url = url
+        self.downloader = downloader
+        self.filepath = filepath
+        self.status = status
+        self.validator = validator
+        self.ranges = ranges
+        self.existed = existed
+        self.pending = len(ranges)
+        self.errors = []
+        self.t0 = time.time()
+
+    @property
+    def temp_filepath(self):
+        return self.downloader._get_temp_download_filename(self.filepath)
+
+    def get_part_filepath(self, start, end):
+        # boundaries are in the name, so a part could be continued only by
+        # a download with the same chunk size
+        return '%s-%d-%d' % (self.temp_filepath, start, end)
+
+
+@auto_repr
+class DownloadManager(object):
+    """Download many URLs concurrently
+
+    URLs are downloaded by the downloaders of the matching providers, so all
+    downloads from a provider share its session (authentication, cookies,
+    keep-alive connections).  Downloaders supporting ranges continue
+    interrupted downloads, and could download a large file in parts in
+    parallel.
+
+    Parameters
+    ----------
+    providers : Providers, optional
+      If not provided, loaded from the config files
+    jobs : int, optional
+      How many downloads (of files or their parts) to run in parallel.  If not
+      provided, `datalad.download.jobs` config is consulted
+    chunk_size : int, optional
+      Files larger than twice this size get downloaded in parts of this size
+      in parallel.  0 to disable.  If not provided,
+      `datalad.download.chunk-size` config is consulted
+    """
+
+    def __init__(self, providers=None, jobs=None, chunk_size=None):
+        if providers is None:
+            from .providers import Providers
+            providers = Providers.from_config_files()
+        self.providers = providers
+        self.jobs = cfg.obtain('datalad.download.jobs') \
+            if jobs is None else jobs
+        self.chunk_size = cfg.obtain('datalad.download.chunk-size') \
+            if chunk_size is None else chunk_size
+        # to guard stats and state of chunked downloads
+        self._lock = threading.Lock()
+
+    def download(self, urls, path=None, overwrite=False, stats=None):
+        """Download URLs, possibly in parallel
+
+        Parameters
+        ----------
+        urls : list of str or (str, str)
+          URLs, or (URL, path) pairs to download
+        path : str, optional
+          Filename or existing directory to store downloaded content of URLs
+          without a dedicated path under.  If not provided -- deduced from
+          the url
+        overwrite : bool, optional
+          Either to overwrite existing files
+        stats : ActivityStats, optional
+
+        Yields
+        ------
+        str, str, Exception
+          URL, path of the downloaded file and None if download succeeded,
+          or None and the exception if it has failed.  If downloaded in
+          parallel, in the order of completion
+        """
+        requests = [(u, path) if isinstance(u, string_types) else u
+                    for u in urls]
+
+        if not self.jobs or self.jobs <= 1:
+            for url, url_path in requests:
+                try:
+                    downloader = self._get_downloader(url)
+                    filepath = downloader.download(
+                        url, path=url_path, overwrite=overwrite, stats=stats)
+                    yield url, filepath, None
+                except Exception as e:
+                    yield url, None, e
+            return
+
+        results = queue.Queue()
+        pool = ThreadPool(self.jobs)
+        try:
+            for url, url_path in requests:
+                # providers are not thread-safe, so decide on downloaders here
+                try:
+                    downloader = self._get_downloader(url)
+                except Exception as e:
+                    results.put((url, None, e))
+                    continue
+                pool.apply_async(
+                    self._download_url,
+                    (pool, results, (url, url_path, downloader),
+                     overwrite, stats))
+            # every URL produces exactly one result
+            for i in range(len(requests)):
+                res = results.get()
+                if res[2] is None:
+                    lgr.info("Downloaded %s into %s", res[0], res[1])
+                yield res
+        finally:
+            # we might be interrupted, so do not start any pending download
+            pool.terminate()
+
+    def _get_downloader(self, url):
+        return self.providers.get_provider(url).get_downloader(url)
+
+    def _update_stats(self, stats, task_stats):
+        if stats is not None:
+            with self._lock:
+                stats += task_stats
+
+    def _get_chunked_download(self, url, path, downloader, overwrite):
+        """Return _ChunkedDownload if URL should be downloaded in parts"""
+        if not (self.chunk_size and downloader._RANGES_SUPPORTED):
+            return None
+        _, headers = downloader.access(downloader._fetch, url, cache=False,
+                                       size=0)
+        if headers.get('Accept-Ranges', '').lower() != 'bytes':
+            return None
+        status = downloader.get_status_from_headers(headers)
+        if not status.size or status.size < 2 * self.chunk_size:
+            return None
+
+        if path and isdir(path):
+            filepath = opj(path, status.filename)
+        else:
+            filepath = path or status.filename
+        existed = exists(filepath)
+        if existed and not overwrite:
+            raise DownloadError("File %s already exists" % filepath)
+        ranges = [(start, min(start + self.chunk_size, status.size) - 1)
+                  for start in range(0, status.size, self.chunk_size)]
+        return _ChunkedDownload(
+            url, downloader, filepath, status,
+            downloader.get_validator_from_headers(headers), ranges, existed)
+
+    def _download_url(self, pool, results, task, overwrite, stats):
+        url, path, downloader = task
+        try:
+            chunked = self._get_chunked_download(
+                url, path, downloader, overwrite)
+            if chunked:
+                lgr.debug("Downloading %s in %d parts",
+                          url, len(chunked.ranges))
+                for start, end in chunked.ranges:
+                    pool.apply_async(
+                        self._download_part,
+                        (results, chunked, start, end, stats))
+                # the last finished part reports the result
+                return
+            task_stats = ActivityStats()
+            filepath = downloader.download(
+                url, path=path, overwrite=overwrite, stats=task_stats,
+                progress=False)
+            self._update_stats(stats, task_stats)
+            results.put((url, filepath, None))
+        except Exception as e:
+            lgr.debug("Failed to download %s: %s", url, exc_str(e))
+            results.put((url, None, e))
+
+    def _download_part(self, results, chunked, start, end, stats):
+        try:
+            chunked.downloader.download_range(
+                chunked.url, chunked.get_part_filepath(start, end), start, end,
+                validator=chunked.validator)
+        except Exception as e:
+            with self._lock:
+                chunked.errors.append(e)
+        with self._lock:
+            chunked.pending -= 1
+            done = not chunked.pending
+        if done:
+            try:
+                results.put(
+                    (chunked.url, self._join_parts(chunked, stats), None))
+            except Exception as e:
+                lgr.debug("Failed to download %s: %s", chunked.url, exc_str(e))
+                results.put((chunked.url, None, e))
+
+    def _join_parts(self, chunked, stats):
+        if chunked.errors:
+            # downloaded parts are kept, so could be continued later on
+            raise chunked.errors[0]
+        temp_filepath = chunked.temp_filepath
+        try:
+            with open(temp_filepath, 'wb') as fp:
+                for start, end in chunked.ranges:
+                    with open(chunked.get_part_filepath(start, end), 'rb') \
+                            as part:
+                        shutil.copyfileobj(part, fp)
+            downloaded_size = os.stat(temp_filepath).st_size
+            if downloaded_size != chunked.status.size:
+                raise IncompleteDownloadError(
+                    "Downloaded size %d differs from originally announced %d"
+                    % (downloaded_size, chunked.status.size))
+            if chunked.status.mtime:
+                os.utime(temp_filepath, (time.time(), chunked.status.mtime))
+            os.rename(temp_filepath, chunked.filepath)
+        finally:
+            if exists(temp_filepath):
+                os.unlink(temp_filepath)
+        for start, end in chunked.ranges:
+            chunked.downloader._remove_partial(
+                chunked.get_part_filepath(start, end))
+        self._update_stats(
+            stats,
+            ActivityStats(downloaded=1,
+                          overwritten=int(chunked.existed),
+                          downloaded_size=downloaded_size,
+                          downloaded_time=time.time() - chunked.t0))
+        return chunked.filepath
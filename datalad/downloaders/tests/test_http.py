@@ -20,9 +20,11 @@ from datalad.downloaders.tests.utils import get_test_providers
 from ..base import DownloadError
 from ..base import IncompleteDownloadError
 from ..base import BaseDownloader
+from ..base import AccessFailedError
 from ..credentials import UserPassword
 from ..http import HTMLFormAuthenticator
 from ..http import HTTPDownloader
+from ..http import parse_content_range
 from ...support.network import get_url_straight_filename
 from ...tests.utils import with_fake_cookies_db
 from ...tests.utils import skip_if_no_network
@@ -275,6 +277,12 @@ def test_get_status_from_headers():
                  filename)
 
 
+def test_parse_content_range():
+    assert_equal(parse_content_range('bytes 10-99/100'), (10, 100))
+    assert_equal(parse_content_range(' bytes 0-9/* '), (0, None))
+    assert_raises(AccessFailedError, parse_content_range, 'bytes */100')
+
+
 
 # TODO: test that download fails (even if authentication credentials are right) if form_url
 # is wrong!
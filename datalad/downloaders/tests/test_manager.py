@@ -0,0 +1,251 @@
+# emacs: -*- mode: python; py-indent-offset: 4; tab-width: 4; indent-tabs-mode: nil -*-
+# ex: set sts=4 ts=4 sw=4 noet:
+# ## ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ##
+#
+#   See COPYING file distributed along with the datalad package for the
+#   copyright and license terms.
+#
+# ## ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ##
+"""Tests for concurrent downloads"""
+
+import os
+from os.path import exists
+from os.path import join as opj
+
+from ..base import BaseDownloader
+from ..base import DownloadError
+from ..base import DownloaderSession
+from ..manager import DownloadManager
+from ...support.stats import ActivityStats
+from ...support.status import FileStatus
+from ...tests.utils import assert_equal
+from ...tests.utils import assert_false
+from ...tests.utils import assert_in
+from ...tests.utils import assert_raises
+from ...tests.utils import assert_true
+from ...tests.utils import assert_is_instance
+from ...tests.utils import ok_file_has_content
+from ...tests.utils import serve_path_via_http
+from ...tests.utils import with_tempfile
+from ...tests.utils import with_tree
+
+_content = {
+    'http://example.com/small.dat': b'small',
+    'http://example.com/large.dat': b'0123456789' * 10,
+}
+
+
+class _Session(DownloaderSession):
+    def __init__(self, content, start=0, end=None, **kwargs):
+        super(_Session, self).__init__(offset=start, **kwargs)
+        self.content = content[start:None if end is None else end + 1]
+        self.closed = False
+
+    def download(self, f=None, pbar=None, size=None):
+        f.write(self.content[:size])
+
+    def close(self):
+        self.closed = True
+
+
+class _RangesDownloader(BaseDownloader):
+    """Serves _content, recording requested ranges"""
+
+    _RANGES_SUPPORTED = True
+
+    def __init__(self, etag='"v1"', **kwargs):
+        super(_RangesDownloader, self).__init__(**kwargs)
+        self.requested = []
+        self.sessions = []
+        self.etag = etag
+
+    def _establish_session(self, url, allow_old=True):
+        return True
+
+    def get_downloader_session(self, url, allow_redirects=True,
+                               use_redirected_url=True, byte_range=None,
+                               validator=None):
+        self.requested.append(byte_range)
+        content = _content[url]
+        headers = {'Content-Length': len(content), 'Accept-Ranges': 'bytes',
+                   'ETag': self.etag}
+        if validator and validator != self.etag:
+            # behave as on If-Range for a changed content
+            byte_range = None
+        start, end = byte_range or (0, None)
+        session = _Session(content, start, end,
+                           size=len(content), filename=url.split('/')[-1],
+                           url=url, headers=headers)
+        self.sessions.append(session)
+        return session
+
+    @classmethod
+    def get_status_from_headers(cls, headers):
+        return FileStatus(size=headers['Content-Length'],
+                          filename='large.dat')
+
+
+class _Providers(object):
+    def __init__(self, downloader):
+        self.downloader = downloader
+
+    def get_provider(self, url):
+        return self
+
+    def get_downloader(self, url):
+        return self.downloader
+
+
+@with_tempfile(mkdir=True)
+def test_download_resume(path):
+    downloader = _RangesDownloader()
+    url = 'http://example.com/large.dat'
+    fpath = opj(path, 'large.dat')
+    temp_fpath = downloader._get_temp_download_filename(fpath)
+    # leftover from an interrupted download
+    with open(temp_fpath, 'wb') as f:
+        f.write(_content[url][:42])
+    with open(downloader._get_validator_filename(temp_fpath), 'w') as f:
+        f.write('"v1"')
+    assert_equal(downloader.download(url, fpath), fpath)
+    ok_file_has_content(fpath, _content[url].decode())
+    assert_equal(downloader.requested, [(42, None)])
+    assert_false(exists(temp_fpath))
+    assert_false(exists(downloader._get_validator_filename(temp_fpath)))
+
+    # parts are continued as well
+    ppath = opj(path, 'part')
+    with open(ppath, 'wb') as f:
+        f.write(b'23')
+    with open(downloader._get_validator_filename(ppath), 'w') as f:
+        f.write('"v1"')
+    downloader.download_range(url, ppath, 12, 15, validator='"v1"')
+    ok_file_has_content(ppath, '2345')
+    assert_equal(downloader.requested[-1], (14, 15))
+
+
+@with_tempfile(mkdir=True)
+def test_download_resume_changed(path):
+    downloader = _RangesDownloader(etag='"v2"')
+    url = 'http://example.com/large.dat'
+    fpath = opj(path, 'large.dat')
+    temp_fpath = downloader._get_temp_download_filename(fpath)
+    # leftover from an interrupted download of a previous version
+    with open(temp_fpath, 'wb') as f:
+        f.write(b'previous')
+    with open(downloader._get_validator_filename(temp_fpath), 'w') as f:
+        f.write('"v1"')
+    assert_equal(downloader.download(url, fpath), fpath)
+    # started over
+    ok_file_has_content(fpath, _content[url].decode())
+    assert_equal(downloader.requested, [(8, None)])
+    assert_false(exists(temp_fpath))
+    assert_false(exists(downloader._get_validator_filename(temp_fpath)))
+
+    # without a validator it is not known what a leftover is of
+    os.unlink(fpath)
+    with open(temp_fpath, 'wb') as f:
+        f.write(b'unknown')
+    downloader.download(url, fpath)
+    ok_file_has_content(fpath, _content[url].decode())
+    assert_equal(downloader.requested[-1], None)
+
+    # a part of a previous version gets downloaded anew
+    ppath = opj(path, 'part')
+    with open(ppath, 'wb') as f:
+        f.write(b'xx')
+    with open(downloader._get_validator_filename(ppath), 'w') as f:
+        f.write('"v1"')
+    downloader.download_range(url, ppath, 12, 15, validator='"v2"')
+    ok_file_has_content(ppath, '2345')
+    assert_equal(downloader.requested[-1], (12, 15))
+    # but the content must not change while downloading parts
+    os.unlink(ppath)
+    assert_raises(DownloadError, downloader.download_range,
+                  url, ppath, 12, 15, validator='"v1"')
+    assert_false(exists(ppath))
+
+
+@with_tempfile(mkdir=True)
+def test_download_closes_discarded_sessions(path):
+    downloader = _RangesDownloader(etag='"v2"')
+    url = 'http://example.com/large.dat'
+    temp_fpath = downloader._get_temp_download_filename(opj(path, 'large.dat'))
+    with open(temp_fpath, 'wb') as f:
+        f.write(b'previous')
+    with open(downloader._get_validator_filename(temp_fpath), 'w') as f:
+        f.write('"v1"')
+    # the filename is known only from the first session
+    downloader.download(url, path)
+    ok_file_has_content(opj(path, 'large.dat'), _content[url].decode())
+    assert_equal(downloader.requested, [None, (8, None)])
+    assert_equal([s.closed for s in downloader.sessions], [True, False])
+
+    assert_raises(DownloadError, downloader.download, url, path)
+    assert_true(downloader.sessions[-1].closed)
+
+
+@with_tempfile(mkdir=True)
+def test_download_chunked(path):
+    downloader = _RangesDownloader()
+    stats = ActivityStats()
+    manager = DownloadManager(
+        providers=_Providers(downloader), jobs=3, chunk_size=30)
+    res = sorted(manager.download(sorted(_content), path=path, stats=stats))
+    assert_equal(
+        res,
+        [('http://example.com/large.dat', opj(path, 'large.dat'), None),
+         ('http://example.com/small.dat', opj(path, 'small.dat'), None)])
+    for url in _content:
+        ok_file_has_content(opj(path, url.split('/')[-1]),
+                            _content[url].decode())
+    for r in ((0, 29), (30, 59), (60, 89), (90, 99)):
+        assert_in(r, downloader.requested)
+    assert_equal(stats.downloaded, 2)
+    assert_equal(stats.downloaded_size, 105)
+    # no leftovers
+    assert_equal(sorted(os.listdir(path)), ['large.dat', 'small.dat'])
+
+    # should not overwrite
+    res = list(manager.download(['http://example.com/large.dat'], path=path))
+    assert_equal(len(res), 1)
+    assert_is_instance(res[0][2], DownloadError)
+
+
+class _PartialProviders(_Providers):
+    def get_downloader(self, url):
+        if url.endswith('small.dat'):
+            raise ValueError("no downloader for %s" % url)
+        return self.downloader
+
+
+@with_tempfile(mkdir=True)
+def test_download_no_downloader(path):
+    for jobs in (1, 3):
+        manager = DownloadManager(
+            providers=_PartialProviders(_RangesDownloader()), jobs=jobs)
+        res = dict(
+            (url, (filepath, exc))
+            for url, filepath, exc in manager.download(
+                sorted(_content), path=path, overwrite=True))
+        assert_equal(res['http://example.com/large.dat'],
+                     (opj(path, 'large.dat'), None))
+        assert_equal(res['http://example.com/small.dat'][0], None)
+        assert_is_instance(res['http://example.com/small.dat'][1], ValueError)
+
+
+@with_tree(tree=[('file1.dat', 'abc'), ('file2.dat', 'def')])
+@serve_path_via_http
+@with_tempfile(mkdir=True)
+def test_download_many(toppath, topurl, outdir):
+    urls = [topurl + f for f in ('file1.dat', 'file2.dat', 'bogus.dat')]
+    for jobs in (1, 3):
+        res = dict(
+            (url, (filepath, exc))
+            for url, filepath, exc in DownloadManager(jobs=jobs).download(
+                urls, path=outdir, overwrite=True))
+        for f, content in (('file1.dat', 'abc'), ('file2.dat', 'def')):
+            assert_equal(res[topurl + f], (opj(outdir, f), None))
+            ok_file_has_content(opj(outdir, f), content)
+        assert_equal(res[urls[-1]][0], None)
+        assert_is_instance(res[urls[-1]][1], DownloadError)
@@ -40,7 +40,7 @@ from datalad.distribution.dataset import resolve_path
 from datalad.distribution.dataset import EnsureDataset
 from datalad.distribution.dataset import datasetmethod
 
-from datalad.utils import get_dataset_root
+from datalad.interface.path_index import DatasetPathIndex
 from datalad.utils import with_pathsep as _with_sep
 from datalad.utils import assure_list
 
@@ -486,6 +486,8 @@ class AnnotatePaths(Interface):
         # goal: structure in a way that makes most information on any path
         # available in a single pass, at the cheapest possible cost
         reported_paths = {}
+        # dataset roots and subdatasets are shared by many paths
+        index = DatasetPathIndex()
         requested_paths = assure_list(path)
 
         if modified is not None:
@@ -534,7 +536,7 @@ class AnnotatePaths(Interface):
                 if not containing_dir:
                     containing_dir = curdir
 
-            dspath = parent = get_dataset_root(containing_dir)
+            dspath = parent = index.get_root(containing_dir)
             if dspath:
                 if path_props.get('type', None) == 'dataset':
                     # for a dataset the root is not the parent, for anything else
@@ -547,7 +549,7 @@ class AnnotatePaths(Interface):
                         # either forced, or only if we have a reference dataset, and
                         # only if we stay within this refds when searching for the
                         # parent
-                        parent = get_dataset_root(normpath(opj(containing_dir, pardir)))
+                        parent = index.get_root(normpath(opj(containing_dir, pardir)))
                         # NOTE the `and refds_path` is critical, as it will determine
                         # whether a top-level dataset that was discovered gets the
                         # parent property or not, it won't get it without a common
@@ -601,10 +603,7 @@ class AnnotatePaths(Interface):
                 # a dataset (without this info) -> record whether this is a known subdataset
                 # to its parent
                 containing_ds = Dataset(parent)
-                subdss = containing_ds.subdatasets(
-                    fulfilled=None, recursive=False,
-                    result_xfm=None, result_filter=None, return_type='list')
-                if path in [s['path'] for s in subdss]:
+                if index.is_registered_subds(parent, path):
                     if path_type == 'directory' or not lexists(path):
                         # first record that it isn't here, if just a dir or not here at all
                         path_props['state'] = 'absent'
@@ -75,6 +75,18 @@ def get_interface_groups():
     return grps
 
 
+def load_interface(spec):
+    """Load and return the class implementing an interface
+
+    Importing the module of an interface also binds it as a method of Dataset
+    (if the interface is a `datasetmethod`).
+    """
+    from importlib import import_module
+    lgr.log(5, "Importing module %s ", spec[0])
+    mod = import_module(spec[0], package='datalad')
+    return getattr(mod, spec[1])
+
+
 def dedent_docstring(text):
     """Remove uniform indentation from a multiline docstring"""
     # Problem is that first line might often have no offset, so might
@@ -185,6 +185,10 @@ definitions = {
         'ui': ('question', {
                'title': 'Specifies the protocol number used by the Runner to note shell command or python function call times and allows for dry runs. "externals-time" for ExecutionTimeExternalsProtocol, "time" for ExecutionTimeProtocol and "null" for NullProtocol. Any new DATALAD_CMD_PROTOCOL has to implement datalad.support.protocol.ProtocolInterface'}),
     },
+    'datalad.cmd.stats': {
+        'ui': ('question', {
+               'title': 'If set (DATALAD_CMD_STATS environment variable), the Runner accounts counts, wall/CPU times and output sizes of all external commands, grouped by command and DataLad command, and dumps them as JSON at exit into the file named by the value (or datalad-cmd-stats-<pid>.json if it is 1/yes/on/true)'}),
+    },
     'datalad.cmd.protocol.prefix': {
         'ui': ('question', {
                'title': 'Sets a prefix to add before the command call times are noted by DATALAD_CMD_PROTOCOL.'}),
@@ -201,4 +205,74 @@ definitions = {
                'text': 'Specifies the repository version for git-annex to be used by default'}),
         'type': EnsureInt(),
     },
+    'datalad.annex.batch-window': {
+        'ui': ('question', {
+               'title': 'Number of requests to pipeline to batched annex',
+               'text': 'How many requests could be sent to a batched git-annex process ahead of receiving their responses'}),
+        'default': 64,
+        'type': EnsureInt(),
+    },
+    'datalad.annex.batch-workers': {
+        'ui': ('question', {
+               'title': 'Number of parallel batched annex processes',
+               'text': 'How many batched git-annex processes to run in parallel for a query command (e.g. find, info, lookupkey) over many files'}),
+        'default': 1,
+        'type': EnsureInt(),
+    },
+    'datalad.archives.cache-size': {
+        'ui': ('question', {
+               'title': 'Size of the cache of extracted archives',
+               'text': 'How much space (in bytes) extracted archives could take in total, before least recently used ones get removed. 0 for no limit'}),
+        'default': 0,
+        'type': EnsureInt(),
+    },
+    'datalad.customremotes.jobs': {
+        'ui': ('question', {
+               'title': 'Number of parallel jobs of special remotes',
+               'text': 'How many requests of git-annex (e.g. running with -J) datalad special remotes could process in parallel, if git-annex supports the ASYNC protocol extension'}),
+        'default': 8,
+        'type': EnsureInt(),
+    },
+    'datalad.download.jobs': {
+        'ui': ('question', {
+               'title': 'Number of parallel downloads',
+               'text': 'How many URLs (or parts of a single large file) to download in parallel'}),
+        'default': 1,
+        'type': EnsureInt(),
+    },
+    'datalad.download.chunk-size': {
+        'ui': ('question', {
+               'title': 'Size of parts to download large files in',
+               'text': 'Files larger than twice this size (in bytes) get downloaded as parts of this size in parallel, if the server supports ranges and multiple downloads are allowed. 0 to disable'}),
+        'default': 0,
+        'type': EnsureInt(),
+    },
+    'datalad.ssh.persistent-shell': {
+        'ui': ('yesno', {
+               'title': 'Run SSH remote commands in a persistent shell',
+               'text': 'Should commands on an SSH remote be sent to a single shell session running over the shared connection, instead of starting a new ssh process for each command?'}),
+        'default': False,
+        'type': EnsureBool(),
+    },
+    'datalad.create-sibling.batch-size': {
+        'ui': ('question', {
+               'title': 'Number of datasets set up per SSH call by create-sibling',
+               'text': 'For how many datasets should create-sibling run all remote setup steps in a single script over SSH? With 0, every step is a separate SSH call'}),
+        'default': 0,
+        'type': EnsureInt(),
+    },
+    'datalad.recursion.jobs': {
+        'ui': ('question', {
+               'title': 'Number of parallel subdataset operations',
+               'text': 'How many subdatasets to discover in parallel while recursing through a dataset hierarchy'}),
+        'default': 1,
+        'type': EnsureInt(),
+    },
+    'datalad.install.jobs': {
+        'ui': ('question', {
+               'title': 'Number of parallel subdataset installations',
+               'text': 'How many subdatasets to clone in parallel while installing a dataset hierarchy recursively'}),
+        'default': 1,
+        'type': EnsureInt(),
+    },
 }
@@ -25,6 +25,7 @@ from ..utils import assure_list_from_str
 from ..dochelpers import exc_str
 from ..support.param import Parameter
 from ..support.constraints import EnsureStr, EnsureNone
+from .common_opts import jobs_opt
 
 from logging import getLogger
 lgr = getLogger('datalad.api.download-url')
@@ -64,11 +65,13 @@ class DownloadURL(Interface):
             doc="path (filename or directory path) where to store downloaded file(s).  "
                 "In case of multiple URLs provided, must point to a directory.  Otherwise current "
                 "directory is used",
-            constraints=EnsureStr() | EnsureNone())
+            constraints=EnsureStr() | EnsureNone()),
+        jobs=jobs_opt,
     )
 
     @staticmethod
-    def __call__(urls, path=None, overwrite=False, stop_on_failure=False):
+    def __call__(urls, path=None, overwrite=False, stop_on_failure=False,
+                 jobs=None):
         """
         Returns
         -------
@@ -76,7 +79,7 @@ class DownloadURL(Interface):
           downloaded successfully files
         """
 
-        from ..downloaders.providers import Providers
+        from ..downloaders.manager import DownloadManager
 
         urls = assure_list_from_str(urls)
 
@@ -89,23 +92,24 @@ class DownloadURL(Interface):
         if not path:
             path = curdir
 
-        # TODO setup fancy ui.progressbars doing this in parallel and reporting overall progress
+        # TODO setup fancy ui.progressbars reporting overall progress
         # in % of urls which were already downloaded
-        providers = Providers.from_config_files()
+        manager = DownloadManager(jobs=jobs)
         downloaded_paths, failed_urls = [], []
-        for url in urls:
-            # somewhat "ugly"
-            # providers.get_provider(url).get_downloader(url).download(url, path=path)
-            # for now -- via sugaring
-            try:
-                downloaded_path = providers.download(url, path=path, overwrite=overwrite)
-                downloaded_paths.append(downloaded_path)
-                # ui.message("%s -> %s" % (url, downloaded_path))
-            except Exception as e:
+        downloads = manager.download(urls, path=path, overwrite=overwrite)
+        try:
+            for url, downloaded_path, exc in downloads:
+                if exc is None:
+                    downloaded_paths.append(downloaded_path)
+                    # ui.message("%s -> %s" % (url, downloaded_path))
+                    continue
                 failed_urls.append(url)
-                ui.error(exc_str(e))
+                ui.error(exc_str(exc))
                 if stop_on_failure:
                     break
+        finally:
+            # stop pending downloads
+            downloads.close()
         if failed_urls:
             raise RuntimeError("%d url(s) failed to download" % len(failed_urls))
         return downloaded_paths
@@ -15,7 +15,7 @@ import sys
 import time
 from os.path import exists, lexists, join as opj, abspath, isabs, getmtime
 from os.path import curdir, isfile, islink, isdir, dirname, basename, split, realpath
-from os.path import relpath
+from os.path import relpath, normpath
 from os import listdir, lstat, remove, makedirs
 import json as js
 import hashlib
@@ -35,6 +35,7 @@ from ..dochelpers import exc_str
 from ..support.param import Parameter
 from ..support import ansi_colors
 from ..support.constraints import EnsureStr, EnsureNone
+from ..support.exceptions import CommandError
 from ..distribution.dataset import Dataset
 
 from datalad.support.annexrepo import AnnexRepo
@@ -293,11 +294,13 @@ class AnnexModel(GitModel):
 @auto_repr
 class FsModel(AnnexModel):
 
-    __slots__ = AnnexModel.__slots__
+    __slots__ = AnnexModel.__slots__ + ['_content_info']
 
     def __init__(self, path, *args, **kwargs):
+        content_info = kwargs.pop('content_info', None)
         super(FsModel, self).__init__(*args, **kwargs)
         self._path = path
+        self._content_info = content_info
 
     @property
     def path(self):
@@ -327,8 +330,15 @@ class FsModel(AnnexModel):
         sizes = {'total': 0.0, 'ondisk': 0.0, 'git': 0.0, 'annex': 0.0, 'annex_worktree': 0.0}
 
         if type_ in ['file', 'link', 'link-broken']:
+            annexed = self._content_info.get(self._path) \
+                if self._content_info is not None else None
+            if annexed is not None:
+                # known from the bulk query of all annexed files
+                size, present = annexed
+                ondisk_size = size if present else 0
             # if node is under annex, ask annex for node size, ondisk_size
-            if isinstance(self.repo, AnnexRepo) and self.repo.is_under_annex(self._path):
+            elif self._content_info is None and isinstance(self.repo, AnnexRepo) \
+                    and self.repo.is_under_annex(self._path):
                 size = self.repo.info(self._path, batch=True)['size']
                 ondisk_size = size \
                     if self.repo.file_has_content(self._path) \
@@ -508,6 +518,34 @@ def machinesize(humansize):
     return machinesize
 
 
+def get_node_bytes(rec):
+    """Return exact sizes (in bytes) of a node from its record
+
+    Sizes are deduced from the humanized sizes for records generated by older
+    versions, which did not carry exact sizes.
+    """
+    if 'bytes' in rec:
+        return rec['bytes']
+    return {size_type: int(machinesize(size))
+            for size_type, size in rec.get('size', {}).items()}
+
+
+def sum_node_bytes(sizes):
+    """Sum sizes of the nodes per size type"""
+    total = {}
+    for node_sizes in sizes:
+        for size_type, size in node_sizes.items():
+            total[size_type] = total.get(size_type, 0) + size
+    return total
+
+
+def humanize_node_sizes(rec):
+    """Assign humanized sizes to a record from its exact sizes"""
+    if 'bytes' in rec:
+        rec['size'] = {size_type: humanize.naturalsize(size)
+                       for size_type, size in rec['bytes'].items()}
+
+
 def leaf_name(path):
     """takes a relative or absolute path and returns name of node at that location"""
     head, tail = split(abspath(path))
@@ -567,7 +605,171 @@ def metadata_locator(fs_metadata=None, path=None, ds_path=None, metadata_path=No
     return metadata_file
 
 
-def fs_extract(nodepath, repo, basepath='/'):
+# increment whenever records of the nodes change, so web meta data generated
+# by an older version does not get reused
+WEB_META_VERSION = 2
+
+
+def get_annexed_content_info(repo, path):
+    """Get sizes and presence of all annexed files of a repository at once
+
+    Parameters
+    ----------
+    repo : AnnexRepo
+    path : str
+      Path of the repository to prefix the paths of the files with
+
+    Returns
+    -------
+    dict
+      {path: (size, present)} for all annexed files of the repository.  Size
+      is 0 if not known from the key
+    """
+    snapshot = repo.get_content_snapshot()
+    return {opj(path, r.path): (r.size or 0, r.has_content)
+            for r in snapshot if r.is_annexed}
+
+
+def _get_parent_dirs(path):
+    """Yield all leading directories of a relative path"""
+    path = dirname(path)
+    while path:
+        yield path
+        path = dirname(path)
+
+
+class WebMetaState(object):
+    """What web meta data of directories of a dataset were generated from
+
+    For each directory the git tree object (in HEAD) and annexed content
+    present underneath it are recorded, together with the record of the
+    directory (without its nodes), so directories unchanged since can be
+    taken as is, without traversing them again.  Directories with
+    uncommitted or untracked content, or with any subdataset underneath
+    (the state of which is not reflected in the tree), are always traversed.
+
+    Parameters
+    ----------
+    repo : GitRepo
+    path : str
+      Path of the dataset, as used for the paths of the nodes
+    content_info : dict, optional
+      As returned by `get_annexed_content_info`
+    """
+
+    def __init__(self, repo, path, content_info=None):
+        self.path = path
+        self.fname = opj(dirname(metadata_locator(path='.', ds_path=path)),
+                         'web-meta-state.json')
+        self._dirs = {}
+        self._new_dirs = {}
+        if exists(self.fname):
+            try:
+                with open(self.fname) as f:
+                    state = js.load(f)
+                if state.get('version') == WEB_META_VERSION:
+                    self._dirs = state['dirs']
+            except ValueError as e:
+                lgr.debug("Ignoring broken %s: %s", self.fname, exc_str(e))
+        self._trees = self._get_trees(repo)
+        self._dirty = self._get_dirty_dirs(repo)
+        self._dirty.update(self._get_subdataset_dirs(repo))
+        # order-independent digest of present annexed files per directory
+        self._present = {}
+        for filepath, (size, present) in (content_info or {}).items():
+            if not present:
+                continue
+            rpath = relpath(filepath, path)
+            h = int(hashlib.md5(rpath.encode('utf-8')).hexdigest()[:16], 16)
+            for d in _get_parent_dirs(rpath):
+                self._present[d] = (self._present.get(d, 0) + h) % 2 ** 64
+
+    @staticmethod
+    def _get_trees(repo):
+        try:
+            out, _ = repo._git_custom_command(
+                [], ['git', 'ls-tree', '-r', '-d', '-z', 'HEAD'],
+                expect_fail=True)
+        except CommandError:
+            # e.g. no commits yet
+            return {}
+        trees = {}
+        for line in out.split('\0'):
+            if not line:
+                continue
+            props, path = line.split('\t', 1)
+            trees[normpath(path)] = props.split(' ')[2]
+        return trees
+
+    @staticmethod
+    def _get_dirty_dirs(repo):
+        out, _ = repo._git_custom_command(
+            [], ['git', 'status', '--porcelain', '-z', '--ignored',
+                 '--untracked-files=all', '--ignore-submodules=all'])
+        dirty = set()
+        entries = iter(out.split('\0'))
+        for entry in entries:
+            if not entry:
+                continue
+            paths = [entry[3:]]
+            if entry[0] in 'RC':
+                # original path follows
+                paths.append(next(entries, ''))
+            for path in paths:
+                path = normpath(path.rstrip('/'))
+                dirty.add(path)
+                dirty.update(_get_parent_dirs(path))
+        return dirty
+
+    @staticmethod
+    def _get_subdataset_dirs(repo):
+        """Return directories containing a subdataset (gitlink) underneath"""
+        out, _ = repo._git_custom_command(
+            [], ['git', 'ls-files', '--stage', '-z'])
+        dirs = set()
+        for entry in out.split('\0'):
+            if entry.startswith('160000 '):
+                dirs.update(_get_parent_dirs(normpath(entry.split('\t', 1)[1])))
+        return dirs
+
+    def _get_signature(self, rpath):
+        if rpath in self._dirty or rpath not in self._trees:
+            return None
+        return [self._trees[rpath], '%x' % self._present.get(rpath, 0)]
+
+    def get_record(self, path):
+        """Return record of an unchanged directory, or None"""
+        rpath = relpath(path, self.path)
+        signature = self._get_signature(rpath)
+        old = self._dirs.get(rpath)
+        if signature is None or old is None or old[0] != signature \
+                or not exists(metadata_locator(path=rpath, ds_path=self.path)):
+            return None
+        return dict(old[1])
+
+    def set_record(self, path, record):
+        """Record (re)generated web meta data of a directory"""
+        rpath = relpath(path, self.path)
+        signature = self._get_signature(rpath)
+        if signature is not None:
+            self._new_dirs[rpath] = [
+                signature,
+                {k: v for k, v in record.items() if k != 'nodes'}]
+
+    def save(self):
+        # directories which were not traversed since they did not change
+        # remain valid
+        dirs = {d: v for d, v in self._dirs.items() if d in self._trees}
+        dirs.update(self._new_dirs)
+        with open(self.fname, 'w') as f:
+            js.dump({'version': WEB_META_VERSION, 'dirs': dirs}, f)
+
+    def remove(self):
+        if exists(self.fname):
+            remove(self.fname)
+
+
+def fs_extract(nodepath, repo, basepath='/', content_info=None):
     """extract required info of nodepath with its associated parent repository and returns it as a dictionary
 
     Parameters
@@ -577,15 +779,19 @@ def fs_extract(nodepath, repo, basepath='/'):
         `repo`
     repo : GitRepo
         Is the repository nodepath belongs to
+    content_info : dict, optional
+        Sizes and presence of annexed files (see `get_annexed_content_info`),
+        so annex does not need to be queried for the node
     """
     # Create FsModel from filesystem nodepath and its associated parent repository
-    node = FsModel(nodepath, repo)
-    pretty_size = {stype: humanize.naturalsize(svalue) for stype, svalue in node.size.items()}
+    node = FsModel(nodepath, repo, content_info=content_info)
+    # sizes get humanized only when rendered (see fs_render)
+    node_bytes = {stype: int(svalue or 0) for stype, svalue in node.size.items()}
     pretty_date = time.strftime(u"%Y-%m-%d %H:%M:%S", time.localtime(node.date))
     name = leaf_name(node._path) if leaf_name(node._path) != "" else leaf_name(node.repo.path)
     rec = {
         "name": name, "path": relpath(node._path, basepath),
-        "type": node.type_, "size": pretty_size, "date": pretty_date,
+        "type": node.type_, "bytes": node_bytes, "date": pretty_date,
     }
     # if there is meta-data for the dataset (done by aggregate-metadata)
     # we include it
@@ -617,6 +823,11 @@ def fs_render(fs_metadata, json=None, **kwargs):
     json: str ('file', 'display', 'delete')
       Render to file, stdout or delete json
     """
+    # exact sizes are carried through the traversal, humanized only for
+    # the output
+    humanize_node_sizes(fs_metadata)
+    for node in fs_metadata.get('nodes', []):
+        humanize_node_sizes(node)
 
     metadata_file = metadata_locator(fs_metadata, **kwargs)
 
@@ -638,7 +849,8 @@ def fs_render(fs_metadata, json=None, **kwargs):
         print(js.dumps(fs_metadata) + '\n')
 
 
-def fs_traverse(path, repo, parent=None, render=True, recursive=False, json=None, basepath=None):
+def fs_traverse(path, repo, parent=None, render=True, recursive=False, json=None, basepath=None,
+                content_info=None, state=None):
     """Traverse path through its nodes and returns a dictionary of relevant attributes attached to each node
 
     Parameters
@@ -653,6 +865,11 @@ def fs_traverse(path, repo, parent=None, render=True, recursive=False, json=None
       Recurse into subdirectories (note that subdatasets are not traversed)
     render: bool
        To render from within function or not. Set to false if results to be manipulated before final render
+    content_info: dict, optional
+      Sizes and presence of annexed files (see `get_annexed_content_info`)
+    state: WebMetaState, optional
+      If provided, subdirectories which did not change since their web meta
+      data was generated are not traversed again
 
     Returns
     -------
@@ -660,7 +877,12 @@ def fs_traverse(path, repo, parent=None, render=True, recursive=False, json=None
       extracts and returns a (recursive) list of directory info at path
       does not traverse into annex, git or hidden directories
     """
-    fs = fs_extract(path, repo, basepath=basepath or path)
+    if state is not None and basepath and path != basepath:
+        fs = state.get_record(path)
+        if fs is not None:
+            return fs
+    fs = fs_extract(path, repo, basepath=basepath or path,
+                    content_info=content_info)
     if isdir(path):                     # if node is a directory
         children = [fs.copy()]          # store its info in its children dict too  (Yarik is not sure why, but I guess for .?)
         # ATM seems some pieces still rely on having this duplication, so left as is
@@ -678,7 +900,9 @@ def fs_traverse(path, repo, parent=None, render=True, recursive=False, json=None
                                          parent=None,  # children[0],
                                          recursive=recursive,
                                          json=json,
-                                         basepath=basepath or path)
+                                         basepath=basepath or path,
+                                         content_info=content_info,
+                                         state=state)
                     subdir.pop('nodes', None)
                 else:
                     # read child metadata from its metadata file if it exists
@@ -692,20 +916,15 @@ def fs_traverse(path, repo, parent=None, render=True, recursive=False, json=None
                         # Yarik: this one is way too lean...
                         subdir = fs_extract(nodepath,
                                             repo,
-                                            basepath=basepath or path)
+                                            basepath=basepath or path,
+                                            content_info=content_info)
                 # append child metadata to list
                 children.extend([subdir])
 
-        # sum sizes of all 1st level children
-        children_size = {}
-        for node in children[1:]:
-            for size_type, child_size in node['size'].items():
-                children_size[size_type] = children_size.get(size_type, 0) + machinesize(child_size)
-
-        # update current node sizes to the humanized aggregate children size
-        fs['size'] = children[0]['size'] = \
-            {size_type: humanize.naturalsize(child_size)
-             for size_type, child_size in children_size.items()}
+        # update current node sizes to the aggregate size of all 1st level
+        # children
+        fs['bytes'] = children[0]['bytes'] = \
+            sum_node_bytes(get_node_bytes(node) for node in children[1:])
 
         children[0]['name'] = '.'       # replace current node name with '.' to emulate unix syntax
         if parent:
@@ -715,6 +934,8 @@ def fs_traverse(path, repo, parent=None, render=True, recursive=False, json=None
         fs['nodes'] = children          # add children info to main fs dictionary
         if render:                      # render directory node at location(path)
             fs_render(fs, json=json, ds_path=basepath or path)
+            if state is not None:
+                state.set_record(path, fs)
             lgr.info('Directory: %s' % path)
 
     return fs
@@ -743,11 +964,24 @@ def ds_traverse(rootds, parent=None, json=None, recursive=False, all_=False,
     # extract parent info to pass to traverser
     fsparent = fs_extract(parent.path, parent.repo, basepath=rootds.path) if parent else None
 
+    content_info = state = None
+    if all_ and json in ('file', 'display'):
+        repo = rootds.repo
+        if isinstance(repo, AnnexRepo):
+            # query annex once for all the files instead of for every file
+            content_info = get_annexed_content_info(repo, rootds.path)
+        if json == 'file' and not (isinstance(repo, AnnexRepo) and
+                                   repo.is_direct_mode()):
+            # regenerate only what changed
+            state = WebMetaState(repo, rootds.path, content_info)
+    elif json == 'delete':
+        WebMetaState(rootds.repo, rootds.path).remove()
+
     # (recursively) traverse file tree of current dataset
     fs = fs_traverse(rootds.path, rootds.repo,
                      render=False, parent=fsparent, recursive=all_,
-                     json=json)
-    size_list = [fs['size']]
+                     json=json, content_info=content_info, state=state)
+    size_list = [fs['bytes']]
 
     # (recursively) traverse each subdataset
     children = []
@@ -782,7 +1016,7 @@ def ds_traverse(rootds, parent=None, json=None, recursive=False, all_=False,
                                 all_=all_,
                                 parent=rootds)
             subfs.pop('nodes', None)
-            size_list.append(subfs['size'])
+            size_list.append(subfs['bytes'])
         # else just pick the data from metadata_file of each subdataset
         else:
             lgr.info(subds.path)
@@ -791,7 +1025,7 @@ def ds_traverse(rootds, parent=None, json=None, recursive=False, all_=False,
                     subfs = js.load(data_file)
                     subfs.pop('nodes', None)    # remove children
                     subfs['path'] = subds_rpath # reassign the path
-                    size_list.append(subfs['size'])
+                    size_list.append(get_node_bytes(subfs))
             else:
                 # the same drill as if not installed
                 lgr.warning("%s is installed but no meta-data yet", subds)
@@ -799,16 +1033,10 @@ def ds_traverse(rootds, parent=None, json=None, recursive=False, all_=False,
 
         children.extend([subfs])
 
-    # sum sizes of all 1st level children dataset
-    children_size = {}
-    for subdataset_size in size_list:
-        for size_type, subds_size in subdataset_size.items():
-            children_size[size_type] = children_size.get(size_type, 0) + machinesize(subds_size)
-
-    # update current dataset sizes to the humanized aggregate subdataset sizes
-    fs['size'] = {size_type: humanize.naturalsize(size)
-                  for size_type, size in children_size.items()}
-    fs['nodes'][0]['size'] = fs['size']  # update self's updated size in nodes sublist too!
+    # update current dataset sizes to the aggregate size of all 1st level
+    # children datasets
+    fs['bytes'] = sum_node_bytes(size_list)
+    fs['nodes'][0]['bytes'] = fs['bytes']  # update self's updated size in nodes sublist too!
 
     # add dataset specific entries to its dict
     rootds_model = GitModel(rootds.repo)
@@ -825,6 +1053,8 @@ def ds_traverse(rootds, parent=None, json=None, recursive=False, all_=False,
     # render current dataset
     lgr.info('Dataset: %s' % rootds.path)
     fs_render(fs, json=json, ds_path=rootds.path)
+    if state is not None:
+        state.save()
     return fs
 
 
@@ -0,0 +1,197 @@
+# emacs: -*- mode: python; py-indent-offset: 4; tab-width: 4; indent-tabs-mode: nil -*-
+# ex: set sts=4 ts=4 sw=4 noet:
+# ## ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ##
+#
+#   See COPYING file distributed along with the datalad package for the
+#   copyright and license terms.
+#
+# ## ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ##
+"""Memoized lookups of dataset roots and registered subdatasets for many paths
+
+"""
+
+__docformat__ = 'restructuredtext'
+
+import logging
+import os
+import threading
+import time
+
+try:
+    from os import scandir
+except ImportError:
+    # PY2
+    from os import listdir as scandir
+from os.path import dirname
+from os.path import exists
+from os.path import isdir
+from os.path import join as opj
+from os.path import normpath
+from os.path import split as psplit
+
+from datalad.utils import with_pathsep as _with_sep
+
+lgr = logging.getLogger('datalad.interface.path_index')
+
+# registered subdatasets of datasets, across invocations:
+# {dataset path: (stamp, set of subdataset paths)}
+_subds_cache = {}
+_subds_cache_lock = threading.Lock()
+
+
+def _get_subds_stamp(dspath):
+    """Return what listing of registered subdatasets depends on
+
+    Returns None if a listing should not be cached, since files changed too
+    recently to tell a subsequent change by their mtime.
+    """
+    stamp = []
+    for fname in (opj(dspath, '.gitmodules'), opj(dspath, '.git', 'index')):
+        try:
+            st = os.stat(fname)
+        except OSError:
+            stamp.append(None)
+            continue
+        if time.time() - st.st_mtime < 2:
+            # mtime resolution could be as coarse as 2 sec
+            return None
+        stamp.append((st.st_mtime, st.st_size, st.st_ino))
+    return tuple(stamp)
+
+
+def get_path_prefixes(paths):
+    """Return a set of paths and all their leading directories
+
+    Parameters
+    ----------
+    paths : iterable of str
+      Normalized paths (all absolute or all relative)
+
+    Returns
+    -------
+    set
+    """
+    prefixes = set()
+    for path in paths:
+        while path and path not in prefixes:
+            prefixes.add(path)
+            parent = dirname(path)
+            if parent == path:
+                break
+            path = parent
+    return prefixes
+
+
+class DatasetPathIndex(object):
+    """Index of dataset roots and registered subdatasets for looking up paths
+
+    Dataset roots are memoized per directory, so determining the roots of
+    many paths costs a single walk up the directory tree per distinct
+    directory.  Registered subdatasets are memoized per dataset, and (unless
+    `persistent` is False) reused across instances for as long as
+    `.gitmodules` and the index of the dataset remain unchanged.
+
+    Roots are not memoized for directories which do not exist or are empty,
+    i.e. could become (or be replaced by) a dataset while the index is in use
+    (e.g. an absent subdataset getting installed).
+    """
+
+    _SUFFIX = os.sep + opj('.git', 'objects')
+
+    def __init__(self, persistent=True):
+        self._persistent = persistent
+        self._roots = {}
+        self._subdatasets = {}
+
+    @staticmethod
+    def _is_stable(path):
+        try:
+            entries = scandir(path)
+        except OSError:
+            return False
+        try:
+            return next(iter(entries), None) is not None
+        finally:
+            if hasattr(entries, 'close'):
+                entries.close()
+
+    def get_root(self, path):
+        """Return the root of an existent dataset containing a given path
+
+        Equivalent to `datalad.utils.get_dataset_root`: the root path is
+        returned in the same absolute or relative form as the input argument.
+        If no associated dataset exists, or the input path doesn't exist, None
+        is returned.
+        """
+        if not isdir(path):
+            path = dirname(path)
+        visited = []
+        root = None
+        # while we can still go up
+        while psplit(os.path.abspath(path))[1]:
+            if path in self._roots:
+                root = self._roots[path]
+                break
+            visited.append(path)
+            if exists(path + self._SUFFIX):
+                root = path
+                break
+            # new test path in the format we got it
+            path = normpath(opj(path, os.pardir))
+        for p in visited:
+            if self._is_stable(p):
+                self._roots[p] = root
+        return root
+
+    def get_subdatasets(self, dspath):
+        """Return paths of all subdatasets registered in a dataset
+
+        Parameters
+        ----------
+        dspath : str
+          Absolute path of the dataset
+
+        Returns
+        -------
+        set
+          Absolute paths of the subdatasets, installed or not
+        """
+        subdss = self._subdatasets.get(dspath, None)
+        if subdss is not None:
+            return subdss
+        stamp = _get_subds_stamp(dspath) if self._persistent else None
+        if stamp is not None:
+            with _subds_cache_lock:
+                cached = _subds_cache.get(dspath, None)
+            if cached and cached[0] == stamp:
+                self._subdatasets[dspath] = cached[1]
+                return cached[1]
+
+        from datalad.distribution.dataset import Dataset
+        subdss = set(
+            Dataset(dspath).subdatasets(
+                fulfilled=None, recursive=False,
+                result_xfm='paths', result_filter=None, return_type='list'))
+        self._subdatasets[dspath] = subdss
+        if stamp is not None:
+            with _subds_cache_lock:
+                _subds_cache[dspath] = (stamp, subdss)
+        return subdss
+
+    def is_registered_subds(self, dspath, path):
+        """Whether a path is a subdataset registered in the dataset"""
+        return path in self.get_subdatasets(dspath)
+
+    def get_containing_subds(self, dspath, path):
+        """Return the immediate subdataset of a dataset containing a path
+
+        The "mount point" of a subdataset is classified as belonging to that
+        respective subdataset.  `dspath` is returned if no subdataset contains
+        the path.
+        """
+        for prefix in sorted(get_path_prefixes([path]), key=len):
+            if not prefix.startswith(_with_sep(dspath)):
+                continue
+            if prefix in self.get_subdatasets(dspath):
+                return prefix
+        return dspath
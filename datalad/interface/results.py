@@ -14,6 +14,7 @@ __docformat__ = 'restructuredtext'
 
 import logging
 
+from os.path import dirname
 from os.path import isdir
 from os.path import isabs
 from os.path import join as opj
@@ -274,6 +275,55 @@ def is_result_matching_pathsource_argument(res, **kwargs):
         False
 
 
+class ResultPathTracker(object):
+    """Record on which paths `git annex` reported, and how successfully
+
+    Besides the reported paths, all their leading directories are recorded
+    as well, so whether anything underneath a directory was reported is
+    answered by a lookup instead of a scan of all the reports.  Costs of
+    recording are linear in the number of reported paths, since a walk up
+    the directory tree stops at the first directory recorded already.
+    """
+
+    def __init__(self):
+        self._paths = set()
+        # directories with any content reported by success label
+        self._dirs = {'success': set(), 'failure': set()}
+        self._failures = []
+        self.counts = {'success': 0, 'failure': 0}
+
+    def add(self, res):
+        """Record a result (dict with 'path' and 'status')"""
+        self.add_path(res['path'], success_status_map[res['status']])
+
+    def add_path(self, path, success='success'):
+        """Record a path reported with a success label"""
+        self._paths.add(path)
+        self.counts[success] += 1
+        if success == 'failure':
+            self._failures.append(path)
+        dirs = self._dirs[success]
+        parent = dirname(path)
+        while parent not in dirs:
+            dirs.add(parent)
+            path, parent = parent, dirname(parent)
+            if parent == path:
+                break
+
+    def __contains__(self, path):
+        return path in self._paths
+
+    def has_content(self, path, success='success'):
+        """Whether anything underneath a directory was reported"""
+        return path in self._dirs[success]
+
+    def get_failures(self, path):
+        """Return reported failures underneath a directory"""
+        if not self.has_content(path, 'failure'):
+            return []
+        return [fp for fp in self._failures if fp.startswith(_with_sep(path))]
+
+
 def results_from_annex_noinfo(ds, requested_paths, respath_by_status, dir_fail_msg,
                               noinfo_dir_msg, noinfo_file_msg, **kwargs):
     """Helper to yield results based on what information git annex did no give us.
@@ -289,10 +339,10 @@ def results_from_annex_noinfo(ds, requested_paths, respath_by_status, dir_fail_m
       relpaths).
     requested_paths : list
       List of path arguments sent to `git annex`
-    respath_by_status : dict
-      Mapping of 'success' or 'failure' labels to lists of result paths
-      reported by `git annex`. Everything that is not in here, we assume
-      that `git annex` was happy about.
+    respath_by_status : ResultPathTracker or dict
+      Tracker of the result paths reported by `git annex`, or a mapping of
+      'success' or 'failure' labels to lists of them. Everything that is not
+      in here, we assume that `git annex` was happy about.
     dir_fail_msg : str
       Message template to inject into the result for a requested directory where
       a failure was reported for some of its content. The template contains two
@@ -308,11 +358,17 @@ def results_from_annex_noinfo(ds, requested_paths, respath_by_status, dir_fail_m
     **kwargs
       Any further kwargs are included in the yielded result dictionary.
     """
+    tracker = respath_by_status
+    if not isinstance(tracker, ResultPathTracker):
+        tracker = ResultPathTracker()
+        for success, paths in respath_by_status.items():
+            for path in paths:
+                tracker.add_path(path, success)
     for p in requested_paths:
         # any relpath is relative to the currently processed dataset
         # not the global reference dataset
         p = p if isabs(p) else normpath(opj(ds.path, p))
-        if any(p in ps for ps in respath_by_status.values()):
+        if p in tracker:
             # we have a report for this path already
             continue
         common_report = dict(path=p, **kwargs)
@@ -323,9 +379,7 @@ def results_from_annex_noinfo(ds, requested_paths, respath_by_status, dir_fail_m
             # repo, hence all directories are already present, if not
             # we had an error
             # do we have any failures in a subdir of the requested dir?
-            failure_results = [
-                fp for fp in respath_by_status.get('failure', [])
-                if fp.startswith(_with_sep(p))]
+            failure_results = tracker.get_failures(p)
             if failure_results:
                 # we were not able to process all requested_paths, let's label
                 # this 'impossible' to get a warning-type report
@@ -337,9 +391,7 @@ def results_from_annex_noinfo(ds, requested_paths, respath_by_status, dir_fail_m
                     **common_report)
             else:
                 # otherwise cool, but how cool?
-                success_results = [
-                    fp for fp in respath_by_status.get('success', [])
-                    if fp.startswith(_with_sep(p))]
+                success_results = tracker.has_content(p)
                 yield get_status_dict(
                     status='ok' if success_results else 'notneeded',
                     message=None if success_results else (noinfo_dir_msg, p),
@@ -29,6 +29,8 @@ from ...tests.utils import with_tempfile
 from ...tests.utils import with_tree
 from ...tests.utils import skip_if_no_network
 from datalad.interface.ls import ignored, fs_traverse, _ls_json, machinesize
+from datalad.interface.ls import FsModel
+from mock import patch
 from os.path import exists, join as opj
 from os.path import relpath
 from os import mkdir
@@ -246,6 +248,109 @@ def test_ls_json(topdir):
                     assert_equal(subds['size']['total'], '3 Bytes')
 
 
+
+@with_tree(
+    tree={'d1': {'f1.txt': '123', 'sub': {'f2.txt': '1234'}},
+          'd2': {'f3.txt': '12'}})
+def test_ls_json_incremental(topdir):
+    ds = Dataset(topdir).create(force=True, no_annex=True)
+    ds.add('.')
+
+    def traversed():
+        # which directories got their records extracted
+        paths = []
+        orig_size = FsModel.size
+
+        def size(self):
+            paths.append(relpath(self._path, topdir))
+            return orig_size.fget(self)
+        with patch.object(FsModel, 'size', property(size)), \
+                swallow_logs(), swallow_outputs():
+            res = _ls_json(topdir, json='file', all_=True)
+        return res, set(paths)
+
+    res1, paths = traversed()
+    assert_in(opj('d1', 'sub'), paths)
+    # nothing changed -- unchanged directories are taken as is
+    res2, paths = traversed()
+    for d in ('d1', opj('d1', 'sub'), 'd2'):
+        assert d not in paths
+    assert_equal(res1, res2)
+
+    # modified directory (and its parents) get regenerated, even
+    # before committed
+    with open(opj(topdir, 'd1', 'sub', 'f2.txt'), 'w') as f:
+        f.write('123456')
+    res, paths = traversed()
+    assert_in(opj('d1', 'sub'), paths)
+    assert_in('d1', paths)
+    assert 'd2' not in paths
+    ds.save("modified")
+    res, paths = traversed()
+    assert_in(opj('d1', 'sub'), paths)
+    assert 'd2' not in paths
+    sub = [n for n in res['nodes'] if n['name'] == 'd1'][0]
+    assert_equal(sub['size']['total'], '9 Bytes')
+    res, paths = traversed()
+    assert opj('d1', 'sub') not in paths
+
+    # state is removed along with the meta data
+    with swallow_logs(), swallow_outputs():
+        _ls_json(topdir, json='delete', all_=True)
+    assert_equal(
+        glob(opj(topdir, '.git', 'datalad', 'metadata', '*.json')), [])
+
+
+@with_tree(
+    tree={'d1': {'f1.txt': '123', 'subds': {'f2.txt': '1234'}},
+          'd2': {'f3.txt': '12'}})
+def test_ls_json_incremental_subdataset(topdir):
+    ds = Dataset(topdir).create(force=True, no_annex=True)
+    subds = ds.create(opj('d1', 'subds'), force=True, no_annex=True)
+    subds.add('.')
+    ds.add('.')
+
+    def traversed():
+        paths = []
+        orig_size = FsModel.size
+
+        def size(self):
+            paths.append(relpath(self._path, topdir))
+            return orig_size.fget(self)
+        with patch.object(FsModel, 'size', property(size)), \
+                swallow_logs(), swallow_outputs():
+            res = _ls_json(topdir, json='file', all_=True, recursive=True)
+        return res, set(paths)
+
+    traversed()
+    res, paths = traversed()
+    assert 'd2' not in paths
+    # content of the subdataset might change without the superdataset
+    # knowing, so a directory with a subdataset is never taken as is
+    assert_in('d1', paths)
+    with open(opj(subds.path, 'f2.txt'), 'w') as f:
+        f.write('123456')
+    subds.save("modified")
+    res, paths = traversed()
+    assert_in('d1', paths)
+    sub = [n for n in res['nodes'] if n['name'] == 'subds'][0]
+    assert_equal(sub['size']['total'], '6 Bytes')
+
+
+@with_tree(
+    tree={'d': {'f1.txt': '1' * 1499, 'sub': {'f2.txt': '2' * 1499}}})
+def test_ls_json_exact_sizes(topdir):
+    ds = Dataset(topdir).create(force=True, no_annex=True)
+    ds.add('.')
+    for json in ('file', 'display'):
+        with swallow_logs(), swallow_outputs():
+            res = _ls_json(topdir, json=json, all_=True)
+        d = [n for n in res['nodes'] if n['name'] == 'd'][0]
+        # summed up exactly, not from rounded humanized sizes
+        assert_equal(d['bytes']['total'], 2998)
+        assert_equal(d['size']['total'], '3.0 kB')
+        assert_equal(res['nodes'][0]['bytes'], res['bytes'])
+
 @with_tempfile
 def test_ls_noarg(toppath):
     # smoke test pretty much
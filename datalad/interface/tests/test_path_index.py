@@ -0,0 +1,84 @@
+# emacs: -*- mode: python; py-indent-offset: 4; tab-width: 4; indent-tabs-mode: nil -*-
+# ex: set sts=4 ts=4 sw=4 noet:
+# ## ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ##
+#
+#   See COPYING file distributed along with the datalad package for the
+#   copyright and license terms.
+#
+# ## ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ##
+"""Test dataset path index
+
+"""
+
+import os
+from os.path import join as opj
+
+from mock import patch
+
+from datalad.api import create
+from datalad.distribution.dataset import Dataset
+from datalad.tests.utils import assert_equal
+from datalad.tests.utils import assert_false
+from datalad.tests.utils import assert_not_in
+from datalad.tests.utils import ok_
+from datalad.tests.utils import with_tempfile
+from datalad.utils import get_dataset_root
+
+from .. import path_index
+from ..path_index import DatasetPathIndex
+from ..path_index import get_path_prefixes
+
+
+def test_get_path_prefixes():
+    assert_equal(
+        get_path_prefixes([opj('a', 'b', 'c'), opj('a', 'd'), 'e']),
+        {'a', opj('a', 'b'), opj('a', 'b', 'c'), opj('a', 'd'), 'e'})
+    assert_equal(
+        get_path_prefixes([os.sep + opj('a', 'b')]),
+        {os.sep, os.sep + 'a', os.sep + opj('a', 'b')})
+
+
+@with_tempfile(mkdir=True)
+def test_dataset_path_index(path):
+    ds = create(path, no_annex=True)
+    subds = ds.create('sub', no_annex=True)
+    os.makedirs(opj(subds.path, 'd1', 'd2'))
+    with open(opj(subds.path, 'd1', 'd2', 'f'), 'w') as f:
+        f.write('content')
+    os.makedirs(opj(ds.path, 'empty'))
+
+    index = DatasetPathIndex()
+    for p in (ds.path, subds.path,
+              opj(subds.path, 'd1', 'd2', 'f'),
+              opj(subds.path, 'd1', 'd2', 'absent'),
+              opj(ds.path, 'empty'),
+              opj(ds.path, 'empty', 'absent'),
+              opj(ds.path, os.pardir)):
+        assert_equal(index.get_root(p), get_dataset_root(p))
+    # upward walk was memoized
+    assert_equal(index._roots[opj(subds.path, 'd1')], subds.path)
+    # but not for what could become a dataset
+    for p in (opj(ds.path, 'empty'), opj(ds.path, 'empty', 'absent')):
+        assert_not_in(p, index._roots)
+
+    # subdatasets are queried once per dataset
+    with patch.object(path_index, '_get_subds_stamp', return_value=None):
+        index = DatasetPathIndex()
+        ok_(index.is_registered_subds(ds.path, subds.path))
+        with patch.object(Dataset, 'subdatasets') as subdatasets:
+            assert_false(index.is_registered_subds(ds.path, opj(ds.path, 'empty')))
+            assert_equal(
+                index.get_containing_subds(ds.path, opj(subds.path, 'd1')),
+                subds.path)
+            assert_equal(
+                index.get_containing_subds(ds.path, opj(ds.path, 'empty')),
+                ds.path)
+            assert_false(subdatasets.called)
+
+    # and reused across instances while the dataset is unchanged
+    with patch.object(path_index, '_get_subds_stamp', return_value=('stamp',)):
+        DatasetPathIndex().get_subdatasets(ds.path)
+        with patch.object(Dataset, 'subdatasets') as subdatasets:
+            assert_equal(DatasetPathIndex().get_subdatasets(ds.path),
+                         {subds.path})
+            assert_false(subdatasets.called)
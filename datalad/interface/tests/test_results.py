@@ -0,0 +1,77 @@
+# emacs: -*- mode: python; py-indent-offset: 4; tab-width: 4; indent-tabs-mode: nil -*-
+# ex: set sts=4 ts=4 sw=4 noet:
+# ## ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ##
+#
+#   See COPYING file distributed along with the datalad package for the
+#   copyright and license terms.
+#
+# ## ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ##
+"""Test result handling helpers
+
+"""
+
+import os
+from os.path import join as opj
+
+from datalad.distribution.dataset import Dataset
+from datalad.tests.utils import assert_false
+from datalad.tests.utils import assert_in
+from datalad.tests.utils import assert_not_in
+from datalad.tests.utils import eq_
+from datalad.tests.utils import ok_
+from datalad.tests.utils import with_tempfile
+
+from ..results import ResultPathTracker
+from ..results import results_from_annex_noinfo
+
+
+def test_result_path_tracker():
+    tracker = ResultPathTracker()
+    tracker.add({'path': opj(os.sep, 'a', 'b', 'c'), 'status': 'ok'})
+    tracker.add({'path': opj(os.sep, 'a', 'b', 'd'), 'status': 'notneeded'})
+    tracker.add({'path': opj(os.sep, 'a', 'e', 'f'), 'status': 'error'})
+    tracker.add_path(opj(os.sep, 'g'))
+    eq_(tracker.counts, {'success': 3, 'failure': 1})
+    assert_in(opj(os.sep, 'a', 'b', 'c'), tracker)
+    assert_not_in(opj(os.sep, 'a', 'b'), tracker)
+    for d in (os.sep, opj(os.sep, 'a'), opj(os.sep, 'a', 'b')):
+        ok_(tracker.has_content(d))
+    # only content underneath counts
+    assert_false(tracker.has_content(opj(os.sep, 'a', 'b', 'c')))
+    assert_false(tracker.has_content(opj(os.sep, 'a', 'e')))
+    ok_(tracker.has_content(opj(os.sep, 'a', 'e'), 'failure'))
+    eq_(tracker.get_failures(opj(os.sep, 'a')), [opj(os.sep, 'a', 'e', 'f')])
+    eq_(tracker.get_failures(opj(os.sep, 'a', 'b')), [])
+
+
+@with_tempfile(mkdir=True)
+def test_results_from_annex_noinfo(path):
+    for d in ('ok', 'failed', 'silent'):
+        os.makedirs(opj(path, d))
+    ds = Dataset(path)
+    reported = {
+        'success': [opj(path, 'ok', 'f'), opj(path, 'failed', 'f')],
+        'failure': [opj(path, 'failed', 'g')],
+    }
+    tracker = ResultPathTracker()
+    for success, paths in reported.items():
+        for p in paths:
+            tracker.add_path(p, success)
+    for respath_by_status in (tracker, reported):
+        res = dict(
+            (r['path'], r) for r in results_from_annex_noinfo(
+                ds, ['ok', 'failed', 'silent', opj('ok', 'f'), 'file'],
+                respath_by_status,
+                dir_fail_msg='failed %s %s',
+                noinfo_dir_msg='nothing in %s',
+                noinfo_file_msg='nothing',
+                action='test'))
+        eq_(sorted(res),
+            sorted(opj(path, p) for p in ('ok', 'failed', 'silent', 'file')))
+        eq_(res[opj(path, 'ok')]['status'], 'ok')
+        eq_(res[opj(path, 'failed')]['status'], 'impossible')
+        eq_(res[opj(path, 'failed')]['message'],
+            ('failed %s %s', opj(path, 'failed'), [opj(path, 'failed', 'g')]))
+        eq_(res[opj(path, 'silent')]['status'], 'notneeded')
+        eq_(res[opj(path, 'file')]['type'], 'file')
+        eq_(res[opj(path, 'file')]['status'], 'notneeded')
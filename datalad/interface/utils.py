@@ -22,6 +22,7 @@ from os import curdir
 from os import pardir
 from os import listdir
 from os.path import join as opj
+from os.path import abspath
 from os.path import lexists
 from os.path import isdir
 from os.path import dirname
@@ -36,14 +37,16 @@ import json
 # avoid import from API to not get into circular imports
 from datalad.utils import with_pathsep as _with_sep  # TODO: RF whenever merge conflict is not upon us
 from datalad.utils import assure_list
-from datalad.utils import get_dataset_root
 from datalad.utils import unique
 from datalad.support.exceptions import CommandError
+from datalad.support.cmdstats import cmd_stats
 from datalad.support.gitrepo import GitRepo
 from datalad.support.gitrepo import GitCommandError
 from datalad.support.exceptions import IncompleteResultsError
 from datalad.distribution.dataset import Dataset
 from datalad.distribution.dataset import resolve_path
+from datalad.interface.path_index import DatasetPathIndex
+from datalad.interface.path_index import get_path_prefixes
 from datalad import cfg as dlcfg
 from datalad.dochelpers import exc_str
 
@@ -175,6 +178,7 @@ def get_paths_by_dataset(paths, recursive=False, recursion_limit=None,
       and any paths that are not part of any dataset.
     """
     # sort paths into the respective datasets
+    index = DatasetPathIndex()
     if dir_lookup is None:
         dir_lookup = {}
     if out is None:
@@ -204,7 +208,7 @@ def get_paths_by_dataset(paths, recursive=False, recursion_limit=None,
         else:
             _ds_looked_up = False
             # this could be `None` if there is no git repo
-            dspath = get_dataset_root(d)
+            dspath = index.get_root(d)
             dir_lookup[d] = dspath
 
         if not dspath:
@@ -225,11 +229,8 @@ def get_paths_by_dataset(paths, recursive=False, recursion_limit=None,
             if not _ds_looked_up:
                 # we didn't deal with it before
 
-                # TODO this is a slow call, no need for dedicated RF, will vanish
-                # together with the entire function
-                smpath = ds.get_containing_subdataset(
-                    path, recursion_limit=1).path
-                if smpath != dspath:
+                smpath = index.get_containing_subds(ds.path, abspath(path))
+                if smpath != ds.path:
                     # fix entry
                     dir_lookup[d] = smpath
                     # submodule still needs to be obtained
@@ -240,7 +241,7 @@ def get_paths_by_dataset(paths, recursive=False, recursion_limit=None,
                 # effort by not calling ds.subdatasets or
                 # ds.get_containing_subdataset. Instead we just need
                 # get_dataset_root, which is cheaper
-                if dspath != get_dataset_root(dspath):
+                if dspath != index.get_root(dspath):
                     # if the looked up path isn't the default value,
                     # it's a 'fixed' entry for an unavailable dataset (see above)
                     unavailable_paths.append(path)
@@ -334,7 +335,8 @@ def path_is_under(values, path=None):
     return False
 
 
-def discover_dataset_trace_to_targets(basepath, targetpaths, current_trace, spec):
+def discover_dataset_trace_to_targets(basepath, targetpaths, current_trace, spec,
+                                      _prefixes=None):
     """Discover the edges and nodes in a dataset tree to given target paths
 
     Parameters
@@ -359,6 +361,11 @@ def discover_dataset_trace_to_targets(basepath, targetpaths, current_trace, spec
     None
       Function calls itself recursively and populates `spec` in-place.
     """
+    if _prefixes is None:
+        # any target path and all the directories leading to it, so we can
+        # tell in a single lookup whether a path leads to any target
+        targetpaths = set(targetpaths)
+        _prefixes = get_path_prefixes(targetpaths)
     # this beast walks the directory tree from a given `basepath` until
     # it discovers any of the given `targetpaths`
     # if it finds one, it commits any accummulated trace of visited
@@ -382,14 +389,15 @@ def discover_dataset_trace_to_targets(basepath, targetpaths, current_trace, spec
             # ignore gitdir to speed things up
             continue
         p = opj(basepath, p)
-        if all(t != p and not t.startswith(_with_sep(p)) for t in targetpaths):
+        if p not in _prefixes:
             # OPT listdir might be large and we could have only few items
             # in `targetpaths` -- so traverse only those in spec which have
             # leading dir basepath
             continue
         # we need to call this even for non-directories, to be able to match
         # file target paths
-        discover_dataset_trace_to_targets(p, targetpaths, current_trace, spec)
+        discover_dataset_trace_to_targets(
+            p, targetpaths, current_trace, spec, _prefixes=_prefixes)
 
 
 def filter_unmodified(content_by_ds, refds, since):
@@ -648,6 +656,15 @@ def eval_results(func):
         # generator-style, it may generate an exception if desired,
         # on incomplete results
         def generator_func(*_args, **_kwargs):
+            # account external commands to this interface
+            cmd_stats.push_interface(cmdline_name)
+            try:
+                for r in _generator_func(*_args, **_kwargs):
+                    yield r
+            finally:
+                cmd_stats.pop_interface(cmdline_name)
+
+        def _generator_func(*_args, **_kwargs):
             from datalad.plugin import Plugin
 
             # flag whether to raise an exception
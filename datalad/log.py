@@ -126,7 +126,10 @@ class ColorFormatter(logging.Formatter):
     def _get_format(self, log_name=False, log_pid=False):
         from datalad import cfg
         from datalad.config import anything2bool
-        show_timestamps = anything2bool(cfg.get('datalad.log.timestamp', False))
+        # do not load configuration just to format log messages
+        show_timestamps = anything2bool(
+            cfg.get('datalad.log.timestamp', False) if cfg.loaded
+            else os.environ.get('DATALAD_LOG_TIMESTAMP', False))
         return (("" if not show_timestamps else "$BOLD%(asctime)-15s$RESET ") +
                 ("%(name)-15s " if log_name else "") +
                 ("{%(process)d}" if log_pid else "") +
@@ -172,7 +175,12 @@ class LoggerHelper(object):
 
     def _get_config(self, var, default=None):
         from datalad import cfg
-        return cfg.get(self.name.lower() + '.log.' + var, default)
+        name = self.name.lower() + '.log.' + var
+        if not cfg.loaded:
+            # loading configuration costs calls to git, so upon import only
+            # the environment is consulted
+            return os.environ.get(name.upper().replace('.', '_'), default)
+        return cfg.get(name, default)
 
     def set_level(self, level=None, default='INFO'):
         """Helper to set loglevel for an arbitrary logger
@@ -269,6 +277,10 @@ class LoggerHelper(object):
         self.lgr.addHandler(loghandler)
 
         self.set_level()  # set default logging level
+        from datalad import cfg
+        if not cfg.loaded:
+            # level could also be set in the configuration files
+            cfg._on_load.append(self.set_level)
         return self.lgr
 
 lgr = LoggerHelper().get_initialized_logger()
@@ -49,38 +49,60 @@ class MetadataParser(BaseMetadataParser):
             exclude_datalad=False,
             dirs=False))
 
+    def get_subdataset_metadata(self, fname, dsid):
+        """Load aggregated meta data of a single subdataset
+
+        Parameters
+        ----------
+        fname : str
+          One of the filenames returned by `get_core_metadata_filenames`
+        dsid : str
+          ID of the dataset the subdataset is to be a part of
+
+        Returns
+        -------
+        dict, list
+          Info on the subdataset for the 'dcterms:hasPart' property of the
+          dataset, and the meta data of the subdataset.  None, None if the
+          file is not for a subdataset.
+        """
+        basepath = opj(self.ds.path, '.datalad', 'meta')
+        # get the part between the 'meta' dir and the filename
+        # which is the subdataset mountpoint
+        subds_path = fname[len(basepath) + 1:-10]
+        if not subds_path:
+            # this is a potentially existing cache of the native meta data
+            # of the superdataset, not for us...
+            return None, None
+        submeta_info = {
+            'location': subds_path}
+        # load aggregated meta data
+        subds_meta = jsonload(fname)
+        # we cannot simply append, or we get weired nested graphs
+        # proper way would be to expand the JSON-LD, extend the list and
+        # compact/flatten at the end. However assuming a single context
+        # we can cheat.
+        subds_meta = _simplify_meta_data_structure(subds_meta)
+        _adjust_subdataset_location(subds_meta, subds_path)
+        # sift through all meta data sets look for a meta data set that
+        # knows about being part of this dataset, so we record its @id as
+        # part
+        for md in subds_meta:
+            cand_id = md.get('dcterms:isPartOf', None)
+            if cand_id == dsid and '@id' in md:
+                submeta_info['@id'] = md['@id']
+                break
+        return submeta_info, subds_meta
+
     def get_metadata(self, dsid=None, full=False):
         base_meta = _get_base_dataset_metadata(dsid if dsid else self.ds.id)
         meta = [base_meta]
-        basepath = opj(self.ds.path, '.datalad', 'meta')
         parts = []
         for subds_meta_fname in self.get_core_metadata_filenames():
-            # get the part between the 'meta' dir and the filename
-            # which is the subdataset mountpoint
-            subds_path = subds_meta_fname[len(basepath) + 1:-10]
-            if not subds_path:
-                # this is a potentially existing cache of the native meta data
-                # of the superdataset, not for us...
+            submeta_info, subds_meta = self.get_subdataset_metadata(
+                subds_meta_fname, dsid)
+            if submeta_info is None:
                 continue
-            submeta_info = {
-                'location': subds_path}
-            # load aggregated meta data
-            subds_meta = jsonload(subds_meta_fname)
-            # we cannot simply append, or we get weired nested graphs
-            # proper way would be to expand the JSON-LD, extend the list and
-            # compact/flatten at the end. However assuming a single context
-            # we can cheat.
-            subds_meta = _simplify_meta_data_structure(subds_meta)
-            _adjust_subdataset_location(subds_meta, subds_path)
-            # sift through all meta data sets look for a meta data set that
-            # knows about being part of this dataset, so we record its @id as
-            # part
-            for md in subds_meta:
-                cand_id = md.get('dcterms:isPartOf', None)
-                if cand_id == dsid and '@id' in md:
-                    submeta_info['@id'] = md['@id']
-                    break
-
             if subds_meta:
                 meta.extend(subds_meta)
             parts.append(submeta_info)
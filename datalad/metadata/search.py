@@ -16,7 +16,7 @@ import re
 import sys
 
 from operator import itemgetter
-from os.path import join as opj, exists
+from os.path import join as opj
 from six import string_types
 from six import text_type
 from six import iteritems
@@ -32,7 +32,7 @@ from ..support.param import Parameter
 from ..support.constraints import EnsureNone
 from ..support.constraints import EnsureChoice
 from ..log import lgr
-from . import get_metadata, flatten_metadata_graph, pickle
+from .search_index import MetadataSearchIndex
 
 from datalad.consts import LOCAL_CENTRAL_PATH
 from datalad.utils import assure_list
@@ -190,46 +190,11 @@ class Search(Interface):
             else:
                 raise
 
-        cache_dir = opj(opj(ds.path, get_git_dir(ds.path)), 'datalad', 'cache')
-        mcache_fname = opj(cache_dir, 'metadata.p%d' % pickle.HIGHEST_PROTOCOL)
-
-        meta = None
-        if os.path.exists(mcache_fname):
-            lgr.debug("use cached metadata of '{}' from {}".format(ds, mcache_fname))
-            meta, checksum = pickle.load(open(mcache_fname, 'rb'))
-            # TODO add more sophisticated tests to decide when the cache is no longer valid
-            if checksum != ds.repo.get_hexsha():
-                # errrr, try again below
-                meta = None
-
-        # don't put in 'else', as yet to be written tests above might fail and require
-        # regenerating meta data
-        if meta is None:
-            lgr.info("Loading and caching local meta-data... might take a few seconds")
-            if not exists(cache_dir):
-                os.makedirs(cache_dir)
-
-            meta = get_metadata(ds, guess_type=False, ignore_subdatasets=False,
-                                ignore_cache=False)
-            # merge all info on datasets into a single dict per dataset
-            meta = flatten_metadata_graph(meta)
-            # extract graph, if any
-            meta = meta.get('@graph', meta)
-            # build simple queriable representation
-            if not isinstance(meta, list):
-                meta = [meta]
-
-            # sort entries by location (if present)
-            sort_keys = ('location', 'description', 'id')
-            # note with str() instead of '%' getting encoding issues...
-            meta = sorted(meta, key=lambda m: tuple("%s" % (m.get(x, ""),) for x in sort_keys))
-
-            # use pickle to store the optimized graph in the cache
-            pickle.dump(
-                # graph plus checksum from what it was built
-                (meta, ds.repo.get_hexsha()),
-                open(mcache_fname, 'wb'))
-            lgr.debug("cached meta data graph of '{}' in {}".format(ds, mcache_fname))
+        index = MetadataSearchIndex(
+            ds,
+            opj(ds.path, get_git_dir(ds.path), 'datalad', 'cache', 'search'))
+        if index.update():
+            lgr.debug("updated search index of '%s' in %s", ds, index.path)
 
         if report in ('', ['']):
             report = []
@@ -241,90 +206,41 @@ class Search(Interface):
         # convert all to lower case for case insensitive matching
         search = {x.lower() for x in search}
 
-        def get_in_matcher(m):
-            """Function generator to provide closure for a specific value of m"""
-            mlower = m.lower()
-
-            def matcher(s):
-                return mlower in s.lower()
-            return matcher
-
-        matchers = [
-            re.compile(match_).search
-            if regex
-            else get_in_matcher(match_)
-            for match_ in match
-        ]
-
         # location should be reported relative to current location
         # We will assume that noone chpwd while we are yielding
         ds_path_prefix = get_path_prefix(ds.path)
 
         # So we could provide a useful message whenever there were not a single
         # dataset with specified `--search` properties
-        observed_properties = set()
-
-        # for every meta data set
-        for mds in meta:
-            hit = False
-            hits = [False] * len(matchers)
-            matched_fields = set()
-            if not mds.get('type', mds.get('schema:type', None)) == 'Dataset':
-                # we are presently only dealing with datasets
-                continue
-            # TODO consider the possibility of nested and context/graph dicts
-            # but so far we were trying to build simple lists of dicts, as much
-            # as possible
-            if not isinstance(mds, dict):
-                raise NotImplementedError("nested meta data is not yet supported")
-
-            # manual loop for now
-            for k, v in iteritems(mds):
-                if search:
-                    k_lower = k.lower()
-                    if k_lower not in search:
-                        if observed_properties is not None:
-                            # record for providing a hint later
-                            observed_properties.add(k_lower)
-                        continue
-                    # so we have a hit, no need to track
-                    observed_properties = None
-                if isinstance(v, dict) or isinstance(v, list):
-                    v = text_type(v)
-                for imatcher, matcher in enumerate(matchers):
-                    if matcher(v):
-                        hits[imatcher] = True
-                        matched_fields.add(k)
-                if all(hits):
-                    hit = True
-                    # no need to do it longer than necessary
-                    if not report_matched:
-                        break
-
-            if hit:
-                location = mds.get('location', '.')
-                report_ = matched_fields.union(report if report else {}) \
-                    if report_matched else report
-                if report_ == ['*']:
-                    report_dict = mds
-                elif report_:
-                    report_dict = {k: mds[k] for k in report_ if k in mds}
-                    if report_ and not report_dict:
-                        lgr.debug(
-                            'meta data match for %s, but no to-be-reported '
-                            'properties (%s) found. Present properties: %s',
-                            location, ", ".join(report_), ", ".join(sorted(mds))
-                        )
-                else:
-                    report_dict = {}  # it was empty but not None -- asked to
-                    # not report any specific field
-                if isinstance(location, (list, tuple)):
-                    # could be that the same dataset installed into multiple
-                    # locations. For now report them separately
-                    for l in location:
-                        yield opj(ds_path_prefix, l), report_dict
-                else:
-                    yield opj(ds_path_prefix, location), report_dict
+        observed_properties = {f.lower() for f in index.fields}
+        if not search or search.intersection(observed_properties):
+            observed_properties = None
+
+        for mds, matched_fields in index.query(match, regex=regex,
+                                               search=search):
+            location = mds.get('location', '.')
+            report_ = matched_fields.union(report if report else {}) \
+                if report_matched else report
+            if report_ == ['*']:
+                report_dict = mds
+            elif report_:
+                report_dict = {k: mds[k] for k in report_ if k in mds}
+                if report_ and not report_dict:
+                    lgr.debug(
+                        'meta data match for %s, but no to-be-reported '
+                        'properties (%s) found. Present properties: %s',
+                        location, ", ".join(report_), ", ".join(sorted(mds))
+                    )
+            else:
+                report_dict = {}  # it was empty but not None -- asked to
+                # not report any specific field
+            if isinstance(location, (list, tuple)):
+                # could be that the same dataset installed into multiple
+                # locations. For now report them separately
+                for l in location:
+                    yield opj(ds_path_prefix, l), report_dict
+            else:
+                yield opj(ds_path_prefix, location), report_dict
 
         if search and observed_properties is not None:
             import difflib
@@ -0,0 +1,387 @@
+# emacs: -*- mode: python; py-indent-offset: 4; tab-width: 4; indent-tabs-mode: nil -*-
+# ex: set sts=4 ts=4 sw=4 noet:
+# ## ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ##
+#
+#   See COPYING file distributed along with the datalad package for the
+#   copyright and license terms.
+#
+# ## ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ##
+"""Incrementally updated on-disk index of dataset meta data for searching
+
+The index is kept under `.git/datalad/cache/search` and consists of
+
+records.jsonl
+  one JSON record (flattened meta data) per dataset, sorted by location
+records.offsets
+  offsets of the records in records.jsonl
+postings
+  one line per distinct (field, value) pair, with the JSON encoded field
+  name, value and comma-separated ids (line numbers in records.jsonl) of
+  the records having that value, sorted by field
+fields.json
+  byte ranges of the fields in `postings`
+state.json
+  what the index was built from, and info on the subdatasets, so only
+  meta data of those subdatasets which changed need to be processed again
+
+Records and postings are memory-mapped, so a query only reads the postings
+of the fields it searches and the records it matches.
+"""
+
+__docformat__ = 'restructuredtext'
+
+import hashlib
+import json
+import mmap
+import os
+import re
+import struct
+
+from os.path import join as opj
+from os.path import exists
+
+from six import iteritems
+from six import string_types
+from six import text_type
+
+from datalad.log import lgr
+from datalad.metadata import _get_base_dataset_metadata
+from datalad.metadata import flatten_metadata_graph
+from datalad.metadata import get_metadata
+from datalad.metadata import metadata_basepath
+from datalad.metadata import metadata_filename
+from datalad.utils import assure_dir
+from datalad.utils import rmtree
+
+# increment whenever the format of the index changes
+INDEX_VERSION = 2
+
+# record offsets are stored as little-endian unsigned 64bit integers, so the
+# index is the same on any platform
+_OFFSETS_FORMAT = '<%dQ'
+_OFFSET_SIZE = struct.calcsize(_OFFSETS_FORMAT % 1)
+
+
+def _get_file_stamp(fname):
+    st = os.stat(fname)
+    return [st.st_mtime, st.st_size]
+
+
+def _get_sort_key(m):
+    # sort entries by location (if present)
+    # note with str() instead of '%' getting encoding issues...
+    return tuple("%s" % (m.get(x, ""),)
+                 for x in ('location', 'description', 'id'))
+
+
+def _as_searchable(v):
+    if isinstance(v, string_types):
+        return v
+    return text_type(v)
+
+
+def _flatten_records(meta, tag):
+    """Flatten meta data into a list of records (one per node)
+
+    Blank node IDs are only unique within a single flattening, hence they
+    get prefixed with the `tag` of the meta data source.
+    """
+    meta = flatten_metadata_graph(meta)
+    # extract graph, if any
+    meta = meta.get('@graph', meta)
+    if not isinstance(meta, list):
+        meta = [meta]
+    records = []
+    for m in meta:
+        if not isinstance(m, dict):
+            continue
+        if m.get('@id', '').startswith('_:'):
+            m['@id'] = '_:%s-%s' % (tag, m['@id'][2:])
+        records.append(m)
+    return records
+
+
+def _merge_record(target, source):
+    """Merge properties of a record into another one for the same node"""
+    for k, v in iteritems(source):
+        if k not in target:
+            target[k] = v
+            continue
+        if k == '@id' or target[k] == v:
+            continue
+        values = target[k] if isinstance(target[k], list) else [target[k]]
+        for item in (v if isinstance(v, list) else [v]):
+            if item not in values:
+                values.append(item)
+        target[k] = values[0] if len(values) == 1 else values
+
+
+def _atomic_write(fname, content):
+    tmp_fname = fname + '.tmp'
+    with open(tmp_fname, 'wb') as f:
+        f.write(content)
+    # replaces an existing file atomically, os.rename does so on POSIX only
+    getattr(os, 'replace', os.rename)(tmp_fname, fname)
+
+
+def _dump_json(obj):
+    return json.dumps(obj, sort_keys=True).encode('ascii')
+
+
+def _get_in_matcher(m):
+    """Function generator to provide closure for a specific value of m"""
+    mlower = m.lower()
+
+    def matcher(s):
+        return mlower in s.lower()
+    return matcher
+
+
+class MetadataSearchIndex(object):
+    """Inverted index of the meta data of a dataset and its subdatasets
+
+    Parameters
+    ----------
+    ds : Dataset
+    path : str
+      Directory to keep the index in
+    """
+
+    def __init__(self, ds, path):
+        self.ds = ds
+        self.path = path
+        self._fields = None
+
+    def _get_sources(self):
+        """Return {subdataset path: stamp} for all aggregated meta data"""
+        from datalad.metadata.parsers.aggregate import MetadataParser
+        agg_parser = MetadataParser(self.ds)
+        basepath = opj(self.ds.path, metadata_basepath)
+        sources = {}
+        for fname in agg_parser.get_core_metadata_filenames():
+            subds_path = fname[len(basepath) + 1:-len(metadata_filename) - 1]
+            sources[subds_path] = _get_file_stamp(fname)
+        return agg_parser, sources
+
+    def _get_source_fname(self, subds_path):
+        return opj(
+            self.path, 'sources',
+            hashlib.md5(subds_path.encode('utf-8')).hexdigest() + '.json')
+
+    def _load_state(self):
+        state_fname = opj(self.path, 'state.json')
+        if exists(state_fname):
+            try:
+                with open(state_fname, 'rb') as f:
+                    state = json.loads(f.read().decode('ascii'))
+                if state.get('version') == INDEX_VERSION:
+                    return state
+            except ValueError as e:
+                lgr.debug("Ignoring broken search index state: %s", e)
+        # start from scratch
+        if exists(self.path):
+            rmtree(self.path)
+        return {'version': INDEX_VERSION, 'top': None, 'sources': {}}
+
+    def update(self):
+        """Update the index to match current meta data of the dataset
+
+        Only the aggregated meta data of subdatasets whose files changed since
+        the last update are loaded and processed.  Meta data of the dataset
+        itself are reprocessed whenever its HEAD moves, or anything changed.
+
+        Returns
+        -------
+        bool
+          Whether the index had to be updated
+        """
+        state = self._load_state()
+        agg_parser, sources = self._get_sources()
+        main_meta_fname = opj(self.ds.path, metadata_basepath, metadata_filename)
+        top = [self.ds.repo.get_hexsha(),
+               _get_file_stamp(main_meta_fname)
+               if exists(main_meta_fname) else None]
+        old_sources = state['sources']
+        changed = [s for s in sorted(sources)
+                   if s and old_sources.get(s, {}).get('stamp') != sources[s]]
+        removed = [s for s in old_sources if s not in sources]
+        if not changed and not removed and state['top'] == top \
+                and exists(opj(self.path, 'fields.json')):
+            return False
+
+        lgr.info("Updating search index of %s (%i out of %i subdatasets)",
+                 self.ds, len(changed), len([s for s in sources if s]))
+        assure_dir(opj(self.path, 'sources'))
+        dsid = self.ds.id
+        for subds_path in removed:
+            fname = self._get_source_fname(subds_path)
+            if exists(fname):
+                os.unlink(fname)
+            del old_sources[subds_path]
+        for subds_path in changed:
+            part, subds_meta = agg_parser.get_subdataset_metadata(
+                opj(self.ds.path, metadata_basepath, subds_path,
+                    metadata_filename),
+                dsid)
+            records = _flatten_records(
+                subds_meta,
+                hashlib.md5(subds_path.encode('utf-8')).hexdigest()) \
+                if subds_meta else []
+            _atomic_write(self._get_source_fname(subds_path),
+                          _dump_json(records))
+            old_sources[subds_path] = {
+                'stamp': sources[subds_path], 'part': part}
+
+        # meta data of the dataset itself, and its parts
+        meta = get_metadata(self.ds, guess_type=False,
+                            ignore_subdatasets=True, ignore_cache=False)
+        if sources:
+            base_meta = _get_base_dataset_metadata(dsid)
+            parts = [old_sources[s]['part'] for s in sorted(old_sources)]
+            if parts:
+                base_meta['dcterms:hasPart'] = \
+                    parts[0] if len(parts) == 1 else parts
+            meta.append(base_meta)
+        records = _flatten_records(meta, 'top')
+
+        # merge nodes across all the sources
+        nodes = {}
+        order = []
+        for subds_path in [None] + sorted(old_sources):
+            if subds_path is not None:
+                with open(self._get_source_fname(subds_path), 'rb') as f:
+                    records = json.loads(f.read().decode('ascii'))
+            for r in records:
+                node_id = r.get('@id', None)
+                if node_id is None or node_id not in nodes:
+                    order.append(r)
+                    if node_id is not None:
+                        nodes[node_id] = r
+                else:
+                    _merge_record(nodes[node_id], r)
+        # we are presently only dealing with datasets
+        records = sorted(
+            [r for r in order
+             if r.get('type', r.get('schema:type', None)) == 'Dataset'],
+            key=_get_sort_key)
+        self._write(records)
+        state['top'] = top
+        _atomic_write(opj(self.path, 'state.json'), _dump_json(state))
+        return True
+
+    def _write(self, records):
+        offsets = []
+        content = []
+        postings = {}
+        pos = 0
+        for i, r in enumerate(records):
+            line = _dump_json(r) + b'\n'
+            offsets.append(pos)
+            pos += len(line)
+            content.append(line)
+            for k, v in iteritems(r):
+                postings.setdefault(k, {}).setdefault(
+                    _as_searchable(v), []).append(i)
+        offsets.append(pos)
+        fields = {}
+        postings_content = []
+        pos = 0
+        for k in sorted(postings):
+            start = pos
+            for v, ids in sorted(postings[k].items()):
+                line = b'\t'.join((
+                    _dump_json(k), _dump_json(v),
+                    ','.join(map(str, ids)).encode('ascii'))) + b'\n'
+                pos += len(line)
+                postings_content.append(line)
+            fields[k] = [start, pos]
+        _atomic_write(opj(self.path, 'records.jsonl'), b''.join(content))
+        _atomic_write(
+            opj(self.path, 'records.offsets'),
+            struct.pack(_OFFSETS_FORMAT % len(offsets), *offsets))
+        _atomic_write(opj(self.path, 'postings'), b''.join(postings_content))
+        _atomic_write(opj(self.path, 'fields.json'), _dump_json(fields))
+        self._fields = None
+
+    @property
+    def fields(self):
+        """Names of all the fields (properties) in the index"""
+        if self._fields is None:
+            with open(opj(self.path, 'fields.json'), 'rb') as f:
+                self._fields = json.loads(f.read().decode('ascii'))
+        return self._fields
+
+    def _map(self, name):
+        fname = opj(self.path, name)
+        if not os.path.getsize(fname):
+            # cannot mmap an empty file
+            return None
+        with open(fname, 'rb') as f:
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def _iter_postings(self, search=None):
+        """Yield (field, value, ids) of the fields (any, if `search` is None)"""
+        mm = self._map('postings')
+        if mm is None:
+            return
+        try:
+            for field, (start, end) in sorted(
+                    self.fields.items(), key=lambda x: x[1]):
+                if search and field.lower() not in search:
+                    continue
+                for line in mm[start:end].split(b'\n'):
+                    if not line:
+                        continue
+                    _, value, ids = line.split(b'\t')
+                    yield field, json.loads(value.decode('ascii')), \
+                        [int(i) for i in ids.split(b',')]
+        finally:
+            mm.close()
+
+    def query(self, match, regex=False, search=None):
+        """Find records which match all `match` strings in any of their fields
+
+        Parameters
+        ----------
+        match : list of str
+          Strings to search for (case-insensitive) in the values, or regular
+          expressions if `regex` is True
+        regex : bool
+        search : set of str, optional
+          Lower-case names of the fields to search in.  All, if not given.
+
+        Yields
+        ------
+        dict, set
+          Matching record and the names of its fields which had a match,
+          in the order of records' locations
+        """
+        matchers = [
+            re.compile(match_).search
+            if regex
+            else _get_in_matcher(match_)
+            for match_ in match
+        ]
+        hits = [set() for m in matchers]
+        matched_fields = {}
+        for field, value, ids in self._iter_postings(search):
+            for imatcher, matcher in enumerate(matchers):
+                if matcher(value):
+                    hits[imatcher].update(ids)
+                    for i in ids:
+                        matched_fields.setdefault(i, set()).add(field)
+        ids = set.intersection(*hits) if hits else set()
+        if not ids:
+            return
+
+        with open(opj(self.path, 'records.offsets'), 'rb') as f:
+            offsets = f.read()
+        mm = self._map('records.jsonl')
+        try:
+            for i in sorted(ids):
+                start, end = struct.unpack_from(
+                    _OFFSETS_FORMAT % 2, offsets, i * _OFFSET_SIZE)
+                record = json.loads(mm[start:end].decode('ascii'))
+                yield record, matched_fields[i]
+        finally:
+            mm.close()
@@ -9,13 +9,18 @@
 # ## ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ##
 """Some additional tests for search command (some are within test_base)"""
 
+from os.path import join as opj
+from os.path import getsize
+
 from mock import patch
 from datalad.api import Dataset, install
 from nose.tools import assert_equal, assert_raises
+from nose.tools import assert_true, assert_false
 from datalad.utils import chpwd
 from datalad.tests.utils import assert_in
 from datalad.tests.utils import assert_is_generator
 from datalad.tests.utils import with_tempfile
+from datalad.tests.utils import with_tree
 from datalad.tests.utils import with_testsui
 from datalad.tests.utils import SkipTest
 from datalad.support.exceptions import NoDatasetArgumentFound
@@ -153,3 +158,85 @@ def test_search_non_dataset(tdir):
         list(search('smth', dataset=tdir))
     # Should instruct user how that repo could become a datalad dataset
     assert_in("datalad create --force", str(cme.exception))
+
+
+def test_merge_record():
+    from datalad.metadata.search_index import _merge_record
+    rec = {'@id': 'a', 'name': 'x', 'keywords': ['k1']}
+    _merge_record(rec, {'@id': 'a', 'name': 'x', 'location': 'sub'})
+    _merge_record(rec, {'@id': 'a', 'keywords': ['k1', 'k2']})
+    assert_equal(rec, {'@id': 'a', 'name': 'x', 'location': 'sub',
+                       'keywords': ['k1', 'k2']})
+    _merge_record(rec, {'name': 'y'})
+    assert_equal(rec['name'], ['x', 'y'])
+
+
+def _flatten_without_context(meta):
+    return {'@graph': [{k: v for k, v in m.items() if k != '@context'}
+                       for m in meta]}
+
+
+@with_tree(tree={
+    '.datalad': {'meta': {
+        'sub': {'meta.json': '[{"@id": "SUB", "type": "Dataset", '
+                             '"name": "child", "location": "sub"}]'},
+        'other': {'meta.json': '[{"@id": "OTHER", "type": "Dataset", '
+                               '"name": "Other child", "location": "other"}]'},
+    }}})
+def test_search_index(path):
+    from datalad.metadata import search_index
+
+    class FakeRepo(object):
+        def get_hexsha(self):
+            return 'deadbeef'
+
+    class FakeDataset(object):
+        id = 'TOP'
+        repo = FakeRepo()
+    ds = FakeDataset()
+    ds.path = path
+
+    index = search_index.MetadataSearchIndex(ds, opj(path, 'index'))
+    with patch.object(search_index, 'flatten_metadata_graph',
+                      _flatten_without_context), \
+            patch.object(search_index, 'get_metadata',
+                         return_value=[{'@id': 'TOP', 'type': 'Dataset',
+                                        'name': 'mother'}]) as get_metadata:
+        assert_true(index.update())
+        # nothing changed
+        assert_false(index.update())
+        assert_equal(get_metadata.call_count, 1)
+
+        def query(*args, **kwargs):
+            return [(r.get('location'), sorted(f))
+                    for r, f in index.query(*args, **kwargs)]
+
+        # sorted by location
+        assert_equal(query(['child']),
+                     [('other', ['name']), ('sub', ['name'])])
+        assert_equal(query(['CHILD', 'other']),
+                     [('other', ['@id', 'location', 'name'])])
+        assert_equal(query(['^child'], regex=True), [('sub', ['name'])])
+        assert_equal(query(['o'], search={'location'}), [('other', ['location'])])
+        assert_equal(query(['nothing']), [])
+        assert_in('name', index.fields)
+        # the top dataset itself has no location
+        assert_equal(query(['TOP'], search={'@id'}), [(None, ['@id'])])
+
+        # change meta data of a single subdataset
+        with open(opj(path, '.datalad', 'meta', 'sub', 'meta.json'), 'w') as f:
+            f.write('[{"@id": "SUB", "type": "Dataset", "name": "kid", '
+                    '"location": "sub"}]')
+        with patch.object(search_index, '_flatten_records',
+                          wraps=search_index._flatten_records) as flatten:
+            assert_true(index.update())
+            # only the changed subdataset and the top dataset got processed
+            assert_equal(flatten.call_count, 2)
+        assert_equal(query(['child']), [('other', ['name'])])
+        assert_equal(query(['kid']), [('sub', ['name'])])
+        # offsets are stored platform-independently as 64bit integers, one
+        # per record and one past the last record
+        with open(opj(path, 'index', 'records.jsonl')) as f:
+            nrecords = len(f.readlines())
+        assert_equal(getsize(opj(path, 'index', 'records.offsets')),
+                     8 * (nrecords + 1))
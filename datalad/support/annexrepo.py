@@ -16,12 +16,17 @@ import json
 import logging
 import math
 import os
+import posixpath
 import re
 import shlex
 import tempfile
+import threading
 import time
 
+from collections import namedtuple
 from itertools import chain
+from itertools import islice
+from os import curdir
 from os import linesep
 from os import unlink
 from os.path import join as opj
@@ -34,11 +39,13 @@ from os.path import isabs
 from os.path import relpath
 from os.path import normpath
 from subprocess import Popen, PIPE
+from multiprocessing import cpu_count
 from weakref import WeakValueDictionary
 
 from six import string_types
 from six import iteritems
 from six.moves import filter
+from six.moves import queue
 from git import InvalidGitRepositoryError
 
 from datalad import ssh_manager
@@ -46,20 +53,23 @@ from datalad.dochelpers import exc_str
 from datalad.dochelpers import borrowdoc
 from datalad.dochelpers import borrowkwargs
 from datalad.utils import linux_distribution_name
-from datalad.utils import nothing_cm
 from datalad.utils import auto_repr
 from datalad.utils import on_windows
 from datalad.utils import swallow_logs
 from datalad.utils import assure_list
 from datalad.utils import _path_
 from datalad.cmd import GitRunner
+from datalad.cmd import generate_file_chunks
+from datalad.cmd import run_chunked
 
 # imports from same module:
 from .repo import RepoInterface
+from .gitrepo import GitCatFile
 from .gitrepo import GitRepo
 from .gitrepo import NoSuchPathError
 from .gitrepo import normalize_path
 from .gitrepo import normalize_paths
+from .gitrepo import _normalize_path
 from .gitrepo import GitCommandError
 from .gitrepo import to_options
 from . import ansi_colors
@@ -243,7 +253,12 @@ class AnnexRepo(GitRepo, RepoInterface):
                 # to use 'git annex unlock' instead.
                 lgr.warning("direct mode not available for %s. Ignored." % self)
 
-        self._batched = BatchedAnnexes(batch_size=batch_size)
+        self._batched = BatchedAnnexes(
+            batch_size=batch_size,
+            window=self.config.obtain('datalad.annex.batch-window'),
+            workers=self.config.obtain('datalad.annex.batch-workers'))
+        # (stamp, ContentSnapshot) of the entire tree
+        self._content_snapshot = None
 
         # set default backend for future annex commands:
         # TODO: Should the backend option of __init__() also migrate
@@ -921,7 +936,7 @@ class AnnexRepo(GitRepo, RepoInterface):
         return "<AnnexRepo path=%s (%s)>" % (self.path, type(self))
 
     def _run_annex_command(self, annex_cmd, git_options=None, annex_options=None,
-                           backend=None, jobs=None, **kwargs):
+                           backend=None, jobs=None, files=None, **kwargs):
         """Helper to run actual git-annex calls
 
         Unifies annex command calls.
@@ -939,6 +954,11 @@ class AnnexRepo(GitRepo, RepoInterface):
             achieved by having an item '--backend=XXX' in annex_options.
             This may change.
         jobs : int
+        files: list of str, optional
+            files to be passed to the git-annex command after the options.
+            If there are too many to be passed on a single command line,
+            the command is invoked multiple times for chunks of them (in
+            parallel for the commands which do not modify anything)
         **kwargs
             these are passed as additional kwargs to datalad.cmd.Runner.run()
 
@@ -947,6 +967,25 @@ class AnnexRepo(GitRepo, RepoInterface):
         CommandNotAvailableError
             if an annex command call returns "unknown command"
         """
+        cmd_list = self._get_annex_cmd_list(
+            annex_cmd, git_options=git_options, annex_options=annex_options,
+            backend=backend, jobs=jobs)
+
+        try:
+            return run_chunked(
+                lambda cmd: self.cmd_call_wrapper.run(cmd, **kwargs),
+                cmd_list, files or [],
+                jobs=self._get_chunk_jobs(annex_cmd))
+        except CommandError as e:
+            self._raise_if_unknown_command(annex_cmd, cmd_list, e)
+            raise e
+
+    def _get_annex_cmd_list(self, annex_cmd, git_options=None,
+                            annex_options=None, backend=None, jobs=None):
+        """Compose full command line for a git-annex call
+
+        See `_run_annex_command` for the description of the parameters.
+        """
         debug = ['--debug'] if lgr.getEffectiveLevel() <= logging.DEBUG else []
         backend = ['--backend=%s' % backend] if backend else []
 
@@ -965,18 +1004,58 @@ class AnnexRepo(GitRepo, RepoInterface):
         if jobs:
             annex_options += ['-J%d' % jobs]
 
-        cmd_list += [annex_cmd] + backend + debug + annex_options
+        return cmd_list + [annex_cmd] + backend + debug + annex_options
 
-        try:
-            return self.cmd_call_wrapper.run(cmd_list, **kwargs)
-        except CommandError as e:
-            if e.stderr and "git-annex: Unknown command '%s'" % annex_cmd in e.stderr:
-                raise CommandNotAvailableError(str(cmd_list),
-                                               "Unknown command:"
-                                               " 'git-annex %s'" % annex_cmd,
-                                               e.code, e.stdout, e.stderr)
-            else:
-                raise e
+    # git-annex commands which do not modify anything, so could be invoked
+    # for multiple chunks of files in parallel
+    _READONLY_COMMANDS = {'find', 'info', 'lookupkey', 'whereis'}
+
+    def _get_chunk_jobs(self, annex_cmd):
+        """How many invocations for chunks of files could run in parallel"""
+        if annex_cmd not in self._READONLY_COMMANDS:
+            return None
+        return min(cpu_count(), 8)
+
+    @staticmethod
+    def _raise_if_unknown_command(annex_cmd, cmd_list, e):
+        if e.stderr and "git-annex: Unknown command '%s'" % annex_cmd in e.stderr:
+            raise CommandNotAvailableError(str(cmd_list),
+                                           "Unknown command:"
+                                           " 'git-annex %s'" % annex_cmd,
+                                           e.code, e.stdout, e.stderr)
+
+    def _yield_annex_command(self, annex_cmd, git_options=None,
+                             annex_options=None, backend=None, jobs=None,
+                             files=None, **kwargs):
+        """Same as `_run_annex_command` but yielding lines of stdout as they come
+
+        Chunks of `files` are processed one after another.  If an invocation
+        fails, remaining chunks are still processed, and CommandError with
+        stderr of all failed invocations is raised at the end.
+
+        `**kwargs` are passed to `datalad.cmd.Runner.run_gen()`.
+        """
+        cmd_list = self._get_annex_cmd_list(
+            annex_cmd, git_options=git_options, annex_options=annex_options,
+            backend=backend, jobs=jobs)
+        chunks = list(generate_file_chunks(files, cmd_list)) if files else [[]]
+        failed = []
+        for chunk in chunks:
+            try:
+                for line in self.cmd_call_wrapper.run_gen(
+                        cmd_list + chunk, **kwargs):
+                    yield line
+            except CommandError as e:
+                self._raise_if_unknown_command(annex_cmd, cmd_list, e)
+                failed.append(e)
+        if len(failed) == 1:
+            raise failed[0]
+        elif failed:
+            e = failed[-1]
+            raise CommandError(
+                cmd=e.cmd, msg=e.msg, code=e.code,
+                stdout=''.join(e_.stdout or '' for e_ in failed),
+                stderr=''.join(e_.stderr or '' for e_ in failed))
 
     def _run_simple_annex_command(self, *args, **kwargs):
         """Run an annex command and return its output, of which expect 1 line
@@ -1185,7 +1264,8 @@ class AnnexRepo(GitRepo, RepoInterface):
         self.config.reload()
 
     @normalize_paths
-    def get(self, files, remote=None, options=None, jobs=None):
+    def get(self, files, remote=None, options=None, jobs=None, stream=False,
+            expected_downloads=None):
         """Get the actual content of files
 
         Parameters
@@ -1198,6 +1278,12 @@ class AnnexRepo(GitRepo, RepoInterface):
             commandline options for the git annex get command
         jobs : int, optional
             how many jobs to run in parallel (passed to git-annex call)
+        stream : bool, optional
+            If True, return a generator yielding results as git-annex reports
+            them.  Use only with a list of `files`.
+        expected_downloads : dict, optional
+            key -> size of `files`, if they were already determined to need
+            fetching by `get_expected_downloads`
 
         Returns
         -------
@@ -1218,9 +1304,11 @@ class AnnexRepo(GitRepo, RepoInterface):
         # analyze provided files to decide which actually are needed to be
         # fetched
 
-        if '--key' not in options:
-            expected_downloads, fetch_files = self._get_expected_files(
-                files, ['--not', '--in', 'here'])
+        if expected_downloads is not None:
+            fetch_files = files
+        elif '--key' not in options:
+            expected_downloads, fetch_files = self.get_expected_downloads(
+                files)
         else:
             fetch_files = files
             assert(len(files) == 1)
@@ -1236,30 +1324,38 @@ class AnnexRepo(GitRepo, RepoInterface):
         # options  might be the '--key' which should go last
         options = ['--json-progress'] + options
 
-        # Note: Currently swallowing logs, due to the workaround to report files
+        # Note: Failures are expected, due to the workaround to report files
         # not found, but don't fail and report about other files and use JSON,
         # which are contradicting conditions atm. (See _run_annex_command_json)
-
-        # YOH:  oh -- this puts quite a bit of stress on the pipe since now
-        # annex runs in --debug mode spitting out shits load of information.
-        # Since nothing was hardcoded in tests, have no clue what was expected
-        # effect.  I will swallow the logs so they don't scare the user, but only
-        # in non debugging level of logging
-        cm = swallow_logs() \
-            if lgr.getEffectiveLevel() > logging.DEBUG \
-            else nothing_cm()
+        # So they are logged at DEBUG level only and not scare the user.
         # TODO: provide more meaningful message (possibly aggregating 'note'
         #  from annex failed ones
-        with cm:
-            results = self._run_annex_command_json(
-                'get',
-                args=options + fetch_files,
-                jobs=jobs,
-                expected_entries=expected_downloads)
-        results_list = list(results)
+        results = self._yield_annex_command_json(
+            'get',
+            args=options,
+            files=fetch_files,
+            jobs=jobs,
+            expected_entries=expected_downloads,
+            expect_stderr=True,
+            expect_fail=True)
+        if stream:
+            return results
         # TODO:  should we here compare fetch_files against result_list
         # and vomit an exception of incomplete download????
-        return results_list
+        return list(results)
+
+    @normalize_paths
+    def get_expected_downloads(self, files):
+        """Figure out which files need their content to be fetched
+
+        Returns
+        -------
+        expected_downloads : dict
+          key -> size
+        fetch_files : list
+          files to be fetched
+        """
+        return self._get_expected_files(files, ['--not', '--in', 'here'])
 
     def _get_expected_files(self, files, expr):
         """Given a list of files, figure out what to be downloaded
@@ -1284,8 +1380,8 @@ class AnnexRepo(GitRepo, RepoInterface):
         keys_seen = set()
         unknown_sizes = []  # unused atm
         # for now just record total size, and
-        for j in self._run_annex_command_json(
-                'find', args=['--json'] + expr + files
+        for j in self._yield_annex_command_json(
+                'find', args=expr, files=files
         ):
             # TODO: some files might not even be here.  So in current fancy
             # output reporting scheme we should then theoretically handle
@@ -1449,7 +1545,8 @@ class AnnexRepo(GitRepo, RepoInterface):
             else:
                 return_list = list(self._run_annex_command_json(
                     'add',
-                    args=options + files,
+                    args=options,
+                    files=files,
                     backend=backend,
                     expect_fail=True,
                     jobs=jobs,
@@ -1579,7 +1676,7 @@ class AnnexRepo(GitRepo, RepoInterface):
         """
 
         options = options[:] if options else []
-        self._run_annex_command('lock', annex_options=files + options)
+        self._run_annex_command('lock', annex_options=options, files=files)
         # note: there seems to be no output by annex if success.
 
     @normalize_paths
@@ -1610,7 +1707,8 @@ class AnnexRepo(GitRepo, RepoInterface):
 
         else:
             std_out, std_err = \
-                self._run_annex_command('unlock', annex_options=files + options)
+                self._run_annex_command('unlock', annex_options=options,
+                                        files=files)
 
             return [line.split()[1]
                     for line in std_out.splitlines()
@@ -1662,7 +1760,8 @@ class AnnexRepo(GitRepo, RepoInterface):
         options = options[:] if options else []
 
         std_out, std_err = self._run_annex_command('unannex',
-                                                   annex_options=files + options)
+                                                   annex_options=options,
+                                                   files=files)
         return [line.split()[1] for line in std_out.splitlines()
                 if line.split()[0] == 'unannex' and line.split()[-1] == 'ok']
 
@@ -2028,7 +2127,7 @@ class AnnexRepo(GitRepo, RepoInterface):
         return self.whereis(file_, output='full', batch=batch)[AnnexRepo.WEB_UUID]['urls']
 
     @normalize_paths
-    def drop(self, files, options=None, key=False, jobs=None):
+    def drop(self, files, options=None, key=False, jobs=None, stream=False):
         """Drops the content of annexed files from this repository.
 
         Drops only if possible with respect to required minimal number of
@@ -2042,6 +2141,9 @@ class AnnexRepo(GitRepo, RepoInterface):
             commandline options for the git annex drop command
         jobs : int, optional
             how many jobs to run in parallel (passed to git-annex call)
+        stream : bool, optional
+            If True (and not `key`), return a generator yielding results as
+            git-annex reports them.  Use only with a list of `files`.
 
         Returns
         -------
@@ -2079,10 +2181,12 @@ class AnnexRepo(GitRepo, RepoInterface):
             else:
                 return res
         else:
-            return self._run_annex_command_json(
+            results = self._yield_annex_command_json(
                 'drop',
-                args=options + files,
+                args=options,
+                files=files,
                 jobs=jobs)
+            return results if stream else list(results)
 
     def drop_key(self, keys, options=None, batch=False):
         """Drops the content of annexed files from this repository referenced by keys
@@ -2122,11 +2226,14 @@ class AnnexRepo(GitRepo, RepoInterface):
         return remotes
 
     def _run_annex_command_json(self, command, args=None, jobs=None,
-                                expected_entries=None, **kwargs):
+                                expected_entries=None, files=None, **kwargs):
         """Run an annex command with --json and load output results into a tuple of dicts
 
         Parameters
         ----------
+        files : list of str, optional
+          Passed to `_run_annex_command`, i.e. appended after `args` in as
+          many invocations as needed
         expected_entries : dict, optional
           If provided `filename/key: size` dictionary, will be used to create
           ProcessAnnexProgressIndicators to display progress
@@ -2152,41 +2259,13 @@ class AnnexRepo(GitRepo, RepoInterface):
             out, err = self._run_annex_command(
                 command,
                 annex_options=annex_options,
+                files=files,
                 **kwargs)
         except CommandError as e:
             # Note: A call might result in several 'failures', that can be or
             # cannot be handled here. Detection of something, we can deal with,
             # doesn't mean there's nothing else to deal with.
-
-            # OutOfSpaceError:
-            # Note:
-            # doesn't depend on anything in stdout. Therefore check this before
-            # dealing with stdout
-            out_of_space_re = re.search(
-                "not enough free space, need (.*) more", e.stderr
-            )
-            if out_of_space_re:
-                raise OutOfSpaceError(cmd="annex %s" % command,
-                                      sizemore_msg=out_of_space_re.groups()[0])
-
-            # RemoteNotAvailableError:
-            remote_na_re = re.search(
-                "there is no available git remote named \"(.*)\"", e.stderr
-            )
-            if remote_na_re:
-                raise RemoteNotAvailableError(cmd="annex %s" % command,
-                                              remote=remote_na_re.groups()[0])
-
-            # TEMP: Workaround for git-annex bug, where it reports success=True
-            # for annex add, while simultaneously complaining, that it is in
-            # a submodule:
-            # TODO: For now just reraise. But independently on this bug, it
-            # makes sense to have an exception for that case
-            in_subm_re = re.search(
-                "fatal: Pathspec '(.*)' is in submodule '(.*)'", e.stderr
-            )
-            if in_subm_re:
-                raise e
+            not_existing = self._check_annex_json_error(command, e)
 
             # Note: try to approach the covering of potential annex failures
             # in a more general way:
@@ -2200,14 +2279,6 @@ class AnnexRepo(GitRepo, RepoInterface):
             else:
                 out = None
 
-            # Note: Workaround for not existing files as long as annex doesn't
-            # report it within JSON response:
-            # see http://git-annex.branchable.com/bugs/copy_does_not_reflect_some_failed_copies_in_--json_output/
-            not_existing = [
-                line.split()[1] for line in e.stderr.splitlines()
-                if line.startswith('git-annex:') and
-                   line.endswith('not found')
-            ]
             if not_existing:
                 if out is None:
                     # we create the error reporting herein. If all files were
@@ -2217,11 +2288,8 @@ class AnnexRepo(GitRepo, RepoInterface):
                 if not out.endswith(linesep):
                     out += linesep
                 out += linesep.join(
-                    ['{{"command": "{cmd}", "file": "{path}", '
-                     '"note": "{note}",'
-                     '"success":false}}'.format(
-                         cmd=command, path=f, note="not found")
-                     for f in not_existing])
+                    json.dumps(self._get_not_found_record(command, f))
+                    for f in not_existing)
 
             # Note: insert additional code here to analyse failure and possibly
             # raise a custom exception
@@ -2245,6 +2313,125 @@ class AnnexRepo(GitRepo, RepoInterface):
         json_objects = [j for j in json_objects if 'byte-progress' not in j]
         return json_objects
 
+    def _yield_annex_command_json(self, command, args=None, jobs=None,
+                                  expected_entries=None, files=None, **kwargs):
+        """Same as `_run_annex_command_json` but yield records as they come
+
+        Records are parsed as git-annex emits them, so the output of commands
+        operating on many files is never collected in memory.  Lines with
+        progress information are passed to ProcessAnnexProgressIndicators
+        (if `expected_entries` are provided) and are not yielded.
+
+        Parameters
+        ----------
+        expected_entries : dict, optional
+          If provided `filename/key: size` dictionary, will be used to create
+          ProcessAnnexProgressIndicators to display progress
+        files : list of str, optional
+          Passed to `_yield_annex_command`
+        **kwargs
+          Passed to `_yield_annex_command`
+        """
+        progress_indicators = ProcessAnnexProgressIndicators(
+            expected=expected_entries) if expected_entries else None
+        annex_options = ['--json']
+        if jobs:
+            annex_options += ['-J%d' % jobs]
+        if args:
+            annex_options += args
+        # are we (still) dealing with the usual JSON output only?
+        all_json = True
+        nrecords = 0
+        try:
+            for line in self._yield_annex_command(
+                    command, annex_options=annex_options, files=files,
+                    **kwargs):
+                if progress_indicators:
+                    line = progress_indicators(line)
+                    if line is None:
+                        # was a progress report, swallowed
+                        continue
+                line = line.rstrip()
+                if not line.startswith('{'):
+                    all_json = all_json and not line
+                    continue
+                j = json.loads(line)
+                # protect against progress leakage
+                if 'byte-progress' in j:
+                    continue
+                nrecords += 1
+                yield j
+        except CommandError as e:
+            not_existing = self._check_annex_json_error(command, e)
+            for f in not_existing:
+                yield self._get_not_found_record(command, f)
+            # see _run_annex_command_json on when we raise
+            if not not_existing and (not all_json or
+                                     (not nrecords and e.stderr)):
+                raise e
+        finally:
+            if progress_indicators:
+                progress_indicators.finish()
+
+    @staticmethod
+    def _check_annex_json_error(command, e):
+        """Analyze failed annex --json command and raise if it is known how
+
+        Parameters
+        ----------
+        command : str
+          git-annex command which failed
+        e : CommandError
+
+        Returns
+        -------
+        list of str
+          Files reported by annex as not found
+        """
+        # OutOfSpaceError:
+        # Note:
+        # doesn't depend on anything in stdout. Therefore check this before
+        # dealing with stdout
+        out_of_space_re = re.search(
+            "not enough free space, need (.*) more", e.stderr
+        )
+        if out_of_space_re:
+            raise OutOfSpaceError(cmd="annex %s" % command,
+                                  sizemore_msg=out_of_space_re.groups()[0])
+
+        # RemoteNotAvailableError:
+        remote_na_re = re.search(
+            "there is no available git remote named \"(.*)\"", e.stderr
+        )
+        if remote_na_re:
+            raise RemoteNotAvailableError(cmd="annex %s" % command,
+                                          remote=remote_na_re.groups()[0])
+
+        # TEMP: Workaround for git-annex bug, where it reports success=True
+        # for annex add, while simultaneously complaining, that it is in
+        # a submodule:
+        # TODO: For now just reraise. But independently on this bug, it
+        # makes sense to have an exception for that case
+        in_subm_re = re.search(
+            "fatal: Pathspec '(.*)' is in submodule '(.*)'", e.stderr
+        )
+        if in_subm_re:
+            raise e
+
+        # Note: Workaround for not existing files as long as annex doesn't
+        # report it within JSON response:
+        # see http://git-annex.branchable.com/bugs/copy_does_not_reflect_some_failed_copies_in_--json_output/
+        return [
+            line.split()[1] for line in e.stderr.splitlines()
+            if line.startswith('git-annex:') and
+               line.endswith('not found')
+        ]
+
+    @staticmethod
+    def _get_not_found_record(command, path):
+        return {"command": command, "file": path, "note": "not found",
+                "success": False}
+
     # TODO: reconsider having any magic at all and maybe just return a list/dict always
     @normalize_paths
     def whereis(self, files, output='uuids', key=False, options=None, batch=False):
@@ -2297,7 +2484,11 @@ class AnnexRepo(GitRepo, RepoInterface):
         options = assure_list(options, copy=True)
         options += ["--key"] if key else []
 
-        json_objects = self._run_annex_command_json('whereis', args=options + files)
+        # --key takes a single key, so cannot be chunked along with files
+        json_objects = self._yield_annex_command_json(
+            'whereis', args=options + files) if key else \
+            self._yield_annex_command_json(
+                'whereis', args=options, files=files)
         if output in {'descriptions', 'uuids'}:
             return [
                 [remote.get(output[:-1]) for remote in j.get('whereis')]
@@ -2337,7 +2528,8 @@ class AnnexRepo(GitRepo, RepoInterface):
         options = ['--bytes', '--fast'] if fast else ['--bytes']
 
         if not batch:
-            json_objects = self._run_annex_command_json('info', args=options + files)
+            json_objects = self._run_annex_command_json(
+                'info', args=options, files=files)
         else:
             json_objects = self._batched.get(
                 'info',
@@ -2396,6 +2588,115 @@ class AnnexRepo(GitRepo, RepoInterface):
         # TODO: JSON
         return out.splitlines()
 
+    def _get_content_snapshot_stamp(self):
+        """Return what a snapshot of the content of the tree depends on
+
+        Returns None if a snapshot should not be cached, since files changed
+        too recently to tell a subsequent change by their mtime.
+        """
+        from datalad.distribution.utils import get_git_dir
+        git_dir = opj(self.path, get_git_dir(self.path))
+        stamp = [self.get_hexsha()]
+        # index of the tree, and of the git-annex branch and its journal,
+        # which get updated whenever content is obtained or dropped
+        for fname in (opj(git_dir, 'index'),
+                      opj(git_dir, 'annex', 'index'),
+                      opj(git_dir, 'annex', 'journal')):
+            try:
+                st = os.stat(fname)
+            except OSError:
+                stamp.append(None)
+                continue
+            if time.time() - st.st_mtime < 2:
+                # mtime resolution could be as coarse as 2 sec
+                return None
+            stamp.append((st.st_mtime, st.st_size, st.st_ino))
+        return tuple(stamp)
+
+    def get_content_snapshot(self, paths=None):
+        """Get the key, size and presence of content of all files at once
+
+        Instead of querying files one by one, all files tracked in the index
+        (under `paths`) are listed by a single `git ls-files`, and keys of the
+        annexed ones are read from their symlinks (or pointer files) by the
+        persistent `git cat-file` process.  Presence of content of locked
+        files is deduced from their symlinks, so git-annex gets called (once)
+        only for unlocked files, or if in direct mode.
+
+        A snapshot of the entire tree is cached for as long as HEAD, the
+        index and the state of the git-annex branch remain unchanged, and
+        snapshots for `paths` are then selected from it.
+
+        Parameters
+        ----------
+        paths : list of str, optional
+          Files or directories to limit the snapshot to
+
+        Returns
+        -------
+        ContentSnapshot
+        """
+        if paths is not None:
+            # as git reports them
+            paths = [_normalize_path(self.path, p).replace(os.sep, '/')
+                     for p in assure_list(paths)]
+        stamp = self._get_content_snapshot_stamp()
+        if stamp is not None and self._content_snapshot \
+                and self._content_snapshot[0] == stamp:
+            snapshot = self._content_snapshot[1]
+            return snapshot if paths is None else snapshot.select(paths)
+
+        snapshot = self._sweep_content(paths)
+        if paths is None and stamp is not None:
+            self._content_snapshot = (stamp, snapshot)
+        return snapshot
+
+    def _sweep_content(self, paths=None):
+        """Build a ContentSnapshot from the index (see get_content_snapshot)"""
+        out, _ = self._git_custom_command(
+            paths or [], ['git', 'ls-files', '--stage', '-z', '--'])
+        # pointer files of unlocked files are only in v6 repositories
+        check_pointers = int(self.config.get("annex.version", 0)) >= 6
+        direct = self.is_direct_mode()
+        snapshot = ContentSnapshot()
+        # annexed files with presence of content to be asked from annex
+        unverified = []
+        for entry in out.split('\0'):
+            if not entry:
+                continue
+            info, path = entry.split('\t', 1)
+            mode, hexsha, stage = info.split(' ')
+            if path in snapshot or mode == GitCatFile.MODE_GITLINK:
+                # other stages of a conflict, or a subdataset
+                continue
+            key = None
+            if mode == '120000':
+                target = self.cat_file.read(hexsha)[2].decode('utf-8')
+                if 'annex/objects/' in target:
+                    key = posixpath.basename(target)
+            elif check_pointers:
+                obj_info = self.cat_file.info(hexsha)
+                if obj_info and obj_info[2] < 1024:
+                    content = self.cat_file.read(hexsha)[2]
+                    if content.startswith(b'/annex/objects/'):
+                        key = posixpath.basename(
+                            content.decode('utf-8').strip())
+            if key is None:
+                has_content = False
+            elif mode == '120000' and not direct:
+                # locked file: symlink is broken unless content is present
+                has_content = exists(opj(self.path, path))
+            else:
+                has_content = False
+                unverified.append(path)
+            snapshot.append(path, key, has_content)
+        if unverified:
+            for j in self._yield_annex_command_json(
+                    'find', args=['--in', 'here'], files=unverified):
+                if j.get('file') in snapshot:
+                    snapshot.has_content[snapshot.index(j['file'])] = True
+        return snapshot
+
     def get_preferred_content(self, property, remote=None):
         """Get preferred content configuration of a repository or remote
 
@@ -2836,21 +3137,17 @@ class AnnexRepo(GitRepo, RepoInterface):
         if options:
             annex_options.extend(shlex.split(options))
 
-        cm = swallow_logs() \
-            if lgr.getEffectiveLevel() > logging.DEBUG \
-            else nothing_cm()
         # TODO: provide more meaningful message (possibly aggregating 'note'
         #  from annex failed ones
-        with cm:
-            results = self._run_annex_command_json(
-                'copy',
-                args=annex_options + copy_files,
-                jobs=jobs,
-                expected_entries=expected_copys
-                #log_stdout=True, log_stderr=not log_online,
-                #log_online=log_online, expect_stderr=True
-            )
-        results_list = list(results)
+        results_list = list(self._yield_annex_command_json(
+            'copy',
+            args=annex_options,
+            files=copy_files,
+            jobs=jobs,
+            expected_entries=expected_copys,
+            expect_stderr=True,
+            expect_fail=True
+        ))
         # XXX this is the only logic different ATM from get
         # check if any transfer failed since then we should just raise an Exception
         # for now to guarantee consistent behavior with non--json output
@@ -2973,9 +3270,8 @@ class AnnexRepo(GitRepo, RepoInterface):
         if not files:
             return
         files = assure_list(files)
-        args = ['--json']
-        args.extend(files)
-        for res in self._run_annex_command_json('metadata', args):
+        for res in self._yield_annex_command_json(
+                'metadata', args=['--json'], files=files):
             yield (
                 res['file'],
                 res['fields'] if timestamps else \
@@ -3044,23 +3340,118 @@ class AnnexRepo(GitRepo, RepoInterface):
 
         if recursive:
             args.append('--force')
-        # append actual file path arguments
-        args.extend(assure_list(files))
-
-        for jsn in self._run_annex_command_json(
+        for jsn in self._yield_annex_command_json(
                 'metadata',
-                args):
+                args,
+                # actual file path arguments
+                files=assure_list(files)):
             yield jsn
 
 
+ContentRecord = namedtuple(
+    'ContentRecord',
+    ['path', 'key', 'size', 'backend', 'has_content', 'is_annexed'])
+
+
+class ContentSnapshot(object):
+    """Columnar table of the content of files of a repository
+
+    Values of each column are stored in a list (e.g. `snapshot.keys`), and
+    the table is indexed by the (relative, POSIX) paths of the files.  For files not
+    under annex `key`, `size` and `backend` are None, and `has_content` is
+    False, as `file_has_content` reports it.  Otherwise `size` is None only if
+    the key does not carry it.
+    """
+
+    def __init__(self):
+        self.paths = []
+        self.keys = []
+        self.sizes = []
+        self.backends = []
+        self.has_content = []
+        self._index = {}
+
+    def append(self, path, key=None, has_content=False):
+        self._index[path] = len(self.paths)
+        self.paths.append(path)
+        self.keys.append(key)
+        self.sizes.append(AnnexRepo.get_size_from_key(key) if key else None)
+        self.backends.append(key.split('-', 1)[0] if key else None)
+        self.has_content.append(has_content)
+
+    @property
+    def is_annexed(self):
+        return [k is not None for k in self.keys]
+
+    def index(self, path):
+        """Return the row of a file"""
+        return self._index[path]
+
+    def __len__(self):
+        return len(self.paths)
+
+    def __contains__(self, path):
+        return path in self._index
+
+    def __getitem__(self, path):
+        return self._get_record(self._index[path])
+
+    def get(self, path, default=None):
+        i = self._index.get(path)
+        return default if i is None else self._get_record(i)
+
+    def _get_record(self, i):
+        return ContentRecord(
+            self.paths[i], self.keys[i], self.sizes[i], self.backends[i],
+            self.has_content[i], self.keys[i] is not None)
+
+    def __iter__(self):
+        for i in range(len(self.paths)):
+            yield self._get_record(i)
+
+    def select(self, paths):
+        """Return a snapshot of only the files under any of the paths"""
+        if any(p in (curdir, '') for p in paths):
+            return self
+        prefixes = tuple(p.rstrip('/') + '/' for p in paths)
+        selected = ContentSnapshot()
+        for i, path in enumerate(self.paths):
+            if path in paths or path.startswith(prefixes):
+                selected._index[path] = len(selected.paths)
+                selected.paths.append(path)
+                selected.keys.append(self.keys[i])
+                selected.sizes.append(self.sizes[i])
+                selected.backends.append(self.backends[i])
+                selected.has_content.append(self.has_content[i])
+        return selected
+
+
 # TODO: Why was this commented out?
 # @auto_repr
 class BatchedAnnexes(dict):
     """Class to contain the registry of active batch'ed instances of annex for
     a repository
+
+    If `workers` > 1, read-only commands (see `_PARALLELIZABLE`) get a
+    `BatchedAnnexPool` of that many processes instead of a single
+    `BatchedAnnex`.
     """
-    def __init__(self, batch_size=0):
+
+    # annex commands which only query and thus could run in parallel
+    _PARALLELIZABLE = {
+        'checkpresentkey',
+        'contentlocation',
+        'examinekey',
+        'find',
+        'info',
+        'lookupkey',
+        'whereis',
+    }
+
+    def __init__(self, batch_size=0, window=None, workers=1):
         self.batch_size = batch_size
+        self.window = window
+        self.workers = workers or 1
         super(BatchedAnnexes, self).__init__()
 
     def get(self, codename, annex_cmd=None, **kwargs):
@@ -3084,10 +3475,20 @@ class BatchedAnnexes(dict):
         # END RF/BF
 
         if codename not in self:
-            # Create a new git-annex process we will keep around
-            self[codename] = BatchedAnnex(annex_cmd,
-                                          git_options=git_options,
-                                          **kwargs)
+            cmd = annex_cmd[0] if isinstance(annex_cmd, list) else annex_cmd
+            if self.workers > 1 and cmd in self._PARALLELIZABLE:
+                # Create a pool of git-annex processes to shard requests across
+                self[codename] = BatchedAnnexPool(annex_cmd,
+                                                  workers=self.workers,
+                                                  git_options=git_options,
+                                                  window=self.window,
+                                                  **kwargs)
+            else:
+                # Create a new git-annex process we will keep around
+                self[codename] = BatchedAnnex(annex_cmd,
+                                              git_options=git_options,
+                                              window=self.window,
+                                              **kwargs)
         return self[codename]
 
     def clear(self):
@@ -3138,11 +3539,19 @@ def readline_json(stdout):
 @auto_repr
 class BatchedAnnex(object):
     """Container for an annex process which would allow for persistent communication
+
+    Multiple requests could be pipelined (see `yield_`): up to `window`
+    requests are sent to the process ahead of reading their responses, which
+    are consumed by a reader thread in the order of the requests.
     """
 
+    # default number of requests to keep "in-flight" while pipelining
+    _DEFAULT_WINDOW = 64
+
     def __init__(self, annex_cmd, git_options=None, annex_options=None, path=None,
                  json=False,
-                 output_proc=None):
+                 output_proc=None,
+                 window=None):
         if not isinstance(annex_cmd, list):
             annex_cmd = [annex_cmd]
         self.annex_cmd = annex_cmd
@@ -3153,6 +3562,7 @@ class BatchedAnnex(object):
         if output_proc is None:
             output_proc = readline_json if json else readline_rstripped
         self.output_proc = output_proc
+        self.window = window if window else self._DEFAULT_WINDOW
         self._process = None
         self._stderr_out = None
         self._stderr_out_fname = None
@@ -3191,6 +3601,12 @@ class BatchedAnnex(object):
             lgr.warning("Restarting the process due to previous failure")
             self._initialize()
 
+    @staticmethod
+    def _format_entry(entry):
+        if not isinstance(entry, string_types):
+            entry = ' '.join(entry)
+        return entry + '\n'
+
     def __call__(self, cmds):
         """
 
@@ -3205,42 +3621,115 @@ class BatchedAnnex(object):
         str or list
           Output received from annex.  list in case if cmds was a list
         """
+        if isinstance(cmds, list):
+            # multiple requests get pipelined
+            return list(self.yield_(cmds))
+
         # TODO: add checks -- may be process died off and needs to be reinitiated
         if not self._process:
             self._initialize()
 
-        input_multiple = isinstance(cmds, list)
-        if not input_multiple:
-            cmds = [cmds]
-
-        output = []
-
-        for entry in cmds:
-            if not isinstance(entry, string_types):
-                entry = ' '.join(entry)
-            entry = entry + '\n'
-            lgr.log(5, "Sending %r to batched annex %s" % (entry, self))
-            # apparently communicate is just a one time show
-            # stdout, stderr = self._process.communicate(entry)
-            # according to the internet wisdom there is no easy way with subprocess
-            self._check_process(restart=True)
-            process = self._process  # _check_process might have restarted it
-            process.stdin.write(entry)  # .encode())
-            process.stdin.flush()
-            lgr.log(5, "Done sending.")
-            # TODO: somehow do catch stderr which might be there or not
-            #stderr = str(process.stderr) if process.stderr.closed else None
-            self._check_process(restart=False)
-            # We are expecting a single line output
-            # TODO: timeouts etc
-            #import pdb; pdb.set_trace()
-            stdout = self.output_proc(process.stdout) if not process.stdout.closed else None
-            #if stderr:
-            #    lgr.warning("Received output in stderr: %r" % stderr)
-            lgr.log(5, "Received output: %r" % stdout)
-            output.append(stdout)
+        entry = self._format_entry(cmds)
+        lgr.log(5, "Sending %r to batched annex %s" % (entry, self))
+        # apparently communicate is just a one time show
+        # stdout, stderr = self._process.communicate(entry)
+        # according to the internet wisdom there is no easy way with subprocess
+        self._check_process(restart=True)
+        process = self._process  # _check_process might have restarted it
+        process.stdin.write(entry)  # .encode())
+        process.stdin.flush()
+        lgr.log(5, "Done sending.")
+        # TODO: somehow do catch stderr which might be there or not
+        #stderr = str(process.stderr) if process.stderr.closed else None
+        self._check_process(restart=False)
+        # We are expecting a single line output
+        # TODO: timeouts etc
+        stdout = self.output_proc(process.stdout) if not process.stdout.closed else None
+        #if stderr:
+        #    lgr.warning("Received output in stderr: %r" % stderr)
+        lgr.log(5, "Received output: %r" % stdout)
+        return stdout
+
+    def _read_responses(self, process, pending, responses):
+        """Reader thread target: read a response for every pending request
+
+        A `None` within `pending` signals that no more requests will come.
+        Any exception from `output_proc` is passed along to be re-raised
+        within the consuming thread.
+        """
+        while True:
+            if pending.get() is None:
+                break
+            try:
+                out = self.output_proc(process.stdout) \
+                    if not process.stdout.closed else None
+                responses.put((out, None))
+            except Exception as exc:
+                responses.put((None, exc))
+
+    def yield_(self, cmds, window=None):
+        """Pipeline requests to annex, yielding responses in the same order
 
-        return output if input_multiple else output[0]
+        Up to `window` requests are written to the process before waiting
+        for the response to the earliest of them, so the throughput is not
+        bound by a round-trip per request.
+
+        Parameters
+        ----------
+        cmds : iterable of (str or tuple)
+          Requests to send.  Could be a generator, which would be consumed
+          only as fast as responses are coming back.
+        window : int, optional
+          Maximal number of requests awaiting a response.  If not specified,
+          the one given to the constructor is used.
+
+        Yields
+        ------
+        str or dict
+          Output (as processed by `output_proc`) for each request
+        """
+        window = window or self.window
+        if not self._process:
+            self._initialize()
+        self._check_process(restart=True)
+        process = self._process
+
+        pending = queue.Queue()
+        responses = queue.Queue()
+        reader = threading.Thread(
+            target=self._read_responses,
+            args=(process, pending, responses))
+        reader.daemon = True
+        reader.start()
+
+        def get_response():
+            out, exc = responses.get()
+            if exc is not None:
+                raise exc
+            lgr.log(5, "Received output: %r" % (out,))
+            return out
+
+        inflight = 0
+        try:
+            for entry in cmds:
+                if inflight >= window:
+                    inflight -= 1
+                    yield get_response()
+                entry = self._format_entry(entry)
+                lgr.log(5, "Sending %r to batched annex %s" % (entry, self))
+                process.stdin.write(entry)
+                process.stdin.flush()
+                pending.put(True)
+                inflight += 1
+            while inflight:
+                inflight -= 1
+                yield get_response()
+        finally:
+            # reader would still consume responses for requests already sent
+            # (e.g. if we were interrupted) so the process stays in sync
+            pending.put(None)
+            reader.join()
+            self._check_process(restart=False)
 
     def __del__(self):
         self.close()
@@ -3265,6 +3754,101 @@ class BatchedAnnex(object):
             lgr.debug("Process %s has finished", process)
 
 
+@auto_repr
+class BatchedAnnexPool(object):
+    """A pool of `BatchedAnnex` processes running the same command
+
+    Multiple requests get split into contiguous shards, one per process,
+    which are processed in parallel threads, and the responses are
+    reassembled in the order of the requests.  Only commands which do not
+    modify the repository should be used with a pool.
+    """
+
+    # do not bother sharding less than that many requests per process
+    _MIN_SHARD_SIZE = 8
+
+    def __init__(self, annex_cmd, workers=2, **kwargs):
+        self.workers = workers
+        self._annexes = [BatchedAnnex(annex_cmd, **kwargs)
+                         for i in range(workers)]
+
+    @property
+    def window(self):
+        return self._annexes[0].window
+
+    def _check_process(self, restart=False):
+        for annex in self._annexes:
+            annex._check_process(restart=restart)
+
+    def __call__(self, cmds):
+        """Same as `BatchedAnnex.__call__` but sharding a list of requests
+        """
+        if not isinstance(cmds, list):
+            # a single request -- no need to involve others
+            return self._annexes[0](cmds)
+        return list(self.yield_(cmds))
+
+    def _process_shards(self, cmds):
+        """Process a list of requests across the processes
+
+        Returns
+        -------
+        list
+          Responses in the order of `cmds`
+        """
+        nshards = min(
+            self.workers, max(1, len(cmds) // self._MIN_SHARD_SIZE))
+        if nshards == 1:
+            return self._annexes[0](cmds)
+        shard_size = int(math.ceil(len(cmds) / float(nshards)))
+        shards = [cmds[i:i + shard_size]
+                  for i in range(0, len(cmds), shard_size)]
+        outputs = [None] * len(shards)
+        errors = []
+
+        def process_shard(i):
+            try:
+                outputs[i] = self._annexes[i](shards[i])
+            except Exception as exc:
+                errors.append(exc)
+
+        threads = [threading.Thread(target=process_shard, args=(i,))
+                   for i in range(len(shards))]
+        for t in threads:
+            t.daemon = True
+            t.start()
+        for t in threads:
+            t.join()
+        if errors:
+            raise errors[0]
+        return list(chain(*outputs))
+
+    def yield_(self, cmds, window=None):
+        """Same as `BatchedAnnex.yield_` but sharding requests across processes
+
+        Requests are consumed in blocks of `window` requests per process,
+        so the responses could be streamed while not requiring `cmds` to
+        be fully materialized.
+        """
+        block_size = max(window or self.window, self._MIN_SHARD_SIZE) \
+            * self.workers
+        cmds = iter(cmds)
+        while True:
+            block = list(islice(cmds, block_size))
+            if not block:
+                break
+            for out in self._process_shards(block):
+                yield out
+
+    def __del__(self):
+        self.close()
+
+    def close(self):
+        """Close communication to all the processes of the pool"""
+        for annex in getattr(self, '_annexes', []):
+            annex.close()
+
+
 class ProcessAnnexProgressIndicators(object):
     """'Filter' for annex --json output to react to progress indicators
 
@@ -3346,7 +3930,8 @@ class ProcessAnnexProgressIndicators(object):
                     except:
                         size_j = None
                     size = size_j or AnnexRepo.get_size_from_key(j['key'])
-                    self.total_pbar.update(size, increment=True)
+                    if size:
+                        self.total_pbar.update(size, increment=True)
             else:
                 self._failed += 1
 
@@ -10,8 +10,16 @@
 
 """
 
+import bz2
+import gzip
 import hashlib
+import json
 import patoolib
+import posixpath
+import shutil
+import tarfile
+import threading
+import zipfile
 from .external_versions import external_versions
 # There were issues, so let's stay consistently with recent version
 assert(external_versions["patoolib"] >= "1.7")
@@ -26,6 +34,8 @@ from six.moves.urllib.parse import unquote as urlunquote
 
 import string
 import random
+from collections import Counter
+from contextlib import contextmanager
 
 from ..utils import any_re_search
 
@@ -55,15 +65,30 @@ import patoolib.util
 # because otherwise it just lets processes to spit out everything to std and we
 # do want to use it at "verbosity>=0" so we could get idea on what is going on.
 # And I don't want to mock for every invocation
+from datalad import cfg
 from ..support.exceptions import CommandError
 from ..utils import swallow_outputs
 from ..utils import rmtemp
 from ..cmd import Runner
+from ..cmd import link_file_load
 from ..consts import ARCHIVES_TEMP_DIR
 from ..utils import rmtree
 from ..utils import get_tempfile_kwargs
 
 from ..utils import on_windows
+from ..utils import nothing_cm
+
+try:
+    import fcntl
+except ImportError:
+    # Windows -- no locking across processes
+    fcntl = None
+
+try:
+    import lzma
+except ImportError:
+    # PY2 -- .xz compressed archives could not be indexed
+    lzma = None
 
 _runner = Runner()
 
@@ -212,6 +237,53 @@ def _get_cached_filename(archive):
     return archive_cached
 
 
+# leading bytes of the supported compressed streams
+_COMPRESSIONS = (
+    (b'\x1f\x8b', 'gz'),
+    (b'BZh', 'bz2'),
+    (b'\xfd7zXZ\x00', 'xz'),
+)
+
+
+def _get_compression(archive):
+    """Return compression of the archive by its content, or None"""
+    with open(archive, 'rb') as f:
+        head = f.read(6)
+    for magic, compression in _COMPRESSIONS:
+        if head.startswith(magic):
+            return compression
+    return None
+
+
+def _open_decompressed(archive, compression):
+    """Return a (seekable) file object with decompressed content of archive"""
+    if compression is None:
+        return open(archive, 'rb')
+    elif compression == 'gz':
+        return gzip.GzipFile(archive, 'rb')
+    elif compression == 'bz2':
+        return bz2.BZ2File(archive, 'rb')
+    elif compression == 'xz' and lzma is not None:
+        return lzma.LZMAFile(archive, 'rb')
+    raise ValueError("Cannot decompress %s compressed %s"
+                     % (compression, archive))
+
+
+def _normalize_member_name(name):
+    return posixpath.normpath(name.replace(os.sep, '/')).lstrip('/')
+
+
+def _copy_bytes(fsrc, fdst, size, chunk_size=1024 * 1024):
+    """Copy `size` bytes from fsrc to fdst"""
+    while size > 0:
+        buf = fsrc.read(min(chunk_size, size))
+        if not buf:
+            raise IOError("Premature end of the archive, %d bytes missing"
+                          % size)
+        fdst.write(buf)
+        size -= len(buf)
+
+
 def _get_random_id(size=6, chars=string.ascii_uppercase + string.digits):
     """Return a random ID composed from digits and uppercase letters
 
@@ -220,9 +292,28 @@ def _get_random_id(size=6, chars=string.ascii_uppercase + string.digits):
     return ''.join(random.choice(chars) for _ in range(size))
 
 
+def _get_tree_size(path):
+    """Return total size of the files under path"""
+    size = 0
+    for root, dirs, files in os.walk(path):
+        for name in files:
+            try:
+                size += os.lstat(opj(root, name)).st_size
+            except OSError:
+                pass
+    return size
+
+
 class ArchivesCache(object):
     """Cache to maintain extracted archives
 
+    If `max_size` is set, least recently used extracted archives (and indexes
+    of their members) get removed whenever extraction of another archive makes
+    the cache exceed it.  Last use of an extracted archive is tracked via
+    modification time of its stamp file, and the cache directory is locked
+    while archives get extracted, evicted or used, so it could be shared by
+    multiple threads and processes.
+
     Parameters
     ----------
     toppath : str
@@ -230,11 +321,24 @@ class ArchivesCache(object):
       If not provided -- random tempdir is used
     persistent : bool, optional
       Passed over into generated ExtractedArchives
+    max_size : int, optional
+      Size (in bytes) the extracted archives could take in total, 0 for no
+      limit.  If not provided, `datalad.archives.cache-size` config is
+      consulted
+
+    Attributes
+    ----------
+    stats : Counter
+      Number of 'hits' (files provided from already extracted archives),
+      'misses' (archives extracted) and 'evictions'
     """
+
+    LOCK_FILENAME = '.lock'
+
     # TODO: make caching persistent across sessions/runs, with cleanup
     # IDEA: extract under .git/annex/tmp so later on annex unused could clean it
     #       all up
-    def __init__(self, toppath=None, persistent=False):
+    def __init__(self, toppath=None, persistent=False, max_size=None):
 
         self._toppath = toppath
         if toppath:
@@ -250,6 +354,17 @@ class ArchivesCache(object):
             path = tempfile.mktemp(**get_tempfile_kwargs())
         self._path = path
         self.persistent = persistent
+        if max_size is None:
+            max_size = cfg.obtain('datalad.archives.cache-size')
+        self.max_size = max_size
+        self.stats = Counter(hits=0, misses=0, evictions=0)
+        # guards the state of the cache within the process.  Threads holding
+        # the cache lock are tracked to let shared ones go along, and the lock
+        # file is locked (across processes) while any of them holds it
+        self._lock = threading.RLock()
+        self._lock_released = threading.Condition(self._lock)
+        self._lock_holders = {}  # thread id: (depth, shared)
+        self._lock_file = None
         # TODO?  assure that it is absent or we should allow for it to persist a bit?
         #if exists(path):
         #    self._clean_cache()
@@ -273,6 +388,103 @@ class ArchivesCache(object):
     def path(self):
         return self._path
 
+    @contextmanager
+    def lock(self, shared=False):
+        """Lock the cache against other threads and processes
+
+        The lock is reentrant within a thread, but a shared lock cannot be
+        turned into an exclusive one.
+
+        Parameters
+        ----------
+        shared : bool, optional
+          Either to allow other threads and processes to hold a shared lock
+          as well, e.g. while only using extracted archives
+        """
+        me = threading.current_thread().ident
+        with self._lock:
+            depth, held_shared = self._lock_holders.get(me, (0, shared))
+            if depth and held_shared and not shared:
+                raise RuntimeError(
+                    "Cannot upgrade a shared lock of %s to an exclusive one"
+                    % self.path)
+            if not depth:
+                # wait for other threads holding a conflicting lock
+                while self._lock_holders and not (
+                        shared and all(s for _, s in
+                                       self._lock_holders.values())):
+                    self._lock_released.wait()
+                if not self._lock_holders and fcntl is not None \
+                        and isdir(self.path):
+                    self._lock_file = open(
+                        opj(self.path, self.LOCK_FILENAME), 'a')
+                    fcntl.flock(self._lock_file,
+                                fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+            self._lock_holders[me] = (depth + 1, held_shared)
+        try:
+            yield
+        finally:
+            with self._lock:
+                depth, held_shared = self._lock_holders.pop(me)
+                if depth > 1:
+                    self._lock_holders[me] = (depth - 1, held_shared)
+                elif not self._lock_holders:
+                    if self._lock_file is not None:
+                        # closing releases the lock
+                        self._lock_file.close()
+                        self._lock_file = None
+                    self._lock_released.notify_all()
+
+    def evict(self, keep=None):
+        """Remove least recently used extracted archives exceeding max_size
+
+        Parameters
+        ----------
+        keep : ExtractedArchive, optional
+          Extracted archive not to be removed, even if exceeding the budget
+          on its own
+        """
+        if not self.max_size:
+            return
+        with self.lock():
+            # extracted archives, and member indexes (possibly without
+            # an extracted archive) of them
+            suffixes = (ExtractedArchive.STAMP_SUFFIX,
+                        ExtractedArchive.INDEX_SUFFIX)
+            entries = {}
+            for fname in os.listdir(self.path):
+                suffix = [s for s in suffixes if fname.endswith(s)]
+                if not suffix:
+                    continue
+                path = opj(self.path, fname[:-len(suffix[0])])
+                try:
+                    st = os.stat(opj(self.path, fname))
+                except OSError:
+                    continue
+                size = ExtractedArchive.get_stamp_size(path) \
+                    if suffix[0] == ExtractedArchive.STAMP_SUFFIX \
+                    else st.st_size
+                atime, total_size = entries.get(path, (0, 0))
+                entries[path] = (max(atime, st.st_mtime), total_size + size)
+            total = sum(e[1] for e in entries.values())
+            for path, (atime, size) in sorted(
+                    entries.items(), key=lambda e: e[1][0]):
+                if total <= self.max_size:
+                    break
+                if keep is not None and path == keep.path:
+                    continue
+                lgr.debug("Removing extracted archive %s (%d bytes) from "
+                          "the cache", path, size)
+                # stamp first, so it is not considered extracted if we fail
+                for p in (path + ExtractedArchive.STAMP_SUFFIX, path,
+                          path + ExtractedArchive.INDEX_SUFFIX):
+                    if isdir(p):
+                        rmtree(p)
+                    elif exists(p):
+                        os.unlink(p)
+                total -= size
+                self.stats['evictions'] += 1
+
     def clean(self, force=False):
         for aname, a in list(self._archives.items()):
             a.clean(force=force)
@@ -306,13 +518,15 @@ class ArchivesCache(object):
     def get_archive(self, archive):
         archive = self._get_normalized_archive_path(archive)
 
-        if archive not in self._archives:
-            self._archives[archive] = \
-                ExtractedArchive(archive,
-                                 opj(self.path, _get_cached_filename(archive)),
-                                 persistent=self.persistent)
+        with self._lock:
+            if archive not in self._archives:
+                self._archives[archive] = \
+                    ExtractedArchive(archive,
+                                     opj(self.path, _get_cached_filename(archive)),
+                                     persistent=self.persistent,
+                                     cache=self)
 
-        return self._archives[archive]
+            return self._archives[archive]
 
     def __getitem__(self, archive):
         return self.get_archive(archive)
@@ -333,12 +547,24 @@ class ArchivesCache(object):
 
 class ExtractedArchive(object):
     """Container for the extracted archive
+
+    Parameters
+    ----------
+    archive : str
+    path : str, optional
+      Where to extract the archive to
+    persistent : bool, optional
+    cache : ArchivesCache, optional
+      Cache the archive is extracted within, to be locked, accounted and
+      kept within its budget
     """
 
     # suffix to use for a stamp so we could guarantee that extracted archive is
     STAMP_SUFFIX = '.stamp'
+    # suffix to use for the index of members of a (tar) archive
+    INDEX_SUFFIX = '.index'
 
-    def __init__(self, archive, path=None, persistent=False):
+    def __init__(self, archive, path=None, persistent=False, cache=None):
         self._archive = archive
         # TODO: bad location for extracted archive -- use tempfile
         if not path:
@@ -349,6 +575,9 @@ class ExtractedArchive(object):
                                "persist" % path)
         self._persistent = persistent
         self._path = path
+        self._index = None
+        self._index_lock = threading.Lock()
+        self._cache = cache
 
     def __repr__(self):
         return "%s(%r, path=%r)" % (self.__class__.__name__, self._archive, self.path)
@@ -362,7 +591,8 @@ class ExtractedArchive(object):
 
         for path, name in [
             (self._path, 'cache'),
-            (self.stamp_path, 'stamp file')
+            (self.stamp_path, 'stamp file'),
+            (self.index_path, 'member index')
         ]:
             if exists(path):
                 if (not self._persistent) or force:
@@ -381,6 +611,28 @@ class ExtractedArchive(object):
     def stamp_path(self):
         return self._path + self.STAMP_SUFFIX
 
+    @property
+    def index_path(self):
+        return self._path + self.INDEX_SUFFIX
+
+    @classmethod
+    def get_stamp_size(cls, path):
+        """Return size of the archive extracted under path, as recorded in its stamp"""
+        try:
+            with open(path + cls.STAMP_SUFFIX) as f:
+                lines = f.read().splitlines()
+            return int(lines[1])
+        except (IOError, OSError, IndexError, ValueError):
+            # stamp from an older version, so no size recorded
+            return _get_tree_size(path)
+
+    def _lock(self, shared=False):
+        return self._cache.lock(shared=shared) if self._cache else nothing_cm()
+
+    def _count(self, stat):
+        if self._cache:
+            self._cache.stats[stat] += 1
+
     @property
     def is_extracted(self):
         return exists(self.path) and exists(self.stamp_path) \
@@ -391,7 +643,28 @@ class ExtractedArchive(object):
         """
         path = self.path
 
+        if self.is_extracted:
+            # mark as recently used
+            try:
+                os.utime(self.stamp_path, None)
+            except OSError:
+                # was just evicted by another process
+                pass
+            else:
+                self._count('hits')
+                return path
+
+        with self._lock():
+            self._extract()
+            if self._cache:
+                self._cache.evict(keep=self)
+        return path
+
+    def _extract(self):
+        path = self.path
+        # might have been extracted meanwhile by another process
         if not self.is_extracted:
+            self._count('misses')
             # we need to extract the archive
             # TODO: extract to _tmp and then move in a single command so we
             # don't end up picking up broken pieces
@@ -412,15 +685,13 @@ class ExtractedArchive(object):
             # rotree(path)
             assert(exists(path))
 
-            # create a stamp
+            # create a stamp, recording size of the extracted content
             with open(self.stamp_path, 'w') as f:
-                f.write(self._archive)
+                f.write('%s\n%d\n' % (self._archive, _get_tree_size(path)))
 
             # assert that stamp mtime is not older than archive's directory
             assert(self.is_extracted)
 
-        return path
-
     # TODO: remove?
     #def has_file_ready(self, afile):
     #    lgr.debug("Checking file {afile} from archive {archive}".format(**locals()))
@@ -502,6 +773,133 @@ class ExtractedArchive(object):
         assert exists(path), "%s must exist" % path
         return path
 
+    def _get_archive_stamp(self):
+        st = os.stat(self._archive)
+        return [st.st_size, st.st_mtime]
+
+    def _load_index(self):
+        """Return index of the members of the archive, building it if needed
+
+        For a tar archive the index provides offset and size of every regular
+        file within (decompressed) archive, and is stored next to the
+        extracted archive, so it is built only once.  Members of zip archives
+        are known from the archive itself.
+
+        Returns
+        -------
+        dict or None
+          None if members of the archive could not be indexed
+        """
+        with self._index_lock:
+            if self._index is None:
+                self._index = self._get_index()
+            return self._index
+
+    def _get_index(self):
+        stamp = self._get_archive_stamp()
+        if exists(self.index_path):
+            try:
+                with open(self.index_path) as f:
+                    index = json.load(f)
+                if index.get('stamp') == stamp:
+                    return index
+            except (IOError, OSError, ValueError) as e:
+                # might also have been just evicted
+                lgr.debug("Ignoring broken index %s: %s", self.index_path, e)
+
+        if zipfile.is_zipfile(self._archive):
+            with zipfile.ZipFile(self._archive) as zf:
+                members = {
+                    _normalize_member_name(zinfo.filename):
+                        [zinfo.filename, zinfo.file_size]
+                    for zinfo in zf.infolist()
+                    if not zinfo.filename.endswith('/')}
+            return {'format': 'zip', 'members': members}
+
+        compression = _get_compression(self._archive)
+        if compression == 'xz' and lzma is None:
+            return None
+        lgr.debug("Indexing members of %s", self._archive)
+        members = {}
+        try:
+            with _open_decompressed(self._archive, compression) as f:
+                # streaming mode, so compressed content is read only once
+                with tarfile.open(fileobj=f, mode='r|') as tf:
+                    for tinfo in tf:
+                        # links and alike need the rest of the archive
+                        if tinfo.isreg() and not tinfo.issparse():
+                            members[_normalize_member_name(tinfo.name)] = \
+                                [tinfo.offset_data, tinfo.size]
+        except (tarfile.TarError, IOError, EOFError) as e:
+            lgr.debug("Cannot index %s: %s", self._archive, e)
+            return None
+        index = {'format': 'tar', 'compression': compression,
+                 'stamp': stamp, 'members': members}
+        # other processes might be reading it
+        tmp_path = '%s.%d.tmp' % (self.index_path, os.getpid())
+        with open(tmp_path, 'w') as f:
+            json.dump(index, f)
+        os.rename(tmp_path, self.index_path)
+        return index
+
+    def _extract_member(self, afile, path):
+        """Extract a single file from the archive without extracting the rest
+
+        Returns
+        -------
+        bool
+          False if the file could not be extracted that way
+        """
+        index = self._load_index()
+        if index is None:
+            return False
+        member = index['members'].get(_normalize_member_name(urlunquote(afile)))
+        if member is None:
+            # e.g. a link within the archive
+            return False
+        if index['format'] == 'zip':
+            with zipfile.ZipFile(self._archive) as zf, \
+                    zf.open(member[0]) as src, \
+                    open(path, 'wb') as dst:
+                shutil.copyfileobj(src, dst)
+        else:
+            offset, size = member
+            with _open_decompressed(self._archive, index['compression']) as src, \
+                    open(path, 'wb') as dst:
+                # for compressed archives only skips over the content
+                # without storing it anywhere
+                src.seek(offset)
+                _copy_bytes(src, dst, size)
+        return True
+
+    def extract_file(self, afile, path):
+        """Provide a single `afile` from the archive under `path`
+
+        Only the requested file is extracted, unless the archive is already
+        extracted, or its format does not allow to extract individual files
+        (in which case it gets fully extracted)
+        """
+        if not self.is_extracted:
+            lgr.debug("Extracting file {afile} from archive {self._archive}"
+                      .format(**locals()))
+            try:
+                if self._extract_member(afile, path):
+                    return path
+            except Exception as e:
+                lgr.debug("Failed to extract %s alone from %s, extracting "
+                          "entire archive: %s", afile, self._archive, e)
+                if exists(path):
+                    os.unlink(path)
+        while True:
+            self.assure_extracted()
+            # so it is not evicted by another process while we link/copy
+            with self._lock(shared=True):
+                if self.is_extracted:
+                    apath = self.get_extracted_filename(afile)
+                    assert exists(apath), "%s must exist" % apath
+                    link_file_load(apath, path)
+                    return path
+
     def __del__(self):
         try:
             if self._persistent:
@@ -0,0 +1,178 @@
+# emacs: -*- mode: python; py-indent-offset: 4; tab-width: 4; indent-tabs-mode: nil -*-
+# ex: set sts=4 ts=4 sw=4 noet:
+# ## ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ##
+#
+#   See COPYING file distributed along with the datalad package for the
+#   copyright and license terms.
+#
+# ## ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ##
+"""Process-wide accounting of external commands spawned by the Runner
+
+Accounting is enabled by setting DATALAD_CMD_STATS environment variable.  If
+its value is a filename (anything but 1/yes/on/true), collected stats get
+dumped as JSON into that file at exit, otherwise into
+datalad-cmd-stats-<pid>.json in the current directory.
+"""
+
+__docformat__ = 'restructuredtext'
+
+import atexit
+import json
+import logging
+import os
+import threading
+
+from os.path import basename
+from six import string_types
+
+lgr = logging.getLogger('datalad.cmdstats')
+
+
+def get_cmd_verb(cmd):
+    """Deduce a "verb" to group a command by, e.g. 'git commit'
+
+    Leading options (e.g. `-c var=value` for git) are skipped, and git
+    subcommands (including `git annex`) are descended into.
+
+    Parameters
+    ----------
+    cmd : str or list
+
+    Returns
+    -------
+    str
+    """
+    if isinstance(cmd, string_types):
+        cmd = cmd.split()
+    if not cmd:
+        return ''
+    verb = [basename(cmd[0])]
+    if verb[0] == 'git-annex':
+        verb = ['git', 'annex']
+    if verb[0] != 'git':
+        return verb[0]
+    args = iter(cmd[1:])
+    for arg in args:
+        if arg in ('-c', '-C', '--git-dir', '--work-tree'):
+            # option taking a value
+            next(args, None)
+        elif arg.startswith('-'):
+            continue
+        else:
+            verb.append(arg)
+            if arg != 'annex':
+                break
+    return ' '.join(verb)
+
+
+class CommandStats(object):
+    """Accumulate counts, times and output sizes of external commands
+
+    Entries are grouped by the command verb (see `get_cmd_verb`) and the
+    DataLad interface (command) which was active while the command ran.
+    """
+
+    _FIELDS = ('count', 'failed', 'wall', 'cpu', 'stdout_bytes', 'stderr_bytes')
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        # interfaces might run in multiple threads
+        self._local = threading.local()
+        self._stats = {}
+
+    @property
+    def _interfaces(self):
+        """Stack of the interfaces active in the current thread"""
+        interfaces = getattr(self._local, 'interfaces', None)
+        if interfaces is None:
+            interfaces = self._local.interfaces = []
+        return interfaces
+
+    def reset(self):
+        with self._lock:
+            self._stats = {}
+
+    def push_interface(self, name):
+        """Mark beginning of execution of a DataLad interface in this thread"""
+        self._interfaces.append(name)
+
+    def pop_interface(self, name):
+        """Mark end of execution of a DataLad interface in this thread"""
+        interfaces = self._interfaces
+        # generators of nested interfaces might finish out of order
+        if name in interfaces:
+            del interfaces[len(interfaces) - 1 - interfaces[::-1].index(name)]
+
+    def record(self, cmd, wall, cpu=None, stdout_bytes=0, stderr_bytes=0,
+               failed=False):
+        """Record a single finished command
+
+        Parameters
+        ----------
+        cmd : str or list
+        wall : float
+          Wall time (in seconds) since the start of the command
+        cpu : float, optional
+          User + system CPU time (in seconds) of the command, if known
+        stdout_bytes, stderr_bytes : int
+          Size of the output
+        failed : bool
+          Either the command exited with non-0 status
+        """
+        interfaces = self._interfaces
+        key = (get_cmd_verb(cmd), interfaces[-1] if interfaces else None)
+        with self._lock:
+            entry = self._stats.get(key)
+            if entry is None:
+                entry = self._stats[key] = dict.fromkeys(self._FIELDS, 0)
+            entry['count'] += 1
+            entry['failed'] += int(bool(failed))
+            entry['wall'] += wall
+            entry['cpu'] += cpu or 0
+            entry['stdout_bytes'] += stdout_bytes or 0
+            entry['stderr_bytes'] += stderr_bytes or 0
+
+    def as_dict(self):
+        """Return collected stats as a JSON-serializable dict
+
+        Returns
+        -------
+        dict
+          with 'commands' (list of records per verb and interface, sorted by
+          decreasing count) and 'total' (sums across all the records)
+        """
+        with self._lock:
+            records = [
+                dict(entry, verb=verb, interface=interface)
+                for (verb, interface), entry in self._stats.items()]
+        records = sorted(
+            records,
+            key=lambda r: (-r['count'], r['verb'], r['interface'] or ''))
+        total = dict.fromkeys(self._FIELDS, 0)
+        for r in records:
+            for f in self._FIELDS:
+                total[f] += r[f]
+        return {'commands': records, 'total': total}
+
+    def write_to_file(self, filename):
+        """Dump collected stats as JSON into a file"""
+        lgr.debug("Writing stats on external commands into %s", filename)
+        with open(filename, 'w') as f:
+            json.dump(self.as_dict(), f, indent=1, sort_keys=True)
+
+
+def _get_stats_filename(value):
+    if value.lower() in ('1', 'yes', 'on', 'true'):
+        value = 'datalad-cmd-stats-%d.json' % os.getpid()
+    # we might be elsewhere at exit
+    return os.path.abspath(value)
+
+
+_stats_setting = os.environ.get('DATALAD_CMD_STATS', '')
+if _stats_setting.lower() in ('', '0', 'no', 'off', 'false'):
+    cmd_stats = CommandStats(enabled=False)
+else:
+    cmd_stats = CommandStats(enabled=True)
+    atexit.register(cmd_stats.write_to_file,
+                    _get_stats_filename(_stats_setting))
@@ -12,6 +12,7 @@ For further information on GitPython see http://gitpython.readthedocs.org/
 
 """
 
+import binascii
 import logging
 import re
 import shlex
@@ -30,24 +31,31 @@ from os.path import curdir
 from os.path import pardir
 from os.path import sep
 import posixpath
+import tempfile
+import threading
+from subprocess import Popen
+from subprocess import PIPE
 from weakref import WeakValueDictionary
 
 
 from six import string_types
 from six import add_metaclass
+from six import PY3
 from functools import wraps
 import git as gitpy
 from git.exc import GitCommandError
 from git.exc import NoSuchPathError
 from git.exc import InvalidGitRepositoryError
-from git.objects.blob import Blob
 
 from datalad import ssh_manager
 from datalad.cmd import GitRunner
+from datalad.cmd import generate_file_chunks
+from datalad.cmd import run_chunked
 from datalad.consts import GIT_SSH_COMMAND
 from datalad.dochelpers import exc_str
 from datalad.config import ConfigManager
 from datalad.utils import assure_list
+from datalad.utils import auto_repr
 from datalad.utils import optional_args
 from datalad.utils import on_windows
 from datalad.utils import getpwd
@@ -520,6 +528,7 @@ class GitRepo(RepoInterface):
         self.cmd_call_wrapper = runner or GitRunner(cwd=self.path)
         self._repo = repo
         self._cfg = None
+        self._cat_file = None
 
         _valid_repo = GitRepo.is_valid_repo(path)
         if create and not _valid_repo:
@@ -574,6 +583,7 @@ class GitRepo(RepoInterface):
         if self.inode != inode:
             # reset background processes invoked by GitPython:
             self._repo.git.clear_cache()
+            self._close_cat_file()
             self.inode = inode
 
         if self._repo is None:
@@ -690,6 +700,8 @@ class GitRepo(RepoInterface):
         # unbind possibly bound ConfigManager, to prevent all kinds of weird
         # stalls etc
         self._cfg = None
+        # and close our own `git cat-file --batch` processes
+        self._close_cat_file()
         # Make sure to flush pending changes, especially close batch processes
         # (internal `git cat-file --batch` by GitPython)
         if hasattr(self, 'repo') and self.repo is not None \
@@ -732,6 +744,25 @@ class GitRepo(RepoInterface):
             self._cfg = ConfigManager(dataset=self, dataset_only=False)
         return self._cfg
 
+    @property
+    def cat_file(self):
+        """Persistent `git cat-file` reader to access objects of the repository
+
+        Returns
+        -------
+        GitCatFile
+        """
+        if self._cat_file is None:
+            self._cat_file = GitCatFile(
+                self.path, git_options=self._GIT_COMMON_OPTIONS)
+        return self._cat_file
+
+    def _close_cat_file(self):
+        cat_file = getattr(self, '_cat_file', None)
+        if cat_file is not None:
+            cat_file.close()
+            self._cat_file = None
+
     def is_with_annex(self, only_remote=False):
         """Return True if GitRepo (assumed) at the path has remotes with git-annex branch
 
@@ -1049,20 +1080,15 @@ class GitRepo(RepoInterface):
         # TODO: support not only a branch but any treeish
         #       Note: repo.tree(treeish).hexsha
         if branch is None:
-            try:
-                # do not use
-                #self.repo.active_branch.object.hexsha
-                # but HEAD to be able to cope with detached heads
-                return self.repo.head.object.hexsha
-            except ValueError as exc:
-                if 'does not exist' in str(exc):
-                    return None
-                raise
+            # do not use active branch but HEAD to be able to cope with
+            # detached heads.  None if there is no commit yet
+            info = self.cat_file.info('HEAD')
+            return info[0] if info else None
 
-        for b in self.repo.branches:
-            if b.name == branch:
-                return b.object.hexsha
-        raise ValueError("Unknown branch %s" % branch)
+        info = self.cat_file.info('refs/heads/%s' % branch)
+        if info is None:
+            raise ValueError("Unknown branch %s" % branch)
+        return info[0]
 
     def get_merge_base(self, treeishes):
         """Get a merge base hexsha
@@ -1215,8 +1241,9 @@ class GitRepo(RepoInterface):
             # active branch can be queried way faster:
             return self.get_indexed_files()
         else:
-            return [item.path for item in self.repo.tree(branch).traverse()
-                    if isinstance(item, Blob)]
+            return [path for mode, path, hexsha
+                    in self.cat_file.traverse_tree(branch)
+                    if mode != GitCatFile.MODE_GITLINK]
 
     def get_file_content(self, file_, branch='HEAD'):
         """
@@ -1227,15 +1254,16 @@ class GitRepo(RepoInterface):
           content of file_ as a list of lines.
         """
 
-        content_str = self.repo.commit(branch).tree[file_].data_stream.read()
+        obj = self.cat_file.read(
+            '%s:%s' % (branch, posix_relpath(file_) if on_windows else file_))
+        if obj is None:
+            raise KeyError("No file %s in %s" % (file_, branch))
+        content_str = obj[2]
 
-        # in python3 a byte string is returned. Need to convert it:
-        from six import PY3
+        # in python3 a byte string is returned. Need to convert it (byte by
+        # byte as it was always done):
         if PY3:
-            conv_str = u''
-            for b in bytes(content_str):
-                conv_str += chr(b)
-            return conv_str.splitlines()
+            return content_str.decode('latin-1').splitlines()
         else:
             return content_str.splitlines()
         # TODO: keep splitlines?
@@ -1351,22 +1379,47 @@ class GitRepo(RepoInterface):
         files: list of files
         cmd_str: str or list
             arbitrary command str. `files` is appended to that string.
+            If a list, and there are too many files to be passed on a single
+            command line, they are passed via --pathspec-from-file, if the
+            command supports it, or the command is invoked multiple times for
+            chunks of the files.
 
         Returns
         -------
         stdout, stderr
         """
-        cmd = shlex.split(cmd_str + " " + " ".join(files), posix=not on_windows) \
-            if isinstance(cmd_str, string_types) \
-            else cmd_str + files
+        pathspec_file = None
+        commit_chunks = False
+        if isinstance(cmd_str, string_types):
+            cmd = shlex.split(cmd_str + " " + " ".join(files), posix=not on_windows)
+            files = []
+        else:
+            cmd = cmd_str
+            files = files or []
+            if len(files) > 1 and \
+                    next(generate_file_chunks(files, cmd), None) != files:
+                # too many files for a single command line
+                icmd = self._get_subcommand_index(cmd)
+                subcmd = cmd[icmd] if icmd < len(cmd) else None
+                min_version = self._PATHSPEC_FROM_FILE_VERSIONS.get(subcmd)
+                if min_version and external_versions['cmd:git'] >= min_version:
+                    pathspec_file = self._write_pathspec_file(files)
+                    cmd = cmd[:icmd + 1] + \
+                        ['--pathspec-from-file=%s' % pathspec_file,
+                         '--pathspec-file-nul'] + \
+                        cmd[icmd + 1:]
+                    files = []
+                elif subcmd == 'commit':
+                    # commit files of all the chunks into a single commit
+                    commit_chunks = True
         assert(cmd[0] == 'git')
         cmd = cmd[:1] + self._GIT_COMMON_OPTIONS + cmd[1:]
 
         from .exceptions import GitIgnoreError
 
-        try:
-            out, err = self.cmd_call_wrapper.run(
-                cmd,
+        def run(cmd_):
+            return self.cmd_call_wrapper.run(
+                cmd_,
                 log_stderr=log_stderr,
                 log_stdout=log_stdout,
                 log_online=log_online,
@@ -1375,6 +1428,12 @@ class GitRepo(RepoInterface):
                 env=env,
                 shell=shell,
                 expect_fail=expect_fail)
+
+        try:
+            if commit_chunks:
+                out, err = self._commit_chunked(run, cmd, files)
+            else:
+                out, err = run_chunked(run, cmd, files)
         except CommandError as e:
             ignored = re.search(GitIgnoreError.pattern, e.stderr)
             if ignored:
@@ -1383,8 +1442,89 @@ class GitRepo(RepoInterface):
                                      stderr=e.stderr,
                                      paths=ignored.groups()[0].splitlines())
             raise
+        finally:
+            if pathspec_file:
+                os.unlink(pathspec_file)
         return out, err
 
+    # git versions since which commands support --pathspec-from-file
+    _PATHSPEC_FROM_FILE_VERSIONS = {
+        'add': '2.25.0',
+        'checkout': '2.25.0',
+        'commit': '2.25.0',
+        'reset': '2.25.0',
+        'rm': '2.26.0',
+    }
+
+    # options of git itself (not of its subcommands) which take a value
+    _GIT_OPTIONS_WITH_VALUE = ('-c', '-C', '--git-dir', '--work-tree',
+                               '--namespace', '--exec-path')
+
+    @classmethod
+    def _get_subcommand_index(cls, cmd):
+        """Return index of the git subcommand in a git command line"""
+        i = 1
+        if cmd[1:4] == ['annex', 'proxy', '--']:
+            # command run through the proxy in direct mode
+            i = 5
+        while i < len(cmd) and cmd[i].startswith('-'):
+            i += 2 if cmd[i] in cls._GIT_OPTIONS_WITH_VALUE else 1
+        return i
+
+    def _get_head_hexsha(self):
+        """Return hexsha of HEAD as git sees it right now, or None"""
+        try:
+            out, _ = self.cmd_call_wrapper.run(
+                ['git', 'rev-parse', '--verify', '-q', 'HEAD'],
+                expect_fail=True)
+        except CommandError:
+            # no commit yet
+            return None
+        return out.strip()
+
+    def _commit_chunked(self, run, cmd, files):
+        """Commit files passed in chunks, into a single commit
+
+        For git which cannot read the paths from a file.  A commit made for
+        the preceding chunks is amended with the files of the next ones, but
+        any other (e.g. already existing) commit is never amended.
+
+        Returns
+        -------
+        stdout, stderr
+        """
+        amend_cmd = cmd + ['--amend', '--no-edit']
+        head = self._get_head_hexsha()
+        out, err = '', ''
+        nothing_committed = None
+        for chunk in generate_file_chunks(files, amend_cmd):
+            committed = self._get_head_hexsha() != head
+            try:
+                out_, err_ = run((amend_cmd if committed else cmd) + chunk)
+            except CommandError as e:
+                if not any(m in (e.stdout or '') for m in (
+                        'nothing to commit', 'no changes added to commit',
+                        'nothing added to commit')):
+                    raise
+                # files of other chunks might still have changes
+                nothing_committed = e
+                out_, err_ = e.stdout or '', e.stderr or ''
+            out += out_
+            err += err_
+        if nothing_committed and self._get_head_hexsha() == head:
+            raise nothing_committed
+        return out, err
+
+    @staticmethod
+    def _write_pathspec_file(files):
+        """Write NUL-separated files into a temporary file, return its path"""
+        fd, path = tempfile.mkstemp(prefix='datalad-pathspec-')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(b'\0'.join(
+                f_ if isinstance(f_, bytes) else f_.encode('utf-8')
+                for f_ in files))
+        return path
+
 # TODO: --------------------------------------------------------------------
 
     def add_remote(self, name, url, options=None):
@@ -2058,3 +2198,155 @@ class GitRepo(RepoInterface):
 # TODO
 # remove submodule: nope, this is just deinit_submodule + remove
 # status?
+
+
+@auto_repr
+class GitCatFile(object):
+    """Persistent `git cat-file --batch(-check)` processes for a repository
+
+    Objects are requested by any name `git cat-file` understands (e.g. a
+    hexsha, `HEAD`, `master:path/file`).  Bodies of the objects are read
+    exactly by the size announced in the header, so there is no need for a
+    new git process per object.
+    """
+
+    MODE_TREE = '40000'
+    MODE_GITLINK = '160000'
+
+    def __init__(self, path, git_options=None):
+        self.path = path
+        self.git_options = git_options or []
+        # mode ('--batch' or '--batch-check') -> process
+        self._processes = {}
+        self._lock = threading.Lock()
+
+    def _get_process(self, mode):
+        process = self._processes.get(mode)
+        if process is not None and process.poll() is not None:
+            lgr.warning("Process %s was terminated with returncode %s",
+                        process, process.returncode)
+            self._processes.pop(mode)
+            process = None
+        if process is None:
+            cmd = ['git'] + self.git_options + ['cat-file', mode]
+            lgr.log(5, "Starting %s", cmd)
+            process = self._processes[mode] = Popen(
+                cmd, stdin=PIPE, stdout=PIPE,
+                env=GitRunner.get_git_environ_adjusted(),
+                cwd=self.path)
+        return process
+
+    def _request(self, mode, obj):
+        """Send a request and read the header of the response
+
+        Returns
+        -------
+        process, (hexsha, type, size) or None
+          None is returned if object is missing
+        """
+        if '\n' in obj:
+            raise ValueError("Object names with new lines are not supported: %r"
+                             % obj)
+        process = self._get_process(mode)
+        process.stdin.write((obj + '\n').encode('utf-8'))
+        process.stdin.flush()
+        header = process.stdout.readline().decode('utf-8').rstrip('\n')
+        fields = header.split(' ')
+        if len(fields) != 3:
+            # "<obj> missing" or "<obj> ambiguous", or process died
+            lgr.log(5, "No object %r: %r", obj, header)
+            return process, None
+        return process, (fields[0], fields[1], int(fields[2]))
+
+    def info(self, obj):
+        """Get information about an object
+
+        Returns
+        -------
+        (hexsha, type, size) or None
+          None if there is no such object
+        """
+        with self._lock:
+            return self._request('--batch-check', obj)[1]
+
+    def read(self, obj):
+        """Read an object
+
+        Returns
+        -------
+        (hexsha, type, content) or None
+          `content` is bytes.  None if there is no such object
+        """
+        with self._lock:
+            process, info = self._request('--batch', obj)
+            if info is None:
+                return None
+            hexsha, type_, size = info
+            content = process.stdout.read(size)
+            # skip the trailing newline
+            process.stdout.read(1)
+        return hexsha, type_, content
+
+    def read_tree(self, treeish):
+        """Read entries of a single tree
+
+        Parameters
+        ----------
+        treeish : str
+          Anything pointing to a tree, e.g. commit or `branch:subdir`
+
+        Returns
+        -------
+        list of (mode, name, hexsha)
+        """
+        obj = self.read('%s^{tree}' % treeish)
+        if obj is None:
+            raise ValueError("No tree for %s" % treeish)
+        data = obj[2]
+        entries = []
+        i = 0
+        while i < len(data):
+            # <mode> SP <name> NUL <20 bytes of binary sha>
+            sp = data.index(b' ', i)
+            nul = data.index(b'\0', sp)
+            mode = data[i:sp].decode()
+            name = data[sp + 1:nul]
+            if PY3:
+                name = name.decode('utf-8')
+            hexsha = binascii.hexlify(data[nul + 1:nul + 21]).decode()
+            entries.append((mode, name, hexsha))
+            i = nul + 21
+        return entries
+
+    def traverse_tree(self, treeish):
+        """Recursively yield all non-tree entries of a tree
+
+        Yields
+        ------
+        (mode, path, hexsha)
+          `path` is relative to the tree and POSIX
+        """
+        trees = [('', self.read_tree(treeish))]
+        while trees:
+            prefix, entries = trees.pop(0)
+            for mode, name, hexsha in entries:
+                path = prefix + name
+                if mode == self.MODE_TREE:
+                    trees.append((path + '/', self.read_tree(hexsha)))
+                else:
+                    yield mode, path, hexsha
+
+    def close(self):
+        """Close communication and wait for processes to terminate"""
+        for mode, process in list(self._processes.items()):
+            lgr.log(5, "Closing %s", process)
+            try:
+                process.stdin.close()
+                process.stdout.close()
+                process.wait()
+            except Exception as exc:
+                lgr.debug("Failed to close %s: %s", process, exc_str(exc))
+        self._processes = {}
+
+    def __del__(self):
+        self.close()
@@ -0,0 +1,180 @@
+# emacs: -*- mode: python; py-indent-offset: 4; tab-width: 4; indent-tabs-mode: nil -*-
+# ex: set sts=4 ts=4 sw=4 noet:
+# ## ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ##
+#
+#   See COPYING file distributed along with the datalad package for the
+#   copyright and license terms.
+#
+# ## ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ##
+"""Helpers for running independent (mostly I/O bound) tasks concurrently"""
+
+__docformat__ = 'restructuredtext'
+
+import logging
+import threading
+
+from multiprocessing.pool import ThreadPool
+
+lgr = logging.getLogger('datalad.parallel')
+
+
+class _Deferred(object):
+    """Mimics AsyncResult of a pool, but calls the function only on `get()`"""
+
+    def __init__(self, func, *args):
+        self._func = func
+        self._args = args
+
+    def get(self):
+        return self._func(*self._args)
+
+
+def walk_tree(root, expand, jobs=1, bottomup=False):
+    """Walk a tree depth-first while expanding its nodes concurrently
+
+    Each node is expanded by `expand` exactly once.  With `jobs` > 1 children
+    of a node get expanded by a pool of `jobs` threads as soon as they are
+    known, i.e. possibly long before the walk reaches them, but results are
+    still yielded in the order of a serial depth-first walk.  With `jobs` <= 1
+    no threads are used and a node is expanded only once the walk reaches
+    it.
+
+    Parameters
+    ----------
+    root
+      Root node of the tree, passed to `expand` as is
+    expand : callable
+      Given a node, must return a tuple (result, children), where result
+      is to be yielded (unless None) and children is a list of nodes to be
+      expanded and walked next.  It gets called from within a worker thread
+      if `jobs` > 1, so must not rely on any state shared with other nodes.
+      Exceptions are re-raised from the walk at the position of the node.
+    jobs : int, optional
+      Maximal number of nodes to expand concurrently
+    bottomup : bool, optional
+      Either to yield the result of a node after (not before) the results of
+      all the nodes underneath it
+
+    Yields
+    ------
+    results of the nodes (including root), except for None
+    """
+    pool = ThreadPool(jobs) if jobs and jobs > 1 else None
+
+    def submit(node):
+        if pool is None:
+            return _Deferred(expand, node)
+        return pool.apply_async(expand, (node,))
+
+    def walk(pending):
+        res, children = pending.get()
+        # schedule all the children right away, so they get expanded
+        # while we are busy with the preceding siblings
+        children = [submit(child) for child in children]
+        if not bottomup and res is not None:
+            yield res
+        for child in children:
+            for r in walk(child):
+                yield r
+        if bottomup and res is not None:
+            yield res
+
+    try:
+        for r in walk(submit(root)):
+            yield r
+    finally:
+        if pool is not None:
+            # we might be interrupted, so do not wait for all the scheduled
+            # nodes to be expanded
+            pool.terminate()
+
+
+class _JobBudget(object):
+    """Total number of jobs, which tasks take a share of while running"""
+
+    def __init__(self, jobs):
+        self._free = jobs
+        self._cond = threading.Condition()
+
+    def acquire(self, n):
+        with self._cond:
+            while self._free < n:
+                self._cond.wait()
+            self._free -= n
+
+    def release(self, n):
+        with self._cond:
+            self._free += n
+            self._cond.notify_all()
+
+
+def get_job_shares(weights, jobs):
+    """Split a budget of jobs among tasks proportionally to their weights
+
+    Every task gets at least one job, and none more than `jobs`.
+
+    Parameters
+    ----------
+    weights : list of int or float
+    jobs : int
+
+    Returns
+    -------
+    list of int
+    """
+    total = sum(weights)
+    return [min(jobs, max(1, int(jobs * w // total))) if total else 1
+            for w in weights]
+
+
+def run_balanced(func, items, weights, jobs=1):
+    """Run a task per item concurrently within a total budget of jobs
+
+    Each task gets a share of `jobs` proportional to its weight (see
+    `get_job_shares`), and tasks run concurrently as long as the sum of
+    the shares of the running ones stays within `jobs`.  The heaviest
+    tasks get started first, so the light ones fill in the gaps, but
+    results are still yielded in the order of `items`.  With `jobs` <= 1
+    tasks get run serially, and only once the preceding result was
+    consumed.
+
+    Parameters
+    ----------
+    func : callable
+      Given an item and the number of jobs it may use, must return a result
+      for the item.  It gets called from within a worker thread if `jobs`
+      > 1.  Exceptions are re-raised at the position of the item.
+    items : list
+    weights : list of int or float
+      Expected costs (e.g. bytes to transfer) of the tasks for the items
+    jobs : int, optional
+
+    Yields
+    ------
+    item, result
+    """
+    if not jobs or jobs <= 1:
+        for item in items:
+            yield item, func(item, 1)
+        return
+
+    shares = get_job_shares(weights, jobs)
+    budget = _JobBudget(jobs)
+
+    def run(item, share):
+        budget.acquire(share)
+        try:
+            return func(item, share)
+        finally:
+            budget.release(share)
+
+    pool = ThreadPool(min(jobs, len(items)) or 1)
+    try:
+        pending = {}
+        for i in sorted(range(len(items)), key=lambda i: -weights[i]):
+            pending[i] = pool.apply_async(run, (items[i], shares[i]))
+        for i, item in enumerate(items):
+            yield item, pending.pop(i).get()
+    finally:
+        # we might be interrupted, so do not start any pending task
+        pool.terminate()
@@ -14,12 +14,18 @@ git calls to a ssh remote without the need to reauthenticate.
 """
 
 import logging
+import threading
 from socket import gethostname
 from hashlib import md5
 from os import remove
+from os import urandom
 from os.path import exists
 from os.path import join as opj
 from subprocess import Popen
+from subprocess import PIPE
+from binascii import hexlify
+
+from six.moves import queue
 # importing the quote function here so it can always be imported from this
 # module
 try:
@@ -65,12 +71,98 @@ def get_connection_hash(hostname, port='', username=''):
             username=username).encode('utf-8')).hexdigest()[:8]
 
 
+class _RemoteShell(object):
+    """Shell session on a remote, reused to run many commands
+
+    Every command is sent to the stdin of a single `sh` running on the remote
+    (over the shared connection), followed by printing a sentinel unique to
+    the session (along with the exit code of the command) to stdout and
+    stderr, which tells where the output of the command ends.
+    """
+
+    def __init__(self, ssh_cmd):
+        self._sentinel = '__datalad_%s__' % hexlify(urandom(8)).decode()
+        lgr.debug("Starting remote shell by calling %s", ssh_cmd)
+        self._proc = Popen(ssh_cmd + ['sh'], stdin=PIPE, stdout=PIPE,
+                           stderr=PIPE)
+        # stderr is consumed all the time, so a chatty command could not
+        # block while we are waiting for its stdout
+        self._stderr = queue.Queue()
+        reader = threading.Thread(target=self._read_stderr)
+        reader.daemon = True
+        reader.start()
+        self._lock = threading.Lock()
+
+    def _read_stderr(self):
+        for line in iter(self._proc.stderr.readline, b''):
+            self._stderr.put(line)
+        self._stderr.put(None)
+
+    def is_alive(self):
+        return self._proc.poll() is None
+
+    def _read_until_sentinel(self, readline):
+        sentinel = self._sentinel.encode()
+        lines = []
+        while True:
+            line = readline()
+            if not line:
+                raise CommandError(
+                    msg="Remote shell exited unexpectedly", code=255,
+                    stdout=b''.join(lines).decode('utf-8', 'replace'))
+            i = line.find(sentinel)
+            if i < 0:
+                lines.append(line)
+                continue
+            # output might have lacked a trailing newline
+            lines.append(line[:i])
+            return (b''.join(lines).decode('utf-8', 'replace'),
+                    line[i + len(sentinel):].strip())
+
+    def __call__(self, cmd):
+        """Run a command
+
+        Returns
+        -------
+        stdout, stderr, exit code
+        """
+        # a command runs in its own shell, so it could neither break the
+        # session (e.g. by a syntax error), nor read its commands from stdin
+        script = 'sh -c %s </dev/null; printf "%%s%%d\\n" %s $?; ' \
+                 'printf "%%s\\n" %s >&2\n' \
+                 % (sh_quote(cmd), self._sentinel, self._sentinel)
+        with self._lock:
+            try:
+                self._proc.stdin.write(script.encode('utf-8'))
+                self._proc.stdin.flush()
+            except (IOError, OSError, ValueError) as e:
+                raise CommandError(
+                    cmd=cmd, msg="Remote shell is gone: %s" % exc_str(e),
+                    code=255)
+            try:
+                out, code = self._read_until_sentinel(
+                    self._proc.stdout.readline)
+                err, _ = self._read_until_sentinel(
+                    lambda: self._stderr.get() or b'')
+            except CommandError as e:
+                e.cmd = cmd
+                raise
+        return out, err, int(code)
+
+    def close(self):
+        if self.is_alive():
+            lgr.debug("Closing remote shell")
+            # shell exits at the end of its input
+            self._proc.stdin.close()
+        self._proc.wait()
+
+
 @auto_repr
 class SSHConnection(object):
     """Representation of a (shared) ssh connection.
     """
 
-    def __init__(self, ctrl_path, sshri):
+    def __init__(self, ctrl_path, sshri, persistent_shell=None):
         """Create a connection handler
 
         The actual opening of the connection is performed on-demand.
@@ -82,8 +174,14 @@ class SSHConnection(object):
         sshri: SSHRI
           SSH resource identifier (contains all connection-relevant info),
           or another resource identifier that can be converted into an SSHRI.
+        persistent_shell: bool, optional
+          Whether to run commands in a single shell session on the remote,
+          instead of starting a new ssh process for every command.  If not
+          provided, `datalad.ssh.persistent-shell` config is consulted
         """
         self._runner = None
+        self._persistent_shell = persistent_shell
+        self._shell = None
 
         from datalad.support.network import SSHRI, is_ssh
         if not is_ssh(sshri):
@@ -100,6 +198,9 @@ class SSHConnection(object):
         # essential properties of the remote system
         self._remote_props = {}
         self._opened_by_us = False
+        # whether the connection was found to be open last time we checked,
+        # so it doesn't have to be checked for every command
+        self._alive = False
 
     def __call__(self, cmd, stdin=None, log_output=True):
         """Executes a command on the remote.
@@ -119,15 +220,7 @@ class SSHConnection(object):
           stdout, stderr of the command run.
         """
 
-        # TODO:  do not do all those checks for every invocation!!
-        # TODO: check for annex location once, check for open socket once
-        #       and provide roll back if fails to run and was not explicitly
-        #       checked first
-        if not self.is_open():
-            if not self.open():
-                raise RuntimeError(
-                    'Cannot open SSH connection to {}'.format(
-                        self.sshri))
+        self._assure_open()
 
         # locate annex and set the bundled vs. system Git machinery in motion
         remote_annex_installdir = self.get_annex_installdir()
@@ -137,6 +230,41 @@ class SSHConnection(object):
                 'export "PATH={}:$PATH"'.format(remote_annex_installdir),
                 cmd)
 
+        try:
+            return self._run(cmd, stdin, log_output)
+        except CommandError as e:
+            # ssh itself exits with 255, e.g. if the connection got lost
+            # since we checked it last
+            if e.code != 255 or self.is_open():
+                raise
+        lgr.debug("Connection %s was lost, reopening", self)
+        self._assure_open()
+        return self._run(cmd, stdin, log_output)
+
+    def _assure_open(self):
+        if self._alive and exists(self.ctrl_path):
+            return
+        if not self.is_open():
+            if not self.open():
+                raise RuntimeError(
+                    'Cannot open SSH connection to {}'.format(
+                        self.sshri))
+
+    def _run(self, cmd, stdin, log_output):
+        if stdin is None and self.persistent_shell:
+            if self._shell is None or not self._shell.is_alive():
+                self._shell = _RemoteShell(
+                    ["ssh"] + self._ctrl_options + [self.sshri.as_str()])
+            lgr.log(5, "Running %r in the shell on %s", cmd, self)
+            out, err, code = self._shell(cmd)
+            if log_output and (out or err):
+                lgr.log(5, "| stdout: %s| stderr: %s", out, err)
+            if code:
+                raise CommandError(
+                    cmd=cmd, msg="Failed to run %r on %s" % (cmd, self),
+                    code=code, stdout=out, stderr=err)
+            return out, err
+
         # build SSH call, feed remote command as a single last argument
         # whatever it contains will go to the remote machine for execution
         # we cannot perform any sort of escaping, because it will limit
@@ -159,6 +287,14 @@ class SSHConnection(object):
             stdin=stdin,
             **kwargs)
 
+    @property
+    def persistent_shell(self):
+        if self._persistent_shell is None:
+            from datalad import cfg
+            self._persistent_shell = cfg.obtain(
+                'datalad.ssh.persistent-shell')
+        return self._persistent_shell
+
     @property
     def runner(self):
         if self._runner is None:
@@ -190,6 +326,7 @@ class SSHConnection(object):
         finally:
             null.close()
         lgr.debug("Check of %s has %s", self, {True: 'succeeded', False: 'failed'}[res])
+        self._alive = res
         return res
 
     def open(self):
@@ -230,11 +367,16 @@ class SSHConnection(object):
             )
         else:
             self._opened_by_us = True
+        self._alive = ret
         return ret
 
     def close(self):
         """Closes the connection.
         """
+        self._alive = False
+        if self._shell is not None:
+            self._shell.close()
+            self._shell = None
         if not self._opened_by_us:
             lgr.debug("Not closing %s since was not opened by itself", self)
             return
@@ -348,27 +490,29 @@ class SSHManager(object):
                                  "interface platform dependent SSH")
 
         self._connections = dict()
+        # determined along with the socket directory, i.e. before the first
+        # connection, so there is no need to consult config upon import
         self._socket_dir = None
-
-        from os import listdir
-        from os.path import isdir
-        self._prev_connections = [opj(self.socket_dir, p)
-                                  for p in listdir(self.socket_dir)
-                                  if not isdir(opj(self.socket_dir, p))]
-        lgr.log(5,
-                "Found %d previous connections",
-                len(self._prev_connections))
+        self._prev_connections = []
 
     @property
     def socket_dir(self):
         if self._socket_dir is None:
             from ..config import ConfigManager
             from os import chmod
+            from os import listdir
+            from os.path import isdir
             cfg = ConfigManager()
-            self._socket_dir = opj(cfg.obtain('datalad.locations.cache'),
-                                   'sockets')
-            assure_dir(self._socket_dir)
-            chmod(self._socket_dir, 0o700)
+            socket_dir = opj(cfg.obtain('datalad.locations.cache'), 'sockets')
+            assure_dir(socket_dir)
+            chmod(socket_dir, 0o700)
+            self._prev_connections = [opj(socket_dir, p)
+                                      for p in listdir(socket_dir)
+                                      if not isdir(opj(socket_dir, p))]
+            lgr.log(5,
+                    "Found %d previous connections",
+                    len(self._prev_connections))
+            self._socket_dir = socket_dir
 
         return self._socket_dir
 
@@ -94,6 +94,9 @@ from datalad.support.gitrepo import GitRepo
 # imports from same module:
 from datalad.support.annexrepo import AnnexRepo
 from datalad.support.annexrepo import ProcessAnnexProgressIndicators
+from datalad.support.annexrepo import BatchedAnnex
+from datalad.support.annexrepo import BatchedAnnexes
+from datalad.support.annexrepo import BatchedAnnexPool
 from .utils import check_repo_deals_with_inode_change
 
 @ignore_nose_capturing_stdout
@@ -269,13 +272,24 @@ def test_AnnexRepo_get_outofspace(annex_path):
             stderr="junk around not enough free space, need 905.6 MB more and after"
         )
 
+    def yield_cmderror(*args, **kwargs):
+        raise_cmderror()
+        yield  # pragma: no cover
+
     with patch.object(AnnexRepo, '_run_annex_command', raise_cmderror) as cma, \
+            patch.object(AnnexRepo, '_yield_annex_command', yield_cmderror), \
             assert_raises(OutOfSpaceError) as cme:
         ar.get("file")
     exc = cme.exception
     eq_(exc.sizemore_msg, '905.6 MB')
     assert_re_in(".*annex (find|get). needs 905.6 MB more", str(exc))
 
+    # it is the streamed `annex find` which reports it
+    with patch.object(AnnexRepo, '_yield_annex_command', yield_cmderror), \
+            assert_raises(OutOfSpaceError) as cme:
+        ar.get("file")
+    assert_re_in(".*annex find. needs 905.6 MB more", str(cme.exception))
+
 
 @with_testrepos('basic_annex', flavors=['local'])
 def test_AnnexRepo_get_remote_na(path):
@@ -312,6 +326,41 @@ def test_AnnexRepo_file_has_content(batch, direct, src, annex_path):
     ok_(ar.file_has_content("test-annex.dat", batch=batch))
 
 
+@with_testrepos('.*annex.*', flavors=['local'], count=1)
+@with_tempfile
+def test_AnnexRepo_get_content_snapshot(src, annex_path):
+    ar = AnnexRepo.clone(src, annex_path)
+    snapshot = ar.get_content_snapshot()
+    testfiles = ["test-annex.dat", "test.dat"]
+    for f in testfiles:
+        ok_(f in snapshot)
+    eq_([snapshot[f].is_annexed for f in testfiles],
+        ar.is_under_annex(testfiles))
+    eq_([snapshot[f].has_content for f in testfiles],
+        ar.file_has_content(testfiles))
+    eq_([snapshot[f].has_content for f in testfiles], [False, False])
+    rec = snapshot["test-annex.dat"]
+    eq_(rec.key, ar.get_file_key("test-annex.dat"))
+    eq_(rec.size, AnnexRepo.get_size_from_key(rec.key))
+    eq_(rec.backend, rec.key.split('-')[0])
+
+    ok_annex_get(ar, "test-annex.dat")
+    # not to be fooled by mtime resolution
+    with patch.object(ar, '_get_content_snapshot_stamp', return_value=None):
+        snapshot = ar.get_content_snapshot(testfiles)
+    eq_(sorted(snapshot.paths), sorted(testfiles))
+    eq_(snapshot.has_content, ar.file_has_content(snapshot.paths))
+
+    # a snapshot of the entire tree is reused while nothing changes
+    with patch.object(ar, '_get_content_snapshot_stamp',
+                      return_value=('stamp',)):
+        snapshot = ar.get_content_snapshot()
+        with patch.object(ar, '_sweep_content') as sweep:
+            ok_(ar.get_content_snapshot() is snapshot)
+            eq_(ar.get_content_snapshot("test.dat").paths, ["test.dat"])
+            assert_false(sweep.called)
+
+
 # 1 is enough to test
 @with_batch_direct
 @with_testrepos('.*annex.*', flavors=['local'], count=1)
@@ -818,7 +867,7 @@ def test_AnnexRepo_get(src, dst):
 
     called = []
     # for some reason yoh failed mock to properly just call original func
-    orig_run = annex._run_annex_command
+    orig_run = annex._yield_annex_command
 
     def check_run(cmd, annex_options, **kwargs):
         called.append(cmd)
@@ -834,7 +883,7 @@ def test_AnnexRepo_get(src, dst):
         return orig_run(cmd, annex_options=annex_options, **kwargs)
 
     annex.drop(testfile)
-    with patch.object(AnnexRepo, '_run_annex_command',
+    with patch.object(AnnexRepo, '_yield_annex_command',
                       side_effect=check_run, auto_spec=True), \
             swallow_outputs():
         annex.get(testfile, jobs=5)
@@ -1167,24 +1216,29 @@ def test_annex_copy_to(origin, clone):
 
     # Test that if we pass a list of items and annex processes them nicely,
     # we would obtain a list back. To not stress our tests even more -- let's mock
-    def ok_copy(command, **kwargs):
+    def ok_copy(command, annex_options=None, files=None, **kwargs):
         # Check that we do pass to annex call only the list of files which we
         #  asked to be copied
-        assert_in('copied1', kwargs['annex_options'])
-        assert_in('copied2', kwargs['annex_options'])
-        assert_in('existed', kwargs['annex_options'])
-        return """
-{"command":"copy","note":"to target ...", "success":true, "key":"akey1", "file":"copied1"}
-{"command":"copy","note":"to target ...", "success":true, "key":"akey2", "file":"copied2"}
-{"command":"copy","note":"checking target ...", "success":true, "key":"akey3", "file":"existed"}
-""", ""
-    with patch.object(repo, '_run_annex_command', ok_copy):
+        assert_in('copied1', files)
+        assert_in('copied2', files)
+        assert_in('existed', files)
+        if command == 'find':
+            for key, f in (('akey1', 'copied1'), ('akey2', 'copied2'),
+                           ('akey3', 'existed')):
+                yield '{"file":"%s", "key":"%s", "bytesize":"1"}\n' % (f, key)
+            return
+        for line in (
+                '{"command":"copy","note":"to target ...", "success":true, "key":"akey1", "file":"copied1"}\n',
+                '{"command":"copy","note":"to target ...", "success":true, "key":"akey2", "file":"copied2"}\n',
+                '{"command":"copy","note":"checking target ...", "success":true, "key":"akey3", "file":"existed"}\n'):
+            yield line
+    with patch.object(repo, '_yield_annex_command', ok_copy):
         eq_(repo.copy_to(["copied2", "copied1", "existed"], "target"),
             ["copied1", "copied2"])
 
     # now let's test that we are correctly raising the exception in case if
     # git-annex execution fails
-    orig_run = repo._run_annex_command
+    orig_run = repo._yield_annex_command
 
     # Kinda a bit off the reality since no nonex* would not be returned/handled
     # by _get_expected_files, so in real life -- wouldn't get report about Incomplete!?
@@ -1193,23 +1247,23 @@ def test_annex_copy_to(origin, clone):
             # That is not how annex behaves
             # http://git-annex.branchable.com/bugs/copy_does_not_reflect_some_failed_copies_in_--json_output/
             # for non-existing files output goes into stderr
+            yield '{"command":"copy","note":"to target ...", "success":true, "key":"akey1", "file":"copied"}\n'
+            yield '{"command":"copy","note":"checking target ...", "success":true, "key":"akey2", "file":"existed"}\n'
             raise CommandError(
                 "Failed to run ...",
-                stdout=
-                    '{"command":"copy","note":"to target ...", "success":true, "key":"akey1", "file":"copied"}\n'
-                    '{"command":"copy","note":"checking target ...", "success":true, "key":"akey2", "file":"existed"}\n',
                 stderr=
                     'git-annex: nonex1 not found\n'
                     'git-annex: nonex2 not found\n'
             )
         else:
-            return orig_run(command, **kwargs)
+            for line in orig_run(command, **kwargs):
+                yield line
 
     def fail_to_copy_get_expected(files, expr):
         assert files == ["copied", "existed", "nonex1", "nonex2"]
         return {'akey1': 10}, ["copied"]
 
-    with patch.object(repo, '_run_annex_command', fail_to_copy), \
+    with patch.object(repo, '_yield_annex_command', fail_to_copy), \
             patch.object(repo, '_get_expected_files', fail_to_copy_get_expected):
         with assert_raises(IncompleteResultsError) as cme:
             repo.copy_to(["copied", "existed", "nonex1", "nonex2"], "target")
@@ -2147,3 +2201,46 @@ def test_fake_is_not_special(path):
     # doesn't exist -- we fail by default
     assert_raises(RemoteNotAvailableError, ar.is_special_annex_remote, "fake")
     assert_false(ar.is_special_annex_remote("fake", check_if_known=False))
+
+
+@with_tree(tree={'f%d.dat' % i: 'content %d' % i for i in range(10)})
+def test_BatchedAnnex_pipelined(path):
+    ar = AnnexRepo(path, create=True)
+    files = sorted('f%d.dat' % i for i in range(10))
+    ar.add(files)
+    ar.commit("added files")
+    keys = [ar.get_file_key(f) for f in files]
+
+    bcmd = BatchedAnnex('lookupkey', git_options=ar._GIT_COMMON_OPTIONS,
+                        path=ar.path, window=3)
+    # list input gets pipelined and order is preserved
+    eq_(bcmd(files), keys)
+    # generator input and a smaller window
+    eq_(list(bcmd.yield_((f for f in files), window=1)), keys)
+    # interrupting the consumer leaves the process in sync
+    gen = bcmd.yield_(files)
+    eq_(next(gen), keys[0])
+    gen.close()
+    eq_(bcmd(files[-1]), keys[-1])
+    bcmd.close()
+
+
+@with_tree(tree={'f%02d.dat' % i: 'content %d' % i for i in range(40)})
+def test_BatchedAnnexPool(path):
+    ar = AnnexRepo(path, create=True)
+    files = sorted('f%02d.dat' % i for i in range(40))
+    ar.add(files)
+    ar.commit("added files")
+    keys = ar.get_file_key(files)
+
+    batched = BatchedAnnexes(workers=3, window=4)
+    pool = batched.get('lookupkey', git_options=ar._GIT_COMMON_OPTIONS,
+                       path=ar.path)
+    assert_is_instance(pool, BatchedAnnexPool)
+    # results are reassembled in the order of requests
+    eq_(pool(files), keys)
+    eq_(pool(files[0]), keys[0])
+    # modifying commands are never sharded
+    assert_is_instance(batched.get('addurl', path=ar.path), BatchedAnnex)
+    batched.clear()
+    eq_(len(batched), 0)
@@ -0,0 +1,127 @@
+# emacs: -*- mode: python; py-indent-offset: 4; tab-width: 4; indent-tabs-mode: nil -*-
+# ex: set sts=4 ts=4 sw=4 noet:
+# ## ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ##
+#
+#   See COPYING file distributed along with the datalad package for the
+#   copyright and license terms.
+#
+# ## ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ##
+"""Tests for accounting of external commands"""
+
+import json
+import os
+import sys
+import threading
+import time
+
+from mock import patch
+
+from datalad.cmd import Runner
+from datalad.cmd import _RusagePopen
+from datalad.cmd import _get_cpu_time
+from datalad.support.cmdstats import CommandStats
+from datalad.support.cmdstats import get_cmd_verb
+from datalad.support.exceptions import CommandError
+from datalad.tests.utils import assert_raises
+from datalad.tests.utils import eq_
+from datalad.tests.utils import ok_
+from datalad.tests.utils import skip_if
+from datalad.tests.utils import with_tempfile
+
+
+def test_get_cmd_verb():
+    eq_(get_cmd_verb(['git', '-c', 'a=b', 'commit', '-m', 'msg']), 'git commit')
+    eq_(get_cmd_verb(['git', '-C', 'path', 'annex', 'get', '--json', 'f']),
+        'git annex get')
+    eq_(get_cmd_verb(['git-annex', 'find']), 'git annex find')
+    eq_(get_cmd_verb('/usr/bin/ssh -O check host'), 'ssh')
+    eq_(get_cmd_verb([]), '')
+
+
+def test_CommandStats():
+    stats = CommandStats(enabled=True)
+    stats.record(['git', 'status'], 1.0, cpu=0.5, stdout_bytes=10)
+    stats.push_interface('save')
+    stats.record(['git', 'status'], 2.0, stderr_bytes=3, failed=True)
+    stats.record(['git', 'status'], 1.0)
+    stats.push_interface('add')
+    stats.record(['git', 'annex', 'add', 'f'], 1.0)
+    # out of order finish of nested interfaces
+    stats.pop_interface('save')
+    stats.record(['git', 'commit'], 1.0)
+    stats.pop_interface('add')
+    stats.record(['git', 'commit'], 1.0)
+
+    d = stats.as_dict()
+    eq_(d['total']['count'], 6)
+    eq_(d['total']['failed'], 1)
+    eq_(d['total']['wall'], 7.0)
+    eq_(d['total']['cpu'], 0.5)
+    eq_(d['commands'][0],
+        dict(verb='git status', interface='save', count=2, failed=1,
+             wall=3.0, cpu=0, stdout_bytes=0, stderr_bytes=3))
+    eq_(set((r['verb'], r['interface']) for r in d['commands']),
+        {('git status', 'save'), ('git status', None),
+         ('git annex add', 'add'), ('git commit', 'add'),
+         ('git commit', None)})
+
+    stats.reset()
+    eq_(stats.as_dict()['total']['count'], 0)
+
+
+@with_tempfile
+def test_runner_cmd_stats(path):
+    stats = CommandStats(enabled=True)
+    runner = Runner()
+    with patch('datalad.cmd.cmd_stats', stats):
+        runner.run([sys.executable, '-c', 'print("12345")'])
+        assert_raises(
+            CommandError, runner.run,
+            [sys.executable, '-c', 'import sys; sys.exit(1)'],
+            expect_fail=True)
+        list(runner.run_gen([sys.executable, '-c', 'print("12345")']))
+    stats.write_to_file(path)
+    with open(path) as f:
+        d = json.load(f)
+    eq_(d['total']['count'], 3)
+    eq_(d['total']['failed'], 1)
+    eq_(d['total']['stdout_bytes'], 12)
+    ok_(d['total']['wall'] > 0)
+    if hasattr(os, 'wait4'):
+        # usage is collected for processes reaped by wait() and poll() alike
+        ok_(d['total']['cpu'] > 0)
+
+
+def test_CommandStats_threads():
+    stats = CommandStats(enabled=True)
+    stats.push_interface('get')
+
+    def worker():
+        # does not see (or pop) interfaces of other threads
+        stats.push_interface('install')
+        stats.pop_interface('get')
+        stats.record(['git', 'clone'], 1.0)
+        stats.pop_interface('install')
+
+    t = threading.Thread(target=worker)
+    t.start()
+    t.join()
+    stats.record(['git', 'status'], 1.0)
+    eq_(set((r['verb'], r['interface']) for r in stats.as_dict()['commands']),
+        {('git clone', 'install'), ('git status', 'get')})
+
+
+@skip_if(cond=not hasattr(os, 'wait4'))
+def test_RusagePopen():
+    cmd = [sys.executable, '-c', 'sum(range(10 ** 6))']
+    # reaped by poll()
+    proc = _RusagePopen(cmd)
+    while proc.poll() is None:
+        time.sleep(0.01)
+    eq_(proc.returncode, 0)
+    ok_(_get_cpu_time(proc) > 0)
+    eq_(proc.wait(), 0)
+    # or wait()
+    proc = _RusagePopen([sys.executable, '-c', 'import sys; sys.exit(3)'])
+    eq_(proc.wait(), 3)
+    ok_(proc.rusage is not None)
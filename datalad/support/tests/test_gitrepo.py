@@ -168,6 +168,61 @@ def test_GitRepo_remove(path):
     eq_(set(gr.remove('*', r=True, f=True)), {'file2', 'd2/f1', 'd2/f2'})
 
 
+@with_tempfile(mkdir=True)
+@with_tempfile(mkdir=True)
+def test_GitRepo_many_files(path1, path2):
+    files = ['file%03d' % i for i in range(50)]
+    # with and without support for --pathspec-from-file
+    for path, pathspec_versions in (
+            (path1, GitRepo._PATHSPEC_FROM_FILE_VERSIONS), (path2, {})):
+        gr = GitRepo(path, create=True)
+        for f in files:
+            with open(opj(path, f), 'w') as fp:
+                fp.write(f)
+        # too many files for a single command line
+        with patch('datalad.cmd.CMD_MAX_ARG', 200), \
+                patch.object(GitRepo, '_PATHSPEC_FROM_FILE_VERSIONS',
+                             pathspec_versions):
+            added = gr.add(files)
+            eq_(sorted(a['file'] for a in added), files)
+            gr.commit("many files", files=files)
+        ok_clean_git(gr)
+        eq_(sorted(gr.get_indexed_files()), files)
+        # a single commit with all the files
+        eq_(len(list(gr.repo.iter_commits())), 1)
+        eq_(gr.repo.head.commit.message, "many files" + linesep)
+        eq_(len(gr.repo.head.commit.stats.files), len(files))
+
+        # files of the first chunks are not modified, but nevertheless an
+        # existing commit must not be amended
+        with open(opj(path, 'unrelated'), 'w') as fp:
+            fp.write('unrelated')
+        gr.add('unrelated')
+        gr.commit("unrelated", files=['unrelated'])
+        unrelated = gr.get_hexsha()
+        with open(opj(path, files[-1]), 'w') as fp:
+            fp.write('modified')
+        with patch('datalad.cmd.CMD_MAX_ARG', 200), \
+                patch.object(GitRepo, '_PATHSPEC_FROM_FILE_VERSIONS',
+                             pathspec_versions):
+            gr.commit("modified", files=files)
+        ok_clean_git(gr)
+        eq_(gr.repo.head.commit.parents[0].hexsha, unrelated)
+        eq_(gr.repo.head.commit.message, "modified" + linesep)
+        eq_(list(gr.repo.head.commit.stats.files), [files[-1]])
+
+
+def test_get_subcommand_index():
+    for cmd, subcmd in (
+            (['git', 'commit', '-m', 'msg'], 'commit'),
+            (['git', '-c', 'core.quotepath=false', 'commit'], 'commit'),
+            (['git', '-C', 'path', '--no-pager', 'add'], 'add'),
+            (['git', 'annex', 'proxy', '--', 'git', 'commit'], 'commit'),
+            (['git', 'annex', 'proxy', '--', 'git', '-c', 'a.b=c', 'rm'],
+             'rm')):
+        eq_(cmd[GitRepo._get_subcommand_index(cmd)], subcmd)
+
+
 @assert_cwd_unchanged
 @with_tempfile
 def test_GitRepo_commit(path):
@@ -1123,3 +1178,37 @@ def test_GitRepo_set_remote_url(path):
         gr.config['remote.some-without-url.url']
     eq_(set(gr.get_remotes()), {'some', 'some-without-url'})
     eq_(set(gr.get_remotes(with_urls_only=True)), {'some'})
+
+
+@with_tree(tree={'top.txt': 'top', 'sub': {'sub.txt': 'line1\nline2\n'}})
+def test_GitRepo_cat_file(path):
+    gr = GitRepo(path, create=True)
+    gr.add('.')
+    gr.commit("committed")
+
+    cat_file = gr.cat_file
+    # the same instance is reused
+    assert_is(cat_file, gr.cat_file)
+    hexsha, type_, size = cat_file.info('HEAD')
+    eq_(hexsha, gr.get_hexsha())
+    eq_(type_, 'commit')
+    eq_(cat_file.read('HEAD:sub/sub.txt')[1:], ('blob', b'line1\nline2\n'))
+    eq_(cat_file.info('HEAD:nonexistent'), None)
+    eq_(cat_file.read('HEAD:nonexistent'), None)
+    eq_(set(e[1] for e in cat_file.read_tree('HEAD')), {'top.txt', 'sub'})
+    eq_(sorted(e[1] for e in cat_file.traverse_tree('HEAD')),
+        ['sub/sub.txt', 'top.txt'])
+
+    eq_(gr.get_file_content('sub/sub.txt'), ['line1', 'line2'])
+    assert_raises(KeyError, gr.get_file_content, 'nonexistent')
+    assert_raises(ValueError, gr.get_hexsha, 'nonexistent')
+
+    # new commits are visible to the running process
+    create_tree(path, {'new.txt': 'new'})
+    gr.add('new.txt')
+    gr.commit("new one")
+    eq_(cat_file.info('HEAD')[0], gr.repo.head.object.hexsha)
+    assert_in('new.txt', gr.get_files(gr.get_active_branch()))
+
+    gr._close_cat_file()
+    eq_(gr._cat_file, None)
@@ -0,0 +1,125 @@
+# emacs: -*- mode: python; py-indent-offset: 4; tab-width: 4; indent-tabs-mode: nil -*-
+# ex: set sts=4 ts=4 sw=4 noet:
+# ## ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ##
+#
+#   See COPYING file distributed along with the datalad package for the
+#   copyright and license terms.
+#
+# ## ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ##
+"""Tests for helpers of concurrent execution"""
+
+import random
+import threading
+import time
+
+from datalad.support.parallel import get_job_shares
+from datalad.support.parallel import run_balanced
+from datalad.support.parallel import walk_tree
+from datalad.tests.utils import assert_raises
+from datalad.tests.utils import eq_
+from datalad.tests.utils import ok_
+
+# a -> (b -> (d, e), c -> (f))
+_tree = {
+    'a': ['b', 'c'],
+    'b': ['d', 'e'],
+    'c': ['f'],
+}
+
+
+def _check_walk_tree(jobs):
+    threads = set()
+
+    def expand(node):
+        threads.add(threading.current_thread())
+        # shuffle completion order
+        time.sleep(random.random() * 0.01)
+        return (node if node != 'a' else None), _tree.get(node, [])
+
+    eq_(list(walk_tree('a', expand, jobs=jobs)),
+        ['b', 'd', 'e', 'c', 'f'])
+    eq_(list(walk_tree('a', expand, jobs=jobs, bottomup=True)),
+        ['d', 'e', 'b', 'f', 'c'])
+    if jobs > 1:
+        ok_(threading.current_thread() not in threads)
+    else:
+        eq_(threads, {threading.current_thread()})
+
+
+def test_walk_tree():
+    for jobs in (1, 4):
+        yield _check_walk_tree, jobs
+
+
+def test_walk_tree_lazy():
+    expanded = []
+
+    def expand(node):
+        expanded.append(node)
+        return node, _tree.get(node, [])
+
+    # serial walk expands only what was walked
+    gen = walk_tree('a', expand)
+    eq_(next(gen), 'a')
+    eq_(next(gen), 'b')
+    eq_(expanded, ['a', 'b'])
+
+
+def test_walk_tree_error():
+    def expand(node):
+        if node == 'e':
+            raise ValueError(node)
+        return node, _tree.get(node, [])
+
+    for jobs in (1, 4):
+        gen = walk_tree('a', expand, jobs=jobs)
+        eq_([next(gen) for i in range(3)], ['a', 'b', 'd'])
+        assert_raises(ValueError, next, gen)
+
+
+def test_get_job_shares():
+    eq_(get_job_shares([10, 5, 5], 4), [2, 1, 1])
+    eq_(get_job_shares([100, 0, 1], 4), [3, 1, 1])
+    eq_(get_job_shares([1], 4), [4])
+    eq_(get_job_shares([0, 0], 4), [1, 1])
+
+
+def test_run_balanced():
+    lock = threading.Lock()
+    running = []
+    started = []
+
+    def func(item, jobs):
+        with lock:
+            started.append(item)
+            running.append(jobs)
+            # never more jobs than the budget at a time
+            ok_(sum(running) <= 4)
+        # shuffle completion order
+        time.sleep(random.random() * 0.01)
+        with lock:
+            running.remove(jobs)
+        return jobs
+
+    items = ['a', 'b', 'c', 'd', 'e']
+    weights = [1, 8, 1, 4, 2]
+    for jobs in (1, 4):
+        del started[:]
+        eq_(list(run_balanced(func, items, weights, jobs=jobs)),
+            [(i, (1 if jobs == 1 else s))
+             for i, s in zip(items, [1, 2, 1, 1, 1])])
+        if jobs > 1:
+            # heaviest first
+            eq_(started[0], 'b')
+
+
+def test_run_balanced_error():
+    def func(item, jobs):
+        if item == 'b':
+            raise ValueError(item)
+        return item
+
+    for jobs in (1, 4):
+        gen = run_balanced(func, ['a', 'b', 'c'], [1, 1, 1], jobs=jobs)
+        eq_(next(gen), ('a', 'a'))
+        assert_raises(ValueError, next, gen)
@@ -13,6 +13,8 @@ import logging
 import os
 from os.path import exists, isdir, getmtime, join as opj
 
+from mock import patch
+
 from datalad.support.external_versions import external_versions
 
 from datalad.tests.utils import assert_raises
@@ -25,7 +27,10 @@ from datalad.tests.utils import assert_in
 from datalad.tests.utils import ok_
 from datalad.tests.utils import assert_is_instance
 
+from ..exceptions import CommandError
+from ..network import SSHRI
 from ..sshconnector import SSHConnection, SSHManager, sh_quote
+from ..sshconnector import _RemoteShell
 from ..sshconnector import get_connection_hash
 
 
@@ -201,3 +206,89 @@ def test_ssh_git_props():
     # how annex was installed
     ok_(ssh.get_git_version())
     manager.close()  # close possibly still present connections
+
+
+def test_remote_shell():
+    # local shell is just as good to test the protocol
+    shell = _RemoteShell([])
+    eq_(shell('echo out; echo err >&2'), ('out\n', 'err\n', 0))
+    eq_(shell('printf noeol; exit 3'), ('noeol', '', 3))
+    # neither a syntax error, nor reading stdin, breaks the session
+    out, err, code = shell('echo "unbalanced')
+    ok_(code)
+    eq_(shell('cat'), ('', '', 0))
+    # commands do not affect each other
+    shell('export DATALAD_TEST_VAR=1; cd /')
+    eq_(shell('echo ${DATALAD_TEST_VAR:-unset}')[0], 'unset\n')
+    # lots of stderr does not block reading stdout
+    out, err, code = shell('seq 1 100000 >&2; echo done')
+    eq_(out, 'done\n')
+    eq_(len(err.splitlines()), 100000)
+    shell.close()
+    ok_(not shell.is_alive())
+    with assert_raises(CommandError) as cme:
+        shell('echo')
+    eq_(cme.exception.code, 255)
+
+
+@with_tempfile(content="socket")
+def test_ssh_cached_liveness(ctrl_path):
+    ssh = SSHConnection(ctrl_path, SSHRI(hostname='localhost'))
+    ssh._remote_props['installdir:annex'] = None
+    results = []
+    alive = [True]
+
+    def run(cmd, stdin, log_output):
+        if results:
+            raise results.pop()
+        return cmd, ''
+
+    def check():
+        ssh._alive = alive[0]
+        return alive[0]
+
+    with patch.object(ssh, 'is_open', side_effect=check) as is_open, \
+            patch.object(ssh, '_run', side_effect=run):
+        eq_(ssh('cmd1'), ('cmd1', ''))
+        eq_(is_open.call_count, 1)
+        # not checked as long as no command fails
+        eq_(ssh('cmd2'), ('cmd2', ''))
+        eq_(is_open.call_count, 1)
+        # failing command is not rerun while the connection is open
+        results.append(CommandError(code=255))
+        assert_raises(CommandError, ssh, 'cmd3')
+        eq_(is_open.call_count, 2)
+        # but is if the connection was lost
+        results.append(CommandError(code=255))
+        alive[0] = False
+
+        def reopen():
+            alive[0] = True
+            return check()
+
+        with patch.object(ssh, 'open', side_effect=reopen) as open_:
+            eq_(ssh('cmd4'), ('cmd4', ''))
+            eq_(open_.call_count, 1)
+        eq_(is_open.call_count, 4)
+        # other failures are not checked for
+        results.append(CommandError(code=1))
+        assert_raises(CommandError, ssh, 'cmd5')
+        eq_(is_open.call_count, 4)
+
+
+@skip_ssh
+def test_ssh_persistent_shell():
+    ssh = SSHConnection(
+        opj(SSHManager().socket_dir, get_connection_hash('localhost')),
+        SSHRI(hostname='localhost'), persistent_shell=True)
+    eq_(ssh('[ 1 = 2 ] && echo no || echo success')[0], 'success\n')
+    shell = ssh._shell
+    ok_(shell.is_alive())
+    eq_(ssh('echo one >&2; echo two'), ('two\n', 'one\n'))
+    # the very same shell session was used
+    ok_(ssh._shell is shell)
+    with assert_raises(CommandError) as cme:
+        ssh('exit 3')
+    eq_(cme.exception.code, 3)
+    ssh.close()
+    ok_(not shell.is_alive())
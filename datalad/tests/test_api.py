@@ -9,7 +9,9 @@
 '''Unit tests for Python API functionality.'''
 
 import re
+import sys
 from inspect import getargspec
+from subprocess import check_output
 
 from nose.tools import assert_true, assert_false
 from nose import SkipTest
@@ -34,6 +36,21 @@ def test_basic_setup():
     assert_in('Parameters', api.Dataset.create.__doc__)
 
 
+def test_lazy_import():
+    if sys.version_info < (3, 7):
+        raise SkipTest("interfaces are imported along with datalad.api")
+    out = check_output([
+        sys.executable, '-c',
+        "import sys, datalad.api; "
+        "print([m for m in ('git', 'requests', 'boto', 'keyring', "
+        "'datalad.distribution.dataset', 'datalad.distribution.install') "
+        "if m in sys.modules])"])
+    eq_(out.split()[-1], b'[]')
+    from datalad import api
+    assert_in('install', dir(api))
+    assert_in('Dataset', dir(api))
+
+
 def _test_consistent_order_of_args(intf, spec_posargs):
     f = getattr(intf, '__call__')
     args, varargs, varkw, defaults = getargspec(f)
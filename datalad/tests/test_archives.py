@@ -8,6 +8,9 @@
 # ## ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ##
 
 import os
+import threading
+import time
+import zipfile
 from os.path import join as opj, exists
 
 from mock import patch
@@ -130,6 +133,59 @@ def test_ExtractedArchive(path):
     if not os.environ.get('DATALAD_TESTS_TEMP_KEEP'):
         assert_false(exists(earchive.path))
 
+@with_tree((('d1', (('f1', 'f1 load'), ('f2', 'f2 load'))),
+            ('f3', 'f3 load')))
+@with_tempfile(mkdir=True)
+def check_extract_file(ext, path, outdir):
+    archive = opj(outdir, 'archive' + ext)
+    if ext == '.zip':
+        # do not depend on availability of the zip tool
+        with zipfile.ZipFile(archive, 'w') as zf:
+            for root, dirs, files in os.walk(path):
+                for f in files:
+                    fpath = opj(root, f)
+                    zf.write(
+                        fpath, os.path.relpath(fpath, os.path.dirname(path)))
+    else:
+        compress_files([os.path.basename(path)], archive,
+                       path=os.path.dirname(path))
+    earchive = ExtractedArchive(archive)
+    afile = opj(os.path.basename(path), 'd1', 'f2')
+    target = opj(outdir, 'target')
+    with patch('datalad.support.archives.decompress_file') as decompress:
+        eq_(earchive.extract_file(afile, target), target)
+        assert_false(decompress.called)
+    with open(target) as f:
+        eq_(f.read(), 'f2 load')
+    # nothing else got extracted
+    assert_false(exists(earchive.path))
+    if ext != '.zip':
+        # index is reused
+        assert_true(exists(earchive.index_path))
+        earchive = ExtractedArchive(archive, earchive.path)
+        with patch('tarfile.open') as tf_open:
+            earchive.extract_file(
+                opj(os.path.basename(path), 'f3'), target)
+            assert_false(tf_open.called)
+        with open(target) as f:
+            eq_(f.read(), 'f3 load')
+
+    # not present in the index -- falls back to full extraction
+    with patch.object(earchive, '_load_index', return_value=None):
+        earchive.extract_file(afile, target)
+    assert_true(earchive.is_extracted)
+    with open(target) as f:
+        eq_(f.read(), 'f2 load')
+    earchive.clean()
+    assert_false(exists(earchive.index_path))
+
+
+def test_extract_file():
+    yield check_extract_file, '.tar.gz'
+    yield check_extract_file, '.tar'
+    yield check_extract_file, '.zip'
+
+
 #@with_tree(**tree_simplearchive)
 #@with_tree(**tree_simplearchive)
 def test_ArchivesCache():
@@ -157,6 +213,101 @@ def test_ArchivesCache():
     assert_false(exists(cache_path))
 
 
+def _fake_decompress_file(archive, dir_, leading_directories='strip'):
+    with open(opj(dir_, 'load'), 'w') as f:
+        f.write('123456')
+
+
+@patch('datalad.support.archives.decompress_file', _fake_decompress_file)
+def test_ArchivesCache_evict():
+    cache = ArchivesCache(max_size=13)
+    archives = [cache[opj('/zuba', a)] for a in ('a1', 'a2', 'a3')]
+    now = time.time()
+    for i, earchive in enumerate(archives[:2]):
+        earchive.assure_extracted()
+        for p in (earchive.path, earchive.stamp_path):
+            os.utime(p, (now - 100 + i, now - 100 + i))
+    eq_(dict(cache.stats), {'hits': 0, 'misses': 2, 'evictions': 0})
+    eq_(ExtractedArchive.get_stamp_size(archives[0].path), 6)
+    # marks a1 as recently used
+    archives[0].assure_extracted()
+    archives[2].assure_extracted()
+    eq_(dict(cache.stats), {'hits': 1, 'misses': 3, 'evictions': 1})
+    eq_([a.is_extracted for a in archives], [True, False, True])
+    assert_true(exists(opj(cache.path, ArchivesCache.LOCK_FILENAME)))
+
+    # the one just extracted is kept even if exceeding the budget alone
+    cache.max_size = 1
+    archives[1].assure_extracted()
+    eq_([a.is_extracted for a in archives], [False, True, False])
+    eq_(cache.stats['evictions'], 3)
+    cache.clean()
+    assert_false(exists(cache.path))
+
+
+@patch('datalad.support.archives.decompress_file', _fake_decompress_file)
+def test_ArchivesCache_evict_index():
+    cache = ArchivesCache(max_size=13)
+    archives = [cache[opj('/zuba', a)] for a in ('a1', 'a2')]
+    # index of an archive, members of which were extracted individually
+    with open(archives[0].index_path, 'w') as f:
+        f.write('0123456789')
+    now = time.time()
+    os.utime(archives[0].index_path, (now - 100, now - 100))
+    archives[1].assure_extracted()
+    eq_(cache.stats['evictions'], 1)
+    assert_false(exists(archives[0].index_path))
+    assert_true(archives[1].is_extracted)
+
+    # index is removed along with the extracted archive
+    with open(archives[1].index_path, 'w') as f:
+        f.write('0123456789')
+    cache.max_size = 1
+    archives[0].assure_extracted()
+    eq_(cache.stats['evictions'], 2)
+    assert_false(exists(archives[1].index_path))
+    eq_([a.is_extracted for a in archives], [True, False])
+    cache.clean()
+
+
+def test_ArchivesCache_lock_threads():
+    cache = ArchivesCache()
+    shared = threading.Event()
+    release = threading.Event()
+    acquired = []
+
+    def hold_shared():
+        with cache.lock(shared=True):
+            shared.set()
+            release.wait(10)
+
+    def hold(shared):
+        with cache.lock(shared=shared):
+            acquired.append(shared)
+
+    holder = threading.Thread(target=hold_shared)
+    holder.start()
+    assert_true(shared.wait(10))
+    threads = [threading.Thread(target=hold, args=(s,)) for s in (True, False)]
+    for t in threads:
+        t.start()
+    threads[0].join(10)
+    # shared locks do not exclude each other, but an exclusive one waits
+    eq_(acquired, [True])
+    release.set()
+    for t in [holder] + threads:
+        t.join(10)
+    eq_(acquired, [True, False])
+
+    with cache.lock(shared=True):
+        assert_raises(RuntimeError, cache.lock().__enter__)
+    with cache.lock():
+        with cache.lock(shared=True):
+            pass
+    eq_(cache._lock_holders, {})
+    cache.clean()
+
+
 def _test_get_leading_directory(ea, return_value, target_value, kwargs={}):
     with patch.object(ExtractedArchive, 'get_extracted_files', return_value=return_value):
         assert_equal(ea.get_leading_directory(**kwargs), target_value)
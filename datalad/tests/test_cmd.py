@@ -21,6 +21,8 @@ from .utils import ok_, eq_, assert_is, assert_equal, assert_false, \
 
 from ..cmd import Runner, link_file_load
 from ..cmd import GitRunner
+from ..cmd import generate_file_chunks
+from ..cmd import run_chunked
 from ..support.exceptions import CommandError
 from ..support.protocol import DryRunProtocol
 from .utils import with_tempfile, assert_cwd_unchanged, \
@@ -290,3 +292,71 @@ def test_runner_stdin(path):
     with swallow_outputs() as cmo, open(opj(path, "test_input.txt"), "r") as fake_input:
         runner.run(['cat'], log_stdout=False, stdin=fake_input)
         assert_in("whatever", cmo.out)
+
+
+def test_runner_gen():
+    runner = Runner()
+    eq_(list(runner.run_gen([sys.executable, '-c',
+                             'print("line1"); print("line2")'])),
+        ['line1' + os.linesep, 'line2' + os.linesep])
+
+    # failure is reported only after all the output was yielded
+    out = []
+    with assert_raises(CommandError) as cme:
+        for line in runner.run_gen(
+                [sys.executable, '-c',
+                 'import sys; print("out"); sys.stderr.write("err"); '
+                 'sys.exit(3)'],
+                expect_fail=True):
+            out.append(line)
+    eq_(out, ['out' + os.linesep])
+    eq_(cme.exception.code, 3)
+    eq_(cme.exception.stderr, 'err')
+
+    # nothing gets run in dry mode
+    dry = DryRunProtocol()
+    eq_(list(Runner(protocol=dry).run_gen(['echo', 'dry'])), [])
+    eq_(dry[0]['command'], ['echo', 'dry'])
+
+
+@patch('datalad.cmd.CMD_MAX_ARG', 20)
+def test_generate_file_chunks():
+    eq_(list(generate_file_chunks([])), [])
+    eq_(list(generate_file_chunks(['a', 'b'])), [['a', 'b']])
+    files = ['f%d' % i for i in range(10)]
+    chunks = list(generate_file_chunks(files, ['cmd', 'arg']))
+    eq_(sum(chunks, []), files)
+    eq_(chunks[0], ['f0', 'f1', 'f2', 'f3'])
+    # a file too long on its own still gets its own chunk
+    eq_(list(generate_file_chunks(['a' * 30, 'b'])), [['a' * 30], ['b']])
+
+
+@patch('datalad.cmd.CMD_MAX_ARG', 20)
+def test_run_chunked():
+    files = ['f%d' % i for i in range(10)]
+    for jobs in (None, 3):
+        calls = []
+
+        def run(cmd):
+            calls.append(cmd)
+            return ' '.join(cmd[1:]) + '\n', ''
+        eq_(run_chunked(run, ['ls'], files[:2], jobs=jobs),
+            ('f0 f1\n', ''))
+        eq_(len(calls), 1)
+        out, err = run_chunked(run, ['ls'], files, jobs=jobs)
+        eq_(out.split(), files)
+        assert_greater(len(calls), 2)
+
+    # failure is raised after all chunks were processed
+    calls = []
+
+    def run_failing(cmd):
+        if 'f0' in cmd:
+            calls.append(cmd)
+            raise CommandError(cmd=cmd, code=1, stdout='', stderr='failed\n')
+        return run(cmd)
+    with assert_raises(CommandError) as cme:
+        run_chunked(run_failing, ['ls'], files)
+    eq_(sum([c[1:] for c in calls], []), files)
+    eq_(cme.exception.stderr, 'failed\n')
+    eq_(cme.exception.stdout.split(), files[len(calls[0]) - 1:])
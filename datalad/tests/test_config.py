@@ -11,6 +11,7 @@
 """
 
 import os
+import threading
 from os.path import exists
 from os.path import join as opj
 
@@ -26,7 +27,12 @@ from datalad.utils import swallow_logs
 from datalad.distribution.dataset import Dataset
 from datalad.api import create
 from datalad.config import ConfigManager
+from datalad.config import _parse_gitconfig_file
+from datalad.config import _get_global_cfg_dump
+from datalad.config import _get_repo_cfgfname
 from datalad.cmd import CommandError
+from datalad.cmd import GitRunner
+from datalad.support.gitrepo import GitRepo
 
 from datalad.tests.utils import with_testsui
 
@@ -298,6 +304,118 @@ def test_obtain(path):
     #ask()
 
 
+@with_tree(tree={
+    'cfg': """\
+[something]
+user = name=Jane Doe
+	myint = 3   ; comment
+[onemore "complicated の beast with.dot"]
+findme = 5.0
+[Legacy.Sub]
+  Key = "  quoted # not a comment " trailing  \\
+ continued
+escaped = a\\tb\\\\c   \\"q\\"
+empty =
+""",
+    'include': """\
+[include]
+path = cfg
+""",
+    'valueless': """\
+[some]
+flag
+"""})
+def test_parse_gitconfig_file(path):
+    # must produce exactly the same dump as git itself does
+    stdout, stderr = GitRunner().run(
+        ['git', 'config', '-z', '-l', '--show-origin',
+         '--file', opj(path, 'cfg')])
+    assert_equal(_parse_gitconfig_file(opj(path, 'cfg')), stdout.rstrip('\0'))
+    # we leave anything fancy to git
+    assert_raises(ValueError, _parse_gitconfig_file, opj(path, 'include'))
+    assert_raises(ValueError, _parse_gitconfig_file, opj(path, 'valueless'))
+
+
+@with_tempfile(mkdir=True)
+def test_global_cfg_cache(new_home):
+    class CountingRunner(GitRunner):
+        ncalls = 0
+
+        def run(self, *args, **kwargs):
+            CountingRunner.ncalls += 1
+            return super(CountingRunner, self).run(*args, **kwargs)
+
+    runner = CountingRunner()
+    with patch.dict('os.environ', {'HOME': new_home}):
+        dump, files = _get_global_cfg_dump(runner)
+        assert_in(opj(new_home, '.gitconfig'), files)
+        assert_not_in('datalad.unittest.cached', dump)
+        ncalls = CountingRunner.ncalls
+        # nothing changed -- git is not asked again
+        assert_equal(_get_global_cfg_dump(runner), (dump, files))
+        assert_equal(CountingRunner.ncalls, ncalls)
+        # creation of a global config gets noticed
+        with open(opj(new_home, '.gitconfig'), 'w') as f:
+            f.write('[datalad "unittest"]\n\tcached = yes\n')
+        dump, files = _get_global_cfg_dump(runner)
+        assert_in('datalad.unittest.cached', dump)
+        assert_true(CountingRunner.ncalls > ncalls)
+
+
+@with_tempfile(mkdir=True)
+@with_tempfile(mkdir=True)
+def test_global_cfg_includes(path, new_home):
+    ds = Dataset(path)
+    GitRepo(path, create=True)
+    with open(opj(new_home, 'included'), 'w') as f:
+        f.write('[datalad "unittest"]\n\tincluded = yes\n')
+    with open(opj(new_home, '.gitconfig'), 'w') as f:
+        f.write('[includeIf "gitdir:%s/"]\n\tpath = %s\n'
+                % (path, opj(new_home, 'included')))
+    with patch.dict('os.environ', {'HOME': new_home}):
+        # conditional includes depend on the repository, nothing to share
+        dump, files = _get_global_cfg_dump(GitRunner())
+        assert_equal(dump, None)
+        cfg = ConfigManager(ds)
+        assert_equal(cfg.get('datalad.unittest.included'), 'yes')
+        assert_not_in('datalad.unittest.included', ConfigManager())
+
+
+@with_tempfile(mkdir=True)
+@with_tempfile
+def test_worktree_cfgfname(path, wtpath):
+    ds = Dataset(path)
+    GitRepo(path, create=True).commit('init', options=['--allow-empty'])
+    ds.config.add('datalad.unittest.worktree', 'yes', where='local')
+    GitRunner(cwd=path).run(['git', 'worktree', 'add', wtpath])
+    assert_equal(_get_repo_cfgfname(wtpath), opj(path, '.git', 'config'))
+    cfg = ConfigManager(Dataset(wtpath))
+    assert_equal(cfg.get('datalad.unittest.worktree'), 'yes')
+
+
+@with_tree(tree=_dataset_config_template)
+def test_concurrent_reload(path):
+    cfg = ConfigManager(Dataset(opj(path, 'ds')), dataset_only=True)
+    missing = []
+
+    def reload():
+        for i in range(20):
+            cfg.reload(force=True)
+
+    def get():
+        for i in range(200):
+            if 'something.myint' not in cfg:
+                missing.append(i)
+
+    threads = [threading.Thread(target=f) for f in (reload, get, get)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    # a reload never exposes a partially loaded configuration
+    assert_equal(missing, [])
+
+
 def test_from_env():
     cfg = ConfigManager()
     assert_not_in('datalad.crazy.cfg', cfg)
@@ -21,7 +21,6 @@ import tempfile
 import platform
 import gc
 import glob
-import wrapt
 
 from contextlib import contextmanager
 from functools import wraps
@@ -558,6 +557,8 @@ def better_wraps(to_be_wrapped):
     It is written with the intention to replace the use of `wraps` without any
     need to rewrite the actual decorators.
     """
+    # takes a while to import, and is needed only for decorating
+    import wrapt
 
     @wrapt.decorator(adapter=to_be_wrapped)
     def intermediator(to_be_wrapper, instance, args, kwargs):
@@ -620,7 +621,6 @@ def get_tempfile_kwargs(tkwargs=None, prefix="", wrapped=None):
     return tkwargs_
 
 
-@optional_args
 def line_profile(func):
     """Q&D helper to line profile the function and spit out stats
     """